@@ -0,0 +1,34 @@
+"""Per-job metrics on cron_runs
+
+Revision ID: 0b7d5e2a9f14
+Revises: f3a9c6e21b58
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7d5e2a9f14'
+down_revision: Union[str, Sequence[str], None] = 'f3a9c6e21b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cron_runs', sa.Column('rows_scanned', sa.Integer(), nullable=True))
+    op.add_column('cron_runs', sa.Column('emails_sent', sa.Integer(), nullable=True))
+    op.add_column('cron_runs', sa.Column('db_ms', sa.Integer(), nullable=True))
+    op.add_column('cron_runs', sa.Column('gmail_ms', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('cron_runs', 'gmail_ms')
+    op.drop_column('cron_runs', 'db_ms')
+    op.drop_column('cron_runs', 'emails_sent')
+    op.drop_column('cron_runs', 'rows_scanned')
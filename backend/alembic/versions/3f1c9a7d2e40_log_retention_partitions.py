@@ -0,0 +1,134 @@
+"""Log retention: monthly partitions (Postgres) and archive tables
+
+Revision ID: 3f1c9a7d2e40
+Revises: b92a23a86e89
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from datetime import datetime, timedelta, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2e40'
+down_revision: Union[str, Sequence[str], None] = 'b92a23a86e89'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOG_TABLES = ('audit_logs', 'communication_logs')
+PARTITIONS_AHEAD = 2
+
+
+def _next_month(dt):
+    return (dt.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _partition_table(table):
+    """Rebuild `table` as a table range-partitioned by created_at, one partition per month."""
+    bind = op.get_bind()
+    op.execute(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL")
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+    op.execute(f"ALTER TABLE {table}_legacy RENAME CONSTRAINT {table}_pkey TO {table}_legacy_pkey")
+    op.execute(f"ALTER INDEX IF EXISTS ix_{table}_id RENAME TO ix_{table}_legacy_id")
+    op.execute(
+        f"CREATE TABLE {table} (LIKE {table}_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE (created_at)"
+    )
+    # Partition key must be part of the primary key
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, created_at)")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+    oldest = bind.execute(sa.text(f"SELECT min(created_at) FROM {table}_legacy")).scalar()
+    now = datetime.now(timezone.utc)
+    month = (oldest or now).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    last = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(PARTITIONS_AHEAD):
+        last = _next_month(last)
+    while month <= last:
+        upper = _next_month(month)
+        op.execute(
+            f"CREATE TABLE {table}_p{month.strftime('%Y%m')} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    op.execute(f"INSERT INTO {table} SELECT * FROM {table}_legacy")
+    op.execute(f"DROP TABLE {table}_legacy")
+    op.execute(f"ALTER TABLE {table} ADD FOREIGN KEY (workspace_id) REFERENCES workspaces (id)")
+    op.execute(f"ALTER TABLE {table} ADD FOREIGN KEY (booking_id) REFERENCES bookings (id)")
+    op.create_index(f'ix_{table}_id', table, ['id'], unique=False)
+
+
+def _unpartition_table(table):
+    op.execute(f"CREATE TABLE {table}_flat (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    op.execute(f"INSERT INTO {table}_flat SELECT * FROM {table}")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}_flat.id")
+    op.execute(f"DROP TABLE {table} CASCADE")
+    op.execute(f"ALTER TABLE {table}_flat RENAME TO {table}")
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+    op.create_index(f'ix_{table}_id', table, ['id'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        for table in LOG_TABLES:
+            _partition_table(table)
+
+    op.create_index('ix_audit_logs_booking_id', 'audit_logs', ['booking_id'], unique=False)
+    op.create_index('ix_audit_logs_workspace_created', 'audit_logs', ['workspace_id', 'created_at'], unique=False)
+    op.create_index('ix_communication_logs_booking_id', 'communication_logs', ['booking_id'], unique=False)
+    op.create_index('ix_communication_logs_workspace_created', 'communication_logs', ['workspace_id', 'created_at'], unique=False)
+
+    # Archive tables are only written on SQLite, but exist everywhere so the schema matches the models
+    op.create_table('audit_logs_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('workspace_id', sa.Integer(), nullable=False),
+    sa.Column('booking_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('action', sa.String(), nullable=False),
+    sa.Column('details', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_audit_logs_archive_booking_id', 'audit_logs_archive', ['booking_id'], unique=False)
+    op.create_index('ix_audit_logs_archive_created_at', 'audit_logs_archive', ['created_at'], unique=False)
+    op.create_table('communication_logs_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('workspace_id', sa.Integer(), nullable=False),
+    sa.Column('contact_id', sa.Integer(), nullable=True),
+    sa.Column('booking_id', sa.Integer(), nullable=True),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('recipient_email', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_communication_logs_archive_booking_id', 'communication_logs_archive', ['booking_id'], unique=False)
+    op.create_index('ix_communication_logs_archive_created_at', 'communication_logs_archive', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_communication_logs_archive_created_at', table_name='communication_logs_archive')
+    op.drop_index('ix_communication_logs_archive_booking_id', table_name='communication_logs_archive')
+    op.drop_table('communication_logs_archive')
+    op.drop_index('ix_audit_logs_archive_created_at', table_name='audit_logs_archive')
+    op.drop_index('ix_audit_logs_archive_booking_id', table_name='audit_logs_archive')
+    op.drop_table('audit_logs_archive')
+
+    op.drop_index('ix_communication_logs_workspace_created', table_name='communication_logs')
+    op.drop_index('ix_communication_logs_booking_id', table_name='communication_logs')
+    op.drop_index('ix_audit_logs_workspace_created', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_booking_id', table_name='audit_logs')
+
+    if op.get_bind().dialect.name == 'postgresql':
+        for table in LOG_TABLES:
+            op.drop_index(f'ix_{table}_id', table_name=table)
+            _unpartition_table(table)
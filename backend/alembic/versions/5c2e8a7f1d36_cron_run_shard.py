@@ -0,0 +1,28 @@
+"""Shard label on cron_runs
+
+Revision ID: 5c2e8a7f1d36
+Revises: 0b7d5e2a9f14
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8a7f1d36'
+down_revision: Union[str, Sequence[str], None] = '0b7d5e2a9f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cron_runs', sa.Column('shard', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('cron_runs', 'shard')
@@ -0,0 +1,35 @@
+"""Shared availability cache table
+
+Revision ID: 7a4d2c9e6b15
+Revises: 5c2e8a7f1d36
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4d2c9e6b15'
+down_revision: Union[str, Sequence[str], None] = '5c2e8a7f1d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('availability_cache',
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('tz', sa.String(), nullable=False),
+    sa.Column('slots', sa.JSON(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('service_id', 'day', 'tz')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('availability_cache')
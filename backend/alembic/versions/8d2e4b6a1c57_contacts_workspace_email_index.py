@@ -0,0 +1,28 @@
+"""Add (workspace_id, email) index on contacts for bulk import dedup
+
+Revision ID: 8d2e4b6a1c57
+Revises: 3f1c9a7d2e40
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e4b6a1c57'
+down_revision: Union[str, Sequence[str], None] = '3f1c9a7d2e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_contacts_workspace_email', 'contacts', ['workspace_id', 'email'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contacts_workspace_email', table_name='contacts')
@@ -0,0 +1,30 @@
+"""Staff pool on services
+
+Revision ID: 9e3b7f5a2c48
+Revises: 7a4d2c9e6b15
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3b7f5a2c48'
+down_revision: Union[str, Sequence[str], None] = '7a4d2c9e6b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('services', sa.Column('staff_ids', sa.JSON(), nullable=True))
+    op.create_index('ix_bookings_staff_start', 'bookings', ['staff_id', 'start_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_staff_start', table_name='bookings')
+    op.drop_column('services', 'staff_ids')
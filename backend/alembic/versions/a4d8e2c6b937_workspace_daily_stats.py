@@ -0,0 +1,77 @@
+"""Daily per-workspace stats rollup
+
+Revision ID: a4d8e2c6b937
+Revises: e9b4c2f7a618
+Create Date: 2026-10-20 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d8e2c6b937'
+down_revision: Union[str, Sequence[str], None] = 'e9b4c2f7a618'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every day that already has activity starts out dirty; the stats_rollup job fills the table in
+SEED = [
+    ("bookings", "SELECT DISTINCT workspace_id, {day} FROM bookings WHERE workspace_id IS NOT NULL",
+     "start_time"),
+    ("emails", "SELECT DISTINCT workspace_id, {day} FROM communication_logs WHERE created_at IS NOT NULL",
+     "created_at"),
+    ("forms", "SELECT DISTINCT coalesce(b.workspace_id, f.workspace_id), {day} FROM form_submissions s "
+              "LEFT JOIN bookings b ON b.id = s.booking_id LEFT JOIN forms f ON f.id = s.form_id "
+              "WHERE s.status = 'completed' AND s.completed_at IS NOT NULL "
+              "AND coalesce(b.workspace_id, f.workspace_id) IS NOT NULL",
+     "s.completed_at"),
+    ("leads", "SELECT DISTINCT workspace_id, {day} FROM contacts WHERE workspace_id IS NOT NULL AND created_at IS NOT NULL",
+     "created_at"),
+]
+
+
+def _day(dialect: str, column: str) -> str:
+    return f"({column} AT TIME ZONE 'UTC')::date" if dialect == 'postgresql' else f"date({column})"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'workspace_daily_stats',
+        sa.Column('workspace_id', sa.Integer(), sa.ForeignKey('workspaces.id'), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('bookings_total', sa.Integer(), nullable=False),
+        sa.Column('bookings_by_status', sa.JSON(), nullable=False),
+        sa.Column('bookings_by_service', sa.JSON(), nullable=False),
+        sa.Column('bookings_by_staff', sa.JSON(), nullable=False),
+        sa.Column('emails_sent', sa.Integer(), nullable=False),
+        sa.Column('emails_failed', sa.Integer(), nullable=False),
+        sa.Column('forms_completed', sa.Integer(), nullable=False),
+        sa.Column('new_leads', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_table(
+        'workspace_stats_dirty',
+        sa.Column('workspace_id', sa.Integer(), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('source', sa.String(length=16), primary_key=True),
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    )
+    op.create_index('ix_form_submissions_completed_at', 'form_submissions', ['completed_at'], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    for source, select_sql, column in SEED:
+        op.execute(
+            f"INSERT INTO workspace_stats_dirty (workspace_id, day, source, version) "
+            f"SELECT d.*, '{source}', 1 FROM ({select_sql.format(day=_day(dialect, column))}) AS d"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_form_submissions_completed_at', table_name='form_submissions')
+    op.drop_table('workspace_stats_dirty')
+    op.drop_table('workspace_daily_stats')
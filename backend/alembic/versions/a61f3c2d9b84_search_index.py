@@ -0,0 +1,82 @@
+"""Full-text search index for contacts and messages
+
+Revision ID: a61f3c2d9b84
+Revises: 8d2e4b6a1c57
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a61f3c2d9b84'
+down_revision: Union[str, Sequence[str], None] = '8d2e4b6a1c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5("
+    "full_name, email, phone, content='contacts', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS contacts_fts_ai AFTER INSERT ON contacts BEGIN "
+    "INSERT INTO contacts_fts(rowid, full_name, email, phone) VALUES (new.id, new.full_name, new.email, new.phone); END",
+    "CREATE TRIGGER IF NOT EXISTS contacts_fts_ad AFTER DELETE ON contacts BEGIN "
+    "INSERT INTO contacts_fts(contacts_fts, rowid, full_name, email, phone) "
+    "VALUES ('delete', old.id, old.full_name, old.email, old.phone); END",
+    "CREATE TRIGGER IF NOT EXISTS contacts_fts_au AFTER UPDATE OF full_name, email, phone ON contacts BEGIN "
+    "INSERT INTO contacts_fts(contacts_fts, rowid, full_name, email, phone) "
+    "VALUES ('delete', old.id, old.full_name, old.email, old.phone); "
+    "INSERT INTO contacts_fts(rowid, full_name, email, phone) VALUES (new.id, new.full_name, new.email, new.phone); END",
+    "INSERT INTO contacts_fts(contacts_fts) VALUES ('rebuild')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5("
+    "content, content='messages', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN "
+    "INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN "
+    "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE OF content ON messages BEGIN "
+    "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+    "INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content); END",
+    "INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS contacts_fts_ai",
+    "DROP TRIGGER IF EXISTS contacts_fts_ad",
+    "DROP TRIGGER IF EXISTS contacts_fts_au",
+    "DROP TABLE IF EXISTS contacts_fts",
+    "DROP TRIGGER IF EXISTS messages_fts_ai",
+    "DROP TRIGGER IF EXISTS messages_fts_ad",
+    "DROP TRIGGER IF EXISTS messages_fts_au",
+    "DROP TABLE IF EXISTS messages_fts",
+]
+
+# Expressions must match CONTACT_TSV / MESSAGE_TSV in app/services/search.py
+POSTGRES_UPGRADE = [
+    "CREATE INDEX IF NOT EXISTS ix_contacts_search ON contacts USING gin ("
+    "to_tsvector('simple', coalesce(full_name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(phone, '')))",
+    "CREATE INDEX IF NOT EXISTS ix_messages_search ON messages USING gin (to_tsvector('simple', content))",
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_messages_search",
+    "DROP INDEX IF EXISTS ix_contacts_search",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    statements = POSTGRES_UPGRADE if dialect == 'postgresql' else SQLITE_UPGRADE if dialect == 'sqlite' else []
+    for stmt in statements:
+        op.execute(stmt)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    statements = POSTGRES_DOWNGRADE if dialect == 'postgresql' else SQLITE_DOWNGRADE if dialect == 'sqlite' else []
+    for stmt in statements:
+        op.execute(stmt)
@@ -0,0 +1,40 @@
+"""Claim markers for thank-you emails and daily owner alerts
+
+Revision ID: b6e1f3a8d524
+Revises: a4d8e2c6b937
+Create Date: 2026-10-21 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e1f3a8d524'
+down_revision: Union[str, Sequence[str], None] = 'a4d8e2c6b937'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('bookings', sa.Column('thank_you_sent', sa.Boolean(), server_default=sa.false(), nullable=True))
+    op.add_column('workspaces', sa.Column('owner_alert_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Carry over what the communication log already records, so nothing is sent a second time
+    op.execute(
+        "UPDATE bookings SET thank_you_sent = true WHERE id IN "
+        "(SELECT booking_id FROM communication_logs WHERE type = 'thank_you' AND booking_id IS NOT NULL)"
+    )
+    op.execute(
+        "UPDATE workspaces SET owner_alert_at = (SELECT max(created_at) FROM communication_logs "
+        "WHERE communication_logs.workspace_id = workspaces.id AND type = 'owner_alert')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('workspaces', 'owner_alert_at')
+    op.drop_column('bookings', 'thank_you_sent')
@@ -0,0 +1,28 @@
+"""Add forms.version for compiled schema cache
+
+Revision ID: c47e1b9d3a26
+Revises: a61f3c2d9b84
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47e1b9d3a26'
+down_revision: Union[str, Sequence[str], None] = 'a61f3c2d9b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('forms', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('forms', 'version')
@@ -0,0 +1,135 @@
+"""Move message text into a compressed body store
+
+Revision ID: c7e3a9d5f142
+Revises: d2a6f9c3e815
+Create Date: 2026-10-20 15:00:00.000000
+
+"""
+import hashlib
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e3a9d5f142'
+down_revision: Union[str, Sequence[str], None] = 'd2a6f9c3e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match PREVIEW_CHARS / COMPRESS_MIN_BYTES in app/models/conversation.py
+PREVIEW_CHARS = 200
+COMPRESS_MIN_BYTES = 1024
+BATCH = 1000
+
+SQLITE_FTS_TRIGGERS = ["messages_fts_ai", "messages_fts_ad", "messages_fts_au"]
+
+# The previous external-content index, restored on downgrade (see a61f3c2d9b84)
+SQLITE_DOWNGRADE = [
+    "DROP TABLE IF EXISTS messages_fts",
+    "CREATE VIRTUAL TABLE messages_fts USING fts5("
+    "content, content='messages', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN "
+    "INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN "
+    "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE OF content ON messages BEGIN "
+    "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+    "INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content); END",
+    "INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')",
+]
+
+
+def _encode(raw: bytes):
+    packed = zlib.compress(raw) if len(raw) >= COMPRESS_MIN_BYTES else raw
+    return ("zlib", packed) if len(packed) < len(raw) else ("plain", raw)
+
+
+def _batches(bind, sql):
+    """Rows of `sql` (which must select id first and take :after/:limit) in id order, BATCH at a time."""
+    after = 0
+    while True:
+        rows = bind.execute(sa.text(sql), {"after": after, "limit": BATCH}).all()
+        if not rows:
+            return
+        yield rows
+        after = rows[-1][0]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    op.create_table(
+        'message_bodies',
+        sa.Column('message_id', sa.Integer(), sa.ForeignKey('messages.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('encoding', sa.String(length=8), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+    )
+    op.add_column('messages', sa.Column('preview', sa.String(length=PREVIEW_CHARS), nullable=False, server_default=''))
+    op.add_column('messages', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('messages', sa.Column('body_size', sa.Integer(), nullable=False, server_default='0'))
+
+    if dialect == 'sqlite':
+        for trigger in SQLITE_FTS_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS messages_fts")
+        op.execute("CREATE VIRTUAL TABLE messages_fts USING fts5(content, prefix='2 3')")
+    elif dialect == 'postgresql':
+        # Postgres can still read the text here, so the vector is built in one statement
+        op.execute("DROP INDEX IF EXISTS ix_messages_search")
+        op.execute("ALTER TABLE messages ADD COLUMN search_vector tsvector")
+        op.execute("UPDATE messages SET search_vector = to_tsvector('simple', content)")
+        op.execute("CREATE INDEX ix_messages_search ON messages USING gin (search_vector)")
+
+    for rows in _batches(bind, "SELECT id, content FROM messages WHERE id > :after ORDER BY id LIMIT :limit"):
+        bodies, metas = [], []
+        for message_id, content in rows:
+            content = content or ""
+            raw = content.encode("utf-8")
+            encoding, data = _encode(raw)
+            bodies.append({"message_id": message_id, "encoding": encoding, "data": data})
+            metas.append({"row_id": message_id, "preview": " ".join(content.split())[:PREVIEW_CHARS],
+                          "hash": hashlib.sha256(raw).hexdigest(), "size": len(raw)})
+        bind.execute(sa.text("INSERT INTO message_bodies (message_id, encoding, data) "
+                             "VALUES (:message_id, :encoding, :data)"), bodies)
+        bind.execute(sa.text("UPDATE messages SET preview = :preview, content_hash = :hash, body_size = :size "
+                             "WHERE id = :row_id"), metas)
+        if dialect == 'sqlite':
+            bind.execute(sa.text("INSERT INTO messages_fts(rowid, content) VALUES (:id, :content)"),
+                         [{"id": message_id, "content": content or ""} for message_id, content in rows])
+
+    op.drop_column('messages', 'content')
+    op.create_index('ix_messages_conversation_hash', 'messages', ['conversation_id', 'content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    op.drop_index('ix_messages_conversation_hash', table_name='messages')
+    op.add_column('messages', sa.Column('content', sa.Text(), nullable=False, server_default=''))
+    for rows in _batches(bind, "SELECT message_id, encoding, data FROM message_bodies "
+                               "WHERE message_id > :after ORDER BY message_id LIMIT :limit"):
+        bind.execute(sa.text("UPDATE messages SET content = :content WHERE id = :row_id"), [
+            {"row_id": message_id,
+             "content": (zlib.decompress(data) if encoding == "zlib" else bytes(data)).decode("utf-8")}
+            for message_id, encoding, data in rows
+        ])
+
+    if dialect == 'sqlite':
+        for stmt in SQLITE_DOWNGRADE:
+            op.execute(stmt)
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_messages_search")
+        op.execute("ALTER TABLE messages DROP COLUMN search_vector")
+        op.execute("CREATE INDEX ix_messages_search ON messages USING gin (to_tsvector('simple', content))")
+
+    op.drop_column('messages', 'body_size')
+    op.drop_column('messages', 'content_hash')
+    op.drop_column('messages', 'preview')
+    op.drop_table('message_bodies')
@@ -0,0 +1,28 @@
+"""Index for auto-completing past bookings
+
+Revision ID: d2a6f9c3e815
+Revises: b3f8c1e7d524
+Create Date: 2026-10-20 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a6f9c3e815'
+down_revision: Union[str, Sequence[str], None] = 'b3f8c1e7d524'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_bookings_status_end', 'bookings', ['status', 'end_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_status_end', table_name='bookings')
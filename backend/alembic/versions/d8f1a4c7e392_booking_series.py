@@ -0,0 +1,65 @@
+"""Recurring booking series
+
+Revision ID: d8f1a4c7e392
+Revises: 9e3b7f5a2c48
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f1a4c7e392'
+down_revision: Union[str, Sequence[str], None] = '9e3b7f5a2c48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('booking_series',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('workspace_id', sa.Integer(), nullable=True),
+    sa.Column('service_id', sa.Integer(), nullable=True),
+    sa.Column('contact_id', sa.Integer(), nullable=True),
+    sa.Column('staff_id', sa.Integer(), nullable=True),
+    sa.Column('rule', sa.String(), nullable=False),
+    sa.Column('timezone', sa.String(), nullable=False),
+    sa.Column('start_time', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('ends_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('duration_minutes', sa.Integer(), nullable=False),
+    sa.Column('exdates', sa.JSON(), nullable=True),
+    sa.Column('materialized_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['contact_id'], ['contacts.id'], ),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ),
+    sa.ForeignKeyConstraint(['staff_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_booking_series_id'), 'booking_series', ['id'], unique=False)
+    op.create_index(op.f('ix_booking_series_workspace_id'), 'booking_series', ['workspace_id'], unique=False)
+    op.create_index(op.f('ix_booking_series_service_id'), 'booking_series', ['service_id'], unique=False)
+    op.create_index(op.f('ix_booking_series_staff_id'), 'booking_series', ['staff_id'], unique=False)
+    # Batch mode, so SQLite (which can't ALTER in a constraint) rebuilds the table instead
+    with op.batch_alter_table('bookings') as batch:
+        batch.add_column(sa.Column('series_id', sa.Integer(), nullable=True))
+        batch.create_index(batch.f('ix_bookings_series_id'), ['series_id'], unique=False)
+        batch.create_foreign_key('fk_bookings_series_id', 'booking_series', ['series_id'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('bookings') as batch:
+        batch.drop_constraint('fk_bookings_series_id', type_='foreignkey')
+        batch.drop_index(batch.f('ix_bookings_series_id'))
+        batch.drop_column('series_id')
+    op.drop_index(op.f('ix_booking_series_staff_id'), table_name='booking_series')
+    op.drop_index(op.f('ix_booking_series_service_id'), table_name='booking_series')
+    op.drop_index(op.f('ix_booking_series_workspace_id'), table_name='booking_series')
+    op.drop_index(op.f('ix_booking_series_id'), table_name='booking_series')
+    op.drop_table('booking_series')
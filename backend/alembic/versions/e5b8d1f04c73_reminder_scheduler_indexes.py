@@ -0,0 +1,30 @@
+"""Indexes for reminder scheduler rebuild
+
+Revision ID: e5b8d1f04c73
+Revises: c47e1b9d3a26
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8d1f04c73'
+down_revision: Union[str, Sequence[str], None] = 'c47e1b9d3a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_bookings_start_time', 'bookings', ['start_time'], unique=False)
+    op.create_index('ix_form_submissions_status_sent_at', 'form_submissions', ['status', 'sent_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_form_submissions_status_sent_at', table_name='form_submissions')
+    op.drop_index('ix_bookings_start_time', table_name='bookings')
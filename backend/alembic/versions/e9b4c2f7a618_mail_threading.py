@@ -0,0 +1,40 @@
+"""Gmail thread id and RFC 5322 threading headers
+
+Revision ID: e9b4c2f7a618
+Revises: c7e3a9d5f142
+Create Date: 2026-10-20 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9b4c2f7a618'
+down_revision: Union[str, Sequence[str], None] = 'c7e3a9d5f142'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('conversations', sa.Column('gmail_thread_id', sa.String(), nullable=True))
+    op.create_index('ix_conversations_workspace_thread', 'conversations', ['workspace_id', 'gmail_thread_id'], unique=True)
+    op.add_column('messages', sa.Column('message_id_header', sa.String(), nullable=True))
+    op.add_column('messages', sa.Column('in_reply_to', sa.String(), nullable=True))
+    op.add_column('messages', sa.Column('reference_ids', sa.Text(), nullable=True))
+    op.create_index(op.f('ix_messages_message_id_header'), 'messages', ['message_id_header'], unique=False)
+    op.create_index(op.f('ix_messages_in_reply_to'), 'messages', ['in_reply_to'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_messages_in_reply_to'), table_name='messages')
+    op.drop_index(op.f('ix_messages_message_id_header'), table_name='messages')
+    op.drop_column('messages', 'reference_ids')
+    op.drop_column('messages', 'in_reply_to')
+    op.drop_column('messages', 'message_id_header')
+    op.drop_index('ix_conversations_workspace_thread', table_name='conversations')
+    op.drop_column('conversations', 'gmail_thread_id')
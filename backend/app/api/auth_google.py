@@ -8,9 +8,6 @@ Implements CSRF protection with state parameter.
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
-from google_auth_oauthlib.flow import Flow
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 import secrets
 import os
 from datetime import datetime
@@ -51,6 +48,8 @@ def get_oauth_flow(redirect_uri: str):
         }
     }
     
+    from google_auth_oauthlib.flow import Flow  # Slow to import; only needed during OAuth
+
     flow = Flow.from_client_config(
         client_config,
         scopes=SCOPES,
@@ -134,6 +133,7 @@ def google_oauth_callback(
         credentials = flow.credentials
         
         # Get user email
+        from googleapiclient.discovery import build
         user_info_service = build('oauth2', 'v2', credentials=credentials)
         user_info = user_info_service.userinfo().get().execute()
         email = user_info.get('email')
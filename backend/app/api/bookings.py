@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, Response, Query
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
 from app.api import deps
-from app.schemas.booking import BookingCreate, BookingOut, BookingUpdate, ContactUpdate
+from app.schemas.booking import BookingBulkAction, BookingCreate, BookingOut, BookingUpdate, ContactUpdate
 from app.schemas.onboarding import ServiceCreate # Only if using ServiceOut?
 # We need a schema for ServiceOut actually. 
 # Prompt said "GET /services/{workspace_slug} – public list of Services".
@@ -13,15 +13,20 @@ from app.schemas.onboarding import ServiceCreate # Only if using ServiceOut?
 
 from app.models.service import Service
 from app.models.booking import Booking, BookingStatus
+from app.models.booking_series import BookingSeries, SeriesStatus
 from app.models.contact import Contact
 from app.models.inventory import InventoryItem
-from app.models.workspace import Workspace
 from app.models.user import User
 from app.models.user import User
 from app.models.audit_log import AuditLog
 from app.services import email as email_service
+from app.services.scheduler import reminder_scheduler
+from app.services import availability, booking_bulk, capacity, catalog, http_cache, recurrence, waitlist
 from app.core.monitoring import log_booking_created, log_inventory_changed
 from app.core.rate_limit import public_rate_limiter
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.core.time_utils import ensure_utc
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,13 +34,15 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.get("/services/{workspace_slug}")
-def get_services(workspace_slug: str, db: Session = Depends(deps.get_db)):
-    workspace = db.query(Workspace).filter(Workspace.slug == workspace_slug).first()
+def get_services(workspace_slug: str, request: Request, response: Response, db: Session = Depends(deps.get_db)):
+    workspace = catalog.get_workspace_by_slug(db, workspace_slug)
     if not workspace:
         raise HTTPException(status_code=404, detail="Workspace not found")
-        
-    services = db.query(Service).filter(Service.workspace_id == workspace.id).all()
-    return services
+    tag = http_cache.etag("services", workspace.id, workspace.version)
+    not_modified = http_cache.conditional(request, response, tag, settings.HTTP_CACHE_CATALOG)
+    if not_modified:
+        return not_modified
+    return [s.to_dict() for s in workspace.services]
 
 @router.post("/", response_model=BookingOut)
 def create_booking(
@@ -52,25 +59,10 @@ def create_booking(
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
         
-    # 2. Check Availability (Overlap)
-    # Simple check: start_time match? Or range overlap?
-    # Prompt says "check slot available (query Bookings for same time/service)"
-    # Assuming fixed duration slots for MVP or exact start time match?
-    # We'll check if there is an overlapping booking for the SAME service.
-    # Overlap logic: (StartA < EndB) and (EndA > StartB)
+    # 2. Check Capacity (a free staff member, or the service itself if it has no staff)
     booking_end = booking_in.start_datetime + timedelta(minutes=service.duration_minutes)
-    
-    overlap = db.query(Booking).filter(
-        Booking.service_id == service.id,
-        Booking.status != BookingStatus.CANCELLED.value,
-        Booking.start_time < booking_end,
-        Booking.end_time > booking_in.start_datetime
-    ).first()
-    
-    if overlap:
-        # For a real system we'd check *capacity* (maybe multiple staff?). 
-        # MVP: 1 slot per service per time? Or 1 booking per slot?
-        # "check slot available". We'll assume single capacity per service instance for now.
+    slot = capacity.check(db, service, booking_in.start_datetime, booking_end)
+    if not slot.available:
         raise HTTPException(status_code=400, detail="Slot not available")
 
     # 3. Get/Create Contact
@@ -105,6 +97,7 @@ def create_booking(
         workspace_id=service.workspace_id,
         start_time=booking_in.start_datetime,
         end_time=booking_end,
+        staff_id=slot.pick(),
         status=BookingStatus.PENDING.value
     )
     db.add(booking)
@@ -158,6 +151,7 @@ def create_booking(
              
              # [MONITORING] Log inventory change
              log_inventory_changed(inventory_item.id, inventory_item.name, old_qty, inventory_item.quantity, "booking_created")
+             availability.inventory_changed(db, inventory_item.id, old_qty, inventory_item.quantity)
              
              # [NEW] Audit Log: Inventory Deducted
              audit_inv = AuditLog(
@@ -203,6 +197,8 @@ def create_booking(
         reminder_sent=False
     )
     db.add(pending_sub)
+    waitlist.mark_booked(db, booking)
+    availability.invalidate_booking(db, booking)
     
     db.commit()
     db.refresh(booking)
@@ -219,7 +215,8 @@ def create_booking(
     # 7. Background Tasks
     background_tasks.add_task(email_service.send_booking_confirmation, booking.id)
     background_tasks.add_task(email_service.send_form_magic_link, booking.id) 
-    # Reminder moved to Cron
+    reminder_scheduler.booking_changed(booking)
+    reminder_scheduler.form_submission_changed(pending_sub)
 
     
     return booking
@@ -230,11 +227,69 @@ def list_bookings(
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_active_staff_or_owner)
 ):
-    """List all bookings for the current user's workspace."""
-    bookings = db.query(Booking).filter(
+    """
+    List all bookings for the current user's workspace. One joined query of
+    plain columns, rendered as-is (see app/core/responses.py); the shape is
+    BookingOut's.
+    """
+    rows = db.query(
+        Booking.id, Booking.service_id, Booking.contact_id, Booking.start_time, Booking.end_time,
+        Booking.status, Booking.created_at,
+        Service.name, Service.duration_minutes, Service.location,
+        Contact.full_name, Contact.email, Contact.phone,
+    ).outerjoin(Service, Service.id == Booking.service_id).outerjoin(
+        Contact, Contact.id == Booking.contact_id
+    ).filter(
         Booking.workspace_id == current_user.workspace_id
     ).order_by(Booking.start_time.desc()).all()
-    return bookings
+
+    return FastJSONResponse([{
+        "id": r[0], "service_id": r[1], "contact_id": r[2], "start_time": r[3], "end_time": r[4],
+        "status": r[5], "created_at": r[6],
+        "service": {"id": r[1], "name": r[7], "duration_minutes": r[8], "location": r[9]} if r[7] is not None else None,
+        "contact": {"id": r[2], "full_name": r[10], "email": r[11], "phone": r[12]} if r[11] is not None else None,
+    } for r in rows])
+
+@router.get("/calendar")
+def get_calendar(
+    start: datetime = Query(...),
+    end: datetime = Query(...),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_staff_or_owner)
+):
+    """
+    Everything on the calendar in [start, end): booking rows plus the not yet
+    materialized occurrences of recurring series (id null, virtual true).
+    """
+    start, end = ensure_utc(start), ensure_utc(end)
+    if end <= start or end - start > timedelta(days=366):
+        raise HTTPException(status_code=400, detail="Window must be positive and at most 366 days")
+
+    bookings = db.query(Booking).filter(
+        Booking.workspace_id == current_user.workspace_id,
+        Booking.start_time < end,
+        Booking.end_time > start
+    ).all()
+    entries = [{
+        "id": b.id, "series_id": b.series_id, "service_id": b.service_id, "contact_id": b.contact_id,
+        "staff_id": b.staff_id, "start_time": ensure_utc(b.start_time), "end_time": ensure_utc(b.end_time),
+        "status": b.status, "virtual": False,
+    } for b in bookings]
+
+    series = db.query(BookingSeries).filter(
+        BookingSeries.workspace_id == current_user.workspace_id,
+        BookingSeries.status == SeriesStatus.ACTIVE.value,
+        BookingSeries.start_time < end,
+        (BookingSeries.ends_at == None) | (BookingSeries.ends_at > start)
+    ).all()
+    for s in series:
+        entries.extend({
+            "id": None, "series_id": s.id, "service_id": s.service_id, "contact_id": s.contact_id,
+            "staff_id": s.staff_id, "start_time": occ_start, "end_time": occ_end,
+            "status": "scheduled", "virtual": True,
+        } for occ_start, occ_end in recurrence.occurrences(s, start, end))
+
+    return sorted(entries, key=lambda e: e["start_time"])
 
 @router.post("/{booking_id}/cancel")
 async def cancel_booking(
@@ -287,6 +342,7 @@ async def cancel_booking(
             if item:
                 item.quantity += service.inventory_quantity_required
                 db.add(item)
+                availability.inventory_changed(db, item.id, item.quantity - service.inventory_quantity_required, item.quantity)
                 
                 # Audit Log: Inventory Returned
                 audit_inv = AuditLog(
@@ -303,6 +359,7 @@ async def cancel_booking(
                 )
                 db.add(audit_inv)
 
+    availability.invalidate_booking(db, booking)
     db.commit()
 
     # [NEW] Audit Log: Cancelled
@@ -316,8 +373,14 @@ async def cancel_booking(
     )
     db.add(audit_cancel)
     db.commit()
+    reminder_scheduler.booking_changed(booking)
+
+    # Offer the freed slot to the waitlist
+    waiting_ids = waitlist.slot_released(db, booking, current_user.id if current_user else None)
+    if waiting_ids:
+        db.commit()
+        background_tasks.add_task(email_service.send_waitlist_openings, waiting_ids, booking.start_time)
 
-    
     # Email
     background_tasks.add_task(email_service.send_booking_cancellation, booking.id)
     
@@ -433,12 +496,27 @@ def get_booking_history(
         raise HTTPException(status_code=404, detail="Booking not found")
 
     # Fetch Audits
-    from app.models.audit_log import AuditLog
-    audits = db.query(AuditLog).filter(AuditLog.booking_id == booking.id).all()
+    from app.models.audit_log import AuditLog, AuditLogArchive
+    from app.models.communication_log import CommunicationLog, CommunicationLogArchive
+    from app.services import retention
+
+    audit_q = db.query(AuditLog).filter(AuditLog.booking_id == booking.id)
+    comm_q = db.query(CommunicationLog).filter(CommunicationLog.booking_id == booking.id)
+    if booking.created_at:
+        # Nothing is logged before the booking exists; lets Postgres skip older partitions.
+        # One day of slack covers clock/precision differences between rows.
+        logged_since = booking.created_at - timedelta(days=1)
+        audit_q = audit_q.filter(AuditLog.created_at >= logged_since)
+        comm_q = comm_q.filter(CommunicationLog.created_at >= logged_since)
+    audits = audit_q.all()
     
     # Fetch Comms
-    from app.models.communication_log import CommunicationLog
-    comms = db.query(CommunicationLog).filter(CommunicationLog.booking_id == booking.id).all()
+    comms = comm_q.all()
+
+    # SQLite keeps cold rows in archive tables (Postgres keeps them in older partitions)
+    if not retention.is_postgres(db):
+        audits += db.query(AuditLogArchive).filter(AuditLogArchive.booking_id == booking.id).all()
+        comms += db.query(CommunicationLogArchive).filter(CommunicationLogArchive.booking_id == booking.id).all()
     
     # Merge and Sort
     timeline = []
@@ -466,7 +544,7 @@ def get_booking_history(
     # Sort by created_at desc
     timeline.sort(key=lambda x: x["created_at"], reverse=True)
     
-    return timeline
+    return FastJSONResponse(timeline)
 
 @router.post("/{booking_id}/reschedule")
 async def public_reschedule_booking(
@@ -514,23 +592,20 @@ async def public_reschedule_booking(
     service = booking.service
     new_end = new_start + timedelta(minutes=service.duration_minutes)
 
-    # 3. Availability Check (Exclude self)
-    overlap = db.query(Booking).filter(
-        Booking.workspace_id == booking.workspace_id,
-        Booking.status.in_([BookingStatus.CONFIRMED.value, BookingStatus.PENDING.value]),
-        Booking.id != booking.id,
-        Booking.start_time < new_end,
-        Booking.end_time > new_start
-    ).first()
-    
-    if overlap:
+    # 3. Capacity Check (Exclude self)
+    slot = capacity.check(db, service, new_start, new_end, exclude_booking_id=booking.id)
+    if not slot.available:
         raise HTTPException(status_code=409, detail="New slot occupied")
 
     # 4. Apply changes
+    availability.invalidate_booking(db, booking)  # Frees the old slot
     booking.start_time = new_start
     booking.end_time = new_end
+    booking.staff_id = slot.pick(booking.staff_id)  # Same staff member if they're free
     booking.status = BookingStatus.CONFIRMED.value # Auto-confirm if they move it?
+    booking.reminder_sent = False  # Remind again for the new time
     db.add(booking)
+    availability.invalidate_booking(db, booking)
     
     # 5. Audit Log
     db.add(AuditLog(
@@ -546,6 +621,7 @@ async def public_reschedule_booking(
     ))
     
     db.commit()
+    reminder_scheduler.booking_changed(booking)
     
     # 6. Notification
     background_tasks.add_task(email_service.send_booking_confirmation, booking.id)
@@ -574,11 +650,60 @@ def update_booking(
     if booking_update.status:
         booking.status = booking_update.status
         db.add(booking)
+        availability.invalidate_booking(db, booking)
         db.commit()
+        reminder_scheduler.booking_changed(booking)
 
     return {"status": "updated", "message": "Booking updated successfully"}
 
 
+@router.post("/bulk")
+def bulk_update_bookings(
+    bulk_in: BookingBulkAction,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_staff_or_owner)
+):
+    """
+    Apply one action to many bookings in a single transaction (Admin/Staff only):
+    set_status (e.g. a day's visits to completed / no_show), reassign to staff_id, or cancel.
+    Bookings that can't take the action are listed under "skipped" with a reason.
+    """
+    if not bulk_in.booking_ids:
+        raise HTTPException(status_code=400, detail="booking_ids is empty")
+    if len(set(bulk_in.booking_ids)) > settings.BOOKING_BULK_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BOOKING_BULK_MAX_IDS} bookings per call")
+
+    workspace_id = current_user.workspace_id
+    if bulk_in.action == "set_status":
+        if bulk_in.status not in booking_bulk.SET_STATUSES:
+            raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(booking_bulk.SET_STATUSES)}")
+        result = booking_bulk.set_status(db, workspace_id, current_user.id, bulk_in.booking_ids, bulk_in.status)
+    elif bulk_in.action == "reassign":
+        staff = db.query(User.id).filter(
+            User.id == bulk_in.staff_id,
+            User.workspace_id == workspace_id,
+            User.is_active == True
+        ).first() if bulk_in.staff_id is not None else None
+        if not staff:
+            raise HTTPException(status_code=400, detail="staff_id must be an active member of this workspace")
+        result = booking_bulk.reassign(db, workspace_id, current_user.id, bulk_in.booking_ids, bulk_in.staff_id)
+    else:
+        result = booking_bulk.cancel(db, workspace_id, current_user.id, bulk_in.booking_ids)
+    db.commit()
+
+    if result.updated:
+        # One SELECT refreshes the whole batch for the scheduler (commit expired it)
+        for booking in db.query(Booking).filter(Booking.id.in_(result.updated)):
+            reminder_scheduler.booking_changed(booking)
+        if bulk_in.action == "cancel":
+            background_tasks.add_task(email_service.send_booking_cancellations_bulk, result.updated)
+    for entry_ids, slot_start in result.waitlist:
+        background_tasks.add_task(email_service.send_waitlist_openings, entry_ids, slot_start)
+
+    return result.to_dict()
+
+
 @router.patch("/{booking_id}/details")
 def update_booking_details(
     booking_id: int,
@@ -648,31 +773,13 @@ def restore_booking(
     if booking.status != BookingStatus.CANCELLED.value:
          raise HTTPException(status_code=400, detail=f"Cannot restore booking with status: {booking.status}")
 
-    # 1. Availability Check
-    # Check against any booking that isn't CANCELLED
-    overlap = db.query(Booking).filter(
-        Booking.workspace_id == booking.workspace_id,
-        Booking.status.in_([BookingStatus.CONFIRMED.value, BookingStatus.PENDING.value]),
-        Booking.id != booking.id, # Exclude self just in case
-        Booking.start_time < booking.end_time,
-        Booking.end_time > booking.start_time
-    )
-    
-    # If the booking has a specific staff member, check for their availability specifically.
-    # If not, we assume workspace capacity (which for MVP is usually 1:1 or global).
-    if booking.staff_id:
-        overlap = overlap.filter(Booking.staff_id == booking.staff_id)
-        
-    overlap_item = overlap.first()
-    
-    if overlap_item:
-         raise HTTPException(
-             status_code=409, 
-             detail=f"Time slot is now occupied by booking #{overlap_item.id} ({overlap_item.status})"
-         )
+    # 1. Capacity Check (Exclude self)
+    service = booking.service
+    slot = capacity.check(db, service, booking.start_time, booking.end_time, exclude_booking_id=booking.id)
+    if not slot.available:
+         raise HTTPException(status_code=409, detail="Time slot is now occupied")
          
     # 2. Inventory Check & Re-deduction (MANDATORY per user request)
-    service = booking.service
     if service.inventory_item_id and service.inventory_quantity_required > 0:
         inventory_item = db.query(InventoryItem).filter(InventoryItem.id == service.inventory_item_id).with_for_update().first()
         
@@ -688,6 +795,7 @@ def restore_booking(
         # Deduct
         inventory_item.quantity -= service.inventory_quantity_required
         db.add(inventory_item)
+        availability.inventory_changed(db, inventory_item.id, inventory_item.quantity + service.inventory_quantity_required, inventory_item.quantity)
         
         # Log Inventory Deduct
         audit_inv = AuditLog(
@@ -708,8 +816,9 @@ def restore_booking(
         if inventory_item.quantity <= inventory_item.threshold:
               background_tasks.add_task(email_service.send_inventory_alert, inventory_item.id)
 
-    # 3. Update Status
+    # 3. Update Status (back with the original staff member if they're still free)
     booking.status = BookingStatus.CONFIRMED.value
+    booking.staff_id = slot.pick(booking.staff_id)
     db.add(booking)
     
     # 4. Audit Log
@@ -721,8 +830,10 @@ def restore_booking(
         details={"previous_status": "cancelled"}
     )
     db.add(audit_restore)
+    availability.invalidate_booking(db, booking)
     
     db.commit()
+    reminder_scheduler.booking_changed(booking)
     
     # 5. Notify?
     # Send 'Booking Restored' confirmation
@@ -0,0 +1,62 @@
+"""Calendar API — subscribable iCalendar feeds of bookings (see app/services/calendar_feed.py)."""
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.core.security_utils import generate_feed_token, verify_feed_token
+from app.models.user import User, UserRole
+from app.services import calendar_feed, http_cache
+
+router = APIRouter()
+
+
+def _feed_url(request: Request, workspace_id: int, staff_id: int) -> str:
+    return str(request.url_for("get_calendar_feed", token=generate_feed_token(workspace_id, staff_id)))
+
+
+@router.get("/feeds")
+def get_feed_urls(
+    request: Request,
+    current_user: User = Depends(deps.get_current_active_staff_or_owner),
+):
+    """
+    Subscription URLs: the caller's own schedule, plus the whole workspace for owners.
+    Anyone with a URL can read that feed.
+    """
+    urls = {"staff": _feed_url(request, current_user.workspace_id, current_user.id)}
+    if current_user.role == UserRole.OWNER.value:
+        urls["workspace"] = _feed_url(request, current_user.workspace_id, calendar_feed.WORKSPACE_FEED)
+    return urls
+
+
+@router.get("/feeds/{token}.ics", name="get_calendar_feed")
+def get_calendar_feed(
+    token: str,
+    request: Request,
+    db: Session = Depends(deps.get_db),
+):
+    """
+    The iCalendar feed. Answers 304 when If-None-Match carries the current
+    ETag, which costs one lookup of the feed's change counter.
+    """
+    feed = verify_feed_token(token)
+    if not feed:
+        raise HTTPException(status_code=404, detail="Feed not found")
+    workspace_id, staff_id = feed
+    if staff_id != calendar_feed.WORKSPACE_FEED:
+        staff = db.get(User, staff_id)
+        if not staff or not staff.is_active or staff.workspace_id != workspace_id:
+            raise HTTPException(status_code=404, detail="Feed not found")
+
+    window_start, window_end = calendar_feed.window()
+    tag = calendar_feed.etag(workspace_id, staff_id, calendar_feed.version(db, workspace_id, staff_id), window_start)
+    headers = {"ETag": tag, "Cache-Control": "private, no-cache"}
+    if http_cache.not_modified(request, tag):
+        return Response(status_code=304, headers=headers)
+
+    return StreamingResponse(
+        calendar_feed.write_feed(workspace_id, staff_id, window_start, window_end),
+        media_type="text/calendar; charset=utf-8",
+        headers=headers,
+    )
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from typing import List
 from datetime import datetime, timezone, timedelta
 
@@ -10,6 +10,7 @@ from app.models.user import User
 from app.models.contact import Contact
 from app.services import email as email_service
 from app.core.monitoring import log_reply_pause
+from app.core.responses import FastJSONResponse
 
 router = APIRouter()
 
@@ -49,7 +50,7 @@ def get_conversations(
         }
         results.append(c_dict)
         
-    return results
+    return FastJSONResponse(results)  # Already in ConversationOut's shape; skip a second validation pass
 
 @router.get("/{conversation_id}", response_model=List[MessageOut])
 def get_conversation_messages(
@@ -65,7 +66,8 @@ def get_conversation_messages(
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
         
-    messages = db.query(Message).filter(
+    # Opening a conversation is what needs the bodies: one extra query for all of them
+    messages = db.query(Message).options(selectinload(Message.body)).filter(
         Message.conversation_id == conversation_id
     ).order_by(Message.created_at.asc()).all()
     
@@ -1,228 +1,187 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta, timezone
+import math
 from typing import List, Optional
 
 from app.api import deps
-from app.models.booking import Booking, BookingStatus
-from app.models.form import FormSubmission
-from app.models.inventory import InventoryItem
-from app.models.inventory import InventoryItem
-from app.models.audit_log import AuditLog
-from app.services import email as email_service
+from app.models.cron import JobLease, CronRun
+from app.services import cron_jobs, job_runner
+from app.services import retention
+from app.services.availability import availability_cache
+from app.services.catalog import catalog_cache
 from app.core.config import settings
 
 router = APIRouter()
 
 @router.post("/run")
 async def run_cron_jobs(
-    db: Session = Depends(deps.get_db),
+    shards: Optional[int] = Query(None, ge=1, le=256),
+    shard: Optional[List[int]] = Query(None),
     x_cron_secret: Optional[str] = Header(None)
 ):
+    """
+    Trigger scheduled checks (see app/services/cron_jobs.py).
+    Each job runs under its own lease, so jobs run in parallel (stage by
+    stage, see CRON_STAGES) but a job already running on another worker is
+    skipped rather than run twice.
+
+    With CRON_SHARDS > 1, every job is split by workspace_id % CRON_SHARDS
+    and all shards run concurrently. Pass `shard` (repeatable) to run only
+    those shards, e.g. one replica per shard. The shard count is part of the
+    lease name, so it comes from settings only: `shards`, if given, must match
+    it, otherwise two callers could run the same job under different leases.
+    """
     # Verify cron secret
     if x_cron_secret != settings.CRON_SECRET:
         raise HTTPException(status_code=403, detail="Invalid cron secret")
-    """
-    Trigger scheduled checks:
-    1. Booking Reminders (24h before)
-    2. Form Reminders (Overdue)
-    3. Inventory Alerts
-    4. Thank You Emails
-    5. Owner Daily Summary
-    """
+
+    if shards is not None and shards != settings.CRON_SHARDS:
+        raise HTTPException(status_code=400, detail=f"shards must be {settings.CRON_SHARDS} (CRON_SHARDS)")
+    shards = settings.CRON_SHARDS
+    if shard is not None and any(i < 0 or i >= shards for i in shard):
+        raise HTTPException(status_code=400, detail=f"shard must be between 0 and {shards - 1}")
+
+    outcomes = await job_runner.run_stages(cron_jobs.CRON_STAGES, shards=shards, only=shard)
+
     results = {
         "booking_reminders": 0,
         "form_reminders": 0,
-        "inventory_alerts": 0
+        "inventory_alerts": 0,
+        "follow_ups_sent": 0,
+    }
+    for outcome in outcomes.values():
+        for key, count in (outcome.get("result") or {}).items():
+            results[key] = results.get(key, 0) + count
+    results["jobs"] = {
+        name: {k: v for k, v in outcome.items() if k != "result"}
+        for name, outcome in outcomes.items()
     }
-    
-    now = datetime.now(timezone.utc)
-    
-    # ------------------------------------------------------------------
-    # 1. BOOKING REMINDERS (Approx 24 hours before start)
-    # ------------------------------------------------------------------
-    # Find bookings starting between (Now + 23h) and (Now + 25h) that haven't entered loop?
-    # Or just "starts < Now + 24h" and not sent?
-    # Let's say "Starts within next 24 hours" AND reminder_sent=False
-    
-    tomorrow = now + timedelta(hours=24)
-    # Look for bookings coming up in next 24h
-    upcoming_bookings = db.query(Booking).filter(
-        Booking.start_time > now, 
-        Booking.start_time <= tomorrow,
-        Booking.status != BookingStatus.CANCELLED.value,
-        Booking.reminder_sent == False
-    ).all()
-    
-    for booking in upcoming_bookings:
-        await email_service.send_booking_reminder(booking.id)
-        booking.reminder_sent = True
-        
-        # [NEW] Audit Log: Reminder Sent
-        audit = AuditLog(
-            workspace_id=booking.workspace_id,
-            booking_id=booking.id,
-            user_id=None,
-            action="booking.reminder_sent",
-            details={"recipient": booking.contact.email if booking.contact else "unknown"}
-        )
-        db.add(audit)
-        
-        db.add(booking)
-        results["booking_reminders"] += 1
-        
-    # ------------------------------------------------------------------
-    # 2. FORM REMINDERS (Overdue > 24h)
-    # ------------------------------------------------------------------
-    # Pending forms sent more than 24h ago
-    yesterday = now - timedelta(hours=24)
-    
-    overdue_forms = db.query(FormSubmission).filter(
-        FormSubmission.status == "pending",
-        FormSubmission.sent_at <= yesterday,
-        FormSubmission.reminder_sent == False
-    ).all()
-    
-    for submission in overdue_forms:
-        await email_service.send_form_reminder(submission.id)
-        submission.reminder_sent = True
-        # Form reminders don't have a direct "booking_id" easily accessible here without a join?
-        # FormSubmission has booking_id? Let's check model.
-        # Assuming yes for now, if not we skip. FormSubmission usually links to booking.
-        if submission.booking_id:
-             audit_f = AuditLog(
-                workspace_id=submission.form.workspace_id, # Form has workspace_id
-                booking_id=submission.booking_id,
-                user_id=None,
-                action="form.reminder_sent",
-                details={"submission_id": submission.id}
-             )
-             db.add(audit_f)
-        
-        db.add(submission)
-        results["form_reminders"] += 1
-
-    # ------------------------------------------------------------------
-    # 3. INVENTORY ALERTS (Low stock, once per day)
-    # ------------------------------------------------------------------
-    # Quantity <= Threshold AND (last_alert_at IS NULL OR last_alert_at < yesterday)
-    
-    low_stock_items = db.query(InventoryItem).filter(
-        InventoryItem.quantity <= InventoryItem.threshold
-    ).all()
-    
-    for item in low_stock_items:
-        # Check last alert logic in python to avoid complex SQL filtering if item list is small
-        should_alert = False
-        if not item.last_alert_at:
-            should_alert = True
-        elif item.last_alert_at < yesterday:
-            should_alert = True
-            
-        if should_alert:
-            await email_service.send_inventory_alert(item.id)
-            item.last_alert_at = now
-            # Inventory Alert - Not booking specific, so booking_id is null? 
-            # AuditLog requires booking_id (nullable=False). 
-            # We can't log global inventory alerts to AuditLog as defined (AuditLog is booking-centric).
-            # We will skip logging inventory alerts to AuditLog since it's not a booking event.
-            # Or make booking_id nullable?
-            # Prompt said "Owner must open booking and see... inventory actions".
-            # Global alerts are not booking specific. So we skip.
-            db.add(item)
-            results["inventory_alerts"] += 1
-
-    # ------------------------------------------------------------------
-    # 4. THANK YOU EMAILS (Completed Yesterday)
-    # ------------------------------------------------------------------
-    # For bookings completed yesterday, send thank you if not sent
-    y_start = yesterday.replace(hour=0, minute=0, second=0, microsecond=0)
-    y_end = y_start + timedelta(days=1)
-    
-    completed_yesterday = db.query(Booking).filter(
-        Booking.status == BookingStatus.COMPLETED.value,
-        Booking.end_time >= y_start,
-        Booking.end_time < y_end
-    ).all()
-    
-    # Check log to avoid duplicates
-    from app.models.communication_log import CommunicationLog
-    
-    for booking in completed_yesterday:
-        already_sent = db.query(CommunicationLog).filter(
-            CommunicationLog.booking_id == booking.id,
-            CommunicationLog.type == "thank_you"
-        ).first()
-        
-        if not already_sent:
-            await email_service.send_visit_completion(booking.id)
-
-    # ------------------------------------------------------------------
-    # 5. OWNER DAILY SUMMARY
-    # ------------------------------------------------------------------
-    # Send daily summary if unanswered messages or low stock exists
-    # Iterate all workspaces
-    from app.models.workspace import Workspace
-    from app.models.conversation import Conversation
-    
-    workspaces = db.query(Workspace).all()
-    
-    for ws in workspaces:
-        # Check if alert sent today
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        alert_sent_today = db.query(CommunicationLog).filter(
-            CommunicationLog.workspace_id == ws.id,
-            CommunicationLog.type == "owner_alert",
-            CommunicationLog.created_at >= today_start
-        ).first()
-        
-        if not alert_sent_today:
-            # Unanswered count (not paused, not internal last msg)
-            unanswered = db.query(Conversation).filter(
-                Conversation.workspace_id == ws.id,
-                Conversation.is_paused == False,
-                Conversation.last_message_is_internal == False
-            ).count()
-            
-            # Low stock count for this workspace
-            ws_low_stock = db.query(InventoryItem).filter(
-                InventoryItem.workspace_id == ws.id,
-                InventoryItem.quantity <= InventoryItem.threshold
-            ).count()
-            
-            if unanswered > 0 or ws_low_stock > 0:
-                await email_service.send_daily_owner_alert(ws.id, unanswered, ws_low_stock)
-
-    # ------------------------------------------------------------------
-    # 6. POST-BOOKING FOLLOW-UP (1 Hour Post Completion)
-    # ------------------------------------------------------------------
-    follow_up_count = await process_follow_ups(db)
-    results["follow_ups_sent"] = follow_up_count
-
-    db.commit()
     return results
 
+@router.get("/jobs")
+def get_cron_jobs(
+    db: Session = Depends(deps.get_db),
+    x_cron_secret: Optional[str] = Header(None)
+):
+    """Lease state and last run of every cron job."""
+    if x_cron_secret != settings.CRON_SECRET:
+        raise HTTPException(status_code=403, detail="Invalid cron secret")
+
+    held = db.query(JobLease).filter(JobLease.lease_until != None).all()
+    jobs = []
+    for name in cron_jobs.CRON_JOBS:
+        last = db.query(CronRun).filter(CronRun.job == name).order_by(CronRun.started_at.desc()).first()
+        jobs.append({
+            "name": name,
+            # Lease name is the job name, or "job:index/count" per shard
+            "held_leases": {
+                lease.name: {"holder": lease.holder, "lease_until": lease.lease_until}
+                for lease in held if lease.name == name or lease.name.startswith(name + ":")
+            },
+            "last_run": {
+                "shard": last.shard,
+                "status": last.status,
+                "started_at": last.started_at,
+                **{metric: getattr(last, metric) for metric in RUN_METRICS},
+                "result": last.result,
+                "error": last.error,
+            } if last else None,
+        })
+    return jobs
+
+RUN_METRICS = ("duration_ms", "rows_scanned", "emails_sent", "db_ms", "gmail_ms")
+
+def _percentile(sorted_values: List[int], pct: float) -> Optional[int]:
+    # Nearest-rank percentile
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+@router.get("/runs")
+def get_cron_runs(
+    job: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(deps.get_db),
+    x_cron_secret: Optional[str] = Header(None)
+):
+    """Most recent job runs with their timing and throughput metrics."""
+    if x_cron_secret != settings.CRON_SECRET:
+        raise HTTPException(status_code=403, detail="Invalid cron secret")
+
+    query = db.query(CronRun)
+    if job:
+        query = query.filter(CronRun.job == job)
+    runs = query.order_by(CronRun.started_at.desc()).limit(limit).all()
+    return [
+        {
+            "id": run.id,
+            "job": run.job,
+            "shard": run.shard,
+            "status": run.status,
+            "started_at": run.started_at,
+            **{metric: getattr(run, metric) for metric in RUN_METRICS},
+            "result": run.result,
+            "error": run.error,
+        }
+        for run in runs
+    ]
+
+@router.get("/runs/stats")
+def get_cron_run_stats(
+    window: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(deps.get_db),
+    x_cron_secret: Optional[str] = Header(None)
+):
+    """
+    Per job, over its last `window` finished runs: p50/p95/max of every metric,
+    plus run and failure counts.
+    """
+    if x_cron_secret != settings.CRON_SECRET:
+        raise HTTPException(status_code=403, detail="Invalid cron secret")
+
+    stats = {}
+    for name in cron_jobs.CRON_JOBS:
+        runs = db.query(CronRun).filter(
+            CronRun.job == name, CronRun.finished_at != None
+        ).order_by(CronRun.started_at.desc()).limit(window).all()
+
+        job_stats = {"runs": len(runs), "failures": sum(1 for r in runs if r.status == "failed")}
+        for metric in RUN_METRICS:
+            values = sorted(getattr(r, metric) for r in runs if getattr(r, metric) is not None)
+            job_stats[metric] = {
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+                "max": values[-1] if values else None,
+            }
+        stats[name] = job_stats
+    return stats
+
+@router.get("/caches")
+def get_cache_stats(x_cron_secret: Optional[str] = Header(None)):
+    """Size and hit rate of this process's caches."""
+    if x_cron_secret != settings.CRON_SECRET:
+        raise HTTPException(status_code=403, detail="Invalid cron secret")
+
+    return {"availability": availability_cache.stats(), "catalog": catalog_cache.stats()}
+
+@router.post("/retention")
+def run_retention_job(
+    db: Session = Depends(deps.get_db),
+    x_cron_secret: Optional[str] = Header(None)
+):
+    """
+    Daily log retention: archive old audit/communication logs.
+    See app/services/retention.py.
+    """
+    if x_cron_secret != settings.CRON_SECRET:
+        raise HTTPException(status_code=403, detail="Invalid cron secret")
+
+    return retention.run_log_retention(db)
+
 async def process_follow_ups(db: Session) -> int:
     """
-    Scans for completed bookings > 1 hour ago that haven't received a follow-up.
-    Sends email and updates flag.
+    Sends follow-ups for completed bookings > 1 hour ago that haven't had one.
     Returns count of emails sent.
     """
-    now = datetime.now(timezone.utc)
-    cutoff = now - timedelta(hours=1)
-    
-    follow_up_bookings = db.query(Booking).filter(
-        Booking.end_time < cutoff,
-        Booking.status == BookingStatus.COMPLETED.value,
-        Booking.follow_up_sent == False
-    ).all()
-    
-    count = 0
-    for booking in follow_up_bookings:
-        await email_service.send_visit_completion(booking.id)
-        booking.follow_up_sent = True
-        db.add(booking)
-        count += 1
-    
-    return count
+    return (await cron_jobs.follow_ups(db))["follow_ups_sent"]
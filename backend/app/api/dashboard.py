@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
+from typing import Literal, Optional
 
 from app.api import deps
 from app.models.booking import Booking, BookingStatus
@@ -10,10 +11,13 @@ from app.models.inventory import InventoryItem
 from app.models.user import User
 from app.models.workspace import Workspace
 
-from app.schemas.dashboard import DashboardStats
+from app.core.config import settings
+from app.schemas.dashboard import DashboardStats, DashboardTrends
 
 from app.models.audit_log import AuditLog
 from app.models.communication_log import CommunicationLog
+from app.services.retention import hot_cutoff
+from app.services import stats_rollup
 
 router = APIRouter()
 
@@ -24,6 +28,8 @@ def get_dashboard_stats(
 ):
     workspace_id = current_user.workspace_id
     now = datetime.now(timezone.utc)
+    # Log panels only read the hot window (recent partitions / non-archived rows)
+    logs_since = hot_cutoff(now)
     
     # 1. Bookings
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -104,7 +110,8 @@ def get_dashboard_stats(
     # 4. Failures (SIGNAL 1: Priority 1)
     failed_comms = db.query(CommunicationLog).filter(
         CommunicationLog.workspace_id == workspace_id,
-        CommunicationLog.status == "failed"
+        CommunicationLog.status == "failed",
+        CommunicationLog.created_at >= logs_since
     ).order_by(CommunicationLog.created_at.desc()).limit(5).all()
 
     failures_out = [
@@ -176,7 +183,8 @@ def get_dashboard_stats(
 
     # 6. Recent Activity (SIGNAL 3: Priority 3)
     recent_audits = db.query(AuditLog).outerjoin(User, AuditLog.user_id == User.id).filter(
-        AuditLog.workspace_id == workspace_id
+        AuditLog.workspace_id == workspace_id,
+        AuditLog.created_at >= logs_since
     ).order_by(AuditLog.created_at.desc()).limit(10).all()
     
     activity_out = []
@@ -209,3 +217,29 @@ def get_dashboard_stats(
         "recent_activity": activity_out,
         "failures": failures_out
     }
+
+
+@router.get("/trends", response_model=DashboardTrends)
+def get_dashboard_trends(
+    period: Literal["day", "week", "month"] = "week",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_owner)
+):
+    """
+    Bookings, emails, forms and leads per day / week / month, read from the
+    daily rollup (workspace_daily_stats) rather than the raw tables. Defaults
+    to the last 12 months; the rollup trails live data by one stats_rollup run.
+    """
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=365)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days > settings.STATS_TRENDS_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range can be at most {settings.STATS_TRENDS_MAX_DAYS} days")
+
+    # Whole periods only, so the first week / month isn't cut short
+    start = stats_rollup.period_start(start, period)
+    points = stats_rollup.trends(db, current_user.workspace_id, start, end, period)
+    return {"period": period, "start": start, "end": end, "points": points}
@@ -0,0 +1,68 @@
+"""Live events API — one SSE stream per workspace (see app/services/events.py)."""
+import asyncio
+import json
+from typing import AsyncIterator, Optional
+
+import jwt
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.services.events import event_bus
+
+router = APIRouter()
+
+
+def _workspace_for(token: Optional[str]) -> int:
+    """Resolve the caller's workspace on a short-lived session; the stream itself holds no DB connection."""
+    try:
+        user_id = jwt.decode(token or "", settings.JWT_SECRET, algorithms=[settings.ALGORITHM]).get("sub")
+    except jwt.PyJWTError:
+        user_id = None
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first() if user_id is not None else None
+        if not user or not user.is_active or not user.workspace_id:
+            raise HTTPException(status_code=401, detail="Could not validate credentials")
+        return user.workspace_id
+    finally:
+        db.close()
+
+
+def format_event(evt: dict) -> str:
+    return f"event: {evt['type']}\ndata: {json.dumps(evt)}\n\n"
+
+
+async def stream_events(request: Request, queue: asyncio.Queue, workspace_id: int) -> AsyncIterator[str]:
+    try:
+        yield "event: ready\ndata: {}\n\n"
+        while not await request.is_disconnected():
+            try:
+                evt = await asyncio.wait_for(queue.get(), timeout=settings.LIVE_EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"  # Keeps proxies from closing an idle stream
+                continue
+            yield format_event(evt)
+    finally:
+        event_bus.unsubscribe(workspace_id, queue)
+
+
+@router.get("/stream")
+async def get_event_stream(request: Request, token: Optional[str] = None):
+    """
+    Server-sent events for the caller's workspace. EventSource can't send
+    headers, so the access token may also come as ?token=.
+    """
+    auth = request.headers.get("authorization", "")
+    if auth.lower().startswith("bearer "):
+        token = auth[7:]
+    workspace_id = await asyncio.to_thread(_workspace_for, token)
+
+    queue = event_bus.subscribe(workspace_id)
+    return StreamingResponse(
+        stream_events(request, queue, workspace_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,242 @@
+"""
+Exports API - streaming CSV / NDJSON downloads for owners.
+
+Rows are read with server-side cursors (yield_per) and written out chunk by
+chunk, so memory stays flat no matter how many rows a workspace has.
+Responses are gzip-encoded when the client accepts it.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, Iterator, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.api import deps
+from app.db.session import SessionLocal, engine
+from app.models.audit_log import AuditLog, AuditLogArchive
+from app.models.booking import Booking
+from app.models.communication_log import CommunicationLog, CommunicationLogArchive
+from app.models.contact import Contact
+from app.models.service import Service
+from app.models.user import User
+
+router = APIRouter()
+
+YIELD_PER = 1000      # Rows fetched per server-side cursor round trip
+FLUSH_ROWS = 500      # Rows serialized before a chunk is sent
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+# ---------------------------------------------------------
+# STREAMING HELPERS
+# ---------------------------------------------------------
+
+def _date_bounds(start: Optional[date], end: Optional[date]):
+    """Inclusive date range -> [start 00:00 UTC, end+1 00:00 UTC)."""
+    lower = datetime.combine(start, time.min, tzinfo=timezone.utc) if start else None
+    upper = datetime.combine(end + timedelta(days=1), time.min, tzinfo=timezone.utc) if end else None
+    return lower, upper
+
+
+def _apply_range(stmt, column, start: Optional[date], end: Optional[date]):
+    lower, upper = _date_bounds(start, end)
+    if lower:
+        stmt = stmt.where(column >= lower)
+    if upper:
+        stmt = stmt.where(column < upper)
+    return stmt
+
+
+def _cell(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def _iter_rows(statements: List) -> Iterator[tuple]:
+    """Run each statement on its own session with a server-side cursor."""
+    db = SessionLocal()
+    try:
+        for stmt in statements:
+            result = db.execute(stmt.execution_options(yield_per=YIELD_PER))
+            for row in result:
+                yield tuple(row)
+    finally:
+        db.close()
+
+
+def _encode(rows: Iterable[tuple], columns: List[str], fmt: str) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(columns)
+
+    pending = 0
+    for row in rows:
+        values = [_cell(v) for v in row]
+        if writer:
+            writer.writerow(values)
+        else:
+            buffer.write(json.dumps(dict(zip(columns, values)), default=str) + "\n")
+        pending += 1
+        if pending >= FLUSH_ROWS:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+
+    tail = buffer.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+def _gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _export_response(
+    request: Request,
+    name: str,
+    fmt: str,
+    columns: List[str],
+    statements: List,
+) -> StreamingResponse:
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {fmt}")
+
+    body = _encode(_iter_rows(statements), columns, fmt)
+    headers = {"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        body = _gzip(body)
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+
+    return StreamingResponse(body, media_type=FORMATS[fmt], headers=headers)
+
+
+# ---------------------------------------------------------
+# ENDPOINTS
+# ---------------------------------------------------------
+
+BOOKING_COLUMNS = [
+    "id", "start_time", "end_time", "status", "service_id", "service_name",
+    "contact_id", "contact_name", "contact_email", "staff_id", "created_at",
+]
+
+@router.get("/bookings")
+def export_bookings(
+    request: Request,
+    fmt: str = Query("csv", alias="format"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: User = Depends(deps.get_current_active_owner)
+):
+    """Stream bookings (filtered on start_time) as CSV or NDJSON."""
+    stmt = (
+        select(
+            Booking.id, Booking.start_time, Booking.end_time, Booking.status,
+            Booking.service_id, Service.name, Booking.contact_id,
+            Contact.full_name, Contact.email, Booking.staff_id, Booking.created_at,
+        )
+        .outerjoin(Service, Service.id == Booking.service_id)
+        .outerjoin(Contact, Contact.id == Booking.contact_id)
+        .where(Booking.workspace_id == current_user.workspace_id)
+        .order_by(Booking.start_time, Booking.id)
+    )
+    stmt = _apply_range(stmt, Booking.start_time, start, end)
+    return _export_response(request, "bookings", fmt, BOOKING_COLUMNS, [stmt])
+
+
+CONTACT_COLUMNS = [
+    "id", "full_name", "first_name", "last_name", "email", "phone", "status", "source", "created_at",
+]
+
+@router.get("/contacts")
+def export_contacts(
+    request: Request,
+    fmt: str = Query("csv", alias="format"),
+    status: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: User = Depends(deps.get_current_active_owner)
+):
+    """Stream contacts / leads (filtered on created_at) as CSV or NDJSON."""
+    stmt = (
+        select(
+            Contact.id, Contact.full_name, Contact.first_name, Contact.last_name,
+            Contact.email, Contact.phone, Contact.status, Contact.source, Contact.created_at,
+        )
+        .where(Contact.workspace_id == current_user.workspace_id)
+        .order_by(Contact.id)
+    )
+    if status:
+        stmt = stmt.where(Contact.status == status)
+    stmt = _apply_range(stmt, Contact.created_at, start, end)
+    return _export_response(request, "contacts", fmt, CONTACT_COLUMNS, [stmt])
+
+
+AUDIT_COLUMNS = ["id", "booking_id", "user_id", "action", "details", "created_at"]
+
+@router.get("/audit-logs")
+def export_audit_logs(
+    request: Request,
+    fmt: str = Query("csv", alias="format"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: User = Depends(deps.get_current_active_owner)
+):
+    """Stream audit logs (including SQLite archive rows) as CSV or NDJSON."""
+    statements = []
+    for model in _log_models(AuditLog, AuditLogArchive):
+        stmt = (
+            select(*[getattr(model, c) for c in AUDIT_COLUMNS])
+            .where(model.workspace_id == current_user.workspace_id)
+            .order_by(model.created_at, model.id)
+        )
+        statements.append(_apply_range(stmt, model.created_at, start, end))
+    return _export_response(request, "audit_logs", fmt, AUDIT_COLUMNS, statements)
+
+
+COMMUNICATION_COLUMNS = [
+    "id", "booking_id", "contact_id", "type", "recipient_email", "status", "error_message", "created_at", "sent_at",
+]
+
+@router.get("/communication-logs")
+def export_communication_logs(
+    request: Request,
+    fmt: str = Query("csv", alias="format"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: User = Depends(deps.get_current_active_owner)
+):
+    """Stream communication logs (including SQLite archive rows) as CSV or NDJSON."""
+    statements = []
+    for model in _log_models(CommunicationLog, CommunicationLogArchive):
+        stmt = (
+            select(*[getattr(model, c) for c in COMMUNICATION_COLUMNS])
+            .where(model.workspace_id == current_user.workspace_id)
+            .order_by(model.created_at, model.id)
+        )
+        statements.append(_apply_range(stmt, model.created_at, start, end))
+    return _export_response(request, "communication_logs", fmt, COMMUNICATION_COLUMNS, statements)
+
+
+def _log_models(hot, archive) -> list:
+    """SQLite keeps cold rows in archive tables; Postgres partitions are transparent."""
+    return [hot] if engine.dialect.name == "postgresql" else [hot, archive]
@@ -2,11 +2,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Literal
 
 from app.api import deps
 from app.models.form import Form
 from app.models.user import User
+from app.services import form_schema
 
 router = APIRouter()
 
@@ -18,6 +19,8 @@ class FormFieldSchema(BaseModel):
     type: str = "text"  # text, textarea, email, phone, select
     required: bool = False
     options: Optional[List[str]] = None  # for select fields
+    # Contact attribute this answer fills; inferred from type/name when omitted
+    maps_to: Optional[Literal["email", "full_name", "first_name", "last_name", "phone"]] = None
 
 
 class FormOut(BaseModel):
@@ -127,11 +130,13 @@ def update_form(
         form.name = form_in.name
     if form_in.fields is not None:
         form.fields = [f.model_dump() for f in form_in.fields]
+        form.version = (form.version or 1) + 1
     if form_in.google_form_url is not None and hasattr(form, 'google_form_url'):
         form.google_form_url = form_in.google_form_url
 
     db.commit()
     db.refresh(form)
+    form_schema.invalidate(form.id)
     return FormOut(
         id=form.id,
         name=form.name,
@@ -162,4 +167,5 @@ def delete_form(
 
     db.delete(form)
     db.commit()
+    form_schema.invalidate(form_id)
     return None
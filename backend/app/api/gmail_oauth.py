@@ -1,8 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
-from google_auth_oauthlib.flow import Flow
-from google.oauth2.credentials import Credentials
 import os
 
 from app.api import deps
@@ -31,6 +29,8 @@ def get_oauth_flow(redirect_uri: str):
         }
     }
     
+    from google_auth_oauthlib.flow import Flow
+
     flow = Flow.from_client_config(
         client_config,
         scopes=SCOPES,
@@ -17,7 +17,8 @@ from datetime import datetime, timedelta, timezone
 from app.api import deps
 from app.services.gmail_client import get_gmail_client
 from app.models.contact import Contact
-from app.models.conversation import Conversation, Message
+from app.models.conversation import Conversation, Message, message_hash
+from app.services import mail_threads
 
 router = APIRouter()
 
@@ -97,40 +98,40 @@ def sync_inbox_from_gmail(
             # Sort by date
             messages.sort(key=lambda x: int(x['internalDate']))
             
-            # 1. Identify Contact & Conversation
-            first_msg = messages[0]
-            headers = {h['name']: h['value'] for h in first_msg.get('payload', {}).get('headers', [])}
-            subject = headers.get('Subject', 'No Subject')
-            
-            # Find contact from ANY message in thread? 
-            # Usually the first message determines the thread starter.
-            # But if WE started the thread, the contact is the TO field.
-            # If THEY started, contact is FROM.
-            # Simplified Logic: Check current DB conversations for this thread_id? 
-            # We haven't been storing thread_id in Conversation model. 
-            # We match by Contact Email for now.
-            
-            # Extract distinct emails in thread to find the contact
-            thread_emails = set()
-            for msg in messages:
-                h = {k['name']: k['value'] for k in msg.get('payload', {}).get('headers', [])}
-                sender = parseaddr(h.get('From', ''))[1]
-                recip = parseaddr(h.get('To', ''))[1]
-                if sender: thread_emails.add(sender)
-                if recip: thread_emails.add(recip)
-
-            # Find valid contact among these emails
-            contact = db.query(Contact).filter(
-                Contact.email.in_(thread_emails),
-                Contact.workspace_id == current_user.workspace_id
-            ).first()
-            
+            # 1. Identify Conversation
+            # One indexed lookup: the conversation that owns this Gmail thread,
+            # or one holding a message the thread replies to.
+            parsed = [(msg, mail_threads.gmail_headers(msg)) for msg in messages]
+            headers = parsed[0][1]
+            subject = headers.get('subject', 'No Subject')
+
+            conversation = mail_threads.find_conversation(
+                db, current_user.workspace_id, thread_id, mail_threads.thread_refs(messages)
+            )
+            contact = conversation.contact if conversation else None
+
+            if not conversation:
+                # A thread we haven't seen: find the contact among its participants
+                # If WE started the thread, the contact is the TO field.
+                # If THEY started, contact is FROM.
+                thread_emails = set()
+                for _, h in parsed:
+                    sender = mail_threads.sender(h)
+                    recip = parseaddr(h.get('to', ''))[1]
+                    if sender: thread_emails.add(sender)
+                    if recip: thread_emails.add(recip)
+
+                contact = db.query(Contact).filter(
+                    Contact.email.in_(thread_emails),
+                    Contact.workspace_id == current_user.workspace_id
+                ).first()
+
             if not contact:
                 # Try to create from the FROM of first message if it is not us?
                 # Assume "We" are the workspace.google_email (if we knew it easily here).
                 # Fallback: Just take the first non-me email? 
                 # For now, simplistic approach: From header of first message
-                f_from = parseaddr(headers.get('From', ''))[1]
+                f_from = mail_threads.sender(headers)
                 # If valid email and not our user (simplified)
                 contact = Contact(
                     workspace_id=current_user.workspace_id,
@@ -144,22 +145,19 @@ def sync_inbox_from_gmail(
                 db.commit()
                 db.refresh(contact)
 
-            # Find or Create Conversation
-            # ideally we match by thread_id if we stored it. 
-            # For now, we match by Contact + Subject match? Or just latest conversation?
-            # Let's Find the latest conversation with this contact.
-            conversation = db.query(Conversation).filter(
-                Conversation.contact_id == contact.id,
-                Conversation.workspace_id == current_user.workspace_id
-            ).order_by(Conversation.created_at.desc()).first()
-            
-            # Check subject match or recency ( < 2 days?)
-            # Or just ALWAYS create new if not found?
+            if not conversation:
+                # Conversations from before threading (and lead conversations whose
+                # automated mail carried no stored Message-ID) own no thread yet
+                conversation = mail_threads.unthreaded_conversation(db, current_user.workspace_id, contact.id)
+
+            # Create the Conversation for a new thread; parallel threads with
+            # the same contact each get their own.
             if not conversation:
                 conversation = Conversation(
                     workspace_id=current_user.workspace_id,
                     contact_id=contact.id,
                     subject=subject,
+                    gmail_thread_id=thread_id,
                     created_at=datetime.now(timezone.utc),
                     last_message_at=datetime.now(timezone.utc),
                     is_paused=False
@@ -167,24 +165,29 @@ def sync_inbox_from_gmail(
                 db.add(conversation)
                 db.commit()
                 db.refresh(conversation)
+            elif not conversation.gmail_thread_id:
+                # Matched through its messages (e.g. a form enquiry we answered) or
+                # the contact's unthreaded conversation; claim the thread
+                conversation.gmail_thread_id = thread_id
+                db.commit()
             
             # 2. Sync Messages
-            # We need to avoid duplicates. Check existing Message IDs? 
-            # We don't store Gmail ID in Message table currently... 
-            # We store content. 
-            # Let's add specific logic: Check if message content + timestamp exists?
-            # Better: We can't easily dedup without Gmail ID.
-            # SKIP for now: We will just insert NEW messages based on timestamp?
-            # This is risky. 
-            # HACK: Just insert IF content doesn't exist for this conversation.
-            
-            existing_contents = set(
-                db.query(Message.content).filter(Message.conversation_id == conversation.id).all()
-            )
-            existing_contents = {r[0] for r in existing_contents} # Set of strings
+            # Dedup on Message-ID; mail without one falls back to the body hash.
+            # Rows stored without a Message-ID (synced before threading) match an
+            # incoming message by hash once, and take over its headers.
+            # None of this needs the stored bodies.
+            existing = db.query(Message.id, Message.message_id_header, Message.content_hash).filter(
+                Message.conversation_id == conversation.id
+            ).all()
+            existing_ids = {r[1] for r in existing if r[1]}
+            existing_hashes = {r[2] for r in existing}
+            unthreaded = {}
+            for row_id, message_id_header, content_hash in existing:
+                if not message_id_header:
+                    unthreaded.setdefault(content_hash, []).append(row_id)
 
             updates_made = False
-            for msg in messages:
+            for msg, msg_headers in parsed:
                 # Extract Body
                 body = ""
                 payload = msg.get('payload', {})
@@ -199,13 +202,24 @@ def sync_inbox_from_gmail(
                 
                 if not body: continue
                 
-                # Check duplication (Simple content check)
-                if body in existing_contents:
+                # Check duplication
+                thread_fields = mail_threads.threading_fields(msg_headers)
+                body_hash = message_hash(body)
+                if thread_fields["message_id_header"]:
+                    if thread_fields["message_id_header"] in existing_ids:
+                        continue
+                    if unthreaded.get(body_hash):
+                        db.query(Message).filter(Message.id == unthreaded[body_hash].pop(0)).update(
+                            thread_fields, synchronize_session=False
+                        )
+                        existing_ids.add(thread_fields["message_id_header"])
+                        updates_made = True
+                        continue
+                elif body_hash in existing_hashes:
                     continue
 
                 # Determine direction
-                msg_headers = {h['name']: h['value'] for h in msg.get('payload', {}).get('headers', [])}
-                sender_email = parseaddr(msg_headers.get('From', ''))[1]
+                sender_email = mail_threads.sender(msg_headers)
                 
                 # Is Internal? (If sender is workspace owner/staff)
                 # We can check if sender_email matches a User in this workspace
@@ -218,10 +232,13 @@ def sync_inbox_from_gmail(
                     sender_email=sender_email,
                     content=body,
                     is_internal=is_internal,
-                    created_at=datetime.fromtimestamp(int(msg['internalDate'])/1000, tz=timezone.utc)
+                    created_at=datetime.fromtimestamp(int(msg['internalDate'])/1000, tz=timezone.utc),
+                    **thread_fields
                 )
                 db.add(new_msg)
-                existing_contents.add(body)
+                if thread_fields["message_id_header"]:
+                    existing_ids.add(thread_fields["message_id_header"])
+                existing_hashes.add(body_hash)
                 synced_count += 1
                 updates_made = True
                 
@@ -356,7 +373,7 @@ def reply_to_email(
             userId='me',
             id=request.thread_id,
             format='metadata',
-            metadataHeaders=['From', 'Subject']
+            metadataHeaders=['From', 'Subject', 'Message-ID', 'In-Reply-To', 'References']
         ).execute()
         
         messages = thread_data.get('messages', [])
@@ -364,10 +381,10 @@ def reply_to_email(
             raise HTTPException(status_code=404, detail="Thread not found")
         
         first_msg = messages[0]
-        headers = {h['name']: h['value'] for h in first_msg.get('payload', {}).get('headers', [])}
+        headers = mail_threads.gmail_headers(first_msg)
         
-        to_email = parseaddr(headers.get('From', ''))[1]
-        subject = headers.get('Subject', '')
+        to_email = mail_threads.sender(headers)
+        subject = headers.get('subject', '')
         
         # Add Re: if not present
         if not subject.startswith('Re:'):
@@ -377,8 +394,9 @@ def reply_to_email(
         message = MIMEText(request.body)
         message['to'] = to_email
         message['subject'] = subject
-        message['In-Reply-To'] = first_msg['id']
-        message['References'] = first_msg['id']
+        # Thread under the latest message, by its RFC 5322 Message-ID
+        for name, value in mail_threads.reply_headers(mail_threads.gmail_headers(messages[-1])).items():
+            message[name] = value
         
         # Encode message
         raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
@@ -392,23 +410,24 @@ def reply_to_email(
             }
         ).execute()
         
-        # Pause automations for matching conversation (hackathon brief: "Staff reply → automation stops")
-        from app.models.conversation import Conversation
-        from app.models.contact import Contact
-        contact = db.query(Contact).filter(
-            Contact.email == to_email,
-            Contact.workspace_id == current_user.workspace_id
-        ).first()
-        if contact:
-            conv = db.query(Conversation).filter(
-                Conversation.contact_id == contact.id,
-                Conversation.workspace_id == current_user.workspace_id
+        # Pause automations for this thread's conversation (hackathon brief: "Staff reply → automation stops")
+        conv = mail_threads.find_conversation(
+            db, current_user.workspace_id, request.thread_id, mail_threads.thread_refs(messages)
+        )
+        if not conv:
+            contact = db.query(Contact).filter(
+                Contact.email == to_email,
+                Contact.workspace_id == current_user.workspace_id
             ).first()
-            if conv:
-                conv.is_paused = True
-                conv.paused_until = datetime.utcnow() + timedelta(hours=48)
-                conv.last_message_is_internal = True
-                db.commit()
+            if contact:
+                conv = mail_threads.unthreaded_conversation(db, current_user.workspace_id, contact.id)
+                if conv:
+                    conv.gmail_thread_id = request.thread_id
+        if conv:
+            conv.is_paused = True
+            conv.paused_until = datetime.utcnow() + timedelta(hours=48)
+            conv.last_message_is_internal = True
+            db.commit()
         
         return {
             "message": "Reply sent successfully",
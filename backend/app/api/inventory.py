@@ -7,6 +7,7 @@ from typing import Optional, List
 from app.api import deps
 from app.models.inventory import InventoryItem
 from app.models.user import User
+from app.services import availability
 
 router = APIRouter()
 
@@ -91,6 +92,7 @@ def update_inventory_item(
     if item_in.name is not None:
         item.name = item_in.name
     if item_in.quantity is not None:
+        availability.inventory_changed(db, item.id, item.quantity, item_in.quantity)
         item.quantity = item_in.quantity
     if item_in.threshold is not None:
         item.threshold = item_in.threshold
@@ -118,6 +120,7 @@ def delete_inventory_item(
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
+    availability.inventory_changed(db, item.id, item.quantity, None)
     db.delete(item)
     db.commit()
     return None
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -6,8 +6,12 @@ from app.api import deps
 from app.models.contact import Contact
 from app.models.workspace import Workspace
 from app.schemas.signup import LeadFormSubmission, LeadResponse, UpdateLeadStatus
-from app.services.email import send_welcome_email
+from app.services.email import send_welcome_email, send_welcome_emails_bulk
+from app.services import catalog
+from app.services.contact_import import import_contacts
+from app.core.config import settings
 from app.core.rate_limit import public_rate_limiter
+from app.core.responses import FastJSONResponse
 
 router = APIRouter()
 
@@ -23,7 +27,7 @@ def submit_lead_form(
     """
     public_rate_limiter.check(request)
     # 1. Find workspace
-    workspace = db.query(Workspace).filter(Workspace.slug == workspace_slug).first()
+    workspace = catalog.get_workspace_by_slug(db, workspace_slug)
     if not workspace:
         raise HTTPException(status_code=404, detail="Workspace not found")
     
@@ -91,19 +95,46 @@ def get_leads(
     
     leads = query.order_by(Contact.created_at.desc()).all()
     
-    return [
-        LeadResponse(
-            id=lead.id,
-            first_name=lead.first_name or "",
-            last_name=lead.last_name or "",
-            email=lead.email,
-            phone=lead.phone,
-            status=lead.status or "new",
-            source=lead.source or "manual",
-            created_at=lead.created_at.isoformat() if lead.created_at else ""
-        )
+    # Plain dicts in LeadResponse's shape, rendered without a second validation pass
+    return FastJSONResponse([
+        {
+            "id": lead.id,
+            "first_name": lead.first_name or "",
+            "last_name": lead.last_name or "",
+            "email": lead.email,
+            "phone": lead.phone,
+            "status": lead.status or "new",
+            "source": lead.source or "manual",
+            "created_at": lead.created_at.isoformat() if lead.created_at else ""
+        }
         for lead in leads
-    ]
+    ])
+
+@router.post("/leads/import")
+def import_leads(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    send_welcome: bool = True,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_active_owner)
+):
+    """
+    Bulk import a client list (CSV with an `email` column, or NDJSON).
+    Existing contacts (same email in this workspace) are skipped.
+    """
+    filename = (file.filename or "").lower()
+    fmt = "ndjson" if filename.endswith((".ndjson", ".jsonl")) or "ndjson" in (file.content_type or "") else "csv"
+
+    stats = import_contacts(db, current_user.workspace_id, file.file, fmt=fmt)
+    contact_ids = stats.pop("contact_ids")
+
+    # One background task for the whole batch, not one per contact
+    if send_welcome and contact_ids:
+        workspace = db.query(Workspace).filter(Workspace.id == current_user.workspace_id).first()
+        booking_url = f"{settings.FRONTEND_URL}/book/{workspace.slug}"
+        background_tasks.add_task(send_welcome_emails_bulk, contact_ids, booking_url)
+
+    return stats
 
 @router.patch("/leads/{lead_id}/status")
 def update_lead_status(
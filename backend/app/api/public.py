@@ -1,25 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Request, Response
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, date, timezone
 from typing import List, Optional, Any
 from pydantic import BaseModel, EmailStr
-import pytz
 
 from app.api import deps
 from app.models.service import Service
-from app.models.booking import Booking, BookingStatus
+from app.models.booking import Booking
 from app.models.workspace import Workspace
 from app.models.contact import Contact
 from app.models.conversation import Conversation, Message
 from app.models.conversation import Conversation, Message
 from app.models.form import Form, FormSubmission
-from app.models.inventory import InventoryItem
 from app.services import email as email_service
+from app.services import availability, catalog, http_cache, waitlist
+from app.services.scheduler import reminder_scheduler
+from app.services.form_schema import get_compiled_form, FormValidationError, DEFAULT_INTAKE_FIELDS
 from app.core.monitoring import log_booking_created # Reuse generic logging? Or add new.
 from app.core.rate_limit import public_rate_limiter
+from app.core.config import settings
+from app.core.time_utils import ensure_utc
 
 router = APIRouter()
 
+class WaitlistJoin(BaseModel):
+    name: str
+    email: EmailStr
+    phone: Optional[str] = None
+    window_start: datetime  # any opening starting and ending inside this window
+    window_end: datetime
+
 class ContactFormSubmit(BaseModel):
     workspace_id: int
     name: str
@@ -115,14 +125,18 @@ def submit_contact_form(
 @router.get("/workspace/{slug}")
 def get_workspace_public_config(
     slug: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(deps.get_db)
 ):
-    workspace = db.query(Workspace).filter(Workspace.slug == slug, Workspace.is_active == True).first()
-    if not workspace:
+    workspace = catalog.get_workspace_by_slug(db, slug)
+    if not workspace or not workspace.is_active:
         raise HTTPException(status_code=404, detail="Workspace not found")
-        
-    services = db.query(Service).filter(Service.workspace_id == workspace.id).all()
-    
+    tag = http_cache.etag("workspace", workspace.id, workspace.version)
+    not_modified = http_cache.conditional(request, response, tag, settings.HTTP_CACHE_CATALOG)
+    if not_modified:
+        return not_modified
+
     return {
         "id": workspace.id,
         "name": workspace.name,
@@ -133,13 +147,15 @@ def get_workspace_public_config(
                 "id": s.id,
                 "name": s.name,
                 "duration_minutes": s.duration_minutes
-            } for s in services
+            } for s in workspace.services
         ]
     }
 
 @router.get("/services/{service_id}/availability", response_model=List[str])
 def get_service_availability(
     service_id: int,
+    request: Request,
+    response: Response,
     query_date: date = Query(..., alias="date"),
     timezone: str = Query("UTC"), # Default to UTC if not provided, or fetch from workspace
     db: Session = Depends(deps.get_db)
@@ -147,116 +163,59 @@ def get_service_availability(
     """
     Get available time slots for a service on a specific date.
     Returns a list of start times (e.g. ["09:00", "09:30"]).
+    Served from the availability cache (see app/services/availability.py).
     """
-    # 1. Fetch Service and Workspace
+    slots = availability.get_slots(db, service_id, query_date, timezone)
+    if slots is None:
+        raise HTTPException(status_code=404, detail="Service not found")
+    tag = http_cache.content_etag([service_id, query_date, timezone, slots])
+    not_modified = http_cache.conditional(request, response, tag, settings.HTTP_CACHE_AVAILABILITY)
+    if not_modified:
+        return not_modified
+    return slots
+
+@router.post("/services/{service_id}/waitlist")
+def join_waitlist(
+    service_id: int,
+    request: Request,
+    join_in: WaitlistJoin,
+    db: Session = Depends(deps.get_db)
+):
+    """
+    Join a service's waitlist. The client is emailed (with a few others) when
+    a cancellation frees a slot inside their window.
+    """
+    public_rate_limiter.check(request)
     service = db.query(Service).filter(Service.id == service_id).first()
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
-    
-    workspace = db.query(Workspace).filter(Workspace.id == service.workspace_id).first()
-    # If workspace has timezone setting, use it. Otherwise use param or UTC.
-    # checking workspace model next, assuming generic for now.
-    ws_tz_str = timezone
-    # if hasattr(workspace, 'timezone') and workspace.timezone:
-    #     ws_tz_str = workspace.timezone
-    
-    try:
-        tz = pytz.timezone(ws_tz_str)
-    except pytz.UnknownTimeZoneError:
-        tz = pytz.UTC
-
-    # 2. Check Inventory Level (Crucial Gap Fill)
-    # If service requires inventory and it's out of stock, zero slots available.
-    if service.inventory_item_id and service.inventory_quantity_required > 0:
-        inventory_item = db.query(InventoryItem).filter(InventoryItem.id == service.inventory_item_id).first()
-        if not inventory_item or inventory_item.quantity < service.inventory_quantity_required:
-            # Out of stock. Return empty list immediately.
-            return []
-
-    # 3. Determine Weekday (0=Monday, 6=Sunday)
-    weekday_map = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
-    day_str = weekday_map[query_date.weekday()]
-    
-    # 3. Get Availability for Weekday
-    # availability format: {"mon": ["09:00-17:00"], "tue": ...}
-    availability = service.availability or {}
-    day_slots = availability.get(day_str, [])
-    
-    if not day_slots:
-        return []
 
-    # 4. Generate All Possible Slots
-    potential_slots = []
-    duration = service.duration_minutes
-    
-    for time_range in day_slots:
-        try:
-            start_str, end_str = time_range.split("-")
-            
-            # Create datetime objects for the selected date + time in the target timezone
-            # Format: HH:MM
-            start_dt = datetime.strptime(f"{query_date} {start_str}", "%Y-%m-%d %H:%M")
-            end_dt = datetime.strptime(f"{query_date} {end_str}", "%Y-%m-%d %H:%M")
-            
-            # Localize
-            start_dt = tz.localize(start_dt)
-            end_dt = tz.localize(end_dt)
-            
-            current_slot = start_dt
-            while current_slot + timedelta(minutes=duration) <= end_dt:
-                potential_slots.append(current_slot)
-                current_slot += timedelta(minutes=duration)
-                
-        except ValueError:
-            continue # Skip malformed ranges
-
-    if not potential_slots:
-        return []
-
-    # 5. Query Existing Bookings for Conflicts
-    # We need to check range [DayStart, DayEnd] in UTC to query DB efficiently
-    # Or just check if any booking overlaps each slot.
-    # Optimization: Query all bookings for this service on this day.
-    
-    # Define "Day" in UTC terms to cover all timezones? 
-    # Or just convert potential slots to UTC and check.
-    
-    # Range of interesting time: Min Slot Start -> Max Slot End
-    min_time = min(potential_slots)
-    max_time = max(potential_slots) + timedelta(minutes=duration)
-    
-    # Convert to UTC for DB query
-    min_time_utc = min_time.astimezone(pytz.UTC)
-    max_time_utc = max_time.astimezone(pytz.UTC)
-    
-    conflicting_bookings = db.query(Booking).filter(
-        Booking.service_id == service.id,
-        Booking.status != BookingStatus.CANCELLED.value,
-        Booking.end_time > min_time_utc, # Overlap logic
-        Booking.start_time < max_time_utc
-    ).all()
-    
-    # 6. Filter Slots
-    final_slots = []
-    for slot_start in potential_slots:
-        slot_end = slot_start + timedelta(minutes=duration)
-        slot_start_utc = slot_start.astimezone(pytz.UTC)
-        slot_end_utc = slot_end.astimezone(pytz.UTC)
-        
-        is_free = True
-        for booking in conflicting_bookings:
-            # Check overlap: (StartA < EndB) and (EndA > StartB)
-            # booking.start_time is already UTC (from DB)
-            if (slot_start_utc < booking.end_time) and (slot_end_utc > booking.start_time):
-                is_free = False
-                break
-        
-        if is_free:
-            # Return time string in requested timezone
-            final_slots.append(slot_start.strftime("%H:%M"))
-            
-    return final_slots
+    start, end = ensure_utc(join_in.window_start), ensure_utc(join_in.window_end)
+    if end - start < timedelta(minutes=service.duration_minutes):
+        raise HTTPException(status_code=400, detail="Window is shorter than the service")
+    if end - start > waitlist.max_window():
+        raise HTTPException(status_code=400, detail=f"Window can be at most {waitlist.max_window().days} days")
+    if end <= datetime.now(timezone.utc):
+        raise HTTPException(status_code=400, detail="Window is in the past")
 
+    contact = db.query(Contact).filter(
+        Contact.email == join_in.email,
+        Contact.workspace_id == service.workspace_id
+    ).first()
+    if not contact:
+        contact = Contact(
+            workspace_id=service.workspace_id,
+            email=join_in.email,
+            full_name=join_in.name,
+            phone=join_in.phone,
+            source="waitlist"
+        )
+        db.add(contact)
+        db.flush()
+
+    entry = waitlist.join(db, service, contact, start, end)
+    db.commit()
+    return {"id": entry.id, "status": entry.status}
 
 @router.get("/bookings/{booking_id}")
 def get_public_booking(
@@ -291,6 +250,21 @@ def get_public_booking(
 
 # --- INTAKE FORM ENDPOINTS ---
 
+def _intake_form(db: Session, workspace_id: int) -> Optional[Form]:
+    """The workspace's intake form, falling back to its contact form."""
+    form = db.query(Form).filter(Form.workspace_id == workspace_id, Form.type == "intake").first()
+    if not form:
+        form = db.query(Form).filter(Form.workspace_id == workspace_id, Form.type == "contact").first()
+    return form
+
+
+def _validate_answers(form: Optional[Form], answers: dict) -> dict:
+    try:
+        return get_compiled_form(form).validate(answers)
+    except FormValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
 @router.get("/bookings/{booking_id}/intake")
 def get_booking_intake(
     booking_id: int,
@@ -313,55 +287,19 @@ def get_booking_intake(
     contact = booking.contact
     workspace = booking.workspace
     
-    # 1. Check if Service has a form? 
-    # Current model doesn't link Service -> Form explicitly except maybe via name convention or generic "Intake"?
-    # For MVP, we assume a GLOBAL or SERVICE-SPECIFIC intake form mechanism.
-    # Let's check if there's an "Intake Form" in the workspace.
-    
-    form = db.query(Form).filter(
-        Form.workspace_id == workspace.id,
-        Form.type == "intake" # We might need to standardize this type
-    ).first()
-    
-    # If no specific form, return basic contact details confirmation?
-    # Or create a default one on the fly?
-    # Better: If no form, we can't do intake.
-    if not form:
-        # Fallback: Check for "Contact Form" or generic
-        form = db.query(Form).filter(Form.workspace_id == workspace.id, Form.type == "contact").first()
-    
+    # No Service -> Form link yet: the workspace intake form serves every service.
+    # Without one we return a generic schema rather than blocking the client.
+    form = _intake_form(db, workspace.id)
+    compiled = get_compiled_form(form)
     if not form:
-         # Hard fail or generic empty?
-         # Let's return a generic schema if none found to avoid blocking.
-         fields = [{"name": "notes", "type": "textarea", "label": "Anything we should know?", "required": False}]
+         fields = DEFAULT_INTAKE_FIELDS
          form_name = "Intake Form"
     else:
          fields = form.fields
          form_name = form.name
 
-    # Pre-fill logic:
-    # If the form has fields that match contact attributes, pre-fill them.
-    # We'll creating a "pre_filled_answers" dictionary.
-    pre_filled_answers = {}
-    if contact:
-        # Map common field names to contact attributes
-        # Heuristic matching: keys are lowercase version of label or name
-        for field in fields:
-            f_name = field.get("name", "").lower()
-            f_label = field.get("label", "").lower()
-            
-            val = None
-            if "name" in f_name or "name" in f_label:
-                val = contact.full_name
-            elif "email" in f_name or "email" in f_label:
-                val = contact.email
-            elif "phone" in f_name or "phone" in f_label:
-                val = contact.phone
-            elif "address" in f_name or "address" in f_label:
-                val = getattr(contact, "address", "")
-            
-            if val:
-                pre_filled_answers[field["name"]] = val
+    # Pre-fill fields mapped to contact attributes (mapping resolved at compile time)
+    pre_filled_answers = compiled.prefill(contact)
 
     return {
         "booking_id": booking.id,
@@ -397,42 +335,31 @@ def submit_booking_intake(
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
 
-    # Find the form again to link it? 
-    # We will just store it as a generic submission linked to the booking.
-    # Ideally we know WHICH form ID it was, but for now we link to Booking.
-    
     # Find existing pending submission for this booking
     # (Created during booking creation in bookings.py)
     form_sub = db.query(FormSubmission).filter(
         FormSubmission.booking_id == booking.id
     ).first()
-    
+
+    # Validate against the form the client was shown
+    form = form_sub.form if form_sub and form_sub.form else _intake_form(db, booking.workspace_id)
+    answers = _validate_answers(form, submission.answers)
+    intake_form_id = form.id if form and form.type == "intake" else None
+
     if form_sub:
         # Update existing
-        form_sub.data = submission.answers
+        form_sub.data = answers
         form_sub.status = "completed"
         form_sub.completed_at = datetime.now(timezone.utc)
         # Verify form_id is linked if missing (should be there from creation)
         if not form_sub.form_id:
-             # Try to link intake form now
-             form = db.query(Form).filter(
-                Form.workspace_id == booking.workspace_id,
-                Form.type == "intake"
-             ).first()
-             if form:
-                 form_sub.form_id = form.id
+             form_sub.form_id = intake_form_id
     else:
         # Fallback: Create new if missing (e.g. old bookings)
-        # Try to find 'Intake' form to link
-        form = db.query(Form).filter(
-            Form.workspace_id == booking.workspace_id,
-            Form.type == "intake"
-        ).first()
-        
         form_sub = FormSubmission(
-            form_id=form.id if form else None,
+            form_id=intake_form_id,
             booking_id=booking.id,
-            data=submission.answers,
+            data=answers,
             status="completed",
             sent_at=datetime.now(timezone.utc),
             completed_at=datetime.now(timezone.utc)
@@ -440,6 +367,7 @@ def submit_booking_intake(
         db.add(form_sub)
     
     db.commit()
+    reminder_scheduler.form_submission_changed(form_sub)
     
     # Create Inbox Message for visibility
     if booking.contact:
@@ -467,7 +395,7 @@ def submit_booking_intake(
             
         # Format
         msg_lines = [f"Intake form completed for booking #{booking.id}"]
-        for k, v in submission.answers.items():
+        for k, v in answers.items():
              msg_lines.append(f"{k}: {v}")
              
         message = Message(
@@ -493,11 +421,19 @@ def submit_booking_intake(
 @router.get("/forms/{form_id}")
 def get_public_form(
     form_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(deps.get_db)
 ):
     """
     Get a specific form by ID for public display (Lead Capture).
+    Revalidations are answered from the form's change counter alone.
     """
+    tag = http_cache.etag("form", form_id, http_cache.version(db, http_cache.FORM, form_id))
+    not_modified = http_cache.conditional(request, response, tag, settings.HTTP_CACHE_FORMS)
+    if not_modified:
+        return not_modified
+
     form = db.query(Form).filter(Form.id == form_id).first()
     if not form:
         raise HTTPException(status_code=404, detail="Form not found")
@@ -530,19 +466,13 @@ def submit_public_form(
     if not form:
         raise HTTPException(status_code=404, detail="Form not found")
         
-    # 1. Extract Contact Details (Name/Email/Phone) if present
-    answers = submission.answers
-    email = None
-    name = None
-    phone = None
-    
-    # Heuristic extraction
-    for key, val in answers.items():
-        k = key.lower()
-        if "email" in k: email = val
-        if "name" in k: name = val
-        if "phone" in k: phone = val
-        
+    # 1. Validate and extract Contact Details (Name/Email/Phone) if present
+    answers = _validate_answers(form, submission.answers)
+    contact_info = get_compiled_form(form).extract_contact(answers)
+    email = contact_info.get("email")
+    name = contact_info.get("full_name")
+    phone = contact_info.get("phone")
+
     contact = None
     is_new = False
     
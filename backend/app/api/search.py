@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.models.user import User
+from app.services import search as search_service
+
+router = APIRouter()
+
+@router.get("/search")
+def search(
+    q: str = Query(..., min_length=1),
+    type: str = Query("all", pattern="^(all|contacts|messages)$"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_staff_or_owner)
+):
+    """
+    Ranked, prefix-matching search over contacts and conversation messages
+    in the current workspace. Pagination applies to each section.
+    """
+    workspace_id = current_user.workspace_id
+    results = {"query": q, "contacts": [], "messages": []}
+
+    if type in ("all", "contacts"):
+        results["contacts"] = search_service.search_contacts(db, workspace_id, q, limit, offset)
+    if type in ("all", "messages"):
+        results["messages"] = search_service.search_messages(db, workspace_id, q, limit, offset)
+
+    return results
@@ -0,0 +1,271 @@
+"""Recurring booking series API — create, list, expand, skip and cancel series."""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, EmailStr
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.core.config import settings
+from app.core.time_utils import ensure_utc
+from app.models.audit_log import AuditLog
+from app.models.booking import Booking, BookingStatus
+from app.models.booking_series import BookingSeries, SeriesStatus
+from app.models.contact import Contact
+from app.models.service import Service
+from app.models.user import User
+from app.services import availability, capacity, recurrence
+from app.services.scheduler import reminder_scheduler, MATERIALIZE_AHEAD
+
+router = APIRouter()
+
+# Longest window /occurrences will expand in one request
+MAX_WINDOW = timedelta(days=366)
+
+
+# ── Schemas ──────────────────────────────────────────────
+class SeriesCreate(BaseModel):
+    service_id: int
+    start_datetime: datetime  # first occurrence
+    rule: str  # e.g. "FREQ=WEEKLY;BYDAY=TU", see app/services/recurrence.py
+    timezone: str = "UTC"  # occurrences keep their wall-clock time in this zone
+    name: str
+    email: EmailStr
+    phone: Optional[str] = None
+
+
+class SeriesSkip(BaseModel):
+    start_datetime: datetime
+
+
+def _series_out(series: BookingSeries) -> dict:
+    return {
+        "id": series.id,
+        "service_id": series.service_id,
+        "contact_id": series.contact_id,
+        "staff_id": series.staff_id,
+        "rule": series.rule,
+        "timezone": series.timezone,
+        "start_time": series.start_time,
+        "ends_at": series.ends_at,
+        "duration_minutes": series.duration_minutes,
+        "status": series.status,
+        "next_occurrence": recurrence.next_start(series) if series.status == SeriesStatus.ACTIVE.value else None,
+    }
+
+
+def _get_series(db: Session, series_id: int, workspace_id: int) -> BookingSeries:
+    series = db.query(BookingSeries).filter(
+        BookingSeries.id == series_id,
+        BookingSeries.workspace_id == workspace_id
+    ).first()
+    if not series:
+        raise HTTPException(status_code=404, detail="Series not found")
+    return series
+
+
+# ── Endpoints ────────────────────────────────────────────
+@router.post("/")
+def create_series(
+    series_in: SeriesCreate,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_staff_or_owner),
+):
+    """
+    Book a recurring series. Every occurrence (the first
+    SERIES_MAX_OCCURRENCES of open-ended rules) is checked against existing
+    bookings and series in one batched capacity query; nothing is booked if
+    any of them conflicts.
+    """
+    service = db.query(Service).filter(
+        Service.id == series_in.service_id,
+        Service.workspace_id == current_user.workspace_id
+    ).first()
+    if not service:
+        raise HTTPException(status_code=404, detail="Service not found")
+
+    try:
+        rule = recurrence.parse_rule(series_in.rule)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid rule: {e}")
+
+    first_start = ensure_utc(series_in.start_datetime)
+    starts = recurrence.first_occurrences(rule, first_start, series_in.timezone, settings.SERIES_MAX_OCCURRENCES)
+    if not starts:
+        raise HTTPException(status_code=400, detail="Rule produces no occurrences")
+
+    # One plan covers every candidate occurrence
+    duration = timedelta(minutes=service.duration_minutes)
+    plan = capacity.CapacityPlan.load(db, service, starts[0], starts[-1] + duration)
+    conflicts = []
+    common_staff = list(plan.staff_ids)
+    for start in starts:
+        slot = plan.check(start, start + duration)
+        if not slot.available:
+            conflicts.append(start.isoformat())
+        common_staff = [user_id for user_id in common_staff if user_id in slot.free_staff]
+    if conflicts:
+        raise HTTPException(status_code=409, detail={
+            "message": f"{len(conflicts)} occurrence(s) conflict with existing bookings",
+            "conflicts": conflicts,
+        })
+    if plan.staff_ids and not common_staff:
+        raise HTTPException(status_code=409, detail="No staff member is free for every occurrence")
+
+    contact = db.query(Contact).filter(
+        Contact.email == series_in.email,
+        Contact.workspace_id == service.workspace_id
+    ).first()
+    if not contact:
+        contact = Contact(
+            email=series_in.email,
+            full_name=series_in.name,
+            phone=series_in.phone,
+            workspace_id=service.workspace_id,
+            source="booking"
+        )
+        db.add(contact)
+        db.flush()
+
+    last = recurrence.last_start(rule, first_start, series_in.timezone)
+    series = BookingSeries(
+        workspace_id=service.workspace_id,
+        service_id=service.id,
+        contact_id=contact.id,
+        staff_id=common_staff[0] if common_staff else None,
+        rule=str(rule),
+        timezone=series_in.timezone,
+        start_time=starts[0],
+        ends_at=last + duration if last else None,
+        duration_minutes=service.duration_minutes,
+        status=SeriesStatus.ACTIVE.value,
+    )
+    db.add(series)
+    db.flush()
+    db.add(AuditLog(
+        workspace_id=service.workspace_id,
+        user_id=current_user.id,
+        action="series.created",
+        details={"series_id": series.id, "rule": series.rule, "first_start": starts[0].isoformat()}
+    ))
+    availability.invalidate_series(db, series)
+
+    # Occurrences already inside the reminder window become bookings straight away
+    bookings = recurrence.materialize(db, series, datetime.now(timezone.utc) + MATERIALIZE_AHEAD)
+    db.commit()
+    for booking in bookings:
+        reminder_scheduler.booking_changed(booking)
+    reminder_scheduler.series_changed(series)
+    return _series_out(series)
+
+
+@router.get("/")
+def list_series(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_staff_or_owner),
+):
+    """All series in the workspace."""
+    series = db.query(BookingSeries).filter(
+        BookingSeries.workspace_id == current_user.workspace_id
+    ).order_by(BookingSeries.start_time).all()
+    return [_series_out(s) for s in series]
+
+
+@router.get("/{series_id}/occurrences")
+def get_series_occurrences(
+    series_id: int,
+    start: datetime = Query(...),
+    end: datetime = Query(...),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_staff_or_owner),
+):
+    """Occurrences in [start, end): booked ones with their booking, the rest expanded from the rule."""
+    start, end = ensure_utc(start), ensure_utc(end)
+    if end <= start or end - start > MAX_WINDOW:
+        raise HTTPException(status_code=400, detail="Window must be positive and at most 366 days")
+    series = _get_series(db, series_id, current_user.workspace_id)
+
+    booked = db.query(Booking).filter(
+        Booking.series_id == series.id,
+        Booking.start_time < end,
+        Booking.end_time > start
+    ).all()
+    entries = [
+        {"booking_id": b.id, "start_time": ensure_utc(b.start_time), "end_time": ensure_utc(b.end_time), "status": b.status}
+        for b in booked
+    ]
+    if series.status == SeriesStatus.ACTIVE.value:
+        entries.extend(
+            {"booking_id": None, "start_time": occ_start, "end_time": occ_end, "status": "scheduled"}
+            for occ_start, occ_end in recurrence.occurrences(series, start, end)
+        )
+    return sorted(entries, key=lambda e: e["start_time"])
+
+
+@router.post("/{series_id}/skip")
+def skip_occurrence(
+    series_id: int,
+    skip_in: SeriesSkip,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_staff_or_owner),
+):
+    """Drop one upcoming occurrence that hasn't been booked yet."""
+    series = _get_series(db, series_id, current_user.workspace_id)
+    if series.status != SeriesStatus.ACTIVE.value:
+        raise HTTPException(status_code=400, detail="Series is cancelled")
+
+    start = ensure_utc(skip_in.start_datetime)
+    if series.materialized_until and start < ensure_utc(series.materialized_until):
+        booking = db.query(Booking.id).filter(Booking.series_id == series.id, Booking.start_time == start).first()
+        if booking:
+            raise HTTPException(status_code=400, detail=f"Occurrence is already booking #{booking.id}; cancel that booking instead")
+    match = [occ for occ in recurrence.occurrences(series, start, start + timedelta(seconds=1)) if occ[0] == start]
+    if not match:
+        raise HTTPException(status_code=404, detail="No upcoming occurrence at that time")
+
+    series.exdates = [*(series.exdates or []), start.isoformat()]
+    db.add(AuditLog(
+        workspace_id=series.workspace_id,
+        user_id=current_user.id,
+        action="series.occurrence_skipped",
+        details={"series_id": series.id, "start": start.isoformat()}
+    ))
+    availability.invalidate_series(db, series, *match[0])
+    db.commit()
+    reminder_scheduler.series_changed(series)
+    return _series_out(series)
+
+
+@router.post("/{series_id}/cancel")
+def cancel_series(
+    series_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_staff_or_owner),
+):
+    """Stop the series and cancel its booked occurrences that haven't started."""
+    series = _get_series(db, series_id, current_user.workspace_id)
+    if series.status == SeriesStatus.CANCELLED.value:
+        return {"status": "already_cancelled"}
+
+    availability.invalidate_series(db, series)
+    series.status = SeriesStatus.CANCELLED.value
+    upcoming = db.query(Booking).filter(
+        Booking.series_id == series.id,
+        Booking.start_time > datetime.now(timezone.utc),
+        Booking.status.in_([BookingStatus.PENDING.value, BookingStatus.CONFIRMED.value])
+    ).all()
+    for booking in upcoming:
+        booking.status = BookingStatus.CANCELLED.value
+        availability.invalidate_booking(db, booking)
+    db.add(AuditLog(
+        workspace_id=series.workspace_id,
+        user_id=current_user.id,
+        action="series.cancelled",
+        details={"series_id": series.id, "bookings_cancelled": [b.id for b in upcoming]}
+    ))
+    db.commit()
+    for booking in upcoming:
+        reminder_scheduler.booking_changed(booking)
+    reminder_scheduler.series_changed(series)
+    return {"status": "cancelled", "bookings_cancelled": len(upcoming)}
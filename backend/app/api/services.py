@@ -6,6 +6,7 @@ from pydantic import BaseModel
 from app.api import deps
 from app.models.service import Service
 from app.models.user import User
+from app.services import availability
 
 router = APIRouter()
 
@@ -19,6 +20,7 @@ class ServiceBase(BaseModel):
     location: Optional[str] = "Business Location"
     inventory_item_id: Optional[int] = None
     inventory_quantity_required: Optional[int] = 0
+    staff_ids: Optional[List[int]] = None
 
 class ServiceCreate(ServiceBase):
     pass
@@ -32,6 +34,7 @@ class ServiceUpdate(BaseModel):
     location: Optional[str] = None
     inventory_item_id: Optional[int] = None
     inventory_quantity_required: Optional[int] = None
+    staff_ids: Optional[List[int]] = None
 
 class ServiceOut(ServiceBase):
     id: int
@@ -40,6 +43,13 @@ class ServiceOut(ServiceBase):
     class Config:
         from_attributes = True
 
+def _check_staff(db: Session, workspace_id: int, staff_ids: Optional[List[int]]) -> None:
+    if not staff_ids:
+        return
+    found = db.query(User.id).filter(User.id.in_(staff_ids), User.workspace_id == workspace_id).count()
+    if found != len(set(staff_ids)):
+        raise HTTPException(status_code=400, detail="staff_ids must be members of this workspace")
+
 # --- Endpoints ---
 
 @router.get("/", response_model=List[ServiceOut])
@@ -58,6 +68,7 @@ def create_service(
     current_user: User = Depends(deps.get_current_active_owner),
 ):
     """Create a new service (Owner only)."""
+    _check_staff(db, current_user.workspace_id, service_in.staff_ids)
     avail = service_in.availability
     if not avail:
         avail = {
@@ -95,10 +106,12 @@ def update_service(
         raise HTTPException(status_code=404, detail="Service not found")
         
     update_data = service_in.model_dump(exclude_unset=True)
+    _check_staff(db, current_user.workspace_id, update_data.get("staff_ids"))
     for field, value in update_data.items():
         setattr(service, field, value)
         
     db.add(service)
+    availability.invalidate_service(db, service.id)
     db.commit()
     db.refresh(service)
     return service
@@ -118,6 +131,7 @@ def delete_service(
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
         
+    availability.invalidate_service(db, service.id)
     db.delete(service)
     db.commit()
     return None
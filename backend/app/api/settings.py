@@ -13,11 +13,6 @@ from app.core.security_utils import encrypt_token
 from app.services.email import send_test_email
 from app.core.config import settings
 
-# Google Libraries
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
-
 router = APIRouter()
 
 class GoogleConnectRequest(BaseModel):
@@ -88,6 +83,9 @@ def connect_google(
             }
         }
         
+        from google_auth_oauthlib.flow import Flow
+        from googleapiclient.discovery import build
+
         flow = Flow.from_client_config(
             client_config,
             scopes=['https://www.googleapis.com/auth/gmail.send', 'https://www.googleapis.com/auth/userinfo.email'],
@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from app.api import deps
 from app.models.user import User, UserRole
 from app.schemas.onboarding import StaffInvite
+from app.services import availability
 import logging
 
 logger = logging.getLogger(__name__)
@@ -171,6 +172,7 @@ def remove_staff(
     # Let's just set inactive and maybe we hide inactive ones in UI or show them in a separate tab.
     # But for MVP, let's actually DELETE them if they have no bookings, else Deactivate?
     # Simpler: Just Deactivate.
+    availability.invalidate_staff(db, user.workspace_id, user.id)
     
     db.commit()
     
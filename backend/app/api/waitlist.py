@@ -0,0 +1,63 @@
+"""Waitlist API — staff view of who is waiting for which service."""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, joinedload
+
+from app.api import deps
+from app.models.user import User
+from app.models.waitlist import WaitlistEntry, WaitlistStatus
+
+router = APIRouter()
+
+
+def _entry_out(entry: WaitlistEntry) -> dict:
+    return {
+        "id": entry.id,
+        "service_id": entry.service_id,
+        "contact_id": entry.contact_id,
+        "contact_name": entry.contact.full_name if entry.contact else None,
+        "contact_email": entry.contact.email if entry.contact else None,
+        "window_start": entry.window_start,
+        "window_end": entry.window_end,
+        "status": entry.status,
+        "notified_count": entry.notified_count,
+        "last_notified_at": entry.last_notified_at,
+        "booking_id": entry.booking_id,
+        "created_at": entry.created_at,
+    }
+
+
+@router.get("/")
+def list_waitlist(
+    service_id: Optional[int] = None,
+    status: str = Query(WaitlistStatus.WAITING.value),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_staff_or_owner),
+):
+    """Waitlist entries in the workspace, longest-waiting first."""
+    query = db.query(WaitlistEntry).options(joinedload(WaitlistEntry.contact)).filter(
+        WaitlistEntry.workspace_id == current_user.workspace_id,
+        WaitlistEntry.status == status
+    )
+    if service_id is not None:
+        query = query.filter(WaitlistEntry.service_id == service_id)
+    return [_entry_out(e) for e in query.order_by(WaitlistEntry.created_at, WaitlistEntry.id).limit(500)]
+
+
+@router.delete("/{entry_id}")
+def remove_from_waitlist(
+    entry_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_staff_or_owner),
+):
+    """Take a client off the waitlist."""
+    entry = db.query(WaitlistEntry).filter(
+        WaitlistEntry.id == entry_id,
+        WaitlistEntry.workspace_id == current_user.workspace_id
+    ).first()
+    if not entry:
+        raise HTTPException(status_code=404, detail="Waitlist entry not found")
+    entry.status = WaitlistStatus.CANCELLED.value
+    db.commit()
+    return {"status": "removed"}
@@ -0,0 +1,174 @@
+"""Webhook endpoints API — partner URLs that receive workspace events (see app/services/webhooks.py)."""
+import secrets
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import AnyHttpUrl, BaseModel, Field, field_validator
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.core.config import settings
+from app.core.security_utils import encrypt_token
+from app.models.user import User
+from app.models.webhook import WebhookDelivery, WebhookEndpoint
+from app.services.webhooks import EVENT_TYPES, url_problem
+
+router = APIRouter()
+
+# --- Schemas ---
+def _check_event_types(value: Optional[List[str]]) -> Optional[List[str]]:
+    unknown = set(value or ()) - set(EVENT_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown event types: {', '.join(sorted(unknown))}")
+    return value
+
+def _check_batch_size(value: Optional[int]) -> Optional[int]:
+    if value is not None and value > settings.WEBHOOK_MAX_BATCH_SIZE:
+        raise ValueError(f"batch_size can be at most {settings.WEBHOOK_MAX_BATCH_SIZE}")
+    return value
+
+class EndpointCreate(BaseModel):
+    url: AnyHttpUrl
+    event_types: Optional[List[str]] = None  # None = every event
+    batch_size: int = Field(1, ge=1)  # > 1: {"events": [...]} bodies
+
+    _event_types = field_validator("event_types")(_check_event_types)
+    _batch_size = field_validator("batch_size")(_check_batch_size)
+
+class EndpointUpdate(BaseModel):
+    url: Optional[AnyHttpUrl] = None
+    event_types: Optional[List[str]] = None
+    batch_size: Optional[int] = Field(None, ge=1)
+    is_active: Optional[bool] = None
+
+    _event_types = field_validator("event_types")(_check_event_types)
+    _batch_size = field_validator("batch_size")(_check_batch_size)
+
+class EndpointOut(BaseModel):
+    id: int
+    url: str
+    event_types: Optional[List[str]] = None
+    batch_size: int
+    is_active: bool
+    created_at: Optional[datetime] = None
+    last_success_at: Optional[datetime] = None
+    last_failure_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class EndpointCreated(EndpointOut):
+    secret: str  # Only ever shown here
+
+class DeliveryOut(BaseModel):
+    id: int
+    event_id: str
+    event_type: str
+    status: str
+    attempts: int
+    next_attempt_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    delivered_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+def _check_url(url: str) -> str:
+    problem = url_problem(url)
+    if problem:
+        raise HTTPException(status_code=400, detail=problem)
+    return url
+
+def _get_endpoint(db: Session, endpoint_id: int, workspace_id: int) -> WebhookEndpoint:
+    endpoint = db.query(WebhookEndpoint).filter(
+        WebhookEndpoint.id == endpoint_id,
+        WebhookEndpoint.workspace_id == workspace_id
+    ).first()
+    if not endpoint:
+        raise HTTPException(status_code=404, detail="Webhook endpoint not found")
+    return endpoint
+
+# --- Endpoints ---
+
+@router.get("/", response_model=List[EndpointOut])
+def list_endpoints(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_owner),
+):
+    """List the workspace's webhook endpoints (Owner only)."""
+    return db.query(WebhookEndpoint).filter(
+        WebhookEndpoint.workspace_id == current_user.workspace_id
+    ).order_by(WebhookEndpoint.id).all()
+
+@router.post("/", response_model=EndpointCreated)
+def create_endpoint(
+    endpoint_in: EndpointCreate,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_owner),
+):
+    """
+    Register an endpoint (https, public host only). The signing secret is
+    returned once and stored encrypted.
+    """
+    secret = f"whsec_{secrets.token_urlsafe(32)}"
+    endpoint = WebhookEndpoint(
+        workspace_id=current_user.workspace_id,
+        url=_check_url(str(endpoint_in.url)),
+        secret=encrypt_token(secret),
+        event_types=endpoint_in.event_types,
+        batch_size=endpoint_in.batch_size,
+        is_active=True,
+    )
+    db.add(endpoint)
+    db.commit()
+    db.refresh(endpoint)
+    return EndpointCreated(**EndpointOut.model_validate(endpoint).model_dump(), secret=secret)
+
+@router.patch("/{endpoint_id}", response_model=EndpointOut)
+def update_endpoint(
+    endpoint_id: int,
+    endpoint_in: EndpointUpdate,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_owner),
+):
+    """Change an endpoint; pausing it (is_active false) holds its pending deliveries until it is re-enabled."""
+    endpoint = _get_endpoint(db, endpoint_id, current_user.workspace_id)
+    update_data = endpoint_in.model_dump(exclude_unset=True)
+    if "url" in update_data:
+        update_data["url"] = _check_url(str(update_data["url"]))
+    for field, value in update_data.items():
+        setattr(endpoint, field, value)
+    db.commit()
+    db.refresh(endpoint)
+    return endpoint
+
+@router.delete("/{endpoint_id}", status_code=204)
+def delete_endpoint(
+    endpoint_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_owner),
+):
+    """Delete an endpoint and its delivery history."""
+    endpoint = _get_endpoint(db, endpoint_id, current_user.workspace_id)
+    # One statement, whatever the history size (and SQLite doesn't enforce ON DELETE CASCADE)
+    db.query(WebhookDelivery).filter(WebhookDelivery.endpoint_id == endpoint.id).delete(synchronize_session=False)
+    db.delete(endpoint)
+    db.commit()
+    return None
+
+@router.get("/{endpoint_id}/deliveries", response_model=List[DeliveryOut])
+def list_deliveries(
+    endpoint_id: int,
+    status: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_owner),
+):
+    """Most recent deliveries for an endpoint, optionally filtered by status (pending, delivered, dead)."""
+    endpoint = _get_endpoint(db, endpoint_id, current_user.workspace_id)
+    query = db.query(WebhookDelivery).filter(WebhookDelivery.endpoint_id == endpoint.id)
+    if status:
+        query = query.filter(WebhookDelivery.status == status)
+    return query.order_by(WebhookDelivery.created_at.desc(), WebhookDelivery.id.desc()).limit(limit).all()
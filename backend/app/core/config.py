@@ -22,6 +22,88 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Log retention (audit_logs / communication_logs)
+    LOG_HOT_RETENTION_DAYS: int = 90  # Rows older than this leave the hot tables
+    LOG_ARCHIVE_AFTER_DAYS: int = 365  # Rows older than this are written to gzip NDJSON and dropped
+    LOG_ARCHIVE_DIR: str = "./log_archive"
+
+    # In-process reminder scheduler; when off, /api/cron/run scans for due reminders instead
+    REMINDER_SCHEDULER_ENABLED: bool = True
+
+    # POST /api/bookings/bulk: most booking ids per call (one transaction)
+    BOOKING_BULK_MAX_IDS: int = 500
+
+    # auto_complete cron job: confirmed bookings this long past end_time become completed
+    BOOKING_AUTO_COMPLETE_ENABLED: bool = True
+    BOOKING_AUTO_COMPLETE_GRACE_MINUTES: int = 60
+    BOOKING_AUTO_COMPLETE_CHUNK: int = 1000  # Rows per UPDATE / transaction
+    BOOKING_AUTO_COMPLETE_MAX_CHUNKS: int = 100  # Per run; the next run picks up the rest
+
+    # stats_rollup cron job: dirty (workspace, day, source) markers recomputed per transaction / per run
+    STATS_ROLLUP_BATCH: int = 500
+    STATS_ROLLUP_MAX_BATCHES: int = 20
+    STATS_TRENDS_MAX_DAYS: int = 732  # Widest range the trends API serves (two years of days)
+
+    # Cron job leases: a crashed runner's lease frees up after this long
+    CRON_JOB_LEASE_SECONDS: int = 600
+    # Split each cron job into N workspace shards (workspace_id % N), each with its own lease/session
+    CRON_SHARDS: int = 1
+
+    # Availability cache: in-process LRU of slot lists per (service, date, tz)
+    AVAILABILITY_CACHE_SIZE: int = 2048
+    AVAILABILITY_CACHE_TTL_SECONDS: int = 300
+    # Also keep slot lists in the availability_cache table so replicas share them;
+    # the local LRU then only trusts an entry for AVAILABILITY_CACHE_LOCAL_TTL_SECONDS
+    AVAILABILITY_CACHE_SHARED: bool = False
+    AVAILABILITY_CACHE_LOCAL_TTL_SECONDS: int = 5
+
+    # Recurring bookings: open-ended series are conflict-checked over this many occurrences
+    SERIES_MAX_OCCURRENCES: int = 104
+
+    # Waitlist: longest window a client can wait on, and how many are told about each opening
+    WAITLIST_MAX_WINDOW_DAYS: int = 14
+    WAITLIST_NOTIFY_BATCH: int = 5
+
+    # iCalendar feeds: bookings from this many days back to this many days ahead
+    CALENDAR_FEED_PAST_DAYS: int = 30
+    CALENDAR_FEED_FUTURE_DAYS: int = 365
+
+    # Live events (SSE): relay through Postgres LISTEN/NOTIFY so every worker's
+    # subscribers see every worker's events; off = in-process only
+    LIVE_EVENTS_PG_BRIDGE: bool = False
+    LIVE_EVENTS_HEARTBEAT_SECONDS: int = 15
+    LIVE_EVENTS_QUEUE_SIZE: int = 100
+
+    # Catalog cache: workspace + service snapshots for public pages (per process)
+    CATALOG_CACHE_SIZE: int = 1024
+    CATALOG_CACHE_TTL_SECONDS: int = 60  # Bounds staleness from other replicas' writes
+    CATALOG_CACHE_WARM_ON_STARTUP: bool = False
+
+    # Cache-Control for public reads (ETag-validated; see app/services/http_cache.py)
+    HTTP_CACHE_CATALOG: str = "public, max-age=60, stale-while-revalidate=600"
+    HTTP_CACHE_FORMS: str = "public, max-age=300, stale-while-revalidate=3600"
+    HTTP_CACHE_AVAILABILITY: str = "public, max-age=15, stale-while-revalidate=60"
+
+    # Print the readiness report (a few COUNT queries) in the background after startup
+    READINESS_REPORT_ON_STARTUP: bool = True
+
+    # Response compression (bytes; zlib level 1-9)
+    GZIP_MINIMUM_SIZE: int = 1024
+    GZIP_COMPRESSLEVEL: int = 6
+
+    # Outbound webhooks: in-process delivery worker; when off, /api/cron/run delivers instead
+    WEBHOOK_WORKER_ENABLED: bool = True
+    WEBHOOK_POLL_SECONDS: int = 10  # Retries come due without a wakeup
+    WEBHOOK_CLAIM_LIMIT: int = 200  # Deliveries leased per round
+    WEBHOOK_MAX_BATCH_SIZE: int = 100  # Cap on an endpoint's batch_size
+    WEBHOOK_CONCURRENCY: int = 10  # POSTs in flight per process
+    WEBHOOK_TIMEOUT_SECONDS: float = 10.0
+    WEBHOOK_MAX_ATTEMPTS: int = 8  # Then the delivery is marked dead
+    WEBHOOK_BACKOFF_BASE_SECONDS: float = 30.0
+    WEBHOOK_BACKOFF_MAX_SECONDS: float = 6 * 3600
+    # Allow http and loopback/private hosts as webhook targets (local development only)
+    WEBHOOK_ALLOW_PRIVATE_URLS: bool = False
+
     model_config = SettingsConfigDict(
         env_file=".env", 
         env_ignore_empty=True,
@@ -0,0 +1,41 @@
+"""
+JSON responses
+
+FastJSONResponse renders with orjson, which serializes datetimes, dates and
+UUIDs natively, so handlers can hand it plain dicts built from rows without
+the jsonable_encoder pass. It is the app's default response class for routes
+that return dicts; routes with a response_model keep FastAPI's own fast path
+(Pydantic's dump_json).
+
+List endpoints that build their payload from trusted rows return
+FastJSONResponse directly: that skips both response_model validation and
+jsonable_encoder, while response_model still documents the shape.
+
+Without orjson installed this falls back to the standard encoder.
+"""
+
+import json
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+# "Z" for UTC, like Pydantic; naive datetimes (SQLite) stay naive
+_ORJSON_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        # Anything orjson doesn't know (Decimal, Pydantic models, ...) goes through jsonable_encoder
+        return orjson.dumps(content, default=jsonable_encoder, option=_ORJSON_OPTIONS)
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
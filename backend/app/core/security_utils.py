@@ -68,3 +68,26 @@ def verify_cancel_token(token: str, booking_id: int) -> bool:
         return int(decoded_id) == booking_id
     except Exception:
         return False
+
+def generate_feed_token(workspace_id: int, staff_id: int) -> str:
+    """
+    Generate a signed token for a calendar feed URL (staff_id 0 = whole workspace).
+    Format: "workspace_id-staff_id-signature"
+    """
+    data = f"{workspace_id}-{staff_id}"
+    cipher_suite = _get_cipher_suite()
+    signature = cipher_suite.encrypt(data.encode()).decode()
+    return f"{data}-{signature}"
+
+def verify_feed_token(token: str):
+    """
+    Return (workspace_id, staff_id) for a valid feed token, else None.
+    """
+    try:
+        workspace_id, staff_id, signature = token.split("-", 2)
+        cipher_suite = _get_cipher_suite()
+        if cipher_suite.decrypt(signature.encode()).decode() != f"{workspace_id}-{staff_id}":
+            return None
+        return int(workspace_id), int(staff_id)
+    except Exception:
+        return None
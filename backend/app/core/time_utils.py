@@ -0,0 +1,7 @@
+"""Datetime helpers shared by services and API handlers."""
+from datetime import datetime, timezone
+
+
+def ensure_utc(dt: datetime) -> datetime:
+    """Make a stored datetime timezone-aware. SQLite hands back naive datetimes; everything is stored in UTC."""
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
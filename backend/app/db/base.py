@@ -6,10 +6,23 @@ from app.models.user import User  # noqa
 from app.models.service import Service  # noqa
 from app.models.contact import Contact  # noqa
 from app.models.booking import Booking  # noqa
-from app.models.conversation import Conversation, Message  # noqa
+from app.models.booking_series import BookingSeries  # noqa
+from app.models.waitlist import WaitlistEntry  # noqa
+from app.models.conversation import Conversation, Message, MessageBody  # noqa
 from app.models.form import Form, FormSubmission  # noqa
 from app.models.inventory import InventoryItem  # noqa
-from app.models.communication_log import CommunicationLog  # noqa
-from app.models.audit_log import AuditLog  # noqa
+from app.models.communication_log import CommunicationLog, CommunicationLogArchive  # noqa
+from app.models.audit_log import AuditLog, AuditLogArchive  # noqa
 from app.models.email_integration import EmailIntegration # noqa
+from app.models.cron import JobLease, CronRun  # noqa
+from app.models.availability import AvailabilityCacheEntry  # noqa
+from app.models.calendar_feed import CalendarFeedVersion  # noqa
+from app.models.resource_version import ResourceVersion  # noqa
+from app.models.webhook import WebhookEndpoint, WebhookDelivery  # noqa
+from app.models.workspace_stats import WorkspaceDailyStats, WorkspaceStatsDirtyDay  # noqa
 
+
+# Registers the search tables/triggers that create_all builds next to contacts/messages, and the message indexer
+import app.services.search  # noqa
+# Registers the listener that marks daily stats rollup days dirty
+import app.services.stats_rollup  # noqa
@@ -0,0 +1,35 @@
+"""
+INSERT ... ON CONFLICT helpers.
+
+Postgres and SQLite (tests) both support ON CONFLICT, but each through its own
+dialect `insert` construct; insert_for() picks the one for the session's bind.
+"""
+
+from typing import Iterable, Sequence, Tuple
+
+from sqlalchemy import Table, func
+from sqlalchemy.orm import Session
+
+
+def insert_for(db: Session, table):
+    """The dialect INSERT for `table` (a Table or mapped class), with .on_conflict_do_*()."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def bump_versions(db: Session, table: Table, key_columns: Sequence[str], keys: Iterable[Tuple]) -> None:
+    """
+    Advance the `version` counter of every key (values for `key_columns`),
+    inserting it at 1 where missing; also touches `updated_at` if the table has one.
+    """
+    keys = sorted(set(keys))  # Stable order, so concurrent writers lock alike
+    if not keys:
+        return
+    stmt = insert_for(db, table).values([{**dict(zip(key_columns, key)), "version": 1} for key in keys])
+    set_ = {"version": table.c.version + 1}
+    if "updated_at" in table.c:
+        set_["updated_at"] = func.now()
+    db.execute(stmt.on_conflict_do_update(index_elements=[table.c[name] for name in key_columns], set_=set_))
@@ -1,9 +1,14 @@
+import asyncio
 from fastapi import FastAPI
+from fastapi.datastructures import Default
 from app.core.config import settings
+from app.core.responses import FastJSONResponse
 
-app = FastAPI(title="CareOps MVP", version="0.1.0")
+# Wrapped in Default() so routes with a response_model keep Pydantic's dump_json path
+app = FastAPI(title="CareOps MVP", version="0.1.0", default_response_class=Default(FastJSONResponse))
 
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.api.onboarding import router as onboarding_router
 from app.api.bookings import router as bookings_router
 from app.api.auth import router as auth_router
@@ -39,14 +44,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Small bodies aren't worth the CPU; SSE streams are never compressed
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE, compresslevel=settings.GZIP_COMPRESSLEVEL)
+
 # Startup readiness automation
 from app.core.readiness import auto_seed_if_needed, print_readiness_report
 
+from app.services.scheduler import reminder_scheduler
+from app.services.events import event_bus
+from app.services.webhooks import webhook_dispatcher
+from app.services import catalog
+
 @app.on_event("startup")
 async def startup_event():
     """Run readiness checks and auto-seed on startup"""
     # auto_seed_if_needed()  # Disabled for production deployment
-    print_readiness_report()
+    if settings.READINESS_REPORT_ON_STARTUP:
+        # Off the critical path: its queries run in a thread while the app already serves
+        app.state.readiness_report = asyncio.create_task(asyncio.to_thread(print_readiness_report))
+    if settings.REMINDER_SCHEDULER_ENABLED:
+        reminder_scheduler.start()
+    event_bus.start()
+    if settings.WEBHOOK_WORKER_ENABLED:
+        webhook_dispatcher.start()
+    if settings.CATALOG_CACHE_WARM_ON_STARTUP:
+        await asyncio.to_thread(catalog.warm)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await reminder_scheduler.stop()
+    await event_bus.stop()
+    await webhook_dispatcher.stop()
 
 app.include_router(signup_router, prefix="/api", tags=["signup"])
 app.include_router(auth_router, prefix="/api", tags=["auth"])
@@ -76,6 +104,27 @@ app.include_router(forms_router, prefix="/api/forms", tags=["forms"])
 from app.api.services import router as services_router
 app.include_router(services_router, prefix="/api/services", tags=["services"])
 
+from app.api.exports import router as exports_router
+app.include_router(exports_router, prefix="/api/exports", tags=["exports"])
+
+from app.api.search import router as search_router
+app.include_router(search_router, prefix="/api", tags=["search"])
+
+from app.api.series import router as series_router
+app.include_router(series_router, prefix="/api/series", tags=["series"])
+
+from app.api.waitlist import router as waitlist_router
+app.include_router(waitlist_router, prefix="/api/waitlist", tags=["waitlist"])
+
+from app.api.calendar import router as calendar_router
+app.include_router(calendar_router, prefix="/api/calendar", tags=["calendar"])
+
+from app.api.events import router as events_router
+app.include_router(events_router, prefix="/api/events", tags=["events"])
+
+from app.api.webhooks import router as webhooks_router
+app.include_router(webhooks_router, prefix="/api/webhooks", tags=["webhooks"])
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to CareOps API"}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
@@ -8,7 +8,7 @@ class AuditLog(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     workspace_id = Column(Integer, ForeignKey("workspaces.id"), nullable=False)
-    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=True)  # Nullable for non-booking events
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=True, index=True)  # Nullable for non-booking events
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True) # Null for system actions
     
     action = Column(String, nullable=False) # e.g. "booking.created", "status.change"
@@ -20,3 +20,26 @@ class AuditLog(Base):
     workspace = relationship("Workspace")
     booking = relationship("Booking")
     user = relationship("User")
+
+    __table_args__ = (
+        # Dashboard "recent activity" and retention scans are time-bounded per workspace
+        Index("ix_audit_logs_workspace_created", "workspace_id", "created_at"),
+    )
+
+class AuditLogArchive(Base):
+    """
+    Cold storage for audit rows older than LOG_HOT_RETENTION_DAYS.
+    Used on SQLite, where monthly partitions are not available.
+    Rows keep their original id; no FKs so bookings can be cleaned up independently.
+    """
+    __tablename__ = "audit_logs_archive"
+
+    id = Column(Integer, primary_key=True)
+    workspace_id = Column(Integer, nullable=False)
+    booking_id = Column(Integer, nullable=True, index=True)
+    user_id = Column(Integer, nullable=True)
+
+    action = Column(String, nullable=False)
+    details = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), index=True)
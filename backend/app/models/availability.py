@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, JSON
+from app.db.base_class import Base
+
+class AvailabilityCacheEntry(Base):
+    """
+    Shared tier of the availability cache (AVAILABILITY_CACHE_SHARED): the
+    computed slot list for one service/day/timezone, visible to every replica.
+    Rows are deleted in the same transaction as the change that invalidates them.
+    """
+    __tablename__ = "availability_cache"
+
+    service_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    tz = Column(String, primary_key=True)
+    slots = Column(JSON, nullable=False)  # ["09:00", "09:30", ...]
+    computed_at = Column(DateTime(timezone=True), nullable=False)
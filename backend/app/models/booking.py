@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -16,11 +16,12 @@ class Booking(Base):
     __tablename__ = "bookings"
 
     id = Column(Integer, primary_key=True, index=True)
-    start_time = Column(DateTime(timezone=True), nullable=False)
+    start_time = Column(DateTime(timezone=True), nullable=False, index=True)
     end_time = Column(DateTime(timezone=True), nullable=False)
     status = Column(String, default=BookingStatus.PENDING.value)
     reminder_sent = Column(Boolean, default=False)
     follow_up_sent = Column(Boolean, default=False) # For post-visit automation
+    thank_you_sent = Column(Boolean, default=False)  # Claimed by the thank_you_emails cron job
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -28,11 +29,20 @@ class Booking(Base):
     service_id = Column(Integer, ForeignKey("services.id"))
     contact_id = Column(Integer, ForeignKey("contacts.id"))
     staff_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    series_id = Column(Integer, ForeignKey("booking_series.id"), nullable=True, index=True)  # materialized occurrence
 
     workspace = relationship("Workspace", back_populates="bookings")
     service = relationship("Service", back_populates="bookings")
     contact = relationship("Contact", back_populates="bookings")
     staff_member = relationship("User", back_populates="bookings")
+    series = relationship("BookingSeries", back_populates="bookings")
 
     form_submissions = relationship("FormSubmission", back_populates="booking")
 
+    __table_args__ = (
+        # A staff member's timeline for the capacity engine
+        Index("ix_bookings_staff_start", "staff_id", "start_time"),
+        # Auto-complete, follow-ups and thank-yous: bookings in a status that ended before X
+        Index("ix_bookings_status_end", "status", "end_time"),
+    )
+
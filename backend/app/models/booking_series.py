@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+import enum
+
+class SeriesStatus(str, enum.Enum):
+    ACTIVE = "active"
+    CANCELLED = "cancelled"
+
+class BookingSeries(Base):
+    """
+    A recurring booking stored as a rule, not as rows. Occurrences before
+    `materialized_until` exist as Booking rows (series_id set); later ones are
+    expanded on demand (see app/services/recurrence.py).
+    """
+    __tablename__ = "booking_series"
+
+    id = Column(Integer, primary_key=True, index=True)
+    workspace_id = Column(Integer, ForeignKey("workspaces.id"), index=True)
+    service_id = Column(Integer, ForeignKey("services.id"), index=True)
+    contact_id = Column(Integer, ForeignKey("contacts.id"))
+    staff_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+
+    rule = Column(String, nullable=False)  # e.g. "FREQ=WEEKLY;INTERVAL=1;BYDAY=MO,TH;COUNT=20"
+    timezone = Column(String, nullable=False, default="UTC")  # wall-clock time is kept across DST
+    start_time = Column(DateTime(timezone=True), nullable=False)  # first occurrence
+    ends_at = Column(DateTime(timezone=True), nullable=True)  # end of the last occurrence; NULL = open-ended
+    duration_minutes = Column(Integer, nullable=False)
+    exdates = Column(JSON, nullable=True)  # skipped occurrence starts, UTC ISO strings
+    materialized_until = Column(DateTime(timezone=True), nullable=True)
+    status = Column(String, default=SeriesStatus.ACTIVE.value)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    service = relationship("Service")
+    contact = relationship("Contact")
+    bookings = relationship("Booking", back_populates="series")
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, DateTime
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class CalendarFeedVersion(Base):
+    """
+    Change counter for one iCalendar feed: the workspace feed (staff_id 0) or
+    one staff member's. Bumped in the same flush as any booking or series
+    change that shows up in the feed; the feed's ETag is derived from it.
+    """
+    __tablename__ = "calendar_feed_versions"
+
+    workspace_id = Column(Integer, primary_key=True)
+    staff_id = Column(Integer, primary_key=True)  # 0 = whole workspace
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
@@ -9,7 +9,7 @@ class CommunicationLog(Base):
     id = Column(Integer, primary_key=True, index=True)
     workspace_id = Column(Integer, ForeignKey("workspaces.id"), nullable=False)
     contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=True)
-    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=True)
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=True, index=True)
     
     type = Column(String, nullable=False) # welcome, confirmation, form_link, reminder, reply, inventory
     recipient_email = Column(String, nullable=False)
@@ -23,3 +23,28 @@ class CommunicationLog(Base):
     workspace = relationship("Workspace")
     contact = relationship("Contact")
     booking = relationship("Booking")
+
+    __table_args__ = (
+        # Failed-comms panel, owner-alert dedup and retention scans are time-bounded per workspace
+        Index("ix_communication_logs_workspace_created", "workspace_id", "created_at"),
+    )
+
+class CommunicationLogArchive(Base):
+    """
+    Cold storage for communication rows older than LOG_HOT_RETENTION_DAYS (SQLite).
+    Mirrors CommunicationLog without FKs.
+    """
+    __tablename__ = "communication_logs_archive"
+
+    id = Column(Integer, primary_key=True)
+    workspace_id = Column(Integer, nullable=False)
+    contact_id = Column(Integer, nullable=True)
+    booking_id = Column(Integer, nullable=True, index=True)
+
+    type = Column(String, nullable=False)
+    recipient_email = Column(String, nullable=False)
+    status = Column(String)
+    error_message = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), index=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
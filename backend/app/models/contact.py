@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -24,3 +24,8 @@ class Contact(Base):
     workspace = relationship("Workspace", back_populates="contacts")
     bookings = relationship("Booking", back_populates="contact")
     conversations = relationship("Conversation", back_populates="contact")
+
+    __table_args__ = (
+        # Per-workspace email lookups (find-or-create, bulk import dedup)
+        Index("ix_contacts_workspace_email", "workspace_id", "email"),
+    )
@@ -1,4 +1,7 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Boolean
+import hashlib
+import zlib
+
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, LargeBinary, Index, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -6,6 +9,10 @@ from app.db.base_class import Base
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        # One conversation per Gmail thread; resolves sync and replies (see app/services/mail_threads.py)
+        Index("ix_conversations_workspace_thread", "workspace_id", "gmail_thread_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     subject = Column(String)
@@ -19,18 +26,84 @@ class Conversation(Base):
     paused_until = Column(DateTime(timezone=True), nullable=True)
     last_message_at = Column(DateTime(timezone=True), nullable=True)
     last_message_is_internal = Column(Boolean, default=False) # Optimization for "unanswered" check
+    gmail_thread_id = Column(String, nullable=True)  # Set once the conversation has been seen in Gmail
 
     contact = relationship("Contact", back_populates="conversations")
     messages = relationship("Message", back_populates="conversation")
 
+PREVIEW_CHARS = 200
+COMPRESS_MIN_BYTES = 1024  # Smaller bodies aren't worth a zlib header
+
+
+def message_preview(text: str) -> str:
+    return " ".join(text.split())[:PREVIEW_CHARS]
+
+
+def message_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
 class Message(Base):
+    """
+    The metadata row: what the inbox, dedup and search read. The full text
+    lives in MessageBody and is only loaded when a conversation is opened;
+    `content` reads and writes it, keeping preview/hash/size in step.
+    """
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_conversation_hash", "conversation_id", "content_hash"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(Integer, ForeignKey("conversations.id"))
     sender_email = Column(String, nullable=False)
-    content = Column(Text, nullable=False)
+    preview = Column(String(PREVIEW_CHARS), nullable=False, default="", server_default="")
+    content_hash = Column(String(64), nullable=True)  # sha256 of the body; sync dedup key for mail without a Message-ID
+    body_size = Column(Integer, nullable=False, default=0, server_default="0")  # Uncompressed bytes
+    # RFC 5322 Message-ID, In-Reply-To and References, as "<id@host>" (reference_ids: space separated)
+    message_id_header = Column(String, nullable=True, index=True)
+    in_reply_to = Column(String, nullable=True, index=True)
+    reference_ids = Column(Text, nullable=True)
     is_internal = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     conversation = relationship("Conversation", back_populates="messages")
+    body = relationship("MessageBody", uselist=False, back_populates="message",
+                        cascade="all, delete-orphan")
+
+    @property
+    def content(self) -> str:
+        return self.body.text if self.body is not None else ""
+
+    @content.setter
+    def content(self, text: str) -> None:
+        text = text or ""
+        self.preview = message_preview(text)
+        self.content_hash = message_hash(text)
+        self.body_size = len(text.encode("utf-8"))
+        if self.body is None:
+            self.body = MessageBody()
+        self.body.text = text
+
+
+class MessageBody(Base):
+    """Full message text, zlib-compressed from COMPRESS_MIN_BYTES up."""
+    __tablename__ = "message_bodies"
+
+    message_id = Column(Integer, ForeignKey("messages.id", ondelete="CASCADE"), primary_key=True)
+    encoding = Column(String(8), nullable=False, default="plain")  # plain | zlib
+    data = Column(LargeBinary, nullable=False)
+
+    message = relationship("Message", back_populates="body")
+
+    @property
+    def text(self) -> str:
+        data = zlib.decompress(self.data) if self.encoding == "zlib" else self.data
+        return data.decode("utf-8")
+
+    @text.setter
+    def text(self, value: str) -> None:
+        raw = value.encode("utf-8")
+        packed = zlib.compress(raw) if len(raw) >= COMPRESS_MIN_BYTES else raw
+        # Already-compressed payloads can come out larger; keep whichever is smaller
+        self.encoding, self.data = ("zlib", packed) if len(packed) < len(raw) else ("plain", raw)
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Text, Index
+from app.db.base_class import Base
+
+class JobLease(Base):
+    """
+    One row per cron job. Whoever holds an unexpired lease is the only
+    runner of that job across all workers/replicas.
+    """
+    __tablename__ = "job_leases"
+
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=True)  # host:pid:token of the current runner
+    lease_until = Column(DateTime(timezone=True), nullable=True)  # NULL = free
+    acquired_at = Column(DateTime(timezone=True), nullable=True)
+
+class CronRun(Base):
+    """Run history: one row per job execution."""
+    __tablename__ = "cron_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job = Column(String, nullable=False)
+    shard = Column(String, nullable=True)  # "index/count" when the job ran sharded by workspace
+    holder = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="running")  # running, success, failed
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    duration_ms = Column(Integer, nullable=True)  # wall time
+    rows_scanned = Column(Integer, nullable=True)
+    emails_sent = Column(Integer, nullable=True)
+    db_ms = Column(Integer, nullable=True)
+    gmail_ms = Column(Integer, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_cron_runs_job_started", "job", "started_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, Boolean, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
@@ -11,6 +11,7 @@ class Form(Base):
     type = Column(String) # contact, booking, intake
     is_public = Column(Boolean, default=True)
     fields = Column(JSON, default=[]) 
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # bumped when fields change
     google_form_url = Column(String, nullable=True)  # Optional Google Form URL
     workspace_id = Column(Integer, ForeignKey("workspaces.id"))
     
@@ -31,3 +32,10 @@ class FormSubmission(Base):
     
     form = relationship("Form", back_populates="submissions")
     booking = relationship("Booking", back_populates="form_submissions")
+
+    __table_args__ = (
+        # Pending-form reminder lookups (scheduler rebuild, cron fallback)
+        Index("ix_form_submissions_status_sent_at", "status", "sent_at"),
+        # Daily stats rollup: forms completed on a day
+        Index("ix_form_submissions_completed_at", "completed_at"),
+    )
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class ResourceVersion(Base):
+    """
+    Change counter for one publicly cached resource ("workspace" = its public
+    page and service list, "form" = a public form). Bumped in the same flush
+    as the change; HTTP ETags are derived from it (see app/services/http_cache.py).
+    """
+    __tablename__ = "resource_versions"
+
+    kind = Column(String(16), primary_key=True)
+    resource_id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -14,6 +14,7 @@ class Service(Base):
     workspace_id = Column(Integer, ForeignKey("workspaces.id"))
     inventory_item_id = Column(Integer, ForeignKey("inventory_items.id"), nullable=True)
     inventory_quantity_required = Column(Integer, default=0) # e.g. 1 unit per booking
+    staff_ids = Column(JSON, nullable=True) # e.g. [3, 7]: who can perform it, one booking each at a time
     
     workspace = relationship("Workspace", back_populates="services")
     inventory_item = relationship("InventoryItem") # No back_populates needed yet
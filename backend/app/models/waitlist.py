@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+import enum
+
+class WaitlistStatus(str, enum.Enum):
+    WAITING = "waiting"
+    BOOKED = "booked"
+    CANCELLED = "cancelled"
+
+class WaitlistEntry(Base):
+    """
+    A client waiting for any opening of a service between window_start and
+    window_end. Entries stay WAITING after being notified; the first of them
+    to book the opening wins (see app/services/waitlist.py).
+    """
+    __tablename__ = "waitlist_entries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    workspace_id = Column(Integer, ForeignKey("workspaces.id"), index=True)
+    service_id = Column(Integer, ForeignKey("services.id"), nullable=False)
+    contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=False)
+
+    window_start = Column(DateTime(timezone=True), nullable=False)
+    window_end = Column(DateTime(timezone=True), nullable=False)
+    status = Column(String, default=WaitlistStatus.WAITING.value)
+    notified_count = Column(Integer, default=0)
+    last_notified_at = Column(DateTime(timezone=True), nullable=True)
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=True)  # set once BOOKED
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    service = relationship("Service")
+    contact = relationship("Contact")
+
+    __table_args__ = (
+        # Released-slot matching: one range scan over window_start per service
+        Index("ix_waitlist_service_status_window", "service_id", "status", "window_start"),
+    )
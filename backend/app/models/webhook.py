@@ -0,0 +1,58 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, JSON, Text, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+import enum
+
+class DeliveryStatus(str, enum.Enum):
+    PENDING = "pending"
+    DELIVERED = "delivered"
+    DEAD = "dead"  # Gave up after WEBHOOK_MAX_ATTEMPTS
+
+class WebhookEndpoint(Base):
+    """
+    A partner URL that receives a workspace's events. batch_size > 1 opts the
+    receiver into {"events": [...]} bodies of up to that many events.
+    """
+    __tablename__ = "webhook_endpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    workspace_id = Column(Integer, ForeignKey("workspaces.id"), nullable=False, index=True)
+    url = Column(String, nullable=False)
+    secret = Column(String, nullable=False)  # Encrypted; signs every delivery
+    event_types = Column(JSON, nullable=True)  # e.g. ["booking.created"]; null = every event
+    batch_size = Column(Integer, nullable=False, default=1, server_default="1")
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_success_at = Column(DateTime(timezone=True), nullable=True)
+    last_failure_at = Column(DateTime(timezone=True), nullable=True)
+
+    deliveries = relationship("WebhookDelivery", back_populates="endpoint", cascade="all, delete-orphan", passive_deletes=True)
+
+class WebhookDelivery(Base):
+    """
+    Outbox row: one event for one endpoint, written in the transaction that
+    produced the event and sent later by app/services/webhooks.py.
+    """
+    __tablename__ = "webhook_deliveries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    endpoint_id = Column(Integer, ForeignKey("webhook_endpoints.id", ondelete="CASCADE"), nullable=False)
+    workspace_id = Column(Integer, nullable=False)
+    event_id = Column(String, nullable=False)  # Same for every endpoint; receivers dedupe on it
+    event_type = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default=DeliveryStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+
+    endpoint = relationship("WebhookEndpoint", back_populates="deliveries")
+
+    __table_args__ = (
+        # Worker poll: due pending rows, oldest first
+        Index("ix_webhook_deliveries_status_next_attempt", "status", "next_attempt_at"),
+        Index("ix_webhook_deliveries_endpoint_created", "endpoint_id", "created_at"),
+    )
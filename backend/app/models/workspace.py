@@ -17,6 +17,7 @@ class Workspace(Base):
     is_active = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    owner_alert_at = Column(DateTime(timezone=True))  # Last daily owner alert, claimed by the owner_summaries cron job
 
     users = relationship("User", back_populates="workspace")
     services = relationship("Service", back_populates="workspace")
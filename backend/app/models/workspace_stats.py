@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class WorkspaceDailyStats(Base):
+    """
+    One workspace's activity on one (UTC) day, kept up to date by the
+    stats_rollup cron job (app/services/stats_rollup.py). The *_by_* maps are
+    {key: count} with string keys ("none" for unassigned staff).
+    """
+    __tablename__ = "workspace_daily_stats"
+
+    workspace_id = Column(Integer, ForeignKey("workspaces.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    # Bookings starting that day
+    bookings_total = Column(Integer, nullable=False, default=0)
+    bookings_by_status = Column(JSON, nullable=False, default={})
+    bookings_by_service = Column(JSON, nullable=False, default={})
+    bookings_by_staff = Column(JSON, nullable=False, default={})
+
+    emails_sent = Column(Integer, nullable=False, default=0)  # Communication logs created that day
+    emails_failed = Column(Integer, nullable=False, default=0)
+    forms_completed = Column(Integer, nullable=False, default=0)
+    new_leads = Column(Integer, nullable=False, default=0)  # Contacts created that day
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class WorkspaceStatsDirtyDay(Base):
+    """
+    A (workspace, day, source) whose rollup is out of date. Written in the same
+    transaction as the change; `version` goes up on every re-mark, so the
+    rollup only clears markers nobody touched while it was recomputing.
+    """
+    __tablename__ = "workspace_stats_dirty"
+
+    workspace_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    source = Column(String(16), primary_key=True)  # bookings, emails, forms, leads
+    version = Column(Integer, nullable=False, default=1, server_default="1")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import datetime
 from app.schemas.onboarding import ServiceCreate # Re-use or redefine? Better to have dedicated output.
 
@@ -44,6 +44,12 @@ class BookingUpdate(BaseModel):
     start_datetime: Optional[datetime] = None
     status: Optional[str] = None # For minor status updates like NO_SHOW
 
+class BookingBulkAction(BaseModel):
+    booking_ids: List[int]
+    action: Literal["set_status", "cancel", "reassign"]
+    status: Optional[str] = None  # set_status: pending, confirmed, completed or no_show
+    staff_id: Optional[int] = None  # reassign
+
 class ContactUpdate(BaseModel):
     full_name: Optional[str] = None
     email: Optional[str] = None
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from typing import Dict, List, Literal, Optional
+from datetime import date, datetime
 
 class ActivityItem(BaseModel):
     id: str # audit_{id}
@@ -41,3 +41,20 @@ class DashboardStats(BaseModel):
     attention: List[AttentionItem]
     recent_activity: List[ActivityItem]
     failures: List[FailureItem]
+
+class TrendPoint(BaseModel):
+    period_start: date
+    bookings_total: int
+    bookings_by_status: Dict[str, int]
+    bookings_by_service: Dict[str, int] # service_id -> count
+    bookings_by_staff: Dict[str, int] # staff user id ("none" = unassigned) -> count
+    emails_sent: int
+    emails_failed: int
+    forms_completed: int
+    new_leads: int
+
+class DashboardTrends(BaseModel):
+    period: Literal["day", "week", "month"]
+    start: date
+    end: date
+    points: List[TrendPoint] # Periods without activity are omitted
@@ -0,0 +1,416 @@
+"""
+Availability
+
+Free slots for the public booking page, and the cache in front of them.
+
+compute_slots() turns a service's weekly `availability` JSON into the start
+times still free on one date in one timezone: weekday ranges -> candidate
+slots -> those with spare capacity (capacity.py: a free staff member, or the
+service itself for unstaffed services), or nothing at all if the linked
+inventory item can't cover a booking.
+
+A slot list only changes when one of those inputs does, so get_slots() keeps
+lists in an in-process LRU keyed by (service_id, date, tz), optionally backed
+by the shared `availability_cache` table (AVAILABILITY_CACHE_SHARED). Writers
+call, before committing:
+
+- invalidate_booking(db, booking)          booking created / cancelled / rescheduled / restored
+                                           (also every service its staff member works)
+- invalidate_service(db, service_id)       availability, duration, staff or inventory link changed
+- invalidate_staff(db, ws_id, staff_id)    staff member deactivated
+- invalidate_series(db, series[, start, end])  recurring series created / cancelled / skipped
+- inventory_changed(db, item_id, old, new) stock crossed a linked service's required quantity
+
+Local invalidations are applied when the session commits, so a rolled-back
+change invalidates nothing; shared rows are deleted in the same transaction.
+Each invalidation is stamped with the time it happened and an entry is only
+served if its computation started after the latest stamp for its service and
+day, so a computation that raced a write is never cached as fresh.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pytz
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.time_utils import ensure_utc
+from app.db.upsert import insert_for
+from app.models.availability import AvailabilityCacheEntry
+from app.models.booking import Booking
+from app.models.inventory import InventoryItem
+from app.models.service import Service
+from app.services import capacity, catalog
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+CacheKey = Tuple[int, date, str]  # (service_id, date, tz name)
+
+_PENDING = "availability_invalidations"
+
+
+def resolve_timezone(name: str):
+    try:
+        return pytz.timezone(name)
+    except pytz.UnknownTimeZoneError:
+        return pytz.UTC
+
+
+# ---------------------------------------------------------
+# COMPUTATION
+# ---------------------------------------------------------
+
+def compute_slots(db: Session, service: Service, query_date: date, tz) -> List[str]:
+    """Free start times ("HH:MM" in `tz`) for `service` on `query_date`."""
+    # Out of stock means no slots at all
+    if service.inventory_item_id and service.inventory_quantity_required > 0:
+        inventory_item = db.query(InventoryItem).filter(InventoryItem.id == service.inventory_item_id).first()
+        if not inventory_item or inventory_item.quantity < service.inventory_quantity_required:
+            return []
+
+    # availability format: {"mon": ["09:00-17:00"], "tue": ...}
+    availability = service.availability or {}
+    day_ranges = availability.get(WEEKDAYS[query_date.weekday()], [])
+    if not day_ranges:
+        return []
+
+    duration = timedelta(minutes=service.duration_minutes)
+    potential_slots = []
+    for time_range in day_ranges:
+        try:
+            start_str, end_str = time_range.split("-")
+            start_dt = tz.localize(datetime.strptime(f"{query_date} {start_str}", "%Y-%m-%d %H:%M"))
+            end_dt = tz.localize(datetime.strptime(f"{query_date} {end_str}", "%Y-%m-%d %H:%M"))
+        except ValueError:
+            continue  # Skip malformed ranges
+        current_slot = start_dt
+        while current_slot + duration <= end_dt:
+            potential_slots.append(current_slot)
+            current_slot += duration
+
+    if not potential_slots:
+        return []
+
+    # One query loads every timeline the day's slots can touch
+    plan = capacity.CapacityPlan.load(
+        db, service,
+        min(potential_slots).astimezone(pytz.UTC),
+        (max(potential_slots) + duration).astimezone(pytz.UTC),
+    )
+
+    final_slots = []
+    for slot_start in potential_slots:
+        slot_start_utc = slot_start.astimezone(pytz.UTC)
+        if plan.check(slot_start_utc, slot_start_utc + duration).available:
+            final_slots.append(slot_start.strftime("%H:%M"))
+    return final_slots
+
+
+# ---------------------------------------------------------
+# IN-PROCESS CACHE
+# ---------------------------------------------------------
+
+class AvailabilityCache:
+    """
+    LRU of slot lists. Entries remember when their computation started
+    (time.monotonic()); invalidation records a stamp per service or per
+    (service, day) instead of hunting down entries, and an entry older than
+    its stamps (or than ttl_seconds) is dropped on lookup.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[Tuple[str, ...], float]]" = OrderedDict()
+        self._service_stamps: Dict[int, float] = {}
+        self._day_stamps: Dict[Tuple[int, date], float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _fresh(self, key: CacheKey, computed: float, now: float) -> bool:
+        service_id, day, _ = key
+        return (
+            now - computed < self.ttl_seconds
+            and computed > self._service_stamps.get(service_id, float("-inf"))
+            and computed > self._day_stamps.get((service_id, day), float("-inf"))
+        )
+
+    def get(self, key: CacheKey) -> Optional[List[str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            slots, computed = entry
+            if not self._fresh(key, computed, time.monotonic()):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(slots)
+
+    def put(self, key: CacheKey, slots: List[str], computed: float) -> bool:
+        """Store a list computed from data read after `computed`. False if it is already stale."""
+        with self._lock:
+            if not self._fresh(key, computed, time.monotonic()):
+                return False
+            self._entries[key] = (tuple(slots), computed)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return True
+
+    def record(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def invalidate_days(self, service_id: int, days: Iterable[date]) -> None:
+        with self._lock:
+            now = time.monotonic()
+            for day in days:
+                self._day_stamps[(service_id, day)] = now
+            self.invalidations += 1
+            self._prune_stamps(now)
+
+    def invalidate_service(self, service_id: int) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._service_stamps[service_id] = now
+            self.invalidations += 1
+            self._prune_stamps(now)
+
+    def _prune_stamps(self, now: float) -> None:
+        # A stamp older than the TTL can't outrank any live entry
+        if len(self._day_stamps) + len(self._service_stamps) <= 4 * self.max_size:
+            return
+        cutoff = now - self.ttl_seconds
+        self._day_stamps = {k: t for k, t in self._day_stamps.items() if t > cutoff}
+        self._service_stamps = {k: t for k, t in self._service_stamps.items() if t > cutoff}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._service_stamps.clear()
+            self._day_stamps.clear()
+            self.hits = self.shared_hits = self.misses = self.invalidations = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            served = self.hits + self.shared_hits
+            lookups = served + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "shared": settings.AVAILABILITY_CACHE_SHARED,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round(served / lookups, 4) if lookups else None,
+            }
+
+
+availability_cache = AvailabilityCache(
+    settings.AVAILABILITY_CACHE_SIZE,
+    # Other replicas' invalidations only reach the shared table, so trust local copies briefly
+    settings.AVAILABILITY_CACHE_LOCAL_TTL_SECONDS if settings.AVAILABILITY_CACHE_SHARED
+    else settings.AVAILABILITY_CACHE_TTL_SECONDS,
+)
+
+
+# ---------------------------------------------------------
+# SHARED TABLE
+# ---------------------------------------------------------
+
+def _shared_get(db: Session, key: CacheKey) -> Optional[List[str]]:
+    service_id, day, tz_name = key
+    row = db.get(AvailabilityCacheEntry, (service_id, day, tz_name))
+    if row is None:
+        return None
+    age = datetime.now(timezone.utc) - ensure_utc(row.computed_at)
+    if age.total_seconds() >= settings.AVAILABILITY_CACHE_TTL_SECONDS:
+        return None
+    return list(row.slots)
+
+
+def _shared_put(db: Session, key: CacheKey, slots: List[str]) -> None:
+    service_id, day, tz_name = key
+    now = datetime.now(timezone.utc)
+    stmt = insert_for(db, AvailabilityCacheEntry).values(service_id=service_id, day=day, tz=tz_name, slots=slots, computed_at=now)
+    try:
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["service_id", "day", "tz"],
+            set_={"slots": stmt.excluded.slots, "computed_at": stmt.excluded.computed_at},
+        ))
+        db.commit()
+    except Exception as e:
+        # The cache is an optimisation; never fail the request over it
+        db.rollback()
+        logger.warning(f"[AVAILABILITY] Shared cache write failed: {e}")
+
+
+# ---------------------------------------------------------
+# LOOKUP
+# ---------------------------------------------------------
+
+def get_slots(db: Session, service_id: int, query_date: date, tz_name: str) -> Optional[List[str]]:
+    """Free slots for the service on that date, or None if the service doesn't exist."""
+    tz = resolve_timezone(tz_name)
+    key = (service_id, query_date, tz.zone)
+
+    slots = availability_cache.get(key)
+    if slots is not None:
+        return slots
+
+    # Taken before reading anything, so a write committed mid-computation outranks this entry
+    started = time.monotonic()
+    if settings.AVAILABILITY_CACHE_SHARED:
+        slots = _shared_get(db, key)
+        if slots is not None:
+            availability_cache.put(key, slots, started)
+            availability_cache.record("shared_hits")
+            return slots
+
+    service = catalog.get_service(db, service_id)
+    if not service:
+        return None
+    slots = compute_slots(db, service, query_date, tz)
+    availability_cache.record("misses")
+    if availability_cache.put(key, slots, started) and settings.AVAILABILITY_CACHE_SHARED:
+        _shared_put(db, key, slots)
+    return slots
+
+
+# ---------------------------------------------------------
+# INVALIDATION
+# ---------------------------------------------------------
+
+def _booking_days(start: datetime, end: datetime) -> List[date]:
+    # Bookings are stored in UTC; a day either side covers every timezone's local date
+    first = (ensure_utc(start) - timedelta(days=1)).date()
+    last = (ensure_utc(end) + timedelta(days=1)).date()
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def invalidate_booking(db: Session, booking: Booking) -> None:
+    """
+    Drop the cached days around the booking's current time, for its service
+    and for every service its staff member can be booked for. Call before
+    changing start/end/staff too (e.g. reschedule) to cover the old slot.
+    """
+    if not booking.service_id or not booking.start_time or not booking.end_time:
+        return
+    _invalidate_interval(db, booking.workspace_id, booking.service_id, booking.staff_id,
+                         booking.start_time, booking.end_time)
+
+
+def invalidate_bookings(db: Session, bookings: Iterable[Booking]) -> None:
+    """invalidate_booking for many bookings: one pool lookup per staff member, one shared-cache DELETE."""
+    staffed: Dict[Tuple[int, int], List[int]] = {}
+    days_by_service: Dict[int, set] = {}
+    for booking in bookings:
+        if not booking.service_id or not booking.start_time or not booking.end_time:
+            continue
+        service_ids = {booking.service_id}
+        if booking.staff_id:
+            key = (booking.workspace_id, booking.staff_id)
+            if key not in staffed:
+                staffed[key] = capacity.services_staffed_by(db, *key)
+            service_ids.update(staffed[key])
+        days = _booking_days(booking.start_time, booking.end_time)
+        for service_id in service_ids:
+            days_by_service.setdefault(service_id, set()).update(days)
+    if not days_by_service:
+        return
+    pending = db.info.setdefault(_PENDING, [])
+    for service_id, days in days_by_service.items():
+        pending.append((service_id, sorted(days)))
+    if settings.AVAILABILITY_CACHE_SHARED:
+        db.query(AvailabilityCacheEntry).filter(
+            AvailabilityCacheEntry.service_id.in_(days_by_service),
+            AvailabilityCacheEntry.day.in_(set().union(*days_by_service.values()))
+        ).delete(synchronize_session=False)
+
+
+def invalidate_series(db: Session, series, start: Optional[datetime] = None, end: Optional[datetime] = None) -> None:
+    """A series' virtual occurrences changed: one occurrence if start/end are given, else all of them."""
+    if start is not None:
+        _invalidate_interval(db, series.workspace_id, series.service_id, series.staff_id, start, end)
+        return
+    invalidate_service(db, series.service_id)
+    if series.staff_id:
+        for service_id in capacity.services_staffed_by(db, series.workspace_id, series.staff_id):
+            invalidate_service(db, service_id)
+
+
+def _invalidate_interval(db: Session, workspace_id: int, service_id: int, staff_id: Optional[int],
+                         start: datetime, end: datetime) -> None:
+    days = _booking_days(start, end)
+    service_ids = {service_id}
+    if staff_id:
+        service_ids.update(capacity.services_staffed_by(db, workspace_id, staff_id))
+    pending = db.info.setdefault(_PENDING, [])
+    for service_id in service_ids:
+        pending.append((service_id, days))
+    if settings.AVAILABILITY_CACHE_SHARED:
+        db.query(AvailabilityCacheEntry).filter(
+            AvailabilityCacheEntry.service_id.in_(service_ids),
+            AvailabilityCacheEntry.day.in_(days)
+        ).delete(synchronize_session=False)
+
+
+def invalidate_service(db: Session, service_id: int) -> None:
+    """Drop every cached day of the service."""
+    db.info.setdefault(_PENDING, []).append((service_id, None))
+    if settings.AVAILABILITY_CACHE_SHARED:
+        db.query(AvailabilityCacheEntry).filter(
+            AvailabilityCacheEntry.service_id == service_id
+        ).delete(synchronize_session=False)
+
+
+def invalidate_staff(db: Session, workspace_id: int, staff_id: int) -> None:
+    """A staff member joined or left the active pool: drop the services they work."""
+    for service_id in capacity.services_staffed_by(db, workspace_id, staff_id):
+        invalidate_service(db, service_id)
+
+
+def inventory_changed(db: Session, item_id: int, old_quantity: Optional[int], new_quantity: Optional[int]) -> None:
+    """
+    Stock of an inventory item moved (None = item missing/deleted). Only
+    services whose required quantity was crossed switch between "no slots"
+    and "normal slots"; the rest keep their cache.
+    """
+    linked = db.query(Service.id, Service.inventory_quantity_required).filter(
+        Service.inventory_item_id == item_id,
+        Service.inventory_quantity_required > 0
+    ).all()
+    for service_id, required in linked:
+        was_available = old_quantity is not None and old_quantity >= required
+        is_available = new_quantity is not None and new_quantity >= required
+        if was_available != is_available:
+            invalidate_service(db, service_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session) -> None:
+    for service_id, days in session.info.pop(_PENDING, ()):
+        if days is None:
+            availability_cache.invalidate_service(service_id)
+        else:
+            availability_cache.invalidate_days(service_id, days)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_invalidations(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING, None)
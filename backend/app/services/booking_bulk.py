@@ -0,0 +1,291 @@
+"""
+Bulk Booking Operations
+
+Front-desk actions on many bookings at once (POST /api/bookings/bulk): mark a
+day's visits completed or no-show, hand them to another staff member, or
+cancel them. Each call is one transaction:
+
+- the bookings are loaded (row-locked on Postgres) with one query;
+- the action is one set-based UPDATE over the ids that can take it, plus one
+  multi-row INSERT of audit rows;
+- set-based UPDATEs bypass the flush listeners, so the calendar feed
+  counters, the availability cache and the live events / webhook outbox are
+  updated here explicitly;
+- ids that can't take the action come back under "skipped" with a reason.
+
+The caller commits, re-derives the reminder scheduler's jobs and queues the
+emails (one background task for every cancellation).
+
+complete_past() is the system-side counterpart (the auto_complete cron job):
+confirmed bookings past end_time + grace become completed, which is what
+follow-ups and thank-you emails wait for. It works in chunks of
+BOOKING_AUTO_COMPLETE_CHUNK, each one UPDATE ... RETURNING over the
+(status, end_time) index and its own short transaction, so a large backlog
+never holds many row locks at once; the status condition makes reruns no-ops.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.time_utils import ensure_utc
+from app.models.audit_log import AuditLog
+from app.models.booking import Booking, BookingStatus
+from app.models.inventory import InventoryItem
+from app.models.service import Service
+from app.services import availability, calendar_feed, capacity, events, job_metrics, scheduler, stats_rollup, waitlist
+
+logger = logging.getLogger(__name__)
+
+SET_STATUSES = (
+    BookingStatus.PENDING.value,
+    BookingStatus.CONFIRMED.value,
+    BookingStatus.COMPLETED.value,
+    BookingStatus.NO_SHOW.value,
+)
+CANCELLABLE = (BookingStatus.PENDING.value, BookingStatus.CONFIRMED.value, BookingStatus.NO_SHOW.value)
+
+
+@dataclass
+class BulkResult:
+    updated: List[int] = field(default_factory=list)
+    skipped: List[Dict] = field(default_factory=list)
+    waitlist: List[Tuple[List[int], datetime]] = field(default_factory=list)  # (entry ids, freed slot start)
+
+    def skip(self, booking_id: int, reason: str) -> None:
+        self.skipped.append({"id": booking_id, "reason": reason})
+
+    def to_dict(self) -> Dict:
+        return {"updated": self.updated, "skipped": self.skipped}
+
+
+# ---------------------------------------------------------
+# SHARED STEPS
+# ---------------------------------------------------------
+
+def _load(db: Session, workspace_id: int, booking_ids: Iterable[int], result: BulkResult) -> List[Booking]:
+    ids = list(dict.fromkeys(booking_ids))
+    bookings = db.query(Booking).filter(
+        Booking.id.in_(ids),
+        Booking.workspace_id == workspace_id
+    ).order_by(Booking.start_time, Booking.id).with_for_update().all()
+    found = {booking.id for booking in bookings}
+    for booking_id in ids:
+        if booking_id not in found:
+            result.skip(booking_id, "not_found")
+    return bookings
+
+
+def _update(db: Session, bookings: List[Booking], values: Dict) -> None:
+    # "evaluate" applies the values to the loaded objects without marking them dirty
+    db.query(Booking).filter(Booking.id.in_([b.id for b in bookings])).update(
+        values, synchronize_session="evaluate"
+    )
+
+
+def _audit(db: Session, rows: List[Dict]) -> None:
+    if rows:
+        db.execute(insert(AuditLog), rows)
+
+
+def _audit_row(booking: Booking, user_id: Optional[int], action: str, details: Dict) -> Dict:
+    return {"workspace_id": booking.workspace_id, "booking_id": booking.id, "user_id": user_id,
+            "action": action, "details": {**details, "bulk": True}}
+
+
+def _changed(db: Session, bookings: List[Booking], event_type: str,
+             previous_staff: Iterable[calendar_feed.FeedKey] = ()) -> None:
+    """What the flush listeners do for an ORM update: feed counters, stats rollup markers and events."""
+    feeds: Set[calendar_feed.FeedKey] = {(b.workspace_id, calendar_feed.WORKSPACE_FEED) for b in bookings}
+    feeds |= {(b.workspace_id, b.staff_id) for b in bookings if b.staff_id}
+    feeds |= {key for key in previous_staff if key[1]}
+    calendar_feed.bump(db, feeds)
+    stats_rollup.mark_bookings(db, bookings)
+    events.emit_many(db, [events.booking_event(b, event_type) for b in bookings])
+
+
+# ---------------------------------------------------------
+# ACTIONS
+# ---------------------------------------------------------
+
+def set_status(db: Session, workspace_id: int, user_id: Optional[int], booking_ids: Iterable[int],
+               status: str) -> BulkResult:
+    """Move bookings to `status` (one of SET_STATUSES). Cancelled bookings go through restore instead."""
+    result = BulkResult()
+    changing = []
+    for booking in _load(db, workspace_id, booking_ids, result):
+        if booking.status == BookingStatus.CANCELLED.value:
+            result.skip(booking.id, "cancelled")
+        elif booking.status == status:
+            result.skip(booking.id, "unchanged")
+        else:
+            changing.append(booking)
+    if not changing:
+        return result
+
+    previous = {b.id: b.status for b in changing}
+    _update(db, changing, {Booking.status: status})
+    _audit(db, [_audit_row(b, user_id, "booking.status_changed", {"from": previous[b.id], "to": status})
+                for b in changing])
+    _changed(db, changing, "booking.updated")
+    result.updated = [b.id for b in changing]
+    return result
+
+
+def cancel(db: Session, workspace_id: int, user_id: Optional[int], booking_ids: Iterable[int]) -> BulkResult:
+    """Cancel bookings, return their inventory and offer the freed slots to the waitlist."""
+    result = BulkResult()
+    cancelling = []
+    for booking in _load(db, workspace_id, booking_ids, result):
+        if booking.status == BookingStatus.CANCELLED.value:
+            result.skip(booking.id, "already_cancelled")
+        elif booking.status not in CANCELLABLE:
+            result.skip(booking.id, booking.status)
+        else:
+            cancelling.append(booking)
+    if not cancelling:
+        return result
+
+    _update(db, cancelling, {Booking.status: BookingStatus.CANCELLED.value})
+    audit = [_audit_row(b, user_id, "booking.cancelled", {"reason": "staff_action"}) for b in cancelling]
+
+    # Inventory back: one locked read and one UPDATE per item, however many bookings used it
+    services = {s.id: s for s in db.query(Service).filter(Service.id.in_({b.service_id for b in cancelling}))}
+    returns: Dict[int, List[Tuple[Booking, int]]] = {}
+    for booking in cancelling:
+        service = services.get(booking.service_id)
+        if service and service.inventory_item_id and service.inventory_quantity_required > 0:
+            returns.setdefault(service.inventory_item_id, []).append((booking, service.inventory_quantity_required))
+    if returns:
+        items = db.query(InventoryItem).filter(InventoryItem.id.in_(returns)).with_for_update().all()
+        for item in items:
+            old_quantity = item.quantity
+            for booking, quantity in returns[item.id]:
+                item.quantity += quantity
+                audit.append(_audit_row(booking, user_id, "inventory.returned", {
+                    "item_id": item.id,
+                    "item_name": item.name,
+                    "quantity_returned": quantity,
+                    "new_quantity": item.quantity
+                }))
+            availability.inventory_changed(db, item.id, old_quantity, item.quantity)
+    _audit(db, audit)
+
+    availability.invalidate_bookings(db, cancelling)
+    _changed(db, cancelling, "booking.cancelled")
+    for booking in cancelling:
+        entry_ids = waitlist.slot_released(db, booking, user_id)
+        if entry_ids:
+            result.waitlist.append((entry_ids, booking.start_time))
+    result.updated = [b.id for b in cancelling]
+    return result
+
+
+def reassign(db: Session, workspace_id: int, user_id: Optional[int], booking_ids: Iterable[int],
+             staff_id: int) -> BulkResult:
+    """
+    Hand bookings to `staff_id` (an active member of the workspace; the caller
+    checks). Skips bookings whose service pool doesn't include them, and any
+    that would double-book them, counting the other bookings being moved.
+    """
+    result = BulkResult()
+    candidates = []
+    loaded = _load(db, workspace_id, booking_ids, result)
+    pools = dict(db.query(Service.id, Service.staff_ids).filter(Service.id.in_({b.service_id for b in loaded})))
+    for booking in loaded:
+        if booking.status == BookingStatus.CANCELLED.value:
+            result.skip(booking.id, "cancelled")
+        elif booking.staff_id == staff_id:
+            result.skip(booking.id, "unchanged")
+        elif pools.get(booking.service_id) and staff_id not in pools[booking.service_id]:
+            result.skip(booking.id, "not_eligible")
+        else:
+            candidates.append(booking)
+    if not candidates:
+        return result
+
+    timeline = capacity.staff_timeline(
+        db, staff_id,
+        min(ensure_utc(b.start_time) for b in candidates), max(ensure_utc(b.end_time) for b in candidates),
+        exclude_booking_ids=[b.id for b in candidates],
+    )
+    moving = []
+    busy_until = None  # Candidates are in start order, so an overlap can only be with the latest end
+    for booking in candidates:
+        start, end = ensure_utc(booking.start_time), ensure_utc(booking.end_time)
+        if not timeline.is_free(start, end) or (busy_until is not None and start < busy_until):
+            result.skip(booking.id, "conflict")
+            continue
+        moving.append(booking)
+        busy_until = end if busy_until is None else max(busy_until, end)
+    if not moving:
+        return result
+
+    previous = {b.id: b.staff_id for b in moving}
+    availability.invalidate_bookings(db, moving)  # Services of the staff members they leave
+    _update(db, moving, {Booking.staff_id: staff_id})
+    availability.invalidate_bookings(db, moving)  # ... and of the one they join
+    _audit(db, [_audit_row(b, user_id, "booking.reassigned", {"from_staff_id": previous[b.id], "to_staff_id": staff_id})
+                for b in moving])
+    _changed(db, moving, "booking.updated", previous_staff=[(workspace_id, s) for s in previous.values()])
+    result.updated = [b.id for b in moving]
+    return result
+
+
+# ---------------------------------------------------------
+# AUTOMATIC COMPLETION
+# ---------------------------------------------------------
+
+def _complete_chunk(db: Session, cutoff: datetime, stale_before: datetime, shard=None) -> List:
+    due = select(Booking.id).where(
+        Booking.status == BookingStatus.CONFIRMED.value,
+        Booking.end_time < cutoff
+    ).order_by(Booking.end_time).limit(settings.BOOKING_AUTO_COMPLETE_CHUNK)
+    if shard is not None:
+        due = shard.filter(due, Booking.workspace_id)
+    if db.get_bind().dialect.name == "postgresql":
+        due = due.with_for_update(skip_locked=True)  # A concurrent run takes the next rows instead of waiting
+    stmt = update(Booking).where(
+        Booking.id.in_(due.scalar_subquery()),
+        Booking.status == BookingStatus.CONFIRMED.value  # Re-checked under the row lock
+    ).values(
+        status=BookingStatus.COMPLETED.value,
+        # Visits long gone get no follow-up email now
+        follow_up_sent=case((Booking.end_time < stale_before, True), else_=Booking.follow_up_sent),
+    ).returning(
+        Booking.id, Booking.workspace_id, Booking.service_id, Booking.staff_id, Booking.status,
+        Booking.start_time, Booking.end_time, Booking.reminder_sent, Booking.follow_up_sent,
+    ).execution_options(synchronize_session=False)
+    return db.execute(stmt).all()
+
+
+def complete_past(db: Session, now: Optional[datetime] = None, shard=None) -> int:
+    """Confirmed bookings that ended more than the grace period ago become completed. Returns the count."""
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(minutes=settings.BOOKING_AUTO_COMPLETE_GRACE_MINUTES)
+    stale_before = now - scheduler.FOLLOW_UP_LOOKBACK
+    total = 0
+    for _ in range(settings.BOOKING_AUTO_COMPLETE_MAX_CHUNKS):
+        rows = _complete_chunk(db, cutoff, stale_before, shard)
+        if not rows:
+            break
+        _audit(db, [{"workspace_id": row.workspace_id, "booking_id": row.id, "user_id": None,
+                     "action": "booking.status_changed",
+                     "details": {"from": BookingStatus.CONFIRMED.value, "to": BookingStatus.COMPLETED.value,
+                                 "reason": "auto_complete"}} for row in rows])
+        _changed(db, rows, "booking.updated")
+        db.commit()
+        for row in rows:
+            scheduler.reminder_scheduler.booking_changed(row)  # Queues the follow-up
+        job_metrics.scanned(len(rows))
+        total += len(rows)
+        if len(rows) < settings.BOOKING_AUTO_COMPLETE_CHUNK:
+            break
+    if total:
+        logger.info(f"[BOOKINGS] Auto-completed {total} past bookings")
+    return total
@@ -0,0 +1,247 @@
+"""
+Calendar Feeds
+
+Read-only iCalendar (RFC 5545) feeds of a workspace's bookings, or of one
+staff member's, for calendar apps to subscribe to.
+
+Calendar clients poll every few minutes, so each feed has a change counter
+(calendar_feed_versions, staff_id 0 = the workspace feed). A before_flush
+listener bumps the counters of every feed a flushed Booking / BookingSeries
+touches (old and new staff member alike), and of the whole workspace when a
+service, contact, staff member or the workspace is renamed, in the same
+transaction as the change. Set-based UPDATEs bypass the listener and call
+bump_workspace() themselves. The feed's ETag is the counter plus the first
+day of its window, so an unchanged feed is answered with 304 from one
+primary-key lookup.
+
+write_feed() streams the body: bookings through a server-side cursor, then the
+not-yet-materialized occurrences of recurring series (see recurrence.py).
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import chain
+from typing import Iterable, Iterator, Optional, Set, Tuple
+
+from sqlalchemy import event, func, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.core.config import settings
+from app.core.time_utils import ensure_utc
+from app.db.session import SessionLocal
+from app.db.upsert import bump_versions
+from app.models.booking import Booking, BookingStatus
+from app.models.booking_series import BookingSeries, SeriesStatus
+from app.models.calendar_feed import CalendarFeedVersion
+from app.models.contact import Contact
+from app.models.service import Service
+from app.models.user import User
+from app.models.workspace import Workspace
+from app.services import recurrence
+
+logger = logging.getLogger(__name__)
+
+WORKSPACE_FEED = 0  # staff_id of the workspace-wide feed
+YIELD_PER = 500     # Bookings fetched per server-side cursor round trip
+FLUSH_EVENTS = 200  # Events serialized before a chunk is sent
+
+FeedKey = Tuple[int, int]  # (workspace_id, staff_id)
+
+# Booking fields that appear in a feed; other updates (e.g. reminder_sent) leave feeds alone
+_BOOKING_FIELDS = ("start_time", "end_time", "status", "staff_id", "service_id", "contact_id", "workspace_id")
+# Names that appear in event summaries and calendar names
+_LABEL_FIELDS = {
+    Service: ("name",),
+    Contact: ("full_name",),
+    User: ("full_name", "email"),
+    Workspace: ("name",),
+}
+
+
+# ---------------------------------------------------------
+# CHANGE COUNTERS
+# ---------------------------------------------------------
+
+def bump(db: Session, feeds: Iterable[FeedKey]) -> None:
+    """Advance the change counters of `feeds`, creating them as needed."""
+    bump_versions(db, CalendarFeedVersion.__table__, ("workspace_id", "staff_id"), feeds)
+
+
+def bump_workspace(db: Session, workspace_id: int) -> None:
+    """Advance every feed of the workspace (e.g. a set-based booking update)."""
+    table = CalendarFeedVersion.__table__
+    db.execute(table.update().where(table.c.workspace_id == workspace_id).values(
+        version=table.c.version + 1, updated_at=func.now()
+    ))
+    bump(db, [(workspace_id, WORKSPACE_FEED)])
+
+
+def version(db: Session, workspace_id: int, staff_id: int) -> int:
+    row = db.get(CalendarFeedVersion, (workspace_id, staff_id))
+    return row.version if row else 0
+
+
+def _changed(obj, fields) -> bool:
+    return any(get_history(obj, field).has_changes() for field in fields)
+
+
+def _feeds_of(obj) -> Set[FeedKey]:
+    if obj.workspace_id is None:
+        return set()
+    history = get_history(obj, "staff_id")
+    staff = {s for s in chain(history.added, history.unchanged, history.deleted) if s}
+    return {(obj.workspace_id, WORKSPACE_FEED), *((obj.workspace_id, s) for s in staff)}
+
+
+@event.listens_for(Session, "before_flush")
+def _track_changes(session: Session, flush_context, instances) -> None:
+    feeds: Set[FeedKey] = set()
+    workspaces: Set[int] = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, (Booking, BookingSeries)):
+            if obj in session.dirty:
+                fields = _BOOKING_FIELDS if isinstance(obj, Booking) else ()
+                if not session.is_modified(obj) or (fields and not _changed(obj, fields)):
+                    continue
+            feeds |= _feeds_of(obj)
+        elif type(obj) in _LABEL_FIELDS and obj in session.dirty and _changed(obj, _LABEL_FIELDS[type(obj)]):
+            workspace_id = obj.id if isinstance(obj, Workspace) else obj.workspace_id
+            if workspace_id is not None:
+                workspaces.add(workspace_id)
+    for workspace_id in workspaces:
+        bump_workspace(session, workspace_id)
+    if feeds:
+        bump(session, feeds)
+
+
+# ---------------------------------------------------------
+# FEED
+# ---------------------------------------------------------
+
+def window(today: Optional[date] = None) -> Tuple[datetime, datetime]:
+    """[start, end) of the bookings a feed covers, moving once a day."""
+    today = today or datetime.now(timezone.utc).date()
+    start = datetime.combine(today - timedelta(days=settings.CALENDAR_FEED_PAST_DAYS), time.min, tzinfo=timezone.utc)
+    return start, start + timedelta(days=settings.CALENDAR_FEED_PAST_DAYS + settings.CALENDAR_FEED_FUTURE_DAYS)
+
+
+def etag(workspace_id: int, staff_id: int, feed_version: int, window_start: datetime) -> str:
+    """Strong ETag: the body is a pure function of the counter and the window."""
+    return f'"{workspace_id}.{staff_id}.{feed_version}.{window_start:%Y%m%d}"'
+
+
+def _escape(text: str) -> str:
+    return (text or "").replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    """Fold a content line at 75 octets (RFC 5545 §3.1)."""
+    if len(line.encode("utf-8")) <= 75:
+        return line + "\r\n"
+    parts, current, size = [], [], 0
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > (75 if not parts else 74):  # Continuation lines start with a space
+            parts.append("".join(current))
+            current, size = [], 0
+        current.append(char)
+        size += width
+    parts.append("".join(current))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _stamp(dt: Optional[datetime]) -> str:
+    return ensure_utc(dt or datetime(1970, 1, 1)).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _event(uid: str, start: datetime, end: datetime, stamp: Optional[datetime], summary: str, status: str) -> str:
+    return "".join(_fold(line) for line in (
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{_stamp(stamp)}",
+        f"DTSTART:{_stamp(start)}",
+        f"DTEND:{_stamp(end)}",
+        f"SUMMARY:{_escape(summary)}",
+        f"STATUS:{status}",
+        "END:VEVENT",
+    ))
+
+
+def _summary(service_name: Optional[str], contact_name: Optional[str]) -> str:
+    return " - ".join(part for part in (service_name or "Booking", contact_name) if part)
+
+
+def _occurrence_uid(series_id: int, start: datetime) -> str:
+    # Shared by the virtual occurrence and its booking, so materializing doesn't move the event
+    return f"series-{series_id}-{_stamp(start)}@careops"
+
+
+def write_feed(workspace_id: int, staff_id: int, window_start: datetime, window_end: datetime) -> Iterator[bytes]:
+    """Stream the feed as iCalendar bytes. Runs on its own session."""
+    db = SessionLocal()
+    try:
+        workspace = db.get(Workspace, workspace_id)
+        name = workspace.name if workspace else "CareOps"
+        if staff_id != WORKSPACE_FEED:
+            staff = db.get(User, staff_id)
+            name = f"{name} - {(staff.full_name or staff.email) if staff else 'Staff'}"
+        yield "".join(_fold(line) for line in (
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            "PRODID:-//CareOps//Bookings//EN",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            f"X-WR-CALNAME:{_escape(name)}",
+        )).encode("utf-8")
+
+        stmt = (
+            select(
+                Booking.id, Booking.series_id, Booking.start_time, Booking.end_time, Booking.status,
+                Booking.created_at, Service.name, Contact.full_name,
+            )
+            .outerjoin(Service, Service.id == Booking.service_id)
+            .outerjoin(Contact, Contact.id == Booking.contact_id)
+            .where(
+                Booking.workspace_id == workspace_id,
+                Booking.status != BookingStatus.CANCELLED.value,
+                Booking.start_time >= window_start,
+                Booking.start_time < window_end,
+            )
+            .order_by(Booking.start_time, Booking.id)
+        )
+        if staff_id != WORKSPACE_FEED:
+            stmt = stmt.where(Booking.staff_id == staff_id)
+
+        buffer, pending = [], 0
+        for row in db.execute(stmt.execution_options(yield_per=YIELD_PER)):
+            booking_id, series_id, start, end, status, created_at, service_name, contact_name = row
+            uid = _occurrence_uid(series_id, ensure_utc(start)) if series_id else f"booking-{booking_id}@careops"
+            buffer.append(_event(uid, start, end, created_at, _summary(service_name, contact_name),
+                                 "TENTATIVE" if status == BookingStatus.PENDING.value else "CONFIRMED"))
+            pending += 1
+            if pending >= FLUSH_EVENTS:
+                yield "".join(buffer).encode("utf-8")
+                buffer, pending = [], 0
+
+        series_query = db.query(BookingSeries, Service.name, Contact.full_name).outerjoin(
+            Service, Service.id == BookingSeries.service_id
+        ).outerjoin(
+            Contact, Contact.id == BookingSeries.contact_id
+        ).filter(
+            BookingSeries.workspace_id == workspace_id,
+            BookingSeries.status == SeriesStatus.ACTIVE.value,
+            BookingSeries.start_time < window_end,
+            or_(BookingSeries.ends_at == None, BookingSeries.ends_at > window_start)
+        )
+        if staff_id != WORKSPACE_FEED:
+            series_query = series_query.filter(BookingSeries.staff_id == staff_id)
+        for series, service_name, contact_name in series_query:
+            for start, end in recurrence.occurrences(series, window_start, window_end):
+                buffer.append(_event(_occurrence_uid(series.id, start), start, end, series.created_at,
+                                     _summary(service_name, contact_name), "CONFIRMED"))
+
+        buffer.append(_fold("END:VCALENDAR"))
+        yield "".join(buffer).encode("utf-8")
+    finally:
+        db.close()
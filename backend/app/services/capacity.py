@@ -0,0 +1,188 @@
+"""
+Capacity
+
+Answers "can this service take a booking from start to end, and which staff
+are free to do it" for the slot list, create, reschedule and restore alike.
+
+Every resource is an interval timeline of its non-cancelled bookings:
+
+- ("staff", user_id): everything assigned to that staff member, whatever the
+  service, so nobody is double-booked across services.
+- the service's own pool: bookings of the service that no pool member holds.
+
+A service with `staff_ids` has one unit of capacity per free staff member,
+minus the unassigned bookings already in the window. A service without staff
+is a single resource (one booking at a time), as before staff existed.
+Recurring series count too: their not-yet-materialized occurrences are
+expanded into the same timelines (see recurrence.py).
+
+CapacityPlan loads every relevant booking for a window in one query (plus one
+for series), after which each check is a couple of binary searches per
+resource.
+"""
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.time_utils import ensure_utc
+from app.models.booking import Booking, BookingStatus
+from app.models.booking_series import BookingSeries, SeriesStatus
+from app.models.service import Service
+from app.models.user import User
+from app.services import recurrence
+
+
+class Timeline:
+    """Busy intervals of one resource, sorted for binary search."""
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals: Iterable[Tuple[datetime, datetime]] = ()):
+        intervals = list(intervals)
+        self.starts = sorted(start for start, _ in intervals)
+        self.ends = sorted(end for _, end in intervals)
+
+    def overlapping(self, start: datetime, end: datetime) -> int:
+        # Intervals starting before `end`, minus those already over by `start`
+        return bisect_left(self.starts, end) - bisect_right(self.ends, start)
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        return self.overlapping(start, end) == 0
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+@dataclass
+class Capacity:
+    available: bool
+    free_staff: List[int] = field(default_factory=list)
+
+    def pick(self, preferred: Optional[int] = None) -> Optional[int]:
+        """Staff member to assign: `preferred` if still free, else the first free one."""
+        if not self.free_staff:
+            return preferred  # Service has no staff pool; leave the assignment alone
+        return preferred if preferred in self.free_staff else self.free_staff[0]
+
+
+def eligible_staff(db: Session, service: Service) -> List[int]:
+    """Active members of the service's staff pool, in the order the owner listed them."""
+    if not service.staff_ids:
+        return []
+    active = {user_id for (user_id,) in db.query(User.id).filter(
+        User.id.in_(service.staff_ids),
+        User.workspace_id == service.workspace_id,
+        User.is_active == True
+    )}
+    return [user_id for user_id in service.staff_ids if user_id in active]
+
+
+class CapacityPlan:
+    """Timelines for one service over a window."""
+
+    def __init__(self, service_id: int, staff_ids: List[int], bookings: Iterable[Tuple]):
+        self.staff_ids = staff_ids
+        staffed = set(staff_ids)
+        by_staff: Dict[int, List] = {user_id: [] for user_id in staff_ids}
+        pool = []
+        for booking_service_id, staff_id, start, end in bookings:
+            interval = (ensure_utc(start), ensure_utc(end))
+            if staff_id in staffed:
+                by_staff[staff_id].append(interval)
+            elif booking_service_id == service_id and (staff_id is None or not staff_ids):
+                pool.append(interval)
+        self.staff = {user_id: Timeline(intervals) for user_id, intervals in by_staff.items()}
+        self.pool = Timeline(pool)
+
+    @classmethod
+    def load(cls, db: Session, service: Service, window_start: datetime, window_end: datetime,
+             exclude_booking_id: Optional[int] = None) -> "CapacityPlan":
+        staff_ids = eligible_staff(db, service)
+        scope = Booking.service_id == service.id
+        if staff_ids:
+            scope = or_(scope, Booking.staff_id.in_(staff_ids))
+        query = db.query(Booking.service_id, Booking.staff_id, Booking.start_time, Booking.end_time).filter(
+            scope,
+            Booking.status != BookingStatus.CANCELLED.value,
+            Booking.start_time < window_end,
+            Booking.end_time > window_start
+        )
+        if exclude_booking_id is not None:
+            query = query.filter(Booking.id != exclude_booking_id)
+        intervals = query.all()
+        intervals.extend(series_intervals(db, service.id, staff_ids, window_start, window_end))
+        return cls(service.id, staff_ids, intervals)
+
+    def check(self, start: datetime, end: datetime) -> Capacity:
+        start, end = ensure_utc(start), ensure_utc(end)
+        if not self.staff_ids:
+            return Capacity(available=self.pool.is_free(start, end))
+        free = [user_id for user_id in self.staff_ids if self.staff[user_id].is_free(start, end)]
+        # Each unassigned booking in the window still needs one of the free staff
+        return Capacity(available=len(free) > self.pool.overlapping(start, end), free_staff=free)
+
+
+def series_intervals(db: Session, service_id: int, staff_ids: List[int],
+                     window_start: datetime, window_end: datetime) -> List[Tuple]:
+    """Virtual occurrences of active series in scope, as (service_id, staff_id, start, end)."""
+    scope = BookingSeries.service_id == service_id
+    if staff_ids:
+        scope = or_(scope, BookingSeries.staff_id.in_(staff_ids))
+    series = db.query(BookingSeries).filter(
+        scope,
+        BookingSeries.status == SeriesStatus.ACTIVE.value,
+        BookingSeries.start_time < window_end,
+        or_(BookingSeries.ends_at == None, BookingSeries.ends_at > window_start)
+    ).all()
+    return [
+        (s.service_id, s.staff_id, start, end)
+        for s in series
+        for start, end in recurrence.occurrences(s, window_start, window_end)
+    ]
+
+
+def staff_timeline(db: Session, staff_id: int, window_start: datetime, window_end: datetime,
+                   exclude_booking_ids: Iterable[int] = ()) -> Timeline:
+    """Everything one staff member is booked for in a window, whatever the service."""
+    query = db.query(Booking.start_time, Booking.end_time).filter(
+        Booking.staff_id == staff_id,
+        Booking.status != BookingStatus.CANCELLED.value,
+        Booking.start_time < window_end,
+        Booking.end_time > window_start
+    )
+    exclude_booking_ids = list(exclude_booking_ids)
+    if exclude_booking_ids:
+        query = query.filter(Booking.id.notin_(exclude_booking_ids))
+    intervals = [(ensure_utc(start), ensure_utc(end)) for start, end in query]
+    series = db.query(BookingSeries).filter(
+        BookingSeries.staff_id == staff_id,
+        BookingSeries.status == SeriesStatus.ACTIVE.value,
+        BookingSeries.start_time < window_end,
+        or_(BookingSeries.ends_at == None, BookingSeries.ends_at > window_start)
+    ).all()
+    intervals.extend((ensure_utc(start), ensure_utc(end)) for s in series
+                     for start, end in recurrence.occurrences(s, window_start, window_end))
+    return Timeline(intervals)
+
+
+def check(db: Session, service: Service, start: datetime, end: datetime,
+          exclude_booking_id: Optional[int] = None) -> Capacity:
+    """Capacity for a single booking window (create / reschedule / restore)."""
+    return CapacityPlan.load(db, service, start, end, exclude_booking_id).check(start, end)
+
+
+def services_staffed_by(db: Session, workspace_id: int, staff_id: int) -> List[int]:
+    """Services whose staff pool includes this staff member."""
+    return [
+        service_id
+        for service_id, staff_ids in db.query(Service.id, Service.staff_ids).filter(
+            Service.workspace_id == workspace_id,
+            Service.staff_ids != None
+        )
+        if staff_ids and staff_id in staff_ids
+    ]
@@ -0,0 +1,344 @@
+"""
+Catalog
+
+Public pages resolve a workspace slug and list its services on every hit,
+but those rows change maybe once a week. The catalog cache keeps, per
+workspace, an immutable snapshot of the public workspace fields and its
+services, plus the slug -> workspace and service -> workspace lookups, so a
+warm hit touches no tables.
+
+Snapshots are frozen dataclasses (tuples and read-only mappings inside), safe
+to share between requests and threads. compute_slots() and the capacity
+engine accept a ServiceSnapshot wherever they take a Service.
+
+Invalidation is automatic: a flush listener notes every workspace whose
+Workspace or Service rows were inserted, updated or deleted (services.py,
+settings.py, onboarding, signup, ...), and the notes are applied when the
+session commits, so a rolled-back change invalidates nothing. The same flush
+bumps the workspace's HTTP validator (http_cache.py). Other replicas
+catch up within CATALOG_CACHE_TTL_SECONDS. CATALOG_CACHE_WARM_ON_STARTUP
+loads every active workspace before the first request.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import chain
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import and_, event
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.resource_version import ResourceVersion
+from app.models.service import Service
+from app.models.workspace import Workspace
+from app.services import http_cache
+
+logger = logging.getLogger(__name__)
+
+_PENDING = "catalog_invalidations"
+
+# Workspace columns in a snapshot; token refreshes and the like don't invalidate
+_WORKSPACE_FIELDS = ("slug", "name", "address", "timezone", "contact_email", "is_active")
+
+
+# ---------------------------------------------------------
+# SNAPSHOTS
+# ---------------------------------------------------------
+
+@dataclass(frozen=True)
+class ServiceSnapshot:
+    id: int
+    workspace_id: int
+    name: str
+    duration_minutes: int
+    location: Optional[str]
+    availability: Mapping[str, Tuple[str, ...]]
+    inventory_item_id: Optional[int]
+    inventory_quantity_required: int
+    staff_ids: Optional[Tuple[int, ...]]
+
+    @classmethod
+    def of(cls, service: Service) -> "ServiceSnapshot":
+        return cls(
+            id=service.id,
+            workspace_id=service.workspace_id,
+            name=service.name,
+            duration_minutes=service.duration_minutes,
+            location=service.location,
+            availability=MappingProxyType({
+                day: tuple(ranges) if isinstance(ranges, list) else ranges
+                for day, ranges in (service.availability or {}).items()
+            }),
+            inventory_item_id=service.inventory_item_id,
+            inventory_quantity_required=service.inventory_quantity_required or 0,
+            staff_ids=tuple(service.staff_ids) if service.staff_ids else None,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "workspace_id": self.workspace_id,
+            "name": self.name,
+            "duration_minutes": self.duration_minutes,
+            "location": self.location,
+            "availability": {day: list(ranges) if isinstance(ranges, tuple) else ranges
+                             for day, ranges in self.availability.items()},
+            "inventory_item_id": self.inventory_item_id,
+            "inventory_quantity_required": self.inventory_quantity_required,
+            "staff_ids": list(self.staff_ids) if self.staff_ids else None,
+        }
+
+
+@dataclass(frozen=True)
+class WorkspaceSnapshot:
+    id: int
+    slug: str
+    name: str
+    address: Optional[str]
+    timezone: Optional[str]
+    contact_email: Optional[str]
+    is_active: bool
+    services: Tuple[ServiceSnapshot, ...]
+    version: int = 0  # resource_versions counter, read with the workspace row (see http_cache.py)
+
+    @classmethod
+    def of(cls, workspace: Workspace, services: Iterable[Service], version: int = 0) -> "WorkspaceSnapshot":
+        return cls(
+            id=workspace.id,
+            slug=workspace.slug,
+            name=workspace.name,
+            address=workspace.address,
+            timezone=workspace.timezone,
+            contact_email=workspace.contact_email,
+            is_active=bool(workspace.is_active),
+            services=tuple(ServiceSnapshot.of(s) for s in sorted(services, key=lambda s: s.id)),
+            version=version or 0,
+        )
+
+    def service(self, service_id: int) -> Optional[ServiceSnapshot]:
+        return next((s for s in self.services if s.id == service_id), None)
+
+
+# ---------------------------------------------------------
+# CACHE
+# ---------------------------------------------------------
+
+class CatalogCache:
+    """
+    LRU of workspace snapshots with slug and service indexes. Like the
+    availability cache, invalidation stamps the workspace with the time it
+    happened and a snapshot is only stored if it was read after the stamp.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[WorkspaceSnapshot, float]]" = OrderedDict()
+        self._slugs: Dict[str, int] = {}
+        self._services: Dict[int, int] = {}  # service_id -> workspace_id
+        self._stamps: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _lookup(self, workspace_id: Optional[int]) -> Optional[WorkspaceSnapshot]:
+        entry = self._entries.get(workspace_id) if workspace_id is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        snapshot, loaded = entry
+        if time.monotonic() - loaded >= self.ttl_seconds:
+            self._drop(workspace_id)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(workspace_id)
+        self.hits += 1
+        return snapshot
+
+    def get(self, workspace_id: int) -> Optional[WorkspaceSnapshot]:
+        with self._lock:
+            return self._lookup(workspace_id)
+
+    def get_by_slug(self, slug: str) -> Optional[WorkspaceSnapshot]:
+        with self._lock:
+            return self._lookup(self._slugs.get(slug))
+
+    def get_by_service(self, service_id: int) -> Optional[WorkspaceSnapshot]:
+        with self._lock:
+            return self._lookup(self._services.get(service_id))
+
+    def put(self, snapshot: WorkspaceSnapshot, loaded: float) -> bool:
+        """Store a snapshot read after `loaded` (time.monotonic()). False if it is already stale."""
+        with self._lock:
+            if loaded <= self._stamps.get(snapshot.id, float("-inf")):
+                return False
+            self._drop(snapshot.id)
+            self._entries[snapshot.id] = (snapshot, loaded)
+            self._slugs[snapshot.slug] = snapshot.id
+            for service in snapshot.services:
+                self._services[service.id] = snapshot.id
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+            return True
+
+    def _drop(self, workspace_id: int) -> None:
+        entry = self._entries.pop(workspace_id, None)
+        if entry is None:
+            return
+        snapshot, _ = entry
+        if self._slugs.get(snapshot.slug) == workspace_id:
+            del self._slugs[snapshot.slug]
+        for service in snapshot.services:
+            if self._services.get(service.id) == workspace_id:
+                del self._services[service.id]
+
+    def invalidate(self, workspace_ids: Iterable[int]) -> None:
+        with self._lock:
+            now = time.monotonic()
+            for workspace_id in workspace_ids:
+                self._stamps[workspace_id] = now
+                self._drop(workspace_id)
+                self.invalidations += 1
+            if len(self._stamps) > 4 * self.max_size:
+                # A stamp only matters to loads that started before it; those are long done
+                cutoff = now - self.ttl_seconds
+                self._stamps = {k: t for k, t in self._stamps.items() if t > cutoff}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._slugs.clear()
+            self._services.clear()
+            self._stamps.clear()
+            self.hits = self.misses = self.invalidations = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "services": len(self._services),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+catalog_cache = CatalogCache(settings.CATALOG_CACHE_SIZE, settings.CATALOG_CACHE_TTL_SECONDS)
+
+
+# ---------------------------------------------------------
+# LOOKUPS
+# ---------------------------------------------------------
+
+def _workspaces(db: Session):
+    # The counter comes in the same statement as the row, so it never runs ahead of it
+    return db.query(Workspace, ResourceVersion.version).outerjoin(ResourceVersion, and_(
+        ResourceVersion.kind == http_cache.WORKSPACE, ResourceVersion.resource_id == Workspace.id
+    ))
+
+
+def _load(db: Session, row, started: float) -> Optional[WorkspaceSnapshot]:
+    if row is None:
+        return None
+    workspace, version = row
+    services = db.query(Service).filter(Service.workspace_id == workspace.id).all()
+    snapshot = WorkspaceSnapshot.of(workspace, services, version)
+    catalog_cache.put(snapshot, started)
+    return snapshot
+
+
+def get_workspace(db: Session, workspace_id: int) -> Optional[WorkspaceSnapshot]:
+    snapshot = catalog_cache.get(workspace_id)
+    if snapshot is not None:
+        return snapshot
+    started = time.monotonic()  # Taken before reading, so a write committed meanwhile outranks it
+    return _load(db, _workspaces(db).filter(Workspace.id == workspace_id).first(), started)
+
+
+def get_workspace_by_slug(db: Session, slug: str) -> Optional[WorkspaceSnapshot]:
+    snapshot = catalog_cache.get_by_slug(slug)
+    if snapshot is not None:
+        return snapshot
+    started = time.monotonic()
+    return _load(db, _workspaces(db).filter(Workspace.slug == slug).first(), started)
+
+
+def get_service(db: Session, service_id: int) -> Optional[ServiceSnapshot]:
+    snapshot = catalog_cache.get_by_service(service_id)
+    if snapshot is None:
+        started = time.monotonic()
+        workspace_id = db.query(Service.workspace_id).filter(Service.id == service_id).scalar()
+        if workspace_id is None:
+            return None
+        snapshot = _load(db, _workspaces(db).filter(Workspace.id == workspace_id).first(), started)
+    return snapshot.service(service_id) if snapshot else None
+
+
+def warm(limit: Optional[int] = None) -> int:
+    """Load active workspaces (up to CATALOG_CACHE_SIZE) in two queries. Returns how many were cached."""
+    db = SessionLocal()
+    try:
+        started = time.monotonic()
+        rows = _workspaces(db).filter(Workspace.is_active == True).order_by(Workspace.id).limit(
+            limit or catalog_cache.max_size
+        ).all()
+        by_workspace: Dict[int, List[Service]] = {w.id: [] for w, _ in rows}
+        if by_workspace:
+            for service in db.query(Service).filter(Service.workspace_id.in_(list(by_workspace))):
+                by_workspace[service.workspace_id].append(service)
+        cached = sum(catalog_cache.put(WorkspaceSnapshot.of(w, by_workspace[w.id], v), started) for w, v in rows)
+        logger.info(f"[CATALOG] Warmed {cached} workspace(s)")
+        return cached
+    finally:
+        db.close()
+
+
+# ---------------------------------------------------------
+# INVALIDATION
+# ---------------------------------------------------------
+
+def invalidate_workspace(db: Session, workspace_id: int) -> None:
+    """
+    Drop the workspace's snapshot when the session commits, and advance its
+    HTTP validator in this transaction (for writes the listener can't see).
+    """
+    db.info.setdefault(_PENDING, set()).add(workspace_id)
+    http_cache.bump(db, [(http_cache.WORKSPACE, workspace_id)])
+
+
+@event.listens_for(Session, "before_flush")
+def _track_changes(session: Session, flush_context, instances) -> None:
+    changed = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Workspace) and obj.id is not None:
+            if obj in session.dirty and not any(get_history(obj, f).has_changes() for f in _WORKSPACE_FIELDS):
+                continue
+            changed.add(obj.id)
+        elif isinstance(obj, Service) and obj.workspace_id is not None:
+            changed.add(obj.workspace_id)
+    for workspace_id in sorted(changed):
+        invalidate_workspace(session, workspace_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        catalog_cache.invalidate(pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_invalidations(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,252 @@
+"""
+Cron Jobs
+
+The periodic checks behind /api/cron/run, one function per job. Each takes
+its own session (see job_runner.run_job), optionally a workspace Shard to
+restrict itself to, and returns a dict of counters.
+
+1. Booking reminders (24h before)      } fired by the in-process scheduler;
+2. Form reminders (overdue > 24h)      } scanned here only when it is off
+3. Inventory alerts (low stock, once per day)
+4. Thank-you emails (completed yesterday)
+5. Owner daily summary
+6. Post-booking follow-ups (1h after completion)  } scheduler too
+7. Recurring series occurrences (rows ahead of reminders)  } scheduler too
+8. Outbound webhook deliveries  } only when the webhook worker is off
+9. Auto-complete: confirmed bookings past end_time + grace -> completed
+10. Daily stats rollup: recompute the dirty days of workspace_daily_stats
+
+Every job claims its row before sending, with a conditional UPDATE of a sent
+flag or timestamp, so an overlapping or repeated run never sends twice.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.booking import Booking, BookingStatus
+from app.models.booking_series import BookingSeries, SeriesStatus
+from app.models.conversation import Conversation
+from app.models.form import FormSubmission
+from app.models.inventory import InventoryItem
+from app.models.workspace import Workspace
+from app.services import email as email_service
+from app.services import booking_bulk, job_metrics, recurrence, scheduler, stats_rollup, webhooks
+from app.services.job_runner import Shard
+
+logger = logging.getLogger(__name__)
+
+
+def _scheduler_owns_reminders() -> bool:
+    return scheduler.reminder_scheduler.is_running
+
+
+def _sharded(query, workspace_column, shard: Optional[Shard]):
+    return shard.filter(query, workspace_column) if shard else query
+
+
+async def booking_reminders(db: Session, shard: Optional[Shard] = None) -> Dict:
+    sent = 0
+    if not _scheduler_owns_reminders():
+        now = datetime.now(timezone.utc)
+        upcoming_ids = _sharded(db.query(Booking.id).filter(
+            Booking.start_time > now,
+            Booking.start_time <= now + scheduler.REMINDER_LEAD,
+            Booking.status != BookingStatus.CANCELLED.value,
+            Booking.reminder_sent == False
+        ), Booking.workspace_id, shard).all()
+        job_metrics.scanned(len(upcoming_ids))
+        for (booking_id,) in upcoming_ids:
+            if await scheduler.send_booking_reminder_job(db, booking_id, now):
+                sent += 1
+    return {"booking_reminders": sent}
+
+
+async def form_reminders(db: Session, shard: Optional[Shard] = None) -> Dict:
+    sent = 0
+    if not _scheduler_owns_reminders():
+        now = datetime.now(timezone.utc)
+        query = db.query(FormSubmission.id).filter(
+            FormSubmission.status == "pending",
+            FormSubmission.sent_at <= now - scheduler.FORM_REMINDER_AFTER,
+            FormSubmission.reminder_sent == False
+        )
+        if shard:
+            # Submissions have no workspace_id; pending ones always belong to a booking
+            query = shard.filter(query.join(Booking, Booking.id == FormSubmission.booking_id), Booking.workspace_id)
+        overdue_ids = query.all()
+        job_metrics.scanned(len(overdue_ids))
+        for (submission_id,) in overdue_ids:
+            if await scheduler.send_form_reminder_job(db, submission_id, now):
+                sent += 1
+    return {"form_reminders": sent}
+
+
+async def inventory_alerts(db: Session, shard: Optional[Shard] = None) -> Dict:
+    """Low stock alert, at most once a day per item."""
+    now = datetime.now(timezone.utc)
+    yesterday = now - timedelta(hours=24)
+    due = or_(InventoryItem.last_alert_at == None, InventoryItem.last_alert_at < yesterday)
+
+    item_ids = _sharded(db.query(InventoryItem.id).filter(
+        InventoryItem.quantity <= InventoryItem.threshold, due
+    ), InventoryItem.workspace_id, shard).all()
+    job_metrics.scanned(len(item_ids))
+
+    sent = 0
+    for (item_id,) in item_ids:
+        # Claim before sending so an overlapping run can't alert twice
+        claimed = db.query(InventoryItem).filter(InventoryItem.id == item_id, due).update(
+            {InventoryItem.last_alert_at: now}, synchronize_session=False
+        )
+        db.commit()
+        if claimed:
+            await email_service.send_inventory_alert(item_id)
+            sent += 1
+    return {"inventory_alerts": sent}
+
+
+async def thank_you_emails(db: Session, shard: Optional[Shard] = None) -> Dict:
+    """Thank-you for visits completed yesterday, once per booking."""
+    yesterday = datetime.now(timezone.utc) - timedelta(hours=24)
+    y_start = yesterday.replace(hour=0, minute=0, second=0, microsecond=0)
+    y_end = y_start + timedelta(days=1)
+
+    completed_ids = _sharded(db.query(Booking.id).filter(
+        Booking.status == BookingStatus.COMPLETED.value,
+        Booking.end_time >= y_start,
+        Booking.end_time < y_end,
+        Booking.thank_you_sent == False
+    ), Booking.workspace_id, shard).all()
+    job_metrics.scanned(len(completed_ids))
+
+    sent = 0
+    for (booking_id,) in completed_ids:
+        # Claim before sending so an overlapping run can't thank twice
+        claimed = db.query(Booking).filter(
+            Booking.id == booking_id, Booking.thank_you_sent == False
+        ).update({Booking.thank_you_sent: True}, synchronize_session=False)
+        db.commit()
+        if claimed:
+            await email_service.send_visit_completion(booking_id)
+            sent += 1
+    return {"thank_you_emails": sent}
+
+
+async def owner_summaries(db: Session, shard: Optional[Shard] = None) -> Dict:
+    """Daily alert to owners with unanswered messages or low stock, at most once a day."""
+    now = datetime.now(timezone.utc)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    due = or_(Workspace.owner_alert_at == None, Workspace.owner_alert_at < today_start)
+
+    workspace_ids = _sharded(db.query(Workspace.id).filter(due), Workspace.id, shard).all()
+    job_metrics.scanned(len(workspace_ids))
+
+    sent = 0
+    for (workspace_id,) in workspace_ids:
+        # Unanswered count (not paused, not internal last msg)
+        unanswered = db.query(Conversation).filter(
+            Conversation.workspace_id == workspace_id,
+            Conversation.is_paused == False,
+            Conversation.last_message_is_internal == False
+        ).count()
+
+        ws_low_stock = db.query(InventoryItem).filter(
+            InventoryItem.workspace_id == workspace_id,
+            InventoryItem.quantity <= InventoryItem.threshold
+        ).count()
+
+        if unanswered > 0 or ws_low_stock > 0:
+            # Claim before sending so an overlapping run can't alert twice
+            claimed = db.query(Workspace).filter(Workspace.id == workspace_id, due).update(
+                {Workspace.owner_alert_at: now}, synchronize_session=False
+            )
+            db.commit()
+            if claimed:
+                await email_service.send_daily_owner_alert(workspace_id, unanswered, ws_low_stock)
+                sent += 1
+    return {"owner_alerts": sent}
+
+
+async def follow_ups(db: Session, shard: Optional[Shard] = None) -> Dict:
+    sent = 0
+    if not _scheduler_owns_reminders():
+        now = datetime.now(timezone.utc)
+        follow_up_ids = _sharded(db.query(Booking.id).filter(
+            Booking.end_time < now - scheduler.FOLLOW_UP_AFTER,
+            Booking.status == BookingStatus.COMPLETED.value,
+            Booking.follow_up_sent == False
+        ), Booking.workspace_id, shard).all()
+        job_metrics.scanned(len(follow_up_ids))
+        for (booking_id,) in follow_up_ids:
+            if await scheduler.send_follow_up_job(db, booking_id, now):
+                sent += 1
+    return {"follow_ups_sent": sent}
+
+
+async def series_occurrences(db: Session, shard: Optional[Shard] = None) -> Dict:
+    """Materialize recurring series occurrences about to need reminders."""
+    created = 0
+    if not _scheduler_owns_reminders():
+        now = datetime.now(timezone.utc)
+        until = now + scheduler.MATERIALIZE_AHEAD
+        series_ids = _sharded(db.query(BookingSeries.id).filter(
+            BookingSeries.status == SeriesStatus.ACTIVE.value,
+            BookingSeries.start_time < until,
+            or_(BookingSeries.materialized_until == None, BookingSeries.materialized_until < until),
+            or_(BookingSeries.ends_at == None, BookingSeries.ends_at > now)
+        ), BookingSeries.workspace_id, shard).all()
+        job_metrics.scanned(len(series_ids))
+        for (series_id,) in series_ids:
+            series = db.query(BookingSeries).filter(BookingSeries.id == series_id).first()
+            created += len(recurrence.materialize(db, series, until))
+            db.commit()
+    return {"series_occurrences": created}
+
+
+async def auto_complete(db: Session, shard: Optional[Shard] = None) -> Dict:
+    """Mark finished visits completed, in chunks (see booking_bulk.complete_past)."""
+    completed = 0
+    if settings.BOOKING_AUTO_COMPLETE_ENABLED:
+        completed = booking_bulk.complete_past(db, shard=shard)
+    return {"bookings_completed": completed}
+
+
+async def webhook_deliveries(db: Session, shard: Optional[Shard] = None) -> Dict:
+    """Deliver due outbound webhooks (the worker's own sessions; `db` is unused)."""
+    stats = {"delivered": 0, "retrying": 0, "dead": 0}
+    if not webhooks.webhook_dispatcher.is_running:
+        stats = await webhooks.webhook_dispatcher.deliver_due(shard=shard)
+        job_metrics.scanned(stats.get("claimed", 0))
+    return {"webhooks_delivered": stats["delivered"], "webhooks_retrying": stats["retrying"],
+            "webhooks_dead": stats["dead"]}
+
+
+async def stats_rollup_days(db: Session, shard: Optional[Shard] = None) -> Dict:
+    """Recompute dirty days of the analytics rollup (see stats_rollup.run)."""
+    return {"stats_days_rolled_up": stats_rollup.run(db, shard=shard)}
+
+
+# Job name -> function, in stages: a stage starts once the previous one has finished
+# (job_runner.run_stages); the jobs within a stage run concurrently. Each name is also its lease name.
+CRON_STAGES = [
+    # Completes visits first, so the jobs that wait for completed visits see them this run
+    {"auto_complete": auto_complete},
+    {
+        "booking_reminders": booking_reminders,
+        "form_reminders": form_reminders,
+        "inventory_alerts": inventory_alerts,
+        "thank_you_emails": thank_you_emails,
+        "owner_summaries": owner_summaries,
+        "follow_ups": follow_ups,
+        "series_occurrences": series_occurrences,
+        "webhook_deliveries": webhook_deliveries,
+    },
+    # Last, so the rollup includes what the jobs above changed
+    {"stats_rollup": stats_rollup_days},
+]
+CRON_JOBS = {name: fn for stage in CRON_STAGES for name, fn in stage.items()}
@@ -7,6 +7,7 @@ from datetime import datetime, timezone
 import base64
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.utils import make_msgid
 
 from app.core.config import settings
 from app.schemas.onboarding import EmailConfig
@@ -14,11 +15,9 @@ from app.models.communication_log import CommunicationLog
 from app.models.workspace import Workspace
 from app.db.session import SessionLocal
 from app.core.security_utils import decrypt_token
+from app.services import job_metrics, mail_threads
 
-# Google Libraries
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from google.auth.transport.requests import Request
+# The Google client stack (~0.3s to import) is only loaded by gmail_client.py, on first send
 
 logger = logging.getLogger(__name__)
 
@@ -31,11 +30,14 @@ async def _send_gmail_email(
     subject: str, 
     html_content: str, 
     log_data: Dict[str, Any],
-    reply_to: Optional[str] = None
+    reply_to: Optional[str] = None,
+    extra_headers: Optional[Dict[str, str]] = None,
+    thread_id: Optional[str] = None
 ):
     """
     Sends email via Gmail API using the Owner's connected account.
     Falls back gracefully if not connected or error occurs.
+    extra_headers / thread_id thread a reply (Message-ID, In-Reply-To, References; Gmail threadId).
     """
     workspace_id = log_data.get("workspace_id")
     if not workspace_id:
@@ -93,12 +95,16 @@ async def _send_gmail_email(
         
         if reply_to:
             message['reply-to'] = reply_to
+        for name, value in (extra_headers or {}).items():
+            message[name] = value
 
         msg = MIMEText(html_content, 'html')
         message.attach(msg)
 
         raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
         body = {'raw': raw_message}
+        if thread_id:
+            body['threadId'] = thread_id
 
         # 4. SEND via GMAIL API
         # We run this in executor to avoid blocking async loop
@@ -108,7 +114,8 @@ async def _send_gmail_email(
             return service.users().messages().send(userId='me', body=body).execute()
 
         loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, build_and_send)
+        with job_metrics.gmail_call():
+            result = await loop.run_in_executor(None, build_and_send)
         
         logger.info(f"Email sent via Gmail API. ID: {result.get('id')}")
         log_entry.status = "success"
@@ -288,6 +295,47 @@ async def send_test_email(workspace_id: int):
         db.close()
 
 
+def _welcome_email_args(contact, booking_url: Optional[str] = None):
+    """Render the welcome email for a contact. Returns args for _send_gmail_email."""
+    workspace = contact.workspace
+
+    subject = "Welcome to CareOps – Next Steps"
+    
+    if booking_url:
+        body = f"""
+            <p style="margin: 0 0 16px 0; color: #3c4257;">Hi {contact.first_name or 'there'},</p>
+            <p style="margin: 0 0 16px 0; color: #3c4257;">Thanks for reaching out. We received your information.</p>
+            <p style="margin: 0 0 16px 0; color: #3c4257;"><strong>Please use the link below to schedule your appointment:</strong></p>
+        """
+        action_text = "Book Appointment"
+        action_url = booking_url
+    else:
+        body = f"""
+            <p style="margin: 0 0 16px 0; color: #3c4257;">Hi {contact.first_name or 'there'},</p>
+            <p style="margin: 0 0 16px 0; color: #3c4257;">Thanks for connecting with us. We have received your information and will be in touch shortly regarding your needs.</p>
+            <p style="margin: 0 0 16px 0; color: #3c4257;">Best regards,</p>
+        """
+        action_text = None
+        action_url = None
+    
+    html = _render_email_template(
+        title=subject,
+        body_content=body,
+        workspace_name=workspace.name,
+        workspace_address=workspace.address,
+        action_button_text=action_text,
+        action_button_url=action_url,
+        preview_text="Here is your requested information."
+    )
+    
+    log_data = {
+        "workspace_id": contact.workspace_id,
+        "contact_id": contact.id,
+        "type": "welcome"
+    }
+    
+    return (contact.email, subject, html, log_data)
+
 async def send_welcome_email(contact_email: str, booking_url: Optional[str] = None):
     from app.models.contact import Contact
     db = SessionLocal()
@@ -295,44 +343,7 @@ async def send_welcome_email(contact_email: str, booking_url: Optional[str] = No
     try:
         contact = db.query(Contact).filter(Contact.email == contact_email).order_by(Contact.id.desc()).first()
         if not contact: return
-        workspace = contact.workspace
-
-        subject = "Welcome to CareOps – Next Steps"
-        
-        if booking_url:
-            body = f"""
-                <p style="margin: 0 0 16px 0; color: #3c4257;">Hi {contact.first_name or 'there'},</p>
-                <p style="margin: 0 0 16px 0; color: #3c4257;">Thanks for reaching out. We received your information.</p>
-                <p style="margin: 0 0 16px 0; color: #3c4257;"><strong>Please use the link below to schedule your appointment:</strong></p>
-            """
-            action_text = "Book Appointment"
-            action_url = booking_url
-        else:
-            body = f"""
-                <p style="margin: 0 0 16px 0; color: #3c4257;">Hi {contact.first_name or 'there'},</p>
-                <p style="margin: 0 0 16px 0; color: #3c4257;">Thanks for connecting with us. We have received your information and will be in touch shortly regarding your needs.</p>
-                <p style="margin: 0 0 16px 0; color: #3c4257;">Best regards,</p>
-            """
-            action_text = None
-            action_url = None
-        
-        html = _render_email_template(
-            title=subject,
-            body_content=body,
-            workspace_name=workspace.name,
-            workspace_address=workspace.address,
-            action_button_text=action_text,
-            action_button_url=action_url,
-            preview_text="Here is your requested information."
-        )
-        
-        log_data = {
-            "workspace_id": contact.workspace_id,
-            "contact_id": contact.id,
-            "type": "welcome"
-        }
-        
-        email_args = (contact_email, subject, html, log_data)
+        email_args = _welcome_email_args(contact, booking_url)
         
     finally:
         db.close()
@@ -340,6 +351,34 @@ async def send_welcome_email(contact_email: str, booking_url: Optional[str] = No
     if email_args:
         await _send_gmail_email(*email_args)
 
+async def send_welcome_emails_bulk(contact_ids: List[int], booking_url: Optional[str] = None, concurrency: int = 5):
+    """
+    Welcome emails for a batch of new contacts (e.g. bulk import).
+    One background task for the whole batch: contacts are loaded in chunks
+    with a single query each, and sends run with bounded concurrency.
+    """
+    from sqlalchemy.orm import joinedload
+    from app.models.contact import Contact
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _send(args):
+        async with semaphore:
+            await _send_gmail_email(*args)
+
+    chunk_size = 500
+    for i in range(0, len(contact_ids), chunk_size):
+        db = SessionLocal()
+        try:
+            contacts = db.query(Contact).options(joinedload(Contact.workspace)).filter(
+                Contact.id.in_(contact_ids[i:i + chunk_size])
+            ).all()
+            batch = [_welcome_email_args(c, booking_url) for c in contacts]
+        finally:
+            db.close()
+
+        await asyncio.gather(*[_send(args) for args in batch])
+
 async def send_booking_confirmation(booking_id: int):
     from app.models.booking import Booking
     
@@ -551,16 +590,34 @@ async def send_reply_email(message_id: int):
             body_content=body,
             workspace_name=workspace.name,
             workspace_address=workspace.address,
-            preview_text=message.content[:100]
+            preview_text=message.preview[:100]
         )
         
         if conversation.contact.email:
+             # Thread under the client's latest email, and stamp our own Message-ID
+             # so their answer maps back to this conversation (app/services/mail_threads.py)
+             parent = db.query(Message.message_id_header, Message.reference_ids).filter(
+                 Message.conversation_id == conversation.id,
+                 Message.id != message.id,
+                 Message.message_id_header.isnot(None)
+             ).order_by(Message.created_at.desc(), Message.id.desc()).first()
+             headers = mail_threads.reply_headers(
+                 {"message-id": parent[0], "references": parent[1] or ""} if parent else {}
+             )
+             if not message.message_id_header:
+                 message.message_id_header = make_msgid()
+                 message.in_reply_to = headers.get("In-Reply-To")
+                 message.reference_ids = headers.get("References")
+                 db.commit()
+             headers["Message-ID"] = message.message_id_header
+
              log_data = {
                 "workspace_id": conversation.workspace_id,
                 "contact_id": conversation.contact_id,
                 "type": "reply"
              }
-             email_args = (conversation.contact.email, subject, html, log_data)
+             email_args = (conversation.contact.email, subject, html, log_data, None,
+                           headers, conversation.gmail_thread_id)
              
     finally:
         db.close()
@@ -705,6 +762,49 @@ async def send_staff_invite(email: str, password: str):
     if email_args:
         await _send_gmail_email(*email_args)
 
+def _cancellation_email_args(booking):
+    if not booking.contact or not booking.contact.email:
+        return None
+    workspace = booking.workspace
+
+    customer_name = booking.contact.first_name or "there"
+    date_str = booking.start_time.strftime('%A, %B %d')
+    time_str = booking.start_time.strftime('%I:%M %p')
+
+    # FIXED: Corrected path for public booking page
+    booking_link = f"{settings.FRONTEND_URL}/workspaces/{workspace.slug}/book"
+
+    subject = "Your booking has been cancelled"
+
+    body = f"""
+        <p style="margin: 0 0 16px 0; color: #3c4257;">Hi {customer_name},</p>
+        <p style="margin: 0 0 16px 0; color: #3c4257;">Your appointment for <strong>{date_str} at {time_str}</strong> has been cancelled.</p>
+        <p style="margin: 0 0 16px 0; color: #3c4257;">We hope to see you again soon.</p>
+
+        <p style="font-size: 12px; color: #6b7280; border-top: 1px solid #e5e7eb; padding-top: 16px; margin-top: 32px;">
+            {workspace.name}<br>
+            {workspace.address or ''}
+        </p>
+    """
+
+    html = _render_email_template(
+        title="Appointment Cancelled",
+        body_content=body,
+        workspace_name=workspace.name,
+        workspace_address=workspace.address,
+        action_button_text="Book Again Anytime",
+        action_button_url=booking_link,
+        preview_text="Cancellation confirmation for your appointment."
+    )
+
+    log_data = {
+        "workspace_id": booking.workspace_id,
+        "contact_id": booking.contact_id,
+        "booking_id": booking.id,
+        "type": "cancellation"
+    }
+    return (booking.contact.email, subject, html, log_data)
+
 async def send_booking_cancellation(booking_id: int):
     from app.models.booking import Booking
     
@@ -712,53 +812,95 @@ async def send_booking_cancellation(booking_id: int):
     email_args = None
     try:
         booking = db.query(Booking).filter(Booking.id == booking_id).first()
-        if not booking or not booking.contact: return
-        workspace = booking.workspace
-        
-        customer_name = (booking.contact and booking.contact.first_name) or "there"
-        date_str = booking.start_time.strftime('%A, %B %d')
-        time_str = booking.start_time.strftime('%I:%M %p')
-        
-        # FIXED: Corrected path for public booking page
-        booking_link = f"{settings.FRONTEND_URL}/workspaces/{workspace.slug}/book"
-
-        subject = "Your booking has been cancelled"
-        
-        body = f"""
-            <p style="margin: 0 0 16px 0; color: #3c4257;">Hi {customer_name},</p>
-            <p style="margin: 0 0 16px 0; color: #3c4257;">Your appointment for <strong>{date_str} at {time_str}</strong> has been cancelled.</p>
-            <p style="margin: 0 0 16px 0; color: #3c4257;">We hope to see you again soon.</p>
-            
-            <p style="font-size: 12px; color: #6b7280; border-top: 1px solid #e5e7eb; padding-top: 16px; margin-top: 32px;">
-                {workspace.name}<br>
-                {address}
-            </p>
-        """,
-        
-        html = _render_email_template(
-            title="Appointment Cancelled",
-            body_content=body,
-            workspace_name=workspace.name,
-            workspace_address=workspace.address,
-            action_button_text="Book Again Anytime",
-            action_button_url=booking_link,
-            preview_text="Cancellation confirmation for your appointment."
-        )
-        
-        if booking.contact.email:
-             log_data = {
-                "workspace_id": booking.workspace_id,
-                "contact_id": booking.contact_id,
-                "booking_id": booking.id,
-                "type": "cancellation"
-             }
-             email_args = (booking.contact.email, subject, html, log_data)
+        if not booking: return
+        email_args = _cancellation_email_args(booking)
     finally:
         db.close()
         
     if email_args:
         await _send_gmail_email(*email_args)
 
+async def send_booking_cancellations_bulk(booking_ids: List[int], concurrency: int = 5):
+    """
+    Cancellation emails for a batch of bookings (bulk cancel): bookings are
+    loaded with one query and sent with bounded concurrency.
+    """
+    from sqlalchemy.orm import joinedload
+    from app.models.booking import Booking
+
+    db = SessionLocal()
+    try:
+        bookings = db.query(Booking).options(
+            joinedload(Booking.contact), joinedload(Booking.workspace)
+        ).filter(Booking.id.in_(booking_ids)).all()
+        batch = [args for args in map(_cancellation_email_args, bookings) if args]
+    finally:
+        db.close()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _send(args):
+        async with semaphore:
+            await _send_gmail_email(*args)
+
+    await asyncio.gather(*[_send(args) for args in batch])
+
+async def send_waitlist_openings(entry_ids: List[int], slot_start: datetime, concurrency: int = 5):
+    """
+    Tell a batch of waitlisted clients that a slot opened up. The entries are
+    loaded with one query and sent with bounded concurrency; whoever books
+    first gets the slot.
+    """
+    from sqlalchemy.orm import joinedload
+    from app.models.waitlist import WaitlistEntry
+
+    db = SessionLocal()
+    batch = []
+    try:
+        entries = db.query(WaitlistEntry).options(
+            joinedload(WaitlistEntry.contact), joinedload(WaitlistEntry.service)
+        ).filter(WaitlistEntry.id.in_(entry_ids)).all()
+        date_str = slot_start.strftime('%A, %B %d')
+        time_str = slot_start.strftime('%I:%M %p')
+
+        for entry in entries:
+            contact, service = entry.contact, entry.service
+            if not contact or not contact.email:
+                continue
+            workspace = service.workspace
+            booking_link = f"{settings.FRONTEND_URL}/workspaces/{workspace.slug}/book"
+            subject = f"A {service.name} slot just opened up"
+            body = f"""
+                <p style="margin: 0 0 16px 0; color: #3c4257;">Hi {contact.first_name or 'there'},</p>
+                <p style="margin: 0 0 16px 0; color: #3c4257;">You're on the waitlist for <strong>{service.name}</strong>, and <strong>{date_str} at {time_str}</strong> has just become available.</p>
+                <p style="margin: 0 0 16px 0; color: #3c4257;">Openings go to whoever books first.</p>
+            """
+            html = _render_email_template(
+                title="A slot opened up",
+                body_content=body,
+                workspace_name=workspace.name,
+                workspace_address=workspace.address,
+                action_button_text="Book Now",
+                action_button_url=booking_link,
+                preview_text=f"{date_str} at {time_str} is now available."
+            )
+            log_data = {
+                "workspace_id": entry.workspace_id,
+                "contact_id": contact.id,
+                "type": "waitlist_opening"
+            }
+            batch.append((contact.email, subject, html, log_data))
+    finally:
+        db.close()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _send(args):
+        async with semaphore:
+            await _send_gmail_email(*args)
+
+    await asyncio.gather(*[_send(args) for args in batch])
+
 async def send_booking_reschedule(booking_id: int):
     from app.models.booking import Booking
     
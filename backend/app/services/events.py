@@ -0,0 +1,307 @@
+"""
+Live Events
+
+Pushes workspace changes to open dashboards (GET /api/events/stream, SSE)
+instead of having them poll:
+
+- booking.created / booking.updated / booking.cancelled
+- contact.created / contact.updated
+- message.created      any new inbox message (inbound or a staff reply)
+- inventory.low        stock fell to or below the item's threshold
+- email.failed         an outgoing email's log row was marked failed
+
+An after_flush listener derives events from the flushed rows themselves, so
+every writer (API, cron, Gmail sync, email sender) is covered without explicit
+calls; set-based UPDATEs, which it can't see, call emit_many() themselves.
+Events are only delivered once the transaction commits:
+
+- in-process (default): held in session.info and published on after_commit,
+  dropped on rollback;
+- LIVE_EVENTS_PG_BRIDGE on Postgres: sent with pg_notify inside the
+  transaction (Postgres delivers NOTIFY on commit only) and every worker's
+  LISTEN connection feeds its local subscribers, whichever worker wrote.
+
+Subscribers get a bounded queue each; one that falls behind gets its queue
+replaced by a single "resync" event, telling the client to refetch.
+
+The same events feed the outbound webhook outbox (app/services/webhooks.py),
+written in the flush's own transaction.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.core.config import settings
+from app.core.time_utils import ensure_utc
+from app.db.session import engine
+from app.models.booking import Booking, BookingStatus
+from app.models.communication_log import CommunicationLog
+from app.models.contact import Contact
+from app.models.conversation import Conversation, Message
+from app.models.inventory import InventoryItem
+from app.services import webhooks
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "careops_events"
+RESYNC = "resync"
+BRIDGE_RETRY_SECONDS = 5
+
+_PENDING = "live_events"
+
+
+def _iso(dt: Optional[datetime]) -> Optional[str]:
+    if dt is None:
+        return None
+    return ensure_utc(dt).isoformat()
+
+
+def make_event(workspace_id: int, type_: str, data: dict) -> dict:
+    return {"id": uuid.uuid4().hex, "type": type_, "workspace_id": workspace_id, "data": data,
+            "at": datetime.now(timezone.utc).isoformat()}
+
+
+# ---------------------------------------------------------
+# BUS
+# ---------------------------------------------------------
+
+class EventBus:
+    """Per-workspace fan-out to subscriber queues, all on the event loop."""
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._bridge: Optional[asyncio.Task] = None
+
+    def subscribe(self, workspace_id: int) -> asyncio.Queue:
+        """Must be called on the event loop."""
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.LIVE_EVENTS_QUEUE_SIZE)
+        self._subscribers.setdefault(workspace_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, workspace_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(workspace_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[workspace_id]
+
+    def publish(self, evt: dict) -> None:
+        """Deliver to local subscribers; safe to call from any thread."""
+        loop = self._loop
+        if evt["workspace_id"] not in self._subscribers or loop is None or loop.is_closed():
+            return  # Nobody listening here
+        try:
+            loop.call_soon_threadsafe(self._deliver, evt)
+        except RuntimeError:
+            pass  # Loop shut down in between
+
+    def _deliver(self, evt: dict) -> None:
+        for queue in list(self._subscribers.get(evt["workspace_id"], ())):
+            try:
+                queue.put_nowait(evt)
+            except asyncio.QueueFull:
+                # Too far behind to catch up event by event
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(make_event(evt["workspace_id"], RESYNC, {}))
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    # -- Postgres bridge ------------------------------------------------
+
+    @staticmethod
+    def bridged() -> bool:
+        return settings.LIVE_EVENTS_PG_BRIDGE and engine.dialect.name == "postgresql"
+
+    def start(self) -> None:
+        if self.bridged() and self._bridge is None:
+            self._loop = asyncio.get_running_loop()
+            self._bridge = asyncio.create_task(self._listen_forever())
+            logger.info("[EVENTS] Listening for events on Postgres channel %s", CHANNEL)
+
+    async def stop(self) -> None:
+        if self._bridge is not None:
+            self._bridge.cancel()
+            try:
+                await self._bridge
+            except asyncio.CancelledError:
+                pass
+            self._bridge = None
+
+    async def _listen_forever(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("[EVENTS] LISTEN connection failed")
+            await asyncio.sleep(BRIDGE_RETRY_SECONDS)
+
+    async def _listen(self) -> None:
+        loop = asyncio.get_running_loop()
+        raw = engine.raw_connection()
+        conn = raw.driver_connection  # psycopg2
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+            lost = loop.create_future()
+
+            def on_readable():
+                try:
+                    conn.poll()
+                except Exception as exc:
+                    if not lost.done():
+                        lost.set_exception(exc)
+                    return
+                while conn.notifies:
+                    try:
+                        self._deliver(json.loads(conn.notifies.pop(0).payload))
+                    except (ValueError, KeyError):
+                        logger.warning("[EVENTS] Ignoring malformed notification")
+
+            loop.add_reader(conn.fileno(), on_readable)
+            try:
+                await lost
+            finally:
+                loop.remove_reader(conn.fileno())
+        finally:
+            raw.invalidate()  # Never hand a LISTENing connection back to the pool
+
+
+event_bus = EventBus()
+
+
+# ---------------------------------------------------------
+# EMITTING
+# ---------------------------------------------------------
+
+def emit(session: Session, workspace_id: int, type_: str, data: dict) -> None:
+    """Queue an event for delivery when the session's transaction commits."""
+    _emit_all(session, [make_event(workspace_id, type_, data)])
+
+
+def emit_many(session: Session, events: List[dict]) -> None:
+    """emit() for a batch, e.g. rows changed by a set-based UPDATE the flush listener never sees."""
+    _emit_all(session, events)
+
+
+def booking_event(booking: Booking, type_: str) -> dict:
+    return make_event(booking.workspace_id, type_, _booking_data(booking))
+
+
+def contact_event(contact: Contact, type_: str) -> dict:
+    """Also takes a row RETURNING the contact columns, e.g. from a bulk INSERT."""
+    return make_event(contact.workspace_id, type_, _contact_data(contact))
+
+
+def _emit_all(session: Session, events: List[dict]) -> None:
+    if not events:
+        return
+    webhooks.enqueue(session, events)
+    if event_bus.bridged():
+        for evt in events:
+            session.connection().execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": CHANNEL, "payload": json.dumps(evt)},
+            )
+    else:
+        session.info.setdefault(_PENDING, []).extend(events)
+
+
+def _change(obj, field: str = "status"):
+    """(old, new) if the attribute changed in this flush, else None."""
+    history = get_history(obj, field)
+    if not history.added:
+        return None
+    return (history.deleted[0] if history.deleted else None), history.added[0]
+
+
+CONTACT_FIELDS = ("email", "full_name", "phone", "status")
+
+
+def _booking_data(booking: Booking) -> dict:
+    return {"booking_id": booking.id, "service_id": booking.service_id, "status": booking.status,
+            "start_time": _iso(booking.start_time)}
+
+
+def _contact_data(contact: Contact) -> dict:
+    return {"contact_id": contact.id, "email": contact.email, "full_name": contact.full_name,
+            "phone": contact.phone, "status": contact.status, "source": contact.source}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect(session: Session, flush_context) -> None:
+    events: List[dict] = []
+    messages: List[Message] = []
+
+    for obj in session.new:
+        if isinstance(obj, Booking) and obj.workspace_id:
+            events.append(make_event(obj.workspace_id, "booking.created", _booking_data(obj)))
+        elif isinstance(obj, Contact) and obj.workspace_id:
+            events.append(make_event(obj.workspace_id, "contact.created", _contact_data(obj)))
+        elif isinstance(obj, Message):
+            messages.append(obj)
+        elif isinstance(obj, CommunicationLog) and obj.status == "failed":
+            events.append(make_event(obj.workspace_id, "email.failed", {"log_id": obj.id, "type": obj.type}))
+
+    for obj in session.dirty:
+        if isinstance(obj, Booking) and obj.workspace_id:
+            change = _change(obj)
+            if change and change[1] == BookingStatus.CANCELLED.value:
+                events.append(make_event(obj.workspace_id, "booking.cancelled", _booking_data(obj)))
+            elif change or _change(obj, "start_time"):
+                events.append(make_event(obj.workspace_id, "booking.updated", _booking_data(obj)))
+        elif isinstance(obj, Contact) and obj.workspace_id:
+            if any(_change(obj, field) for field in CONTACT_FIELDS):
+                events.append(make_event(obj.workspace_id, "contact.updated", _contact_data(obj)))
+        elif isinstance(obj, InventoryItem) and obj.workspace_id:
+            change = _change(obj, "quantity")
+            threshold = obj.threshold or 0
+            # Only a known crossing counts; writers read the quantity before changing it
+            if change and change[0] is not None and change[1] is not None and change[1] <= threshold < change[0]:
+                events.append(make_event(obj.workspace_id, "inventory.low",
+                                         {"item_id": obj.id, "name": obj.name, "quantity": obj.quantity}))
+        elif isinstance(obj, CommunicationLog):
+            change = _change(obj)
+            if change and change[1] == "failed":
+                events.append(make_event(obj.workspace_id, "email.failed", {"log_id": obj.id, "type": obj.type}))
+
+    if messages:
+        # Messages only know their conversation; one lookup for the whole flush
+        conversation_ids = {m.conversation_id for m in messages}
+        workspaces = dict(session.connection().execute(
+            select(Conversation.id, Conversation.workspace_id).where(Conversation.id.in_(conversation_ids))
+        ).all())
+        for message in messages:
+            workspace_id = workspaces.get(message.conversation_id)
+            if workspace_id:
+                events.append(make_event(workspace_id, "message.created", {
+                    "message_id": message.id, "conversation_id": message.conversation_id,
+                    "is_internal": bool(message.is_internal),
+                }))
+
+    _emit_all(session, events)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish(session: Session) -> None:
+    for evt in session.info.pop(_PENDING, ()):
+        event_bus.publish(evt)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING, None)
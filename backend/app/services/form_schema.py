@@ -0,0 +1,194 @@
+"""
+Form Schema
+
+Compiles a Form.fields definition once into a validator / contact extractor
+and caches it per form, keyed by (form id, version).
+
+- `update_form` bumps Form.version and calls `invalidate()`, so a stale entry
+  is never served, even by another worker that missed the invalidation.
+- Submissions are validated in a single pass over the compiled fields.
+- Contact mapping (email / full_name / phone ...) is resolved at compile time,
+  from the field's explicit `maps_to` or, for older forms, from its type/name.
+  Pre-fill and extraction are then plain dictionary lookups.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTACT_FIELDS = ("email", "full_name", "first_name", "last_name", "phone")
+
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+PHONE_RE = re.compile(r"^\+?[0-9 ()\-.]{5,20}$")
+
+# Used when a workspace has no intake form yet
+DEFAULT_INTAKE_FIELDS = [
+    {"name": "notes", "type": "textarea", "label": "Anything we should know?", "required": False},
+]
+
+
+class FormValidationError(ValueError):
+    def __init__(self, errors: Dict[str, str]):
+        self.errors = errors
+        super().__init__("; ".join(f"{name}: {msg}" for name, msg in errors.items()))
+
+
+@dataclass(frozen=True)
+class CompiledField:
+    name: str
+    type: str
+    required: bool
+    options: Optional[frozenset]
+    maps_to: Optional[str]
+
+
+def _infer_mapping(field: Dict) -> Optional[str]:
+    """Legacy forms have no `maps_to`; guess from type, then name/label."""
+    f_type = (field.get("type") or "").lower()
+    if f_type == "email":
+        return "email"
+    if f_type in ("phone", "tel"):
+        return "phone"
+
+    key = f"{field.get('name', '')} {field.get('label', '')}".lower()
+    if "email" in key:
+        return "email"
+    if "phone" in key:
+        return "phone"
+    if "first" in key and "name" in key:
+        return "first_name"
+    if "last" in key and "name" in key:
+        return "last_name"
+    if "name" in key:
+        return "full_name"
+    return None
+
+
+# ---------------------------------------------------------
+# COMPILED FORM
+# ---------------------------------------------------------
+
+class CompiledForm:
+    def __init__(self, form_id: Optional[int], version: int, fields: List[Dict]):
+        self.form_id = form_id
+        self.version = version
+        self.fields: Tuple[CompiledField, ...] = tuple(
+            CompiledField(
+                name=f["name"],
+                type=(f.get("type") or "text").lower(),
+                required=bool(f.get("required")),
+                options=frozenset(f["options"]) if f.get("options") else None,
+                maps_to=f.get("maps_to") or _infer_mapping(f),
+            )
+            for f in fields or [] if f.get("name")
+        )
+        # contact attribute -> form field name (first field wins)
+        self.contact_map: Dict[str, str] = {}
+        for field in self.fields:
+            if field.maps_to in CONTACT_FIELDS:
+                self.contact_map.setdefault(field.maps_to, field.name)
+
+    def validate(self, answers: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return the cleaned answers (declared fields only, strings stripped).
+        Raises FormValidationError listing every bad field.
+        A form without declared fields accepts answers as-is.
+        """
+        if not self.fields:
+            return dict(answers)
+
+        cleaned: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for field in self.fields:
+            value = answers.get(field.name)
+            if isinstance(value, str):
+                value = value.strip()
+            if value in (None, "", []):
+                if field.required:
+                    errors[field.name] = "This field is required"
+                continue
+
+            error = self._check_type(field, value)
+            if error:
+                errors[field.name] = error
+            else:
+                cleaned[field.name] = value
+
+        if errors:
+            raise FormValidationError(errors)
+        return cleaned
+
+    @staticmethod
+    def _check_type(field: CompiledField, value: Any) -> Optional[str]:
+        if field.type == "email":
+            if not isinstance(value, str) or not EMAIL_RE.match(value):
+                return "Enter a valid email address"
+        elif field.type in ("phone", "tel"):
+            if not isinstance(value, str) or not PHONE_RE.match(value):
+                return "Enter a valid phone number"
+        elif field.type == "number":
+            try:
+                float(value)
+            except (TypeError, ValueError):
+                return "Enter a number"
+        elif field.type == "select" and field.options is not None:
+            # Lists / dicts are unhashable, so check the type before the set lookup
+            if not isinstance(value, (str, int, float)) or value not in field.options:
+                return "Choose one of the listed options"
+        elif not isinstance(value, (str, int, float)):
+            return "Expected text"
+        return None
+
+    def extract_contact(self, cleaned: Dict[str, Any]) -> Dict[str, Any]:
+        """Contact attributes present in a validated submission."""
+        contact = {attr: cleaned[name] for attr, name in self.contact_map.items() if name in cleaned}
+        if "full_name" not in contact and ("first_name" in contact or "last_name" in contact):
+            contact["full_name"] = " ".join(
+                str(contact[p]) for p in ("first_name", "last_name") if contact.get(p)
+            )
+        return contact
+
+    def prefill(self, contact) -> Dict[str, Any]:
+        """Form answers pre-filled from a Contact."""
+        if contact is None:
+            return {}
+        values = {name: getattr(contact, attr, None) for attr, name in self.contact_map.items()}
+        return {name: value for name, value in values.items() if value}
+
+
+# ---------------------------------------------------------
+# CACHE
+# ---------------------------------------------------------
+
+_cache: Dict[int, CompiledForm] = {}
+_stats = {"hits": 0, "misses": 0}
+
+DEFAULT_INTAKE = CompiledForm(None, 0, DEFAULT_INTAKE_FIELDS)
+
+
+def get_compiled_form(form) -> CompiledForm:
+    """Compiled validator for a Form row (or the default intake form when None)."""
+    if form is None:
+        return DEFAULT_INTAKE
+
+    version = form.version or 1
+    compiled = _cache.get(form.id)
+    if compiled is not None and compiled.version == version:
+        _stats["hits"] += 1
+        return compiled
+
+    _stats["misses"] += 1
+    compiled = CompiledForm(form.id, version, form.fields or [])
+    _cache[form.id] = compiled
+    return compiled
+
+
+def invalidate(form_id: int) -> None:
+    _cache.pop(form_id, None)
+
+
+def cache_stats() -> Dict[str, int]:
+    return {**_stats, "size": len(_cache)}
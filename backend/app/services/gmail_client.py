@@ -13,10 +13,6 @@ Key Features:
 from typing import Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 
 from app.models.email_integration import EmailIntegration
 from app.core.security_utils import encrypt_token, decrypt_token
@@ -75,6 +71,9 @@ class GmailClientService:
                 db.commit()
                 return False
             
+            from google.auth.transport.requests import Request
+            from google.oauth2.credentials import Credentials
+
             # Create credentials with refresh token
             creds = Credentials(
                 token=None,
@@ -141,6 +140,10 @@ class GmailClientService:
         if not access_token:
             raise ValueError(f"Invalid access token for workspace {workspace_id}")
         
+        # Imported here: the Google client stack is slow to load and most processes never send mail
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build
+
         # Create credentials
         creds = Credentials(
             token=access_token,
@@ -0,0 +1,121 @@
+"""
+HTTP Cache
+
+Validators and Cache-Control policies for the public read endpoints, so
+browsers and CDNs in front of the booking pages can revalidate instead of
+refetching:
+
+- GET /api/public/workspace/{slug}, GET /api/bookings/services/{slug}
+    ETag from the workspace's change counter, carried by its catalog snapshot
+    (catalog.py), so a revalidation is answered without touching the database.
+- GET /api/public/forms/{form_id}
+    ETag from the form's change counter, read before the form itself.
+- GET /api/public/services/{id}/availability
+    ETag hashed from the slot list, which comes out of the availability cache;
+    a per-service counter would move with every booking and revalidate every
+    date of the service at once.
+
+Counters live in resource_versions and are bumped in the same flush as the
+change: workspaces by catalog.py's listener (public fields, any service),
+forms by the listener below (including a rename of their workspace, whose
+name and slug the form page shows). A counter is always read before the
+content it labels, so a body is never older than its ETag.
+"""
+
+import hashlib
+import json
+import logging
+from itertools import chain
+from typing import Iterable, Optional, Set, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.db.upsert import bump_versions
+from app.models.form import Form
+from app.models.resource_version import ResourceVersion
+from app.models.workspace import Workspace
+
+logger = logging.getLogger(__name__)
+
+WORKSPACE = "workspace"
+FORM = "form"
+
+ResourceKey = Tuple[str, int]  # (kind, resource_id)
+
+# Form and workspace columns shown on the public form page
+_FORM_FIELDS = ("name", "fields", "google_form_url", "is_public", "workspace_id")
+_FORM_WORKSPACE_FIELDS = ("name", "slug")
+
+
+# ---------------------------------------------------------
+# CHANGE COUNTERS
+# ---------------------------------------------------------
+
+def bump(db: Session, keys: Iterable[ResourceKey]) -> None:
+    """Advance the change counters of `keys`, creating them as needed."""
+    bump_versions(db, ResourceVersion.__table__, ("kind", "resource_id"), keys)
+
+
+def version(db: Session, kind: str, resource_id: int) -> int:
+    row = db.get(ResourceVersion, (kind, resource_id))
+    return row.version if row else 0
+
+
+@event.listens_for(Session, "before_flush")
+def _track_changes(session: Session, flush_context, instances) -> None:
+    keys: Set[ResourceKey] = set()
+    renamed: Set[int] = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Form) and obj.id is not None:
+            if obj in session.dirty and not any(get_history(obj, f).has_changes() for f in _FORM_FIELDS):
+                continue
+            keys.add((FORM, obj.id))
+        elif isinstance(obj, Workspace) and obj in session.dirty and obj.id is not None:
+            if any(get_history(obj, f).has_changes() for f in _FORM_WORKSPACE_FIELDS):
+                renamed.add(obj.id)
+    if renamed:
+        form_ids = session.connection().execute(select(Form.id).where(Form.workspace_id.in_(renamed))).scalars()
+        keys.update((FORM, form_id) for form_id in form_ids)
+    if keys:
+        bump(session, keys)
+
+
+# ---------------------------------------------------------
+# VALIDATORS
+# ---------------------------------------------------------
+
+def etag(*parts) -> str:
+    """Strong ETag from a resource's identity and change counter."""
+    return '"' + ".".join(str(part) for part in parts) + '"'
+
+
+def content_etag(payload) -> str:
+    """Strong ETag hashed from a JSON-serializable body."""
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return '"' + hashlib.sha1(body.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def not_modified(request: Request, tag: str) -> bool:
+    """Does If-None-Match name `tag`? (Weak comparison, as RFC 9110 requires for GET.)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {t.strip().removeprefix("W/") for t in header.split(",")}
+    return tag.removeprefix("W/") in candidates
+
+
+def conditional(request: Request, response: Response, tag: str, cache_control: str) -> Optional[Response]:
+    """
+    Put the validator and policy on `response`; return a 304 to send instead
+    if the client already holds this version.
+    """
+    headers = {"ETag": tag, "Cache-Control": cache_control}
+    if not_modified(request, tag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
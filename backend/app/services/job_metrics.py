@@ -0,0 +1,86 @@
+"""
+Job Metrics
+
+Per-job instrumentation for cron runs: rows scanned, emails dispatched,
+time spent in the database, time spent waiting on Gmail.
+
+The active collector lives in a ContextVar, so concurrent jobs (each its own
+asyncio task) are counted separately, and code outside a job pays only for
+one ContextVar lookup. DB time comes from engine cursor events; Gmail time
+is measured around the API call in email._send_gmail_email.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class JobMetrics:
+    rows_scanned: int = 0
+    emails_sent: int = 0
+    db_ms: float = 0.0
+    gmail_ms: float = 0.0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "rows_scanned": self.rows_scanned,
+            "emails_sent": self.emails_sent,
+            "db_ms": int(self.db_ms),
+            "gmail_ms": int(self.gmail_ms),
+        }
+
+
+_current: ContextVar[Optional[JobMetrics]] = ContextVar("job_metrics", default=None)
+
+
+@contextmanager
+def collect() -> Iterator[JobMetrics]:
+    """Collect metrics for everything run in this task until the block exits."""
+    metrics = JobMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+def scanned(rows: int) -> None:
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.rows_scanned += rows
+
+
+@contextmanager
+def gmail_call() -> Iterator[None]:
+    metrics = _current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.emails_sent += 1
+            metrics.gmail_ms += (time.perf_counter() - started) * 1000
+
+
+# ---------------------------------------------------------
+# DB TIME
+# ---------------------------------------------------------
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info["job_metrics_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("job_metrics_started", None)
+    metrics = _current.get()
+    if metrics is not None and started is not None:
+        metrics.db_ms += (time.perf_counter() - started) * 1000
@@ -0,0 +1,202 @@
+"""
+Job Runner
+
+Runs named cron jobs so that each one executes at most once at a time
+across every worker and replica.
+
+- Each job has its own lease row in `job_leases`. A runner takes it with a
+  single conditional UPDATE (free, expired, or already ours), so the
+  database decides the winner on both SQLite and Postgres.
+- While a job runs, a heartbeat extends the lease; if the process dies the
+  lease simply expires after CRON_JOB_LEASE_SECONDS.
+- Every execution is recorded in `cron_runs`: status, wall time, result and
+  the job_metrics counters (rows scanned, emails, DB / Gmail time).
+
+Different jobs hold different leases, so they run in parallel. A job can
+also be split into workspace shards (workspace_id % count); every shard has
+its own lease, session and commits, so a slow tenant only holds up its shard
+and replicas can work through different shards of the same job.
+
+Jobs that depend on each other go in separate stages (run_stages): each
+stage starts only once every job of the previous one has finished.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Sequence
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.upsert import insert_for
+from app.models.cron import JobLease, CronRun
+from app.services import job_metrics
+
+logger = logging.getLogger(__name__)
+
+JobFn = Callable[..., Awaitable[Dict]]  # fn(db) or, when sharded, fn(db, shard)
+
+
+@dataclass(frozen=True)
+class Shard:
+    index: int
+    count: int
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def filter(self, query, workspace_column):
+        """Restrict a query to the workspaces in this shard."""
+        return query.filter(workspace_column % self.count == self.index)
+
+    def owns(self, workspace_id: int) -> bool:
+        return workspace_id % self.count == self.index
+
+
+def _new_holder() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+# ---------------------------------------------------------
+# LEASES
+# ---------------------------------------------------------
+
+def acquire_lease(db: Session, name: str, holder: str, ttl_seconds: int, now: Optional[datetime] = None) -> bool:
+    """Take the job's lease if it is free or expired. True if `holder` now owns it."""
+    now = now or datetime.now(timezone.utc)
+    db.execute(insert_for(db, JobLease).values(name=name).on_conflict_do_nothing())
+    taken = db.query(JobLease).filter(
+        JobLease.name == name,
+        or_(JobLease.lease_until == None, JobLease.lease_until < now, JobLease.holder == holder),
+    ).update({
+        JobLease.holder: holder,
+        JobLease.lease_until: now + timedelta(seconds=ttl_seconds),
+        JobLease.acquired_at: now,
+    }, synchronize_session=False)
+    db.commit()
+    return taken == 1
+
+
+def renew_lease(db: Session, name: str, holder: str, ttl_seconds: int) -> bool:
+    renewed = db.query(JobLease).filter(
+        JobLease.name == name, JobLease.holder == holder,
+    ).update({
+        JobLease.lease_until: datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds),
+    }, synchronize_session=False)
+    db.commit()
+    return renewed == 1
+
+
+def release_lease(db: Session, name: str, holder: str) -> None:
+    # Only the holder may release; a runner whose lease expired and was taken over can't free the new one
+    db.query(JobLease).filter(
+        JobLease.name == name, JobLease.holder == holder,
+    ).update({JobLease.lease_until: None}, synchronize_session=False)
+    db.commit()
+
+
+async def _heartbeat(name: str, holder: str, ttl_seconds: int) -> None:
+    while True:
+        await asyncio.sleep(max(1, ttl_seconds // 3))
+        db = SessionLocal()
+        try:
+            if not renew_lease(db, name, holder, ttl_seconds):
+                logger.warning(f"[JOBS] Lost lease for {name}")
+                return
+        finally:
+            db.close()
+
+
+# ---------------------------------------------------------
+# RUNNING
+# ---------------------------------------------------------
+
+def lease_name(name: str, shard: Optional[Shard] = None) -> str:
+    return f"{name}:{shard}" if shard else name
+
+
+async def run_job(name: str, fn: JobFn, ttl_seconds: Optional[int] = None, shard: Optional[Shard] = None) -> Dict:
+    """
+    Run one job (or one shard of it) under its lease with its own session.
+    Returns {"status": "skipped"} if another runner holds the lease.
+    """
+    ttl_seconds = ttl_seconds or settings.CRON_JOB_LEASE_SECONDS
+    lease = lease_name(name, shard)
+    holder = _new_holder()
+    db = SessionLocal()
+    try:
+        if not acquire_lease(db, lease, holder, ttl_seconds):
+            logger.info(f"[JOBS] {lease} already running elsewhere, skipped")
+            return {"status": "skipped"}
+
+        run = CronRun(job=name, shard=str(shard) if shard else None, holder=holder,
+                      status="running", started_at=datetime.now(timezone.utc))
+        db.add(run)
+        db.commit()
+
+        heartbeat = asyncio.create_task(_heartbeat(lease, holder, ttl_seconds))
+        started = time.perf_counter()
+        with job_metrics.collect() as metrics:
+            try:
+                result = await (fn(db, shard) if shard else fn(db))
+                run.status = "success"
+                run.result = result
+            except Exception as e:
+                db.rollback()
+                logger.error(f"[JOBS] {lease} failed: {e}")
+                result = None
+                run.status = "failed"
+                run.error = str(e)
+            finally:
+                heartbeat.cancel()
+
+        run.duration_ms = int((time.perf_counter() - started) * 1000)
+        run.finished_at = datetime.now(timezone.utc)
+        stats = metrics.as_dict()
+        for key, value in stats.items():
+            setattr(run, key, value)
+        db.add(run)
+        db.commit()
+        release_lease(db, lease, holder)
+        logger.info(f"[JOBS] {lease} {run.status} in {run.duration_ms}ms {stats}")
+        return {"status": run.status, "duration_ms": run.duration_ms, **stats, "result": result}
+    finally:
+        db.close()
+
+
+async def run_jobs(jobs: Dict[str, JobFn], shards: int = 1, only: Optional[Iterable[int]] = None) -> Dict[str, Dict]:
+    """
+    Run every job concurrently, each under its own lease. With shards > 1,
+    every (job, shard) pair is a separate task; `only` limits which shard
+    indexes this caller runs (e.g. one replica per shard).
+    Returns outcomes keyed by lease name.
+    """
+    if shards <= 1:
+        tasks = {name: run_job(name, fn) for name, fn in jobs.items()}
+    else:
+        indexes = sorted(set(only)) if only is not None else range(shards)
+        tasks = {}
+        for name, fn in jobs.items():
+            for index in indexes:
+                shard = Shard(index, shards)
+                tasks[lease_name(name, shard)] = run_job(name, fn, shard=shard)
+    outcomes = await asyncio.gather(*tasks.values())
+    return dict(zip(tasks.keys(), outcomes))
+
+
+async def run_stages(stages: Sequence[Dict[str, JobFn]], shards: int = 1,
+                     only: Optional[Iterable[int]] = None) -> Dict[str, Dict]:
+    """run_jobs() for each stage in turn. Returns the outcomes of every stage."""
+    only = list(only) if only is not None else None
+    outcomes: Dict[str, Dict] = {}
+    for jobs in stages:
+        outcomes.update(await run_jobs(jobs, shards=shards, only=only))
+    return outcomes
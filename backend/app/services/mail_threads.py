@@ -0,0 +1,97 @@
+"""
+Mail Threading
+
+Maps email threads onto conversations. A conversation remembers its Gmail
+threadId (unique per workspace) and every synced message its RFC 5322
+Message-ID, In-Reply-To and References. find_conversation() resolves a
+thread in one indexed lookup: the conversation that owns the Gmail thread,
+or failing that the one holding a message the thread refers to (a client
+answering an older email from a fresh Gmail thread). Failing both, the
+contact's latest conversation without a thread takes it over
+(unthreaded_conversation()): conversations from before threading, and lead
+conversations whose welcome / confirmation mail went out without a stored
+Message-ID. Anything else is a new conversation, so two threads running in
+parallel with the same client stay apart.
+"""
+
+import re
+from email.utils import parseaddr
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.conversation import Conversation, Message
+
+_MSG_ID = re.compile(r"<[^<>\s]+>")
+
+
+def gmail_headers(gmail_message: dict) -> Dict[str, str]:
+    """Headers of a Gmail API message, keyed in lower case (Message-ID arrives as Message-Id too)."""
+    return {h["name"].lower(): h["value"] for h in gmail_message.get("payload", {}).get("headers", [])}
+
+
+def header_ids(value: Optional[str]) -> List[str]:
+    """The <id@host> tokens of a Message-ID / In-Reply-To / References header, in order."""
+    return _MSG_ID.findall(value or "")
+
+
+def threading_fields(headers: Dict[str, str]) -> dict:
+    """Message column values for a message with these (lower-cased) headers."""
+    own = header_ids(headers.get("message-id"))
+    parent = header_ids(headers.get("in-reply-to"))
+    references = header_ids(headers.get("references"))
+    return {
+        "message_id_header": own[0] if own else None,
+        "in_reply_to": parent[-1] if parent else None,
+        "reference_ids": " ".join(references) or None,
+    }
+
+
+def reply_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """In-Reply-To / References for answering a message with these (lower-cased) headers."""
+    own = header_ids(headers.get("message-id"))
+    if not own:
+        return {}
+    chain = header_ids(headers.get("references")) or header_ids(headers.get("in-reply-to"))
+    return {"In-Reply-To": own[0], "References": " ".join(chain + own)}
+
+
+def thread_refs(gmail_messages: Iterable[dict]) -> List[str]:
+    """Every Message-ID a Gmail thread's messages carry or point at."""
+    refs = []
+    for gmail_message in gmail_messages:
+        headers = gmail_headers(gmail_message)
+        for name in ("message-id", "in-reply-to", "references"):
+            refs.extend(header_ids(headers.get(name)))
+    return list(dict.fromkeys(refs))
+
+
+def sender(headers: Dict[str, str]) -> str:
+    return parseaddr(headers.get("from", ""))[1]
+
+
+def find_conversation(db: Session, workspace_id: int, thread_id: str,
+                      refs: Iterable[str] = ()) -> Optional[Conversation]:
+    """The workspace's conversation for a Gmail thread, or None if the thread is new to us."""
+    refs = list(refs)
+    match = Conversation.gmail_thread_id == thread_id
+    if refs:
+        match = or_(match, Conversation.id.in_(
+            select(Message.conversation_id).where(Message.message_id_header.in_(refs))
+        ))
+    return db.query(Conversation).filter(
+        Conversation.workspace_id == workspace_id, match
+    ).order_by(
+        # The thread's own conversation wins over one it merely quotes
+        case((Conversation.gmail_thread_id == thread_id, 0), else_=1), Conversation.id.desc()
+    ).first()
+
+
+def unthreaded_conversation(db: Session, workspace_id: int, contact_id: int) -> Optional[Conversation]:
+    """The contact's latest conversation that no Gmail thread owns yet, to claim a thread find_conversation() missed."""
+    return db.query(Conversation).filter(
+        Conversation.workspace_id == workspace_id,
+        Conversation.contact_id == contact_id,
+        Conversation.gmail_thread_id.is_(None),
+    ).order_by(Conversation.created_at.desc(), Conversation.id.desc()).first()
@@ -0,0 +1,288 @@
+"""
+Recurrence
+
+Recurring booking series (app/models/booking_series.py) are stored as a
+compact RRULE subset and only ever expanded for the window being asked about:
+
+    FREQ=DAILY|WEEKLY|MONTHLY;INTERVAL=n;BYDAY=MO,TH (weekly);COUNT=n or UNTIL=YYYYMMDD[THHMMSSZ]
+
+Occurrences keep their wall-clock time in the series timezone, so a weekly
+10:00 visit stays at 10:00 across DST. Open-ended rules jump straight to the
+window instead of walking every period since the first occurrence.
+
+Occurrences starting before `series.materialized_until` are Booking rows;
+later ones are virtual. materialize() turns the next stretch into rows shortly
+before their reminders are due (scheduler, or the cron fallback), so reminders,
+cancellation and follow-ups work on real bookings while availability, the
+calendar and conflict checks see the virtual rest.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import pytz
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.time_utils import ensure_utc
+from app.models.booking import Booking, BookingStatus
+from app.models.booking_series import BookingSeries, SeriesStatus
+
+logger = logging.getLogger(__name__)
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+WEEKDAY_CODES = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+# Horizon for "the next occurrence" of sparse rules (e.g. yearly via MONTHLY;INTERVAL=12)
+NEXT_OCCURRENCE_HORIZON = timedelta(days=800)
+# Open end for walking a whole rule; the walk stops at COUNT/UNTIL or a caller's limit
+FAR_FUTURE = datetime(9000, 1, 1, tzinfo=timezone.utc)
+
+
+def _timezone(name: str):
+    try:
+        return pytz.timezone(name)
+    except pytz.UnknownTimeZoneError:
+        return pytz.UTC
+
+
+# ---------------------------------------------------------
+# RULES
+# ---------------------------------------------------------
+
+@dataclass(frozen=True)
+class Rule:
+    freq: str
+    interval: int = 1
+    byday: Tuple[int, ...] = ()  # weekday numbers (0=Monday), WEEKLY only
+    count: Optional[int] = None
+    until: Optional[datetime] = None  # inclusive, UTC
+
+    def __str__(self) -> str:
+        parts = [f"FREQ={self.freq}", f"INTERVAL={self.interval}"]
+        if self.byday:
+            parts.append("BYDAY=" + ",".join(WEEKDAY_CODES[d] for d in self.byday))
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until.strftime('%Y%m%dT%H%M%SZ')}")
+        return ";".join(parts)
+
+    @property
+    def bounded(self) -> bool:
+        return self.count is not None or self.until is not None
+
+
+@lru_cache(maxsize=1024)
+def parse_rule(text: str) -> Rule:
+    """Parse the supported RRULE subset. Raises ValueError with a readable message."""
+    text = text.strip()
+    if text.upper().startswith("RRULE:"):
+        text = text[6:]
+    try:
+        parts = dict(part.split("=", 1) for part in text.upper().split(";") if part)
+    except ValueError:
+        raise ValueError("rule must be KEY=VALUE pairs separated by ';'")
+
+    unknown = set(parts) - {"FREQ", "INTERVAL", "BYDAY", "COUNT", "UNTIL"}
+    if unknown:
+        raise ValueError(f"unsupported rule parts: {', '.join(sorted(unknown))}")
+    freq = parts.get("FREQ")
+    if freq not in FREQUENCIES:
+        raise ValueError(f"FREQ must be one of {', '.join(FREQUENCIES)}")
+    if "COUNT" in parts and "UNTIL" in parts:
+        raise ValueError("use COUNT or UNTIL, not both")
+
+    try:
+        interval = int(parts.get("INTERVAL", 1))
+        count = int(parts["COUNT"]) if "COUNT" in parts else None
+    except ValueError:
+        raise ValueError("INTERVAL and COUNT must be integers")
+    if interval < 1 or (count is not None and count < 1):
+        raise ValueError("INTERVAL and COUNT must be positive")
+
+    byday: Tuple[int, ...] = ()
+    if "BYDAY" in parts:
+        if freq != "WEEKLY":
+            raise ValueError("BYDAY is only supported with FREQ=WEEKLY")
+        try:
+            byday = tuple(sorted({WEEKDAY_CODES.index(code) for code in parts["BYDAY"].split(",")}))
+        except ValueError:
+            raise ValueError("BYDAY must list MO,TU,WE,TH,FR,SA,SU")
+
+    until = None
+    if "UNTIL" in parts:
+        raw = parts["UNTIL"]
+        try:
+            if "T" in raw:
+                until = datetime.strptime(raw.rstrip("Z"), "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+            else:
+                # A bare date includes that whole day
+                until = datetime.combine(datetime.strptime(raw, "%Y%m%d").date(), time.max, tzinfo=timezone.utc)
+        except ValueError:
+            raise ValueError("UNTIL must be YYYYMMDD or YYYYMMDDTHHMMSSZ")
+
+    return Rule(freq=freq, interval=interval, byday=byday, count=count, until=until)
+
+
+# ---------------------------------------------------------
+# EXPANSION
+# ---------------------------------------------------------
+
+def _monday(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def _period(rule: Rule, first: date, k: int) -> Tuple[date, List[date]]:
+    """(first day of period k, occurrence dates in it)."""
+    if rule.freq == "DAILY":
+        day = first + timedelta(days=k * rule.interval)
+        return day, [day]
+    if rule.freq == "WEEKLY":
+        week = _monday(first) + timedelta(weeks=k * rule.interval)
+        weekdays = rule.byday or (first.weekday(),)
+        return week, [week + timedelta(days=d) for d in weekdays]
+    months = first.month - 1 + k * rule.interval
+    year, month = first.year + months // 12, months % 12 + 1
+    try:
+        return date(year, month, 1), [date(year, month, first.day)]
+    except ValueError:
+        return date(year, month, 1), []  # e.g. the 31st in a 30-day month is skipped, as in RFC 5545
+
+
+def _first_period(rule: Rule, first: date, window_day: date) -> int:
+    if rule.count is not None or window_day <= first:
+        return 0  # COUNT is counted from the first occurrence
+    if rule.freq == "DAILY":
+        periods = (window_day - first).days // rule.interval
+    elif rule.freq == "WEEKLY":
+        periods = (window_day - _monday(first)).days // 7 // rule.interval
+    else:
+        periods = ((window_day.year - first.year) * 12 + window_day.month - first.month) // rule.interval
+    return max(0, periods - 1)  # One period of slack for timezone shifts
+
+
+def expand(rule: Rule, first_start: datetime, tz_name: str, window_start: datetime, window_end: datetime,
+           exdates: Sequence[str] = ()) -> Iterator[datetime]:
+    """Occurrence starts (UTC) with window_start <= start < window_end, skipping `exdates`."""
+    tz = _timezone(tz_name)
+    local_first = ensure_utc(first_start).astimezone(tz)
+    first_day, wall_time = local_first.date(), local_first.time().replace(tzinfo=None)
+    last_day = ensure_utc(window_end).astimezone(tz).date() + timedelta(days=1)
+    skipped = set(exdates or ())
+
+    k = _first_period(rule, first_day, ensure_utc(window_start).astimezone(tz).date())
+    seen = 0
+    while True:
+        period_start, days = _period(rule, first_day, k)
+        if period_start > last_day:
+            return
+        for day in days:
+            if day < first_day:
+                continue
+            start = tz.localize(datetime.combine(day, wall_time)).astimezone(timezone.utc)
+            if rule.until is not None and start > rule.until:
+                return
+            seen += 1
+            if rule.count is not None and seen > rule.count:
+                return
+            if start >= window_end:
+                return
+            if start >= window_start and start.isoformat() not in skipped:
+                yield start
+        k += 1
+
+
+def _series_expand(series: BookingSeries, window_start: datetime, window_end: datetime) -> Iterator[datetime]:
+    return expand(parse_rule(series.rule), series.start_time, series.timezone,
+                  window_start, window_end, series.exdates or ())
+
+
+def occurrences(series: BookingSeries, window_start: datetime, window_end: datetime,
+                include_materialized: bool = False) -> List[Tuple[datetime, datetime]]:
+    """(start, end) of the series' occurrences overlapping the window; virtual ones only by default."""
+    duration = timedelta(minutes=series.duration_minutes)
+    window_start, window_end = ensure_utc(window_start), ensure_utc(window_end)
+    lower = window_start - duration
+    if series.materialized_until and not include_materialized:
+        lower = max(lower, ensure_utc(series.materialized_until))
+    return [
+        (start, start + duration)
+        for start in _series_expand(series, lower, window_end)
+        if start + duration > window_start
+    ]
+
+
+def next_start(series: BookingSeries) -> Optional[datetime]:
+    """Start of the first occurrence that isn't a Booking row yet."""
+    lower = ensure_utc(series.materialized_until) if series.materialized_until else ensure_utc(series.start_time)
+    return next(_series_expand(series, lower, lower + NEXT_OCCURRENCE_HORIZON), None)
+
+
+def first_occurrences(rule: Rule, first_start: datetime, tz_name: str, limit: int) -> List[datetime]:
+    """The first `limit` occurrence starts of a new series (for conflict checks)."""
+    starts = []
+    for start in expand(rule, first_start, tz_name, ensure_utc(first_start), FAR_FUTURE):
+        starts.append(start)
+        if len(starts) >= limit:
+            break
+    return starts
+
+
+def last_start(rule: Rule, first_start: datetime, tz_name: str) -> Optional[datetime]:
+    """Start of a bounded rule's final occurrence (None for open-ended rules)."""
+    if not rule.bounded:
+        return None
+    last = None
+    for last in expand(rule, first_start, tz_name, ensure_utc(first_start), FAR_FUTURE):
+        pass
+    return last
+
+
+# ---------------------------------------------------------
+# MATERIALIZATION
+# ---------------------------------------------------------
+
+def materialize(db: Session, series: BookingSeries, until: datetime) -> List[Booking]:
+    """
+    Create Booking rows for the series' occurrences starting before `until`
+    and move materialized_until up to it. The move is a conditional UPDATE on
+    the old value, so concurrent runners never create the same occurrence
+    twice. The caller commits.
+    """
+    if series.status != SeriesStatus.ACTIVE.value:
+        return []
+    previous = series.materialized_until
+    lower = ensure_utc(previous) if previous else ensure_utc(series.start_time)
+    if lower >= until:
+        return []
+
+    claim = db.query(BookingSeries).filter(BookingSeries.id == series.id)
+    claim = claim.filter(BookingSeries.materialized_until == previous) if previous \
+        else claim.filter(BookingSeries.materialized_until == None)
+    if not claim.update({BookingSeries.materialized_until: until}, synchronize_session=False):
+        return []
+    set_committed_value(series, "materialized_until", until)
+
+    duration = timedelta(minutes=series.duration_minutes)
+    bookings = [
+        Booking(
+            workspace_id=series.workspace_id,
+            service_id=series.service_id,
+            contact_id=series.contact_id,
+            staff_id=series.staff_id,
+            series_id=series.id,
+            start_time=start,
+            end_time=start + duration,
+            status=BookingStatus.CONFIRMED.value,
+        )
+        for start in _series_expand(series, lower, until)
+    ]
+    db.add_all(bookings)
+    db.flush()
+    if bookings:
+        logger.info(f"[SERIES] #{series.id}: materialized {len(bookings)} occurrence(s) until {until.isoformat()}")
+    return bookings
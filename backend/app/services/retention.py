@@ -0,0 +1,241 @@
+"""
+Log Retention
+
+Keeps audit_logs / communication_logs small enough that dashboard, cron
+and history queries stay fast.
+
+Two tiers:
+1. Hot  - recent rows, the only ones dashboard/cron look at.
+2. Cold - rows older than LOG_HOT_RETENTION_DAYS.
+          Postgres: they simply live in older monthly partitions (pruned by created_at bounds).
+          SQLite:   they are moved into *_archive tables.
+
+Rows older than LOG_ARCHIVE_AFTER_DAYS are written to gzip NDJSON files
+(one file per table per month) under LOG_ARCHIVE_DIR and then dropped.
+"""
+
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.audit_log import AuditLog, AuditLogArchive
+from app.models.communication_log import CommunicationLog, CommunicationLogArchive
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+PARTITIONS_AHEAD = 2  # Months of empty partitions kept ready on Postgres
+
+# (hot table, SQLite archive table)
+LOG_TABLES = [
+    (AuditLog.__table__, AuditLogArchive.__table__),
+    (CommunicationLog.__table__, CommunicationLogArchive.__table__),
+]
+
+
+def hot_cutoff(now: Optional[datetime] = None) -> datetime:
+    """Lower bound for hot-path log queries. Anything older is in cold storage."""
+    now = now or datetime.now(timezone.utc)
+    return now - timedelta(days=settings.LOG_HOT_RETENTION_DAYS)
+
+
+def archive_cutoff(now: Optional[datetime] = None) -> datetime:
+    """Rows older than this are exported to gzip NDJSON and removed from the DB."""
+    now = now or datetime.now(timezone.utc)
+    return now - timedelta(days=settings.LOG_ARCHIVE_AFTER_DAYS)
+
+
+def is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _month_start(dt: datetime) -> datetime:
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(dt: datetime) -> datetime:
+    return (dt.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(table_name: str, month: datetime) -> str:
+    return f"{table_name}_p{month.strftime('%Y%m')}"
+
+
+# ---------------------------------------------------------
+# POSTGRES: MONTHLY RANGE PARTITIONS
+# ---------------------------------------------------------
+
+def ensure_partitions(db: Session, now: Optional[datetime] = None) -> List[str]:
+    """
+    Create monthly partitions for the current month and PARTITIONS_AHEAD months after it.
+    Idempotent. No-op outside Postgres.
+    """
+    if not is_postgres(db):
+        return []
+
+    now = now or datetime.now(timezone.utc)
+    month = _month_start(now)
+    created = []
+    for _ in range(PARTITIONS_AHEAD + 1):
+        upper = _next_month(month)
+        for table, _archive in LOG_TABLES:
+            name = partition_name(table.name, month)
+            db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table.name} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+            ))
+            created.append(name)
+        month = upper
+    db.commit()
+    return created
+
+
+def _expired_partitions(db: Session, table_name: str, cutoff: datetime) -> List[tuple]:
+    """Monthly partitions whose whole range is older than cutoff, as (name, month_start)."""
+    rows = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :parent"
+    ), {"parent": table_name}).fetchall()
+
+    prefix = f"{table_name}_p"
+    expired = []
+    for (name,) in rows:
+        if not name.startswith(prefix):
+            continue  # default partition
+        try:
+            month = datetime.strptime(name[len(prefix):], "%Y%m").replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+        if _next_month(month) <= cutoff:
+            expired.append((name, month))
+    return sorted(expired, key=lambda p: p[1])
+
+
+def _drop_expired_partitions(db: Session, table, cutoff: datetime) -> int:
+    """Export and drop whole partitions older than cutoff. Returns rows archived."""
+    archived = 0
+    for name, month in _expired_partitions(db, table.name, cutoff):
+        path = _archive_path(table.name, month)
+        count = 0
+        result = db.execute(text(f"SELECT * FROM {name} ORDER BY id").execution_options(yield_per=BATCH_SIZE))
+        with gzip.open(path, "at", encoding="utf-8") as fh:
+            for row in result.mappings():
+                fh.write(_to_ndjson(row))
+                count += 1
+        db.execute(text(f"ALTER TABLE {table.name} DETACH PARTITION {name}"))
+        db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+        logger.info(f"[RETENTION] Archived partition {name} ({count} rows) -> {path}")
+        archived += count
+    return archived
+
+
+# ---------------------------------------------------------
+# SQLITE: ARCHIVE TABLES
+# ---------------------------------------------------------
+
+def _move_to_archive_table(db: Session, table, archive, cutoff: datetime) -> int:
+    """Move hot rows older than cutoff into the archive table, in chunks."""
+    moved = 0
+    columns = [c.name for c in archive.columns]
+    while True:
+        ids = db.execute(
+            select(table.c.id).where(table.c.created_at < cutoff).order_by(table.c.id).limit(BATCH_SIZE)
+        ).scalars().all()
+        if not ids:
+            break
+        db.execute(insert(archive).from_select(
+            columns, select(*[table.c[c] for c in columns]).where(table.c.id.in_(ids))
+        ))
+        db.execute(delete(table).where(table.c.id.in_(ids)))
+        db.commit()
+        moved += len(ids)
+    return moved
+
+
+# ---------------------------------------------------------
+# GZIP NDJSON EXPORT
+# ---------------------------------------------------------
+
+def _archive_path(table_name: str, month: datetime) -> str:
+    directory = os.path.join(settings.LOG_ARCHIVE_DIR, table_name)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{month.strftime('%Y-%m')}.ndjson.gz")
+
+
+def _to_ndjson(row) -> str:
+    record = {}
+    for key, value in dict(row).items():
+        record[key] = value.isoformat() if isinstance(value, datetime) else value
+    return json.dumps(record, default=str) + "\n"
+
+
+def _export_and_delete(db: Session, table, cutoff: datetime, archive_name: str) -> int:
+    """
+    Append rows older than cutoff to per-month gzip NDJSON files under archive_name, then delete them.
+    Files are gzip multi-member, so repeated runs append safely.
+    """
+    exported = 0
+    while True:
+        rows = db.execute(
+            select(table).where(table.c.created_at < cutoff).order_by(table.c.id).limit(BATCH_SIZE)
+        ).mappings().all()
+        if not rows:
+            break
+
+        by_month: Dict[str, list] = {}
+        for row in rows:
+            created = row["created_at"] or cutoff
+            by_month.setdefault(created.strftime("%Y-%m"), []).append(row)
+
+        for month_key, month_rows in by_month.items():
+            path = _archive_path(archive_name, datetime.strptime(month_key, "%Y-%m"))
+            with gzip.open(path, "at", encoding="utf-8") as fh:
+                for row in month_rows:
+                    fh.write(_to_ndjson(row))
+
+        db.execute(delete(table).where(table.c.id.in_([r["id"] for r in rows])))
+        db.commit()
+        exported += len(rows)
+    return exported
+
+
+# ---------------------------------------------------------
+# SCHEDULED JOB
+# ---------------------------------------------------------
+
+def run_log_retention(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Daily retention pass. Safe to re-run.
+
+    Postgres: keep future partitions ready, export + drop partitions past the archive horizon,
+              and sweep any stragglers left in the default partition.
+    SQLite:   move rows past the hot horizon into archive tables,
+              export + delete archive rows past the archive horizon.
+    """
+    now = now or datetime.now(timezone.utc)
+    hot = hot_cutoff(now)
+    cold = archive_cutoff(now)
+    results = {"moved_to_archive": 0, "exported": 0}
+
+    if is_postgres(db):
+        ensure_partitions(db, now)
+        for table, _archive in LOG_TABLES:
+            results["exported"] += _drop_expired_partitions(db, table, cold)
+            results["exported"] += _export_and_delete(db, table, cold, table.name)
+    else:
+        for table, archive in LOG_TABLES:
+            results["moved_to_archive"] += _move_to_archive_table(db, table, archive, hot)
+            results["exported"] += _export_and_delete(db, archive, cold, table.name)
+
+    logger.info(f"[RETENTION] {results}")
+    return results
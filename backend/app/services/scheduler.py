@@ -0,0 +1,356 @@
+"""
+Reminder Scheduler
+
+In-process scheduler for the time-based booking automations:
+  - booking reminder   24h before start_time
+  - form reminder      24h after a pending intake form was sent
+  - follow-up          1h after a completed visit ended
+  - series occurrence  the next occurrence of a recurring series becomes a
+                       Booking row just before its reminder is due
+
+Due times live in a min-heap. Booking create / reschedule / cancel / status
+changes call `booking_changed()` after commit; a replaced or cancelled entry is
+marked stale and skipped when popped, so every update is O(log n) and nothing
+scans the tables. On startup the heap is rebuilt from one indexed range query
+per source table.
+
+Jobs are idempotent: each one claims its row with a conditional UPDATE
+(e.g. reminder_sent false -> true) before sending, so the /api/cron/run
+fallback or another worker can never double-send.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.time_utils import ensure_utc
+from app.db.session import SessionLocal
+from app.models.audit_log import AuditLog
+from app.models.booking import Booking, BookingStatus
+from app.models.booking_series import BookingSeries, SeriesStatus
+from app.models.form import FormSubmission
+from app.services import email as email_service
+from app.services import recurrence
+
+logger = logging.getLogger(__name__)
+
+REMINDER_LEAD = timedelta(hours=24)
+FORM_REMINDER_AFTER = timedelta(hours=24)
+FOLLOW_UP_AFTER = timedelta(hours=1)
+FOLLOW_UP_LOOKBACK = timedelta(days=7)  # startup rebuild ignores older completed visits
+MATERIALIZE_AHEAD = REMINDER_LEAD + timedelta(hours=1)  # series occurrences become rows this far out
+MAX_SLEEP_SECONDS = 60
+
+BOOKING_REMINDER = "booking_reminder"
+FORM_REMINDER = "form_reminder"
+FOLLOW_UP = "follow_up"
+SERIES_OCCURRENCE = "series_occurrence"
+
+JobKey = Tuple[str, int]
+
+
+# ---------------------------------------------------------
+# JOBS (shared with /api/cron/run)
+# ---------------------------------------------------------
+
+async def send_booking_reminder_job(db: Session, booking_id: int, now: Optional[datetime] = None) -> bool:
+    """Send the 24h reminder if the booking is still due one. Returns True if sent."""
+    now = now or datetime.now(timezone.utc)
+    claimed = db.query(Booking).filter(
+        Booking.id == booking_id,
+        Booking.reminder_sent == False,
+        Booking.status != BookingStatus.CANCELLED.value,
+        Booking.start_time > now,
+        Booking.start_time <= now + REMINDER_LEAD,
+    ).update({Booking.reminder_sent: True}, synchronize_session=False)
+    db.commit()
+    if not claimed:
+        return False
+
+    await email_service.send_booking_reminder(booking_id)
+    booking = db.query(Booking).filter(Booking.id == booking_id).first()
+    db.add(AuditLog(
+        workspace_id=booking.workspace_id,
+        booking_id=booking.id,
+        user_id=None,
+        action="booking.reminder_sent",
+        details={"recipient": booking.contact.email if booking.contact else "unknown"}
+    ))
+    db.commit()
+    return True
+
+
+async def send_form_reminder_job(db: Session, submission_id: int, now: Optional[datetime] = None) -> bool:
+    """Nag about an intake form still pending 24h after it was sent. Returns True if sent."""
+    now = now or datetime.now(timezone.utc)
+    claimed = db.query(FormSubmission).filter(
+        FormSubmission.id == submission_id,
+        FormSubmission.status == "pending",
+        FormSubmission.reminder_sent == False,
+        FormSubmission.sent_at <= now - FORM_REMINDER_AFTER,
+    ).update({FormSubmission.reminder_sent: True}, synchronize_session=False)
+    db.commit()
+    if not claimed:
+        return False
+
+    await email_service.send_form_reminder(submission_id)
+    submission = db.query(FormSubmission).filter(FormSubmission.id == submission_id).first()
+    if submission.booking:
+        db.add(AuditLog(
+            workspace_id=submission.booking.workspace_id,
+            booking_id=submission.booking_id,
+            user_id=None,
+            action="form.reminder_sent",
+            details={"submission_id": submission.id}
+        ))
+        db.commit()
+    return True
+
+
+async def send_follow_up_job(db: Session, booking_id: int, now: Optional[datetime] = None) -> bool:
+    """Post-visit follow-up, 1h after a completed booking ended. Returns True if sent."""
+    now = now or datetime.now(timezone.utc)
+    claimed = db.query(Booking).filter(
+        Booking.id == booking_id,
+        Booking.follow_up_sent == False,
+        Booking.status == BookingStatus.COMPLETED.value,
+        Booking.end_time < now - FOLLOW_UP_AFTER,
+    ).update({Booking.follow_up_sent: True}, synchronize_session=False)
+    db.commit()
+    if not claimed:
+        return False
+
+    await email_service.send_visit_completion(booking_id)
+    return True
+
+
+async def materialize_series_job(db: Session, series_id: int, now: Optional[datetime] = None) -> bool:
+    """Turn a series' upcoming occurrences into bookings, then queue their reminders."""
+    now = now or datetime.now(timezone.utc)
+    series = db.query(BookingSeries).filter(BookingSeries.id == series_id).first()
+    if not series:
+        return False
+    bookings = recurrence.materialize(db, series, now + MATERIALIZE_AHEAD)
+    db.commit()
+    for booking in bookings:
+        reminder_scheduler.booking_changed(booking)
+    reminder_scheduler.series_changed(series)
+    return bool(bookings)
+
+
+JOBS = {
+    BOOKING_REMINDER: send_booking_reminder_job,
+    FORM_REMINDER: send_form_reminder_job,
+    FOLLOW_UP: send_follow_up_job,
+    SERIES_OCCURRENCE: materialize_series_job,
+}
+
+
+# ---------------------------------------------------------
+# SCHEDULER
+# ---------------------------------------------------------
+
+class ReminderScheduler:
+    def __init__(self):
+        self._heap: List[list] = []           # [due_at, seq, key, active]
+        self._entries: Dict[JobKey, list] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()         # sync endpoints feed us from the threadpool
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    # -- heap maintenance ------------------------------------------------
+
+    def schedule(self, key: JobKey, due_at: datetime) -> None:
+        due_at = ensure_utc(due_at)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                old[3] = False
+            entry = [due_at, next(self._seq), key, True]
+            self._entries[key] = entry
+            heapq.heappush(self._heap, entry)
+            is_earliest = self._heap[0] is entry
+            self._compact_if_needed()
+        if is_earliest:
+            self._wake()
+
+    def cancel(self, key: JobKey) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                old[3] = False
+                self._compact_if_needed()
+
+    def _compact_if_needed(self) -> None:
+        # Stale entries from reschedules/cancels are dropped lazily; rebuild once they dominate
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._entries):
+            self._heap = [e for e in self._heap if e[3]]
+            heapq.heapify(self._heap)
+
+    def pop_due(self, now: datetime) -> List[JobKey]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                if entry[3]:
+                    del self._entries[entry[2]]
+                    due.append(entry[2])
+        return due
+
+    def next_due(self) -> Optional[datetime]:
+        with self._lock:
+            while self._heap and not self._heap[0][3]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._heap = []
+            self._entries = {}
+
+    # -- event feed ------------------------------------------------------
+
+    def booking_changed(self, booking) -> None:
+        """Re-derive a booking's pending jobs from its current state."""
+        active = booking.status not in (BookingStatus.CANCELLED.value, BookingStatus.NO_SHOW.value)
+
+        if active and not booking.reminder_sent and booking.status != BookingStatus.COMPLETED.value:
+            self.schedule((BOOKING_REMINDER, booking.id), ensure_utc(booking.start_time) - REMINDER_LEAD)
+        else:
+            self.cancel((BOOKING_REMINDER, booking.id))
+
+        if booking.status == BookingStatus.COMPLETED.value and not booking.follow_up_sent:
+            self.schedule((FOLLOW_UP, booking.id), ensure_utc(booking.end_time) + FOLLOW_UP_AFTER)
+        else:
+            self.cancel((FOLLOW_UP, booking.id))
+
+    def form_submission_changed(self, submission) -> None:
+        if submission.status == "pending" and not submission.reminder_sent and submission.sent_at:
+            self.schedule((FORM_REMINDER, submission.id), ensure_utc(submission.sent_at) + FORM_REMINDER_AFTER)
+        else:
+            self.cancel((FORM_REMINDER, submission.id))
+
+    def series_changed(self, series) -> None:
+        """Queue materialization of the series' next virtual occurrence."""
+        upcoming = recurrence.next_start(series) if series.status == SeriesStatus.ACTIVE.value else None
+        if upcoming is not None:
+            self.schedule((SERIES_OCCURRENCE, series.id), upcoming - REMINDER_LEAD)
+        else:
+            self.cancel((SERIES_OCCURRENCE, series.id))
+
+    def rebuild(self, db: Session, now: Optional[datetime] = None) -> int:
+        """Reload every pending job: one range query per source table."""
+        now = now or datetime.now(timezone.utc)
+        self.clear()
+
+        bookings = db.query(
+            Booking.id, Booking.start_time, Booking.end_time, Booking.status,
+            Booking.reminder_sent, Booking.follow_up_sent,
+        ).filter(
+            Booking.start_time >= now - FOLLOW_UP_LOOKBACK,
+            Booking.status != BookingStatus.CANCELLED.value,
+            or_(Booking.reminder_sent == False, Booking.follow_up_sent == False),
+        )
+        for row in bookings:
+            # Reminders for visits that already started are never sent
+            if ensure_utc(row.start_time) <= now and row.status != BookingStatus.COMPLETED.value:
+                continue
+            self.booking_changed(row)
+
+        submissions = db.query(
+            FormSubmission.id, FormSubmission.status, FormSubmission.reminder_sent, FormSubmission.sent_at,
+        ).filter(
+            FormSubmission.status == "pending",
+            FormSubmission.reminder_sent == False,
+        )
+        for row in submissions:
+            self.form_submission_changed(row)
+
+        series = db.query(BookingSeries).filter(
+            BookingSeries.status == SeriesStatus.ACTIVE.value,
+            or_(BookingSeries.ends_at == None, BookingSeries.ends_at > now),
+        )
+        for row in series:
+            self.series_changed(row)
+
+        logger.info(f"[SCHEDULER] Rebuilt with {len(self)} pending jobs")
+        return len(self)
+
+    # -- run loop --------------------------------------------------------
+
+    def _wake(self) -> None:
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _fire(self, key: JobKey, now: datetime) -> None:
+        kind, object_id = key
+        db = SessionLocal()
+        try:
+            sent = await JOBS[kind](db, object_id, now)
+            logger.info(f"[SCHEDULER] {kind} #{object_id} {'sent' if sent else 'skipped'}")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"[SCHEDULER] {kind} #{object_id} failed: {e}")
+        finally:
+            db.close()
+
+    async def run_due(self, now: Optional[datetime] = None) -> int:
+        now = now or datetime.now(timezone.utc)
+        keys = self.pop_due(now)
+        for key in keys:
+            await self._fire(key, now)
+        return len(keys)
+
+    async def _run(self) -> None:
+        while True:
+            await self.run_due()
+            next_due = self.next_due()
+            timeout = MAX_SLEEP_SECONDS
+            if next_due is not None:
+                timeout = min(timeout, max(0.0, (next_due - datetime.now(timezone.utc)).total_seconds()))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        """Rebuild from the database and start firing jobs (call from the app's event loop)."""
+        db = SessionLocal()
+        try:
+            self.rebuild(db)
+        finally:
+            db.close()
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._loop = None
+        self._wakeup = None
+
+
+reminder_scheduler = ReminderScheduler()
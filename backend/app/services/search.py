@@ -0,0 +1,185 @@
+"""
+Search Index
+
+Full-text search over contacts (name / email / phone) and message content.
+
+SQLite:   FTS5 tables (contacts_fts, messages_fts) created alongside the base
+          tables. contacts_fts is external-content, kept in sync by triggers.
+Postgres: a GIN index on a to_tsvector('simple', ...) expression for
+          contacts, and on messages.search_vector for messages.
+
+Message bodies live compressed in message_bodies (see app/models/conversation.py),
+which the database can't read, so the message index is written from the flush
+instead: messages_fts keeps its own copy of the text on SQLite, search_vector
+holds the tsvector on Postgres. Postgres snippets therefore come from the
+preview; the bodies are never read by a search.
+
+Queries are prefix-matched per word ("jan smi" -> jan* AND smi*) so the
+front desk can search as they type.
+"""
+
+import re
+from typing import Dict, List
+
+from sqlalchemy import DDL, event, text
+from sqlalchemy.orm import Session
+
+from app.models.contact import Contact
+from app.models.conversation import Message, MessageBody
+
+# Must match the expressions indexed in the migration, or Postgres won't use the GIN index
+CONTACT_TSV = "to_tsvector('simple', coalesce(c.full_name, '') || ' ' || coalesce(c.email, '') || ' ' || coalesce(c.phone, ''))"
+MESSAGE_TSV = "m.search_vector"
+
+SQLITE_CONTACTS_FTS = [
+    "DROP TABLE IF EXISTS contacts_fts",
+    "CREATE VIRTUAL TABLE contacts_fts USING fts5("
+    "full_name, email, phone, content='contacts', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS contacts_fts_ai AFTER INSERT ON contacts BEGIN "
+    "INSERT INTO contacts_fts(rowid, full_name, email, phone) VALUES (new.id, new.full_name, new.email, new.phone); END",
+    "CREATE TRIGGER IF NOT EXISTS contacts_fts_ad AFTER DELETE ON contacts BEGIN "
+    "INSERT INTO contacts_fts(contacts_fts, rowid, full_name, email, phone) "
+    "VALUES ('delete', old.id, old.full_name, old.email, old.phone); END",
+    "CREATE TRIGGER IF NOT EXISTS contacts_fts_au AFTER UPDATE OF full_name, email, phone ON contacts BEGIN "
+    "INSERT INTO contacts_fts(contacts_fts, rowid, full_name, email, phone) "
+    "VALUES ('delete', old.id, old.full_name, old.email, old.phone); "
+    "INSERT INTO contacts_fts(rowid, full_name, email, phone) VALUES (new.id, new.full_name, new.email, new.phone); END",
+    "INSERT INTO contacts_fts(contacts_fts) VALUES ('rebuild')",
+]
+
+# Not external-content: the text only exists compressed in message_bodies
+SQLITE_MESSAGES_FTS = [
+    "DROP TABLE IF EXISTS messages_fts",
+    "CREATE VIRTUAL TABLE messages_fts USING fts5(content, prefix='2 3')",
+]
+
+POSTGRES_MESSAGES_TSV = [
+    "ALTER TABLE messages ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE INDEX IF NOT EXISTS ix_messages_search ON messages USING gin (search_vector)",
+]
+
+
+def _register_sqlite_ddl(table, statements: List[str], fts_table: str):
+    """Build the FTS table + triggers whenever create_all creates the base table (SQLite only)."""
+    for stmt in statements:
+        event.listen(table, "after_create", DDL(stmt).execute_if(dialect="sqlite"))
+    event.listen(table, "before_drop", DDL(f"DROP TABLE IF EXISTS {fts_table}").execute_if(dialect="sqlite"))
+
+
+_register_sqlite_ddl(Contact.__table__, SQLITE_CONTACTS_FTS, "contacts_fts")
+_register_sqlite_ddl(Message.__table__, SQLITE_MESSAGES_FTS, "messages_fts")
+for _stmt in POSTGRES_MESSAGES_TSV:
+    event.listen(Message.__table__, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
+
+
+# ---------------------------------------------------------
+# MESSAGE INDEXING
+# ---------------------------------------------------------
+
+@event.listens_for(Session, "after_flush")
+def _index_messages(session: Session, flush_context) -> None:
+    """Index new or rewritten bodies and drop deleted messages, in the flush's transaction."""
+    removed = {obj.id for obj in session.deleted if isinstance(obj, Message)}
+    written = {}
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, MessageBody) and obj.message_id not in removed:
+            written[obj.message_id] = obj.text
+    if not removed and not written:
+        return
+
+    conn = session.connection()
+    if conn.dialect.name == "postgresql":
+        # Deleted rows take their search_vector with them
+        if written:
+            conn.execute(text("UPDATE messages SET search_vector = to_tsvector('simple', :body) WHERE id = :id"),
+                         [{"id": k, "body": v} for k, v in written.items()])
+    elif conn.dialect.name == "sqlite":
+        stale = removed | set(written)
+        conn.execute(text("DELETE FROM messages_fts WHERE rowid = :id"), [{"id": i} for i in stale])
+        if written:
+            conn.execute(text("INSERT INTO messages_fts(rowid, content) VALUES (:id, :body)"),
+                         [{"id": k, "body": v} for k, v in written.items()])
+
+
+# ---------------------------------------------------------
+# QUERY BUILDING
+# ---------------------------------------------------------
+
+def _terms(q: str) -> List[str]:
+    return re.findall(r"\w+", (q or "").lower())
+
+
+def _fts5_query(terms: List[str]) -> str:
+    # Quoted so FTS5 operators in user input are treated as text; * = prefix match
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def _tsquery(terms: List[str]) -> str:
+    return " & ".join(f"{t}:*" for t in terms)
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+# ---------------------------------------------------------
+# SEARCH
+# ---------------------------------------------------------
+
+def search_contacts(db: Session, workspace_id: int, q: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+    """Contacts matching every word of q (prefix match), best match first."""
+    terms = _terms(q)
+    if not terms:
+        return []
+
+    params = {"ws": workspace_id, "limit": limit, "offset": offset}
+    if _is_postgres(db):
+        params["q"] = _tsquery(terms)
+        sql = (
+            f"SELECT c.id, c.full_name, c.email, c.phone, c.status, "
+            f"ts_rank({CONTACT_TSV}, to_tsquery('simple', :q)) AS score "
+            f"FROM contacts c "
+            f"WHERE c.workspace_id = :ws AND {CONTACT_TSV} @@ to_tsquery('simple', :q) "
+            f"ORDER BY score DESC, c.id DESC LIMIT :limit OFFSET :offset"
+        )
+    else:
+        params["q"] = _fts5_query(terms)
+        sql = (
+            "SELECT c.id, c.full_name, c.email, c.phone, c.status, -bm25(contacts_fts) AS score "
+            "FROM contacts_fts JOIN contacts c ON c.id = contacts_fts.rowid "
+            "WHERE contacts_fts MATCH :q AND c.workspace_id = :ws "
+            "ORDER BY score DESC, c.id DESC LIMIT :limit OFFSET :offset"
+        )
+
+    return [dict(row) for row in db.execute(text(sql), params).mappings()]
+
+
+def search_messages(db: Session, workspace_id: int, q: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+    """Messages whose content matches every word of q (prefix match), best match first."""
+    terms = _terms(q)
+    if not terms:
+        return []
+
+    params = {"ws": workspace_id, "limit": limit, "offset": offset}
+    if _is_postgres(db):
+        params["q"] = _tsquery(terms)
+        sql = (
+            f"SELECT m.id, m.conversation_id, cv.contact_id, m.sender_email, m.created_at, "
+            f"ts_headline('simple', m.preview, to_tsquery('simple', :q), 'MaxWords=20, MinWords=5') AS snippet, "
+            f"ts_rank({MESSAGE_TSV}, to_tsquery('simple', :q)) AS score "
+            f"FROM messages m JOIN conversations cv ON cv.id = m.conversation_id "
+            f"WHERE cv.workspace_id = :ws AND {MESSAGE_TSV} @@ to_tsquery('simple', :q) "
+            f"ORDER BY score DESC, m.id DESC LIMIT :limit OFFSET :offset"
+        )
+    else:
+        params["q"] = _fts5_query(terms)
+        sql = (
+            "SELECT m.id, m.conversation_id, cv.contact_id, m.sender_email, m.created_at, "
+            "snippet(messages_fts, 0, '<b>', '</b>', '...', 12) AS snippet, -bm25(messages_fts) AS score "
+            "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid "
+            "JOIN conversations cv ON cv.id = m.conversation_id "
+            "WHERE messages_fts MATCH :q AND cv.workspace_id = :ws "
+            "ORDER BY score DESC, m.id DESC LIMIT :limit OFFSET :offset"
+        )
+
+    return [dict(row) for row in db.execute(text(sql), params).mappings()]
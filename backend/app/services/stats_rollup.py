@@ -0,0 +1,281 @@
+"""
+Stats Rollup
+
+Daily per-workspace analytics (workspace_daily_stats, app/models/workspace_stats.py)
+so trend charts read a few hundred small rows instead of scanning bookings,
+communication logs, form submissions and contacts on every request.
+
+Only dirty days are recomputed. A before_flush listener marks the
+(workspace, UTC day, source) of every flushed change that moves a counter,
+in the same transaction as the change:
+
+    bookings  Booking created / deleted, or status, service, staff or start moved (old and new day)
+    emails    CommunicationLog created or its status changed (the day it was created)
+    forms     FormSubmission completed (or un-completed)
+    leads     Contact created / deleted
+
+Set-based writes bypass the listener and call mark() / mark_bookings()
+themselves (booking_bulk, contact_import). Log retention deliberately does
+not: archived or exported logs keep their counts in the rollup.
+
+The stats_rollup cron job (run()) takes dirty markers in batches, recomputes
+just the marked source of each day with one grouped query, and clears the
+marker unless it was re-marked meanwhile (its version moved on).
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, bindparam, delete, event, func, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.core.config import settings
+from app.core.time_utils import ensure_utc
+from app.db.upsert import bump_versions
+from app.models.booking import Booking
+from app.models.communication_log import CommunicationLog
+from app.models.contact import Contact
+from app.models.form import Form, FormSubmission
+from app.models.workspace_stats import WorkspaceDailyStats, WorkspaceStatsDirtyDay
+from app.services import job_metrics
+
+logger = logging.getLogger(__name__)
+
+BOOKINGS = "bookings"
+EMAILS = "emails"
+FORMS = "forms"
+LEADS = "leads"
+SOURCES = (BOOKINGS, EMAILS, FORMS, LEADS)
+
+NO_STAFF = "none"  # bookings_by_staff key for unassigned bookings
+
+DirtyKey = Tuple[int, date, str]  # (workspace_id, day, source)
+
+_BOOKING_FIELDS = ("status", "service_id", "staff_id", "start_time", "workspace_id")
+
+
+def day_of(dt: Optional[datetime]) -> date:
+    """The UTC day of dt (now when it isn't known yet, e.g. a server default)."""
+    if dt is None:
+        return datetime.now(timezone.utc).date()
+    return ensure_utc(dt).astimezone(timezone.utc).date()
+
+
+def day_bounds(day: date) -> Tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+# ---------------------------------------------------------
+# DIRTY MARKERS
+# ---------------------------------------------------------
+
+def mark(db: Session, keys: Iterable[DirtyKey]) -> None:
+    """Mark (workspace_id, day, source) rollups out of date, in the session's transaction."""
+    bump_versions(db, WorkspaceStatsDirtyDay.__table__, ("workspace_id", "day", "source"),
+                  [key for key in keys if key[0] is not None])
+
+
+def mark_bookings(db: Session, bookings: Iterable) -> None:
+    """Mark the start days of bookings changed by a set-based UPDATE (anything with workspace_id / start_time)."""
+    mark(db, [(b.workspace_id, day_of(b.start_time), BOOKINGS) for b in bookings])
+
+
+def _values(obj, field: str) -> Set:
+    """Old and new values of a field (both days matter when a booking moves)."""
+    history = get_history(obj, field)
+    return {v for v in chain(history.added, history.unchanged, history.deleted) if v is not None}
+
+
+def _days(obj, field: str) -> Set[date]:
+    return {day_of(v) for v in _values(obj, field)}
+
+
+def _changed(obj, fields) -> bool:
+    return any(get_history(obj, field).has_changes() for field in fields)
+
+
+def _submission_workspaces(session: Session, submissions: List[FormSubmission]) -> Dict[int, int]:
+    """id(submission) -> workspace, via its booking or else its form; one lookup each for the whole flush."""
+    booking_ids = {s.booking_id for s in submissions if s.booking_id}
+    form_ids = {s.form_id for s in submissions if s.form_id}
+    connection = session.connection()
+    by_booking = dict(connection.execute(
+        select(Booking.id, Booking.workspace_id).where(Booking.id.in_(booking_ids))
+    ).all()) if booking_ids else {}
+    by_form = dict(connection.execute(
+        select(Form.id, Form.workspace_id).where(Form.id.in_(form_ids))
+    ).all()) if form_ids else {}
+    return {id(s): by_booking.get(s.booking_id) or by_form.get(s.form_id) for s in submissions}
+
+
+@event.listens_for(Session, "before_flush")
+def _track_changes(session: Session, flush_context, instances) -> None:
+    keys: Set[DirtyKey] = set()
+    submissions: List[FormSubmission] = []
+    for obj in chain(session.new, session.dirty, session.deleted):
+        dirty = obj in session.dirty
+        if isinstance(obj, Booking):
+            if dirty and not _changed(obj, _BOOKING_FIELDS):
+                continue
+            keys |= {(w, d, BOOKINGS) for w in _values(obj, "workspace_id") for d in _days(obj, "start_time")}
+        elif isinstance(obj, CommunicationLog):
+            if dirty and not _changed(obj, ("status",)):
+                continue
+            keys.add((obj.workspace_id, day_of(obj.__dict__.get("created_at")), EMAILS))
+        elif isinstance(obj, FormSubmission):
+            if (not dirty or _changed(obj, ("status", "completed_at"))) and _days(obj, "completed_at"):
+                submissions.append(obj)
+        elif isinstance(obj, Contact) and not dirty:
+            keys.add((obj.workspace_id, day_of(obj.__dict__.get("created_at")), LEADS))
+    if submissions:
+        workspaces = _submission_workspaces(session, submissions)
+        keys |= {(workspaces[id(s)], d, FORMS) for s in submissions for d in _days(s, "completed_at")}
+    if keys:
+        mark(session, keys)
+
+
+# ---------------------------------------------------------
+# RECOMPUTE
+# ---------------------------------------------------------
+
+def _bookings(db: Session, workspace_id: int, day: date) -> Dict:
+    start, end = day_bounds(day)
+    rows = db.query(Booking.status, Booking.service_id, Booking.staff_id, func.count()).filter(
+        Booking.workspace_id == workspace_id,
+        Booking.start_time >= start,
+        Booking.start_time < end,
+    ).group_by(Booking.status, Booking.service_id, Booking.staff_id).all()
+    by_status, by_service, by_staff = defaultdict(int), defaultdict(int), defaultdict(int)
+    for status, service_id, staff_id, count in rows:
+        by_status[status or "unknown"] += count
+        by_service[str(service_id)] += count
+        by_staff[str(staff_id) if staff_id else NO_STAFF] += count
+    return {"bookings_total": sum(by_status.values()), "bookings_by_status": dict(by_status),
+            "bookings_by_service": dict(by_service), "bookings_by_staff": dict(by_staff)}
+
+
+def _emails(db: Session, workspace_id: int, day: date) -> Dict:
+    start, end = day_bounds(day)
+    counts = dict(db.query(CommunicationLog.status, func.count()).filter(
+        CommunicationLog.workspace_id == workspace_id,
+        CommunicationLog.created_at >= start,
+        CommunicationLog.created_at < end,
+    ).group_by(CommunicationLog.status).all())
+    return {"emails_sent": counts.get("success", 0), "emails_failed": counts.get("failed", 0)}
+
+
+def _forms(db: Session, workspace_id: int, day: date) -> Dict:
+    start, end = day_bounds(day)
+    count = db.query(func.count(FormSubmission.id)).outerjoin(
+        Booking, Booking.id == FormSubmission.booking_id
+    ).outerjoin(Form, Form.id == FormSubmission.form_id).filter(
+        FormSubmission.status == "completed",
+        FormSubmission.completed_at >= start,
+        FormSubmission.completed_at < end,
+        or_(Booking.workspace_id == workspace_id,
+            and_(Booking.id.is_(None), Form.workspace_id == workspace_id)),
+    ).scalar()
+    return {"forms_completed": count or 0}
+
+
+def _leads(db: Session, workspace_id: int, day: date) -> Dict:
+    start, end = day_bounds(day)
+    count = db.query(func.count(Contact.id)).filter(
+        Contact.workspace_id == workspace_id,
+        Contact.created_at >= start,
+        Contact.created_at < end,
+    ).scalar()
+    return {"new_leads": count or 0}
+
+
+_RECOMPUTE = {BOOKINGS: _bookings, EMAILS: _emails, FORMS: _forms, LEADS: _leads}
+
+
+def recompute(db: Session, workspace_id: int, day: date, sources: Iterable[str] = SOURCES) -> WorkspaceDailyStats:
+    """Rebuild the given sources of one day's row from the raw tables (the caller commits)."""
+    row = db.get(WorkspaceDailyStats, (workspace_id, day))
+    if row is None:
+        row = WorkspaceDailyStats(workspace_id=workspace_id, day=day)
+        db.add(row)
+    for source in sources:
+        for field, value in _RECOMPUTE[source](db, workspace_id, day).items():
+            setattr(row, field, value)
+    return row
+
+
+def run(db: Session, shard=None) -> int:
+    """Recompute dirty days, STATS_ROLLUP_BATCH markers per transaction. Returns the number of markers cleared."""
+    table = WorkspaceStatsDirtyDay.__table__
+    cleared = 0
+    for _ in range(settings.STATS_ROLLUP_MAX_BATCHES):
+        query = db.query(WorkspaceStatsDirtyDay.workspace_id, WorkspaceStatsDirtyDay.day,
+                         WorkspaceStatsDirtyDay.source, WorkspaceStatsDirtyDay.version)
+        if shard:
+            query = shard.filter(query, WorkspaceStatsDirtyDay.workspace_id)
+        markers = query.order_by(WorkspaceStatsDirtyDay.workspace_id, WorkspaceStatsDirtyDay.day).limit(
+            settings.STATS_ROLLUP_BATCH
+        ).all()
+        if not markers:
+            break
+        job_metrics.scanned(len(markers))
+
+        days: Dict[Tuple[int, date], List[str]] = defaultdict(list)
+        for workspace_id, day, source, _version in markers:
+            if source in _RECOMPUTE:
+                days[(workspace_id, day)].append(source)
+        for (workspace_id, day), sources in days.items():
+            recompute(db, workspace_id, day, sources)
+        # A marker re-marked since we read it has a newer version and stays for the next batch
+        result = db.execute(delete(table).where(
+            table.c.workspace_id == bindparam("w"), table.c.day == bindparam("d"),
+            table.c.source == bindparam("s"), table.c.version == bindparam("v"),
+        ), [{"w": w, "d": d, "s": s, "v": v} for w, d, s, v in markers])
+        db.commit()
+        cleared += result.rowcount
+        if len(markers) < settings.STATS_ROLLUP_BATCH:
+            break
+    return cleared
+
+
+# ---------------------------------------------------------
+# TRENDS
+# ---------------------------------------------------------
+
+def period_start(day: date, period: str) -> date:
+    if period == "week":
+        return day - timedelta(days=day.weekday())  # Monday
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _add_counts(into: Dict[str, int], counts: Optional[Dict[str, int]]) -> None:
+    for key, count in (counts or {}).items():
+        into[key] = into.get(key, 0) + count
+
+
+def trends(db: Session, workspace_id: int, start: date, end: date, period: str = "day") -> List[Dict]:
+    """Rollup rows in [start, end] summed per day / week / month, oldest first. Periods without activity are omitted."""
+    rows = db.query(WorkspaceDailyStats).filter(
+        WorkspaceDailyStats.workspace_id == workspace_id,
+        WorkspaceDailyStats.day >= start,
+        WorkspaceDailyStats.day <= end,
+    ).order_by(WorkspaceDailyStats.day).all()
+
+    buckets: Dict[date, Dict] = {}
+    for row in rows:
+        key = period_start(row.day, period)
+        bucket = buckets.setdefault(key, {
+            "period_start": key, "bookings_total": 0, "bookings_by_status": {}, "bookings_by_service": {},
+            "bookings_by_staff": {}, "emails_sent": 0, "emails_failed": 0, "forms_completed": 0, "new_leads": 0,
+        })
+        for field in ("bookings_total", "emails_sent", "emails_failed", "forms_completed", "new_leads"):
+            bucket[field] += getattr(row, field) or 0
+        for field in ("bookings_by_status", "bookings_by_service", "bookings_by_staff"):
+            _add_counts(bucket[field], getattr(row, field))
+    return list(buckets.values())
@@ -0,0 +1,134 @@
+"""
+Waitlist
+
+Clients waiting for an opening of a service anywhere in a time window
+(app/models/waitlist.py). When a booking is cancelled, slot_released() finds
+the waiting entries whose window contains the freed slot and marks them
+notified; the caller commits and sends the batch with
+email.send_waitlist_openings(). Entries stay WAITING after a notification —
+whoever books first gets the slot, and mark_booked() retires their entry.
+
+Matching is one range query on (service_id, status, window_start). Windows
+are at most WAITLIST_MAX_WINDOW_DAYS long, so only entries starting in
+[slot_end - max window, slot_start] can contain the slot, which keeps the
+scan bounded however many entries a service has.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.time_utils import ensure_utc
+from app.models.audit_log import AuditLog
+from app.models.booking import Booking
+from app.models.contact import Contact
+from app.models.service import Service
+from app.models.waitlist import WaitlistEntry, WaitlistStatus
+from app.services import capacity
+
+logger = logging.getLogger(__name__)
+
+
+def max_window() -> timedelta:
+    return timedelta(days=settings.WAITLIST_MAX_WINDOW_DAYS)
+
+
+# ---------------------------------------------------------
+# ENTRIES
+# ---------------------------------------------------------
+
+def join(db: Session, service: Service, contact: Contact,
+         window_start: datetime, window_end: datetime) -> WaitlistEntry:
+    """Add the contact to the service's waitlist; re-joining with the same window is a no-op. The caller commits."""
+    existing = db.query(WaitlistEntry).filter(
+        WaitlistEntry.service_id == service.id,
+        WaitlistEntry.contact_id == contact.id,
+        WaitlistEntry.status == WaitlistStatus.WAITING.value,
+        WaitlistEntry.window_start == window_start,
+        WaitlistEntry.window_end == window_end
+    ).first()
+    if existing:
+        return existing
+
+    entry = WaitlistEntry(
+        workspace_id=service.workspace_id,
+        service_id=service.id,
+        contact_id=contact.id,
+        window_start=window_start,
+        window_end=window_end,
+        status=WaitlistStatus.WAITING.value,
+        notified_count=0,
+    )
+    db.add(entry)
+    db.flush()
+    return entry
+
+
+def matches(db: Session, service_id: int, start: datetime, end: datetime,
+            limit: Optional[int] = None) -> List[WaitlistEntry]:
+    """Waiting entries whose window contains [start, end), longest-waiting first."""
+    query = db.query(WaitlistEntry).filter(
+        WaitlistEntry.service_id == service_id,
+        WaitlistEntry.status == WaitlistStatus.WAITING.value,
+        WaitlistEntry.window_start <= start,
+        WaitlistEntry.window_start >= end - max_window(),
+        WaitlistEntry.window_end >= end
+    ).order_by(WaitlistEntry.created_at, WaitlistEntry.id)
+    if limit:
+        query = query.limit(limit)
+    return query.all()
+
+
+# ---------------------------------------------------------
+# EVENTS
+# ---------------------------------------------------------
+
+def slot_released(db: Session, booking: Booking, user_id: Optional[int] = None) -> List[int]:
+    """
+    Pick the waiting entries to tell about the slot `booking` just freed and
+    record the notification. Returns their ids for email.send_waitlist_openings;
+    the caller commits first.
+    """
+    start, end = ensure_utc(booking.start_time), ensure_utc(booking.end_time)
+    if not booking.service_id or start <= datetime.now(timezone.utc):
+        return []
+    service = db.query(Service).filter(Service.id == booking.service_id).first()
+    if not service or not capacity.check(db, service, start, end).available:
+        return []  # Someone else already holds the slot (e.g. a series occurrence)
+
+    entries = matches(db, service.id, start, end, limit=settings.WAITLIST_NOTIFY_BATCH)
+    if not entries:
+        return []
+
+    entry_ids = [e.id for e in entries]
+    db.query(WaitlistEntry).filter(WaitlistEntry.id.in_(entry_ids)).update({
+        WaitlistEntry.notified_count: WaitlistEntry.notified_count + 1,
+        WaitlistEntry.last_notified_at: datetime.now(timezone.utc),
+    }, synchronize_session=False)
+    db.add(AuditLog(
+        workspace_id=booking.workspace_id,
+        booking_id=booking.id,
+        user_id=user_id,
+        action="waitlist.notified",
+        details={"entry_ids": entry_ids, "start": start.isoformat()}
+    ))
+    logger.info(f"[WAITLIST] Booking #{booking.id} released {start.isoformat()}: notifying {len(entry_ids)} client(s)")
+    return entry_ids
+
+
+def mark_booked(db: Session, booking: Booking) -> int:
+    """Retire the contact's waiting entries that this booking satisfies. The caller commits."""
+    start, end = ensure_utc(booking.start_time), ensure_utc(booking.end_time)
+    return db.query(WaitlistEntry).filter(
+        WaitlistEntry.service_id == booking.service_id,
+        WaitlistEntry.contact_id == booking.contact_id,
+        WaitlistEntry.status == WaitlistStatus.WAITING.value,
+        WaitlistEntry.window_start <= start,
+        WaitlistEntry.window_end >= end
+    ).update({
+        WaitlistEntry.status: WaitlistStatus.BOOKED.value,
+        WaitlistEntry.booking_id: booking.id,
+    }, synchronize_session=False)
@@ -0,0 +1,396 @@
+"""
+Outbound Webhooks
+
+Pushes booking, contact and message events to the partner URLs a workspace
+registers (webhook_endpoints), so partners don't have to poll the API.
+
+1. Outbox    events.py derives events in after_flush; enqueue() writes one
+             webhook_deliveries row per (event, subscribed endpoint) on the
+             same connection, so the rows commit or roll back with the change.
+2. Claim     due rows are leased by pushing next_attempt_at out by
+             LEASE_SECONDS (SKIP LOCKED on Postgres, so workers never share a
+             row); a crashed worker's rows come due again after the lease.
+3. Deliver   rows are grouped per endpoint into batches of its batch_size and
+             POSTed on one pooled httpx.AsyncClient, WEBHOOK_CONCURRENCY at a time.
+4. Record    2xx marks the batch delivered; anything else is retried after
+             jittered exponential backoff (or Retry-After, if longer) until
+             WEBHOOK_MAX_ATTEMPTS, then the rows are marked dead.
+
+Bodies: batch_size 1 sends the event itself, > 1 sends {"events": [...]}.
+Every POST carries X-CareOps-Signature: t=<unix time>,v1=<hex HMAC-SHA256 of
+"<t>.<body>" keyed with the endpoint's secret>. Delivery is at-least-once;
+receivers dedupe on the event id.
+
+Runs in-process (WEBHOOK_WORKER_ENABLED, woken on commit) or as the
+webhook_deliveries cron job when the worker is off.
+
+Targets must be https URLs whose host resolves only to public addresses
+(url_problem); this is checked at registration and again before every
+round, since DNS can change after an endpoint is saved.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import logging
+import random
+import socket
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy import bindparam, event, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.responses import dumps
+from app.core.security_utils import decrypt_token
+from app.core.time_utils import ensure_utc
+from app.db.session import SessionLocal
+from app.models.webhook import DeliveryStatus, WebhookDelivery, WebhookEndpoint
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = (
+    "booking.created", "booking.updated", "booking.cancelled",
+    "contact.created", "contact.updated",
+    "message.created",
+)
+SIGNATURE_HEADER = "X-CareOps-Signature"
+USER_AGENT = "CareOps-Webhooks/1.0"
+LEASE_SECONDS = 300
+MAX_ERROR_LENGTH = 500
+
+_PENDING = "webhook_outbox"
+
+
+def signature_header(secret: str, timestamp: int, body: bytes) -> str:
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay after the `attempts`-th failure: capped exponential with equal jitter,
+    so retries queued during a receiver's outage don't all land at once."""
+    ceiling = min(settings.WEBHOOK_BACKOFF_MAX_SECONDS,
+                  settings.WEBHOOK_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (ensure_utc(parsedate_to_datetime(value)) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), settings.WEBHOOK_BACKOFF_MAX_SECONDS)
+
+
+def url_problem(url: str) -> Optional[str]:
+    """
+    Why `url` may not receive webhooks, or None if it may: it must be https and
+    every address its host resolves to must be public (no loopback, link-local,
+    private or reserved ranges). Resolves DNS, so call it off the event loop.
+    """
+    if settings.WEBHOOK_ALLOW_PRIVATE_URLS:
+        return None
+    parts = urlsplit(url)
+    if parts.scheme != "https":
+        return "Webhook URLs must use https"
+    if not parts.hostname:
+        return "Webhook URL has no host"
+    try:
+        infos = socket.getaddrinfo(parts.hostname, parts.port or 443, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError):
+        return f"Webhook host {parts.hostname} could not be resolved"
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            return f"Webhook host {parts.hostname} resolves to a non-public address ({address})"
+    return None
+
+
+# ---------------------------------------------------------
+# OUTBOX
+# ---------------------------------------------------------
+
+def enqueue(session: Session, events: List[dict]) -> int:
+    """Write outbox rows for `events` inside the session's transaction. Returns the row count."""
+    events = [evt for evt in events if evt["type"] in EVENT_TYPES]
+    if not events:
+        return 0
+    connection = session.connection()
+    endpoints = connection.execute(
+        select(WebhookEndpoint.id, WebhookEndpoint.workspace_id, WebhookEndpoint.event_types).where(
+            WebhookEndpoint.workspace_id.in_({evt["workspace_id"] for evt in events}),
+            WebhookEndpoint.is_active == True,
+        )
+    ).all()
+    if not endpoints:
+        return 0
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"endpoint_id": endpoint_id, "workspace_id": workspace_id, "event_id": evt["id"],
+         "event_type": evt["type"], "payload": evt, "status": DeliveryStatus.PENDING.value,
+         "attempts": 0, "next_attempt_at": now}
+        for evt in events
+        for endpoint_id, workspace_id, event_types in endpoints
+        if workspace_id == evt["workspace_id"] and (not event_types or evt["type"] in event_types)
+    ]
+    if rows:
+        connection.execute(insert(WebhookDelivery.__table__), rows)
+        session.info[_PENDING] = True
+    return len(rows)
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_dispatcher(session: Session) -> None:
+    if session.info.pop(_PENDING, False):
+        webhook_dispatcher.wake()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING, None)
+
+
+# ---------------------------------------------------------
+# DELIVERY
+# ---------------------------------------------------------
+
+class _Target(NamedTuple):
+    url: str
+    secret: str
+    batch_size: int
+
+
+class _Outcome(NamedTuple):
+    endpoint_id: int
+    rows: List[dict]
+    ok: bool
+    error: Optional[str] = None
+    retry_after: Optional[float] = None
+
+
+def _claim(now: datetime, limit: int, shard=None):
+    """Lease up to `limit` due deliveries of active endpoints; returns (rows, targets by endpoint id)."""
+    db = SessionLocal()
+    try:
+        query = db.query(
+            WebhookDelivery.id, WebhookDelivery.endpoint_id, WebhookDelivery.payload, WebhookDelivery.attempts,
+        ).join(WebhookEndpoint, WebhookEndpoint.id == WebhookDelivery.endpoint_id).filter(
+            WebhookDelivery.status == DeliveryStatus.PENDING.value,
+            WebhookDelivery.next_attempt_at <= now,
+            WebhookEndpoint.is_active == True,
+        )
+        if shard is not None:
+            query = shard.filter(query, WebhookDelivery.workspace_id)
+        query = query.order_by(WebhookDelivery.next_attempt_at, WebhookDelivery.id).limit(limit)
+        if db.get_bind().dialect.name == "postgresql":
+            query = query.with_for_update(skip_locked=True, of=WebhookDelivery)
+        rows = [row._asdict() for row in query.all()]
+        if not rows:
+            db.rollback()
+            return [], {}
+        db.execute(
+            update(WebhookDelivery)
+            .where(WebhookDelivery.id.in_([row["id"] for row in rows]))
+            .values(next_attempt_at=now + timedelta(seconds=LEASE_SECONDS))
+        )
+        targets = {
+            endpoint.id: _Target(endpoint.url, decrypt_token(endpoint.secret) or "",
+                                 max(1, min(endpoint.batch_size or 1, settings.WEBHOOK_MAX_BATCH_SIZE)))
+            for endpoint in db.query(WebhookEndpoint).filter(
+                WebhookEndpoint.id.in_({row["endpoint_id"] for row in rows}))
+        }
+        db.commit()
+        return rows, targets
+    finally:
+        db.close()
+
+
+def _record(outcomes: List[_Outcome], now: datetime) -> Dict[str, int]:
+    stats = {"delivered": 0, "retrying": 0, "dead": 0}
+    delivered = [row["id"] for outcome in outcomes if outcome.ok for row in outcome.rows]
+    failed = []
+    for outcome in outcomes:
+        if outcome.ok:
+            continue
+        for row in outcome.rows:
+            attempts = row["attempts"] + 1
+            dead = attempts >= settings.WEBHOOK_MAX_ATTEMPTS
+            delay = max(backoff_seconds(attempts), outcome.retry_after or 0.0)
+            failed.append({
+                "row_id": row["id"], "new_attempts": attempts, "error": (outcome.error or "")[:MAX_ERROR_LENGTH],
+                "new_status": DeliveryStatus.DEAD.value if dead else DeliveryStatus.PENDING.value,
+                "due": now if dead else now + timedelta(seconds=delay),
+            })
+            stats["dead" if dead else "retrying"] += 1
+    stats["delivered"] = len(delivered)
+
+    table = WebhookDelivery.__table__
+    db = SessionLocal()
+    try:
+        if delivered:
+            db.execute(update(table).where(table.c.id.in_(delivered)).values(
+                status=DeliveryStatus.DELIVERED.value, attempts=table.c.attempts + 1,
+                delivered_at=now, last_error=None,
+            ))
+        if failed:
+            db.execute(
+                update(table).where(table.c.id == bindparam("row_id")).values(
+                    status=bindparam("new_status"), attempts=bindparam("new_attempts"),
+                    next_attempt_at=bindparam("due"), last_error=bindparam("error"),
+                ),
+                failed,
+            )
+        for ok, column in ((True, WebhookEndpoint.last_success_at), (False, WebhookEndpoint.last_failure_at)):
+            endpoint_ids = {outcome.endpoint_id for outcome in outcomes if outcome.ok is ok}
+            if endpoint_ids:
+                db.execute(update(WebhookEndpoint).where(WebhookEndpoint.id.in_(endpoint_ids))
+                           .values({column: now}))
+        db.commit()
+    finally:
+        db.close()
+    return stats
+
+
+class WebhookDispatcher:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def client(self) -> httpx.AsyncClient:
+        """One pooled client per event loop: keep-alive connections are reused across rounds."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=settings.WEBHOOK_TIMEOUT_SECONDS,
+                limits=httpx.Limits(max_connections=settings.WEBHOOK_CONCURRENCY,
+                                    max_keepalive_connections=settings.WEBHOOK_CONCURRENCY),
+                headers={"User-Agent": USER_AGENT},
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def _post(self, semaphore: asyncio.Semaphore, endpoint_id: int, target: _Target,
+                    rows: List[dict]) -> _Outcome:
+        if target.batch_size > 1:
+            body = dumps({"events": [row["payload"] for row in rows]})
+        else:
+            body = dumps(rows[0]["payload"])
+        headers = {
+            "Content-Type": "application/json",
+            SIGNATURE_HEADER: signature_header(target.secret, int(time.time()), body),
+        }
+        async with semaphore:
+            try:
+                response = await self.client().post(target.url, content=body, headers=headers)
+            except httpx.HTTPError as exc:
+                return _Outcome(endpoint_id, rows, False, f"{exc.__class__.__name__}: {exc}")
+        if response.is_success:
+            return _Outcome(endpoint_id, rows, True)
+        return _Outcome(endpoint_id, rows, False, f"HTTP {response.status_code}", _retry_after(response))
+
+    async def deliver_due(self, shard=None, now: Optional[datetime] = None) -> Dict[str, int]:
+        """One round: claim, POST and record. Returns counters."""
+        now = now or datetime.now(timezone.utc)
+        rows, targets = await asyncio.to_thread(_claim, now, settings.WEBHOOK_CLAIM_LIMIT, shard)
+        if not rows:
+            return {"claimed": 0, "posts": 0, "delivered": 0, "retrying": 0, "dead": 0}
+
+        per_endpoint: Dict[int, List[dict]] = defaultdict(list)
+        for row in rows:
+            per_endpoint[row["endpoint_id"]].append(row)
+        # Re-checked every round: the host may resolve somewhere else than when it was registered
+        problems = await asyncio.gather(*(asyncio.to_thread(url_problem, targets[endpoint_id].url)
+                                          for endpoint_id in per_endpoint))
+        semaphore = asyncio.Semaphore(settings.WEBHOOK_CONCURRENCY)
+        posts = []
+        blocked = []
+        for (endpoint_id, endpoint_rows), problem in zip(per_endpoint.items(), problems):
+            if problem:
+                logger.warning(f"[WEBHOOKS] Endpoint {endpoint_id} blocked: {problem}")
+                blocked.append(_Outcome(endpoint_id, endpoint_rows, False, problem))
+                continue
+            target = targets[endpoint_id]
+            endpoint_rows.sort(key=lambda row: row["id"])
+            for start in range(0, len(endpoint_rows), target.batch_size):
+                posts.append(self._post(semaphore, endpoint_id, target,
+                                        endpoint_rows[start:start + target.batch_size]))
+        outcomes = await asyncio.gather(*posts)
+
+        stats = await asyncio.to_thread(_record, outcomes + blocked, datetime.now(timezone.utc))
+        stats.update(claimed=len(rows), posts=len(outcomes))
+        if stats["retrying"] or stats["dead"]:
+            logger.warning(f"[WEBHOOKS] {stats['retrying']} deliveries to retry, {stats['dead']} dead")
+        return stats
+
+    # -- run loop --------------------------------------------------------
+
+    def wake(self) -> None:
+        """Deliver now rather than at the next poll; safe to call from any thread."""
+        loop = self._loop
+        if loop is not None and self._wakeup is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass  # Loop shut down in between
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                stats = await self.deliver_due()
+            except Exception:
+                logger.exception("[WEBHOOKS] Delivery round failed")
+                stats = {}
+            if stats.get("claimed", 0) >= settings.WEBHOOK_CLAIM_LIMIT:
+                continue  # Backlog: go again straight away
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.WEBHOOK_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        """Start delivering (call from the app's event loop)."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._loop = None
+        self._wakeup = None
+        if self._client is not None and self._client_loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+
+
+webhook_dispatcher = WebhookDispatcher()
@@ -6,17 +6,35 @@ import os
 # Default to localhost:8001 (based on user metadata active port) or 8000
 # User metadata says uvicorn running on 8001
 API_URL = os.getenv("API_URL", "http://localhost:8001/api/cron/run")
+RETENTION_URL = os.getenv("RETENTION_URL", API_URL.rsplit("/", 1)[0] + "/retention")
 CRON_SECRET = os.getenv("CRON_SECRET", "careops-cron-key-2026")
+# Sharded deployments: run one loop per replica with CRON_SHARD=<index> (CRON_SHARDS set on the API)
+CRON_PARAMS = {"shard": os.getenv("CRON_SHARD")} if os.getenv("CRON_SHARD") else None
+
+def run_retention_if_due(last_run_day):
+    """Trigger the log retention job once per calendar day. Returns the day it last ran."""
+    today = time.strftime('%Y-%m-%d')
+    if last_run_day == today:
+        return last_run_day
+    try:
+        response = requests.post(RETENTION_URL, headers={"X-Cron-Secret": CRON_SECRET})
+        print(f"Retention ({response.status_code}): {response.text}")
+        if response.status_code == 200:
+            return today
+    except Exception as e:
+        print(f"Retention error: {e}")
+    return last_run_day
 
 def run_loop():
     print(f"Starting Cron Loop targeting {API_URL}")
     print("Press Ctrl+C to stop.")
     
+    retention_day = None
     while True:
         try:
             print(f"[{time.strftime('%H:%M:%S')}] Triggering cron...", end=" ")
             # Authenticated POST request
-            response = requests.post(API_URL, headers={"X-Cron-Secret": CRON_SECRET})
+            response = requests.post(API_URL, headers={"X-Cron-Secret": CRON_SECRET}, params=CRON_PARAMS)
             if response.status_code == 200:
                 print(f"Success: {response.json()}")
             else:
@@ -24,6 +42,8 @@ def run_loop():
         except Exception as e:
             print(f"Error: {e}")
             print("Make sure the backend is running on port 8001.")
+
+        retention_day = run_retention_if_due(retention_day)
         
         # Wait 60 seconds
         time.sleep(60)
@@ -0,0 +1,76 @@
+"""
+Repeated availability lookups, computed every time vs served by the cache.
+
+Seeds one service with a few bookings into a scratch in-memory SQLite
+database, then times `rounds` lookups of the same day through
+compute_slots() (what a miss costs) and through get_slots() after one
+warm-up call (what the public availability endpoint does on a hit).
+
+Run from backend/ with the app's environment (settings must load; the
+configured database is not touched):
+    python -m scripts.bench_availability_cache [rounds]
+"""
+
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.booking import Booking
+from app.models.contact import Contact
+from app.models.service import Service
+from app.models.workspace import Workspace
+from app.services import availability
+
+WEEK = {day: ["09:00-17:00"] for day in ("mon", "tue", "wed", "thu", "fri", "sat", "sun")}
+
+
+def seed(db, day: date) -> int:
+    ws = Workspace(name="Bench Spa", slug="bench-spa", is_active=True)
+    db.add(ws)
+    db.flush()
+    service = Service(name="Massage", duration_minutes=60, workspace_id=ws.id, availability=WEEK)
+    contact = Contact(workspace_id=ws.id, email="bench@example.com", full_name="Bench")
+    db.add_all([service, contact])
+    db.flush()
+    for hour in (9, 11, 14):
+        start = datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc)
+        db.add(Booking(workspace_id=ws.id, service_id=service.id, contact_id=contact.id, status="confirmed",
+                       start_time=start, end_time=start + timedelta(hours=1)))
+    db.commit()
+    return service.id
+
+
+def main(rounds: int = 200) -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    day = date.today() + timedelta(days=2)
+    service_id = seed(db, day)
+    tz = availability.resolve_timezone("UTC")
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        availability.compute_slots(db, db.get(Service, service_id), day, tz)
+    uncached = time.perf_counter() - started
+
+    availability.availability_cache.clear()
+    availability.get_slots(db, service_id, day, "UTC")
+    started = time.perf_counter()
+    for _ in range(rounds):
+        availability.get_slots(db, service_id, day, "UTC")
+    cached = time.perf_counter() - started
+    db.close()
+
+    print(f"{rounds} availability lookups")
+    print(f"{'computed':<12}{uncached * 1000:>10.1f} ms")
+    print(f"{'cached':<12}{cached * 1000:>10.1f} ms")
+    print(f"cache stats: {availability.availability_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,84 @@
+"""
+Serialization CPU and bytes on the wire for a 10k-booking list.
+
+Compares the ways GET /api/bookings can render its payload:
+- response_model, encoder: validate List[BookingOut], jsonable_encoder, json.dumps
+- response_model, dump_json: validate List[BookingOut], Pydantic's dump_json
+- trusted dicts: FastJSONResponse (orjson) on the dicts list_bookings builds
+
+Run from backend/:  python -m scripts.bench_json_responses [count]
+"""
+
+import gzip
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.core.responses import dumps
+from app.schemas.booking import BookingOut
+
+REPEAT = 5
+
+
+def make_rows(count: int):
+    start = datetime(2026, 1, 5, 9, tzinfo=timezone.utc)
+    objects, dicts = [], []
+    for i in range(count):
+        service = SimpleNamespace(id=i % 12, name=f"Service {i % 12}", duration_minutes=60, location="Room 2")
+        contact = SimpleNamespace(id=i, full_name=f"Client {i}", email=f"client{i}@example.com", phone="+15550100")
+        booking = SimpleNamespace(
+            id=i, service_id=service.id, contact_id=contact.id, start_time=start + timedelta(hours=i),
+            end_time=start + timedelta(hours=i, minutes=60), status="confirmed", created_at=start,
+            service=service, contact=contact,
+        )
+        objects.append(booking)
+        dicts.append({
+            "id": i, "service_id": service.id, "contact_id": contact.id, "start_time": booking.start_time,
+            "end_time": booking.end_time, "status": "confirmed", "created_at": start,
+            "service": vars(service), "contact": vars(contact),
+        })
+    return objects, dicts
+
+
+def cpu_ms(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.process_time()
+        fn()
+        best = min(best, time.process_time() - started)
+    return best * 1000
+
+
+def main(count: int = 10_000) -> None:
+    objects, dicts = make_rows(count)
+    adapter = TypeAdapter(List[BookingOut])
+
+    def via_encoder():
+        validated = adapter.validate_python(objects, from_attributes=True)
+        return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+    def via_dump_json():
+        return adapter.dump_json(adapter.validate_python(objects, from_attributes=True))
+
+    def via_trusted():
+        return dumps(dicts)
+
+    print(f"{count} bookings, best of {REPEAT}")
+    print(f"{'path':<28}{'cpu ms':>10}{'bytes':>12}{'gzip bytes':>12}{'gzip ms':>10}")
+    for name, fn in (("response_model, encoder", via_encoder), ("response_model, dump_json", via_dump_json),
+                     ("trusted dicts (orjson)", via_trusted)):
+        body = fn()
+        compressed = gzip.compress(body, compresslevel=settings.GZIP_COMPRESSLEVEL)
+        gzip_ms = cpu_ms(lambda: gzip.compress(body, compresslevel=settings.GZIP_COMPRESSLEVEL))
+        print(f"{name:<28}{cpu_ms(fn):>10.1f}{len(body):>12,}{len(compressed):>12,}{gzip_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
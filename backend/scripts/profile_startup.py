@@ -0,0 +1,92 @@
+"""
+Where cold start goes: module import time and the startup hooks.
+
+Imports app.main under `python -X importtime` in a fresh interpreter and
+reports the slowest modules (self and cumulative time) and the top-level
+packages they add up to, then times the app's startup hooks in this process.
+
+Run from backend/ with the deployment's environment:
+    python -m scripts.profile_startup [--top 15]
+"""
+
+import argparse
+import asyncio
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def profile_imports(target: str = "app.main") -> List[ImportTiming]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing {target} failed:\n{result.stderr[-2000:]}")
+    timings = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings.append(ImportTiming(module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return timings
+
+
+def by_package(timings: List[ImportTiming]) -> Dict[str, int]:
+    totals: Dict[str, int] = defaultdict(int)
+    for timing in timings:
+        totals[timing.module.split(".")[0]] += timing.self_us
+    return totals
+
+
+async def time_startup() -> float:
+    from app.main import app
+
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        elapsed = time.perf_counter() - started
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=15, help="rows per table")
+    args = parser.parse_args()
+
+    timings = profile_imports()
+    total = next((t.cumulative_us for t in reversed(timings) if t.module == "app.main"), 0)
+    print(f"import app.main: {total / 1000:.0f} ms ({len(timings)} modules)\n")
+
+    print(f"{'slowest modules (self)':<56}{'self ms':>10}{'cum ms':>10}")
+    for timing in sorted(timings, key=lambda t: t.self_us, reverse=True)[:args.top]:
+        print(f"{timing.module:<56}{timing.self_us / 1000:>10.1f}{timing.cumulative_us / 1000:>10.1f}")
+
+    print(f"\n{'app modules (cumulative)':<56}{'cum ms':>10}")
+    app_modules = [t for t in timings if t.module.startswith("app.") and t.module != "app.main"]
+    for timing in sorted(app_modules, key=lambda t: t.cumulative_us, reverse=True)[:args.top]:
+        print(f"{timing.module:<56}{timing.cumulative_us / 1000:>10.1f}")
+
+    print(f"\n{'packages (sum of self)':<56}{'ms':>10}")
+    for package, self_us in sorted(by_package(timings).items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"{package:<56}{self_us / 1000:>10.1f}")
+
+    try:
+        print(f"\nstartup hooks: {asyncio.run(time_startup()) * 1000:.0f} ms")
+    except Exception as exc:  # e.g. an unmigrated database
+        print(f"\nstartup hooks failed: {exc.__class__.__name__}: {str(exc).splitlines()[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -51,8 +51,8 @@ async def test_gmail_flow():
         
         # 2. Mock Google API Client
         print("2. Mocking Google API...")
-        with patch('app.services.email.build') as mock_build:
-            with patch('app.services.email.Credentials') as mock_creds:
+        with patch('googleapiclient.discovery.build') as mock_build:
+            with patch('google.oauth2.credentials.Credentials') as mock_creds:
                 # Setup mock service
                 mock_service = MagicMock()
                 mock_users = MagicMock()
@@ -0,0 +1,47 @@
+"""
+Shared setup for the script-style tests in this directory.
+
+Import it after the test module has set DATABASE_URL / JWT_SECRET and imported
+app.main. Each file is run on its own, from the repository root
+(`python tests/test_x.py` or `pytest tests/test_x.py`), against the SQLite
+file it names. That file persists between runs, so each test builds its own
+workspace under a unique slug and only looks at its rows.
+"""
+import uuid
+from typing import Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core import security
+from app.models.user import User, UserRole
+from app.models.workspace import Workspace
+
+
+def unique_slug(prefix: str) -> str:
+    return f"{prefix}-{uuid.uuid4().hex[:10]}"
+
+
+def make_user(ws: Workspace, name: str, role: UserRole = UserRole.STAFF, **fields) -> User:
+    """An unsaved, active user of `ws` with the email <name>@<slug>.com."""
+    return User(email=f"{name}@{ws.slug}.com", hashed_password="x", role=role.value,
+                workspace_id=ws.id, is_active=True, **fields)
+
+
+def access_token(user: User) -> str:
+    return security.create_access_token(subject=user.id, workspace_id=user.workspace_id)
+
+
+def auth_headers(user: User) -> dict:
+    return {"Authorization": f"Bearer {access_token(user)}"}
+
+
+def create_workspace(db: Session, slug: str, name: str = "Test Spa",
+                     role: UserRole = UserRole.OWNER) -> Tuple[Workspace, User]:
+    """Commit an active workspace and the user the test logs in as (<role>@<slug>.com)."""
+    ws = Workspace(name=name, slug=slug, is_active=True)
+    db.add(ws)
+    db.commit()
+    user = make_user(ws, role.value, role)
+    db.add(user)
+    db.commit()
+    return ws, user
@@ -0,0 +1,194 @@
+import sys
+import os
+import time
+from datetime import datetime, date, timedelta, timezone
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./availability_cache_test.db"
+os.environ["JWT_SECRET"] = "availability_cache_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from helpers import auth_headers, create_workspace, unique_slug
+from app.core.config import settings
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+WEEK = {day: ["09:00-12:00"] for day in ("mon", "tue", "wed", "thu", "fri", "sat", "sun")}
+
+
+def _setup(slug, stock=None):
+    from app.models.service import Service
+    from app.models.inventory import InventoryItem
+
+    db = Session()
+    ws, owner = create_workspace(db, slug, "Cache Spa")
+    item = None
+    if stock is not None:
+        item = InventoryItem(name="Oil", quantity=stock, threshold=0, workspace_id=ws.id)
+        db.add(item)
+        db.flush()
+    service = Service(name="Massage", duration_minutes=60, workspace_id=ws.id, availability=WEEK,
+                      inventory_item_id=item.id if item else None,
+                      inventory_quantity_required=1 if item else 0)
+    db.add(service)
+    db.commit()
+    headers = auth_headers(owner)
+    ids = (service.id, item.id if item else None)
+    db.close()
+    return headers, ids
+
+
+def _slots(service_id, day):
+    res = client.get(f"/api/public/services/{service_id}/availability?date={day}&timezone=UTC")
+    assert res.status_code == 200, res.text
+    return res.json()
+
+
+def _quiet_emails(monkeypatch):
+    import app.api.bookings as bookings_api
+
+    async def noop(*args, **kwargs):
+        return None
+    for name in ("send_booking_confirmation", "send_form_magic_link", "send_welcome_email",
+                 "send_booking_cancellation", "send_inventory_alert"):
+        monkeypatch.setattr(bookings_api.email_service, name, noop)
+
+
+def test_bookings_invalidate_only_their_days(monkeypatch):
+    from app.services.availability import availability_cache
+
+    _quiet_emails(monkeypatch)
+    slug = unique_slug("avail")
+    headers, (service_id, _) = _setup(slug)
+    day = date.today() + timedelta(days=7)
+    other_day = day + timedelta(days=5)
+
+    assert _slots(service_id, day) == ["09:00", "10:00", "11:00"]
+    _slots(service_id, other_day)
+    hits = availability_cache.hits
+    assert _slots(service_id, day) == ["09:00", "10:00", "11:00"]
+    assert availability_cache.hits == hits + 1
+
+    start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc).replace(hour=10)
+    res = client.post("/api/bookings", json={
+        "service_id": service_id, "start_datetime": start.isoformat(),
+        "name": "Ada", "email": f"ada@{slug}.com",
+    })
+    assert res.status_code == 200, res.text
+    booking_id = res.json()["id"]
+
+    # The booked day is recomputed, the day far away is still served from cache
+    assert _slots(service_id, day) == ["09:00", "11:00"]
+    hits = availability_cache.hits
+    _slots(service_id, other_day)
+    assert availability_cache.hits == hits + 1
+
+    assert client.post(f"/api/bookings/{booking_id}/cancel", headers=headers).status_code == 200
+    assert _slots(service_id, day) == ["09:00", "10:00", "11:00"]
+
+    assert client.post(f"/api/bookings/{booking_id}/restore", headers=headers).status_code == 200
+    assert _slots(service_id, day) == ["09:00", "11:00"]
+
+    new_start = start.replace(hour=9)
+    res = client.post(f"/api/bookings/{booking_id}/reschedule", headers=headers,
+                      json={"start_datetime": new_start.isoformat()})
+    assert res.status_code == 200, res.text
+    assert _slots(service_id, day) == ["10:00", "11:00"]
+
+    res = client.patch(f"/api/services/{service_id}", headers=headers,
+                       json={"availability": {day.strftime("%a").lower(): ["13:00-15:00"]}})
+    assert res.status_code == 200, res.text
+    assert _slots(service_id, day) == ["13:00", "14:00"]
+    assert _slots(service_id, other_day) == []
+
+
+def test_inventory_only_invalidates_when_stock_crosses_requirement():
+    from app.services.availability import availability_cache
+
+    slug = unique_slug("avail-inv")
+    headers, (service_id, item_id) = _setup(slug, stock=2)
+    day = date.today() + timedelta(days=3)
+    assert len(_slots(service_id, day)) == 3
+
+    invalidations = availability_cache.invalidations
+    assert client.patch(f"/api/inventory/{item_id}", headers=headers, json={"quantity": 1}).status_code == 200
+    assert availability_cache.invalidations == invalidations
+
+    assert client.patch(f"/api/inventory/{item_id}", headers=headers, json={"quantity": 0}).status_code == 200
+    assert _slots(service_id, day) == []
+
+    assert client.patch(f"/api/inventory/{item_id}", headers=headers, json={"quantity": 5}).status_code == 200
+    assert len(_slots(service_id, day)) == 3
+
+
+def test_rolled_back_and_raced_writes():
+    from app.services.availability import AvailabilityCache, availability_cache, invalidate_service
+
+    cache = AvailabilityCache(max_size=2, ttl_seconds=60)
+    key = (1, date(2026, 5, 4), "UTC")
+    started = time.monotonic()
+    cache.invalidate_days(1, [date(2026, 5, 4)])
+    # Computed before the invalidation landed: never stored
+    assert cache.put(key, ["09:00"], started) is False
+    assert cache.put(key, ["09:00"], time.monotonic()) is True
+    assert cache.get(key) == ["09:00"]
+
+    # LRU eviction
+    cache.put((2, key[1], "UTC"), [], time.monotonic())
+    cache.put((3, key[1], "UTC"), [], time.monotonic())
+    assert cache.get(key) is None
+
+    # A rolled-back write invalidates nothing
+    db = Session()
+    invalidations = availability_cache.invalidations
+    db.execute(Base.metadata.tables["services"].select().limit(1))
+    invalidate_service(db, 1)
+    db.rollback()
+    db.commit()
+    assert availability_cache.invalidations == invalidations
+    db.close()
+
+
+def test_cache_stats_endpoint():
+    res = client.get("/api/cron/caches", headers={"X-Cron-Secret": settings.CRON_SECRET})
+    assert res.status_code == 200
+    stats = res.json()["availability"]
+    assert stats["hits"] >= 0 and "hit_rate" in stats
+    assert client.get("/api/cron/caches").status_code == 403
+
+
+def test_repeated_requests_are_served_from_cache():
+    from app.services import availability
+
+    slug = unique_slug("avail-repeat")
+    _, (service_id, _) = _setup(slug, stock=10)
+    day = date.today() + timedelta(days=2)
+    rounds = 20
+
+    # Timing lives in scripts/bench_availability_cache.py; here only the counters matter
+    db = Session()
+    service = db.get(availability.Service, service_id)
+    expected = availability.compute_slots(db, service, day, availability.resolve_timezone("UTC"))
+    cache = availability.availability_cache
+    hits, misses = cache.hits, cache.misses
+    for _ in range(rounds):
+        assert availability.get_slots(db, service_id, day, "UTC") == expected
+    db.close()
+    assert (cache.hits - hits, cache.misses - misses) == (rounds - 1, 1)
+
+
+if __name__ == "__main__":
+    test_rolled_back_and_raced_writes()
+    test_inventory_only_invalidates_when_stock_crosses_requirement()
+    test_cache_stats_endpoint()
+    test_repeated_requests_are_served_from_cache()
+    print("\n--- ALL AVAILABILITY CACHE TESTS PASSED ---")
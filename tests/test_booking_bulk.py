@@ -0,0 +1,170 @@
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./booking_bulk_test.db"
+os.environ["JWT_SECRET"] = "booking_bulk_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from helpers import auth_headers, create_workspace, make_user, unique_slug
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+
+def _setup(slug, bookings=4):
+    """A workspace with two staff, a service both can do (using one kit each) and `bookings` hour-long visits for Sam."""
+    from app.models.service import Service
+    from app.models.contact import Contact
+    from app.models.booking import Booking
+    from app.models.inventory import InventoryItem
+
+    db = Session()
+    ws, owner = create_workspace(db, slug, "Bulk Spa")
+    sam = make_user(ws, "sam")
+    kim = make_user(ws, "kim")
+    kit = InventoryItem(workspace_id=ws.id, name="Kit", quantity=10, threshold=2)
+    contact = Contact(workspace_id=ws.id, email=f"ada@{slug}.com", full_name="Ada")
+    db.add_all([sam, kim, kit, contact])
+    db.flush()
+    service = Service(name="Massage", duration_minutes=60, workspace_id=ws.id, staff_ids=[sam.id, kim.id],
+                      inventory_item_id=kit.id, inventory_quantity_required=1)
+    db.add(service)
+    db.flush()
+    start = (datetime.now(timezone.utc) + timedelta(days=2)).replace(hour=9, minute=0, second=0, microsecond=0)
+    rows = [Booking(workspace_id=ws.id, service_id=service.id, contact_id=contact.id, staff_id=sam.id,
+                    status="confirmed", start_time=start + timedelta(hours=i),
+                    end_time=start + timedelta(hours=i + 1)) for i in range(bookings)]
+    db.add_all(rows)
+    db.commit()
+    headers = auth_headers(owner)
+    ids = {"ws": ws.id, "sam": sam.id, "kim": kim.id, "kit": kit.id, "service": service.id,
+           "bookings": [b.id for b in rows]}
+    db.close()
+    return headers, ids
+
+
+def _bulk(headers, **body):
+    return client.post("/api/bookings/bulk", headers=headers, json=body)
+
+
+def _statements(fn):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(" ".join(statement.split()))
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return result, statements
+
+
+def test_set_status_is_one_update():
+    from app.models.audit_log import AuditLog
+    from app.models.booking import Booking
+    from app.services import calendar_feed
+    from app.services.scheduler import reminder_scheduler, FOLLOW_UP
+
+    slug = unique_slug("bulk-status")
+    headers, ids = _setup(slug)
+    first, *rest = ids["bookings"]
+    db = Session()
+    db.get(Booking, first).status = "cancelled"
+    db.commit()
+    feed_before = calendar_feed.version(db, ids["ws"], ids["sam"])
+    db.close()
+
+    res, statements = _statements(lambda: _bulk(headers, action="set_status", status="completed",
+                                                 booking_ids=ids["bookings"] + [999999]))
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert sorted(body["updated"]) == sorted(rest)
+    assert {(s["id"], s["reason"]) for s in body["skipped"]} == {(first, "cancelled"), (999999, "not_found")}
+    assert len([s for s in statements if s.startswith("UPDATE bookings")]) == 1
+    assert len([s for s in statements if s.startswith("INSERT INTO audit_logs")]) == 1
+
+    db = Session()
+    assert {b.status for b in db.query(Booking).filter(Booking.id.in_(rest))} == {"completed"}
+    audits = db.query(AuditLog).filter(AuditLog.action == "booking.status_changed",
+                                       AuditLog.booking_id.in_(rest)).all()
+    assert len(audits) == len(rest) and audits[0].details["to"] == "completed" and audits[0].details["bulk"]
+    assert calendar_feed.version(db, ids["ws"], ids["sam"]) > feed_before
+    db.close()
+    # Completed visits get their follow-up scheduled
+    assert all((FOLLOW_UP, booking_id) in reminder_scheduler._entries for booking_id in rest)
+
+    # Repeating it is a no-op
+    res = _bulk(headers, action="set_status", status="completed", booking_ids=rest)
+    assert res.json()["updated"] == [] and {s["reason"] for s in res.json()["skipped"]} == {"unchanged"}
+    assert _bulk(headers, action="set_status", status="cancelled", booking_ids=rest).status_code == 400
+
+
+def test_cancel_returns_inventory_and_batches_emails(monkeypatch):
+    import app.api.bookings as bookings_api
+    from app.models.audit_log import AuditLog
+    from app.models.inventory import InventoryItem
+
+    sent = []
+
+    async def capture(booking_ids, *args, **kwargs):
+        sent.append(list(booking_ids))
+    monkeypatch.setattr(bookings_api.email_service, "send_booking_cancellations_bulk", capture)
+
+    slug = unique_slug("bulk-cancel")
+    headers, ids = _setup(slug, bookings=3)
+    res = _bulk(headers, action="cancel", booking_ids=ids["bookings"])
+    assert res.status_code == 200, res.text
+    assert sorted(res.json()["updated"]) == sorted(ids["bookings"])
+    assert sent == [res.json()["updated"]]  # One background task for every email
+
+    db = Session()
+    assert db.get(InventoryItem, ids["kit"]).quantity == 13
+    returned = db.query(AuditLog).filter(AuditLog.action == "inventory.returned",
+                                         AuditLog.booking_id.in_(ids["bookings"])).all()
+    assert sorted(a.details["new_quantity"] for a in returned) == [11, 12, 13]
+    db.close()
+
+    res = _bulk(headers, action="cancel", booking_ids=ids["bookings"][:1])
+    assert res.json()["skipped"] == [{"id": ids["bookings"][0], "reason": "already_cancelled"}]
+
+
+def test_reassign_skips_conflicts():
+    from app.models.booking import Booking
+
+    slug = unique_slug("bulk-staff")
+    headers, ids = _setup(slug, bookings=3)
+    b0, b1, b2 = ids["bookings"]
+    db = Session()
+    taken = db.get(Booking, b1)
+    # Kim already has a visit at b1's time
+    db.add(Booking(workspace_id=ids["ws"], service_id=ids["service"], contact_id=taken.contact_id,
+                   staff_id=ids["kim"], status="confirmed", start_time=taken.start_time, end_time=taken.end_time))
+    db.commit()
+    db.close()
+
+    res = _bulk(headers, action="reassign", staff_id=ids["kim"], booking_ids=[b0, b1, b2])
+    assert res.status_code == 200, res.text
+    assert sorted(res.json()["updated"]) == [b0, b2]
+    assert res.json()["skipped"] == [{"id": b1, "reason": "conflict"}]
+
+    db = Session()
+    assert {b.id: b.staff_id for b in db.query(Booking).filter(Booking.id.in_([b0, b1, b2]))} == \
+        {b0: ids["kim"], b1: ids["sam"], b2: ids["kim"]}
+    db.close()
+
+    assert _bulk(headers, action="reassign", staff_id=123456, booking_ids=[b0]).status_code == 400
+
+
+if __name__ == "__main__":
+    test_reassign_skips_conflicts()
+    print("\n--- ALL BULK BOOKING TESTS PASSED ---")
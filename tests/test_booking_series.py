@@ -0,0 +1,178 @@
+import sys
+import os
+import asyncio
+from datetime import datetime, date, timedelta, timezone
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./booking_series_test.db"
+os.environ["JWT_SECRET"] = "booking_series_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from helpers import auth_headers, create_workspace, unique_slug
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+WEEK = {day: ["09:00-12:00"] for day in ("mon", "tue", "wed", "thu", "fri", "sat", "sun")}
+
+
+def _setup(slug):
+    from app.models.service import Service
+
+    db = Session()
+    ws, owner = create_workspace(db, slug, "Series Spa")
+    service = Service(name="Physio", duration_minutes=60, workspace_id=ws.id, availability=WEEK)
+    db.add(service)
+    db.commit()
+    headers = auth_headers(owner)
+    service_id = service.id
+    db.close()
+    return headers, service_id
+
+
+def _slots(service_id, day):
+    res = client.get(f"/api/public/services/{service_id}/availability?date={day}&timezone=UTC")
+    assert res.status_code == 200, res.text
+    return res.json()
+
+
+def _quiet_emails(monkeypatch):
+    import app.api.bookings as bookings_api
+
+    async def noop(*args, **kwargs):
+        return None
+    for name in ("send_booking_confirmation", "send_form_magic_link", "send_welcome_email",
+                 "send_booking_cancellation", "send_booking_reminder"):
+        monkeypatch.setattr(bookings_api.email_service, name, noop)
+
+
+def test_rule_expansion():
+    from app.services.recurrence import parse_rule, expand, first_occurrences, last_start
+
+    rule = parse_rule("RRULE:FREQ=WEEKLY;BYDAY=MO,TH;COUNT=5")
+    assert str(rule) == "FREQ=WEEKLY;INTERVAL=1;BYDAY=MO,TH;COUNT=5"
+    first = datetime(2026, 3, 2, 9, tzinfo=timezone.utc)
+    starts = first_occurrences(rule, first, "UTC", 100)
+    assert [s.day for s in starts] == [2, 5, 9, 12, 16]
+    assert last_start(rule, first, "UTC") == starts[-1]
+
+    # Wall-clock time survives DST: 09:00 London is 09:00Z in March, 08:00Z after the clocks change
+    weekly = parse_rule("FREQ=WEEKLY")
+    window = list(expand(weekly, datetime(2026, 3, 23, 9, tzinfo=timezone.utc), "Europe/London",
+                         datetime(2027, 3, 20, tzinfo=timezone.utc), datetime(2027, 4, 4, tzinfo=timezone.utc)))
+    assert [(s.day, s.hour) for s in window] == [(22, 9), (29, 8)]
+
+    # The 31st is skipped in shorter months
+    monthly = first_occurrences(parse_rule("FREQ=MONTHLY;COUNT=3"), datetime(2026, 1, 31, 10, tzinfo=timezone.utc), "UTC", 10)
+    assert [s.month for s in monthly] == [1, 3, 5]
+
+    for bad in ("FREQ=YEARLY", "FREQ=DAILY;BYDAY=MO", "FREQ=WEEKLY;COUNT=2;UNTIL=20270101", "FREQ=DAILY;INTERVAL=0"):
+        try:
+            parse_rule(bad)
+            assert False, bad
+        except ValueError:
+            pass
+
+
+def test_series_is_lazy_and_blocks_its_slots(monkeypatch):
+    from app.models.booking import Booking
+
+    _quiet_emails(monkeypatch)
+    slug = unique_slug("series")
+    headers, service_id = _setup(slug)
+    first_day = date.today() + timedelta(days=3)
+    first = datetime.combine(first_day, datetime.min.time(), tzinfo=timezone.utc).replace(hour=10)
+
+    # An existing booking on the third occurrence blocks the whole series
+    clash = client.post("/api/bookings", json={
+        "service_id": service_id, "start_datetime": (first + timedelta(weeks=2)).isoformat(),
+        "name": "Other", "email": f"other@{slug}.com",
+    })
+    assert clash.status_code == 200, clash.text
+    payload = {"service_id": service_id, "start_datetime": first.isoformat(), "rule": "FREQ=WEEKLY",
+               "name": "Rita", "email": f"rita@{slug}.com"}
+    res = client.post("/api/series", headers=headers, json=payload)
+    assert res.status_code == 409
+    assert res.json()["detail"]["conflicts"] == [(first + timedelta(weeks=2)).isoformat()]
+
+    assert client.post(f"/api/bookings/{clash.json()['id']}/cancel", headers=headers).status_code == 200
+    res = client.post("/api/series", headers=headers, json=payload)
+    assert res.status_code == 200, res.text
+    series = res.json()
+    assert series["ends_at"] is None and series["next_occurrence"].startswith(first_day.isoformat())
+
+    # Open-ended, yet no booking rows exist for it yet
+    db = Session()
+    assert db.query(Booking).filter(Booking.series_id == series["id"]).count() == 0
+    db.close()
+
+    # Occurrences a year out still block the slot
+    far_day = first_day + timedelta(weeks=52)
+    assert "10:00" not in _slots(service_id, far_day)
+    assert "10:00" in _slots(service_id, far_day + timedelta(days=1))
+    res = client.post("/api/bookings", json={
+        "service_id": service_id, "start_datetime": (first + timedelta(weeks=52)).isoformat(),
+        "name": "Late", "email": f"late@{slug}.com",
+    })
+    assert res.status_code == 400
+
+    res = client.get(f"/api/bookings/calendar?start={first_day}T00:00:00Z&end={first_day + timedelta(days=15)}T00:00:00Z",
+                     headers=headers)
+    assert res.status_code == 200, res.text
+    virtual = [e for e in res.json() if e["virtual"]]
+    assert len(virtual) == 3 and all(e["series_id"] == series["id"] for e in virtual)
+
+    # Skipping one occurrence frees exactly that slot
+    skip_at = first + timedelta(weeks=1)
+    res = client.post(f"/api/series/{series['id']}/skip", headers=headers, json={"start_datetime": skip_at.isoformat()})
+    assert res.status_code == 200, res.text
+    assert "10:00" in _slots(service_id, skip_at.date())
+    assert "10:00" not in _slots(service_id, first_day + timedelta(weeks=2))
+
+
+def test_occurrences_materialize_before_reminders(monkeypatch):
+    from app.models.booking import Booking
+    from app.services import scheduler
+
+    _quiet_emails(monkeypatch)
+    slug = unique_slug("series-mat")
+    headers, service_id = _setup(slug)
+    first = datetime.combine(date.today() + timedelta(days=2), datetime.min.time(), tzinfo=timezone.utc).replace(hour=9)
+    res = client.post("/api/series", headers=headers, json={
+        "service_id": service_id, "start_datetime": first.isoformat(), "rule": "FREQ=DAILY;COUNT=3",
+        "name": "Mo", "email": f"mo@{slug}.com",
+    })
+    assert res.status_code == 200, res.text
+    series_id = res.json()["id"]
+    assert res.json()["ends_at"] is not None
+
+    # When the reminder window opens, the occurrence becomes a booking; repeated runs add nothing
+    due = first - scheduler.REMINDER_LEAD
+    db = Session()
+    assert asyncio.run(scheduler.materialize_series_job(db, series_id, due)) is True
+    assert asyncio.run(scheduler.materialize_series_job(db, series_id, due)) is False
+    rows = db.query(Booking).filter(Booking.series_id == series_id).all()
+    assert [r.start_time.replace(tzinfo=timezone.utc) for r in rows] == [first]
+    assert ("booking_reminder", rows[0].id) in scheduler.reminder_scheduler._entries
+    db.close()
+
+    res = client.get(f"/api/series/{series_id}/occurrences?start={first.date()}T00:00:00Z&end={first.date() + timedelta(days=5)}T00:00:00Z",
+                     headers=headers)
+    assert [o["booking_id"] is not None for o in res.json()] == [True, False, False]
+
+    res = client.post(f"/api/series/{series_id}/cancel", headers=headers)
+    assert res.json() == {"status": "cancelled", "bookings_cancelled": 1}
+    assert "09:00" in _slots(service_id, first.date() + timedelta(days=1))
+
+
+if __name__ == "__main__":
+    test_rule_expansion()
+    print("\n--- ALL BOOKING SERIES TESTS PASSED ---")
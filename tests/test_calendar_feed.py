@@ -0,0 +1,148 @@
+import sys
+import os
+from datetime import datetime, date, timedelta, timezone
+from urllib.parse import urlparse
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./calendar_feed_test.db"
+os.environ["JWT_SECRET"] = "calendar_feed_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from helpers import auth_headers, create_workspace, make_user, unique_slug
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+WEEK = {day: ["09:00-17:00"] for day in ("mon", "tue", "wed", "thu", "fri", "sat", "sun")}
+
+
+def _setup(slug):
+    from app.models.service import Service
+
+    db = Session()
+    ws, owner = create_workspace(db, slug, "Feed Spa")
+    staff = make_user(ws, "staff", full_name="Sam")
+    db.add(staff)
+    db.flush()
+    service = Service(name="Massage, deep", duration_minutes=60, workspace_id=ws.id, availability=WEEK,
+                      staff_ids=[staff.id])
+    db.add(service)
+    db.commit()
+    headers = auth_headers(owner)
+    staff_headers = auth_headers(staff)
+    service_id = service.id
+    db.close()
+    return headers, staff_headers, service_id
+
+
+def _quiet_emails(monkeypatch):
+    import app.api.bookings as bookings_api
+
+    async def noop(*args, **kwargs):
+        return None
+    for name in ("send_booking_confirmation", "send_form_magic_link", "send_welcome_email",
+                 "send_booking_cancellation"):
+        monkeypatch.setattr(bookings_api.email_service, name, noop)
+
+
+def _path(url):
+    return urlparse(url).path
+
+
+def test_lines_are_escaped_and_folded():
+    from app.services.calendar_feed import _escape, _fold
+
+    assert _escape("Massage, deep; 60\nmin") == "Massage\\, deep\\; 60\\nmin"
+    folded = _fold("SUMMARY:" + "é" * 60)
+    lines = folded.split("\r\n")
+    assert all(len(line.encode("utf-8")) <= 75 for line in lines)
+    assert lines[1].startswith(" ") and folded.endswith("\r\n")
+
+
+def test_feed_etag_follows_booking_changes(monkeypatch):
+    from app.models.booking import Booking
+
+    _quiet_emails(monkeypatch)
+    slug = unique_slug("feed")
+    headers, staff_headers, service_id = _setup(slug)
+    workspace_feed = _path(client.get("/api/calendar/feeds", headers=headers).json()["workspace"])
+    staff_urls = client.get("/api/calendar/feeds", headers=staff_headers).json()
+    assert "workspace" not in staff_urls  # Staff only get their own schedule
+    staff_feed = _path(staff_urls["staff"])
+    assert client.get(workspace_feed.replace("-", "x", 1)).status_code == 404
+
+    start = datetime.combine(date.today() + timedelta(days=2), datetime.min.time(), tzinfo=timezone.utc).replace(hour=10)
+    booking = client.post("/api/bookings", json={
+        "service_id": service_id, "start_datetime": start.isoformat(), "name": "Ada Guest", "email": f"ada@{slug}.com",
+    }).json()["id"]
+
+    res = client.get(workspace_feed)
+    assert res.status_code == 200 and res.headers["content-type"].startswith("text/calendar")
+    body = res.text
+    assert body.startswith("BEGIN:VCALENDAR\r\n") and body.endswith("END:VCALENDAR\r\n")
+    assert f"UID:booking-{booking}@careops" in body and "SUMMARY:Massage\\, deep - Ada Guest" in body
+    assert f"DTSTART:{start:%Y%m%dT%H%M%SZ}" in body
+    tag = res.headers["etag"]
+
+    # Polling with the ETag: 304 without touching the bookings table
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        res = client.get(workspace_feed, headers={"If-None-Match": tag})
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert res.status_code == 304 and res.headers["etag"] == tag
+    assert not any("bookings" in s for s in statements)
+
+    # Bookkeeping updates don't change the feed; a reschedule does, for both feeds
+    db = Session()
+    db.query(Booking).get(booking).reminder_sent = True
+    db.commit()
+    db.close()
+    assert client.get(workspace_feed, headers={"If-None-Match": tag}).status_code == 304
+
+    staff_tag = client.get(staff_feed).headers["etag"]
+    res = client.post(f"/api/bookings/{booking}/reschedule", headers=headers,
+                      json={"start_datetime": (start + timedelta(hours=2)).isoformat()})
+    assert res.status_code == 200, res.text
+    assert client.get(workspace_feed, headers={"If-None-Match": tag}).status_code == 200
+    res = client.get(staff_feed, headers={"If-None-Match": staff_tag})
+    assert res.status_code == 200 and f"DTSTART:{start + timedelta(hours=2):%Y%m%dT%H%M%SZ}" in res.text
+
+    # Cancelled bookings drop out
+    client.post(f"/api/bookings/{booking}/cancel", headers=headers)
+    assert f"booking-{booking}@careops" not in client.get(workspace_feed).text
+
+
+def test_feed_includes_series_occurrences(monkeypatch):
+    _quiet_emails(monkeypatch)
+    slug = unique_slug("feed-series")
+    headers, _, service_id = _setup(slug)
+    feed = _path(client.get("/api/calendar/feeds", headers=headers).json()["workspace"])
+    tag = client.get(feed).headers["etag"]
+
+    first = datetime.combine(date.today() + timedelta(days=5), datetime.min.time(), tzinfo=timezone.utc).replace(hour=9)
+    series = client.post("/api/series", headers=headers, json={
+        "service_id": service_id, "start_datetime": first.isoformat(), "rule": "FREQ=WEEKLY;COUNT=4",
+        "name": "Rita", "email": f"rita@{slug}.com",
+    })
+    assert series.status_code == 200, series.text
+    res = client.get(feed, headers={"If-None-Match": tag})
+    assert res.status_code == 200
+    assert res.text.count(f"UID:series-{series.json()['id']}-") == 4
+    assert f"DTSTART:{first + timedelta(weeks=3):%Y%m%dT%H%M%SZ}" in res.text
+
+
+if __name__ == "__main__":
+    test_lines_are_escaped_and_folded()
+    print("\n--- ALL CALENDAR FEED TESTS PASSED ---")
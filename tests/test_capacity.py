@@ -0,0 +1,142 @@
+import sys
+import os
+from datetime import datetime, date, timedelta, timezone
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./capacity_test.db"
+os.environ["JWT_SECRET"] = "capacity_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from helpers import auth_headers, create_workspace, make_user, unique_slug
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+WEEK = {day: ["09:00-12:00"] for day in ("mon", "tue", "wed", "thu", "fri", "sat", "sun")}
+
+
+def _setup(slug, staff_count, services):
+    """services: list of staff index lists (None = unstaffed service)."""
+    from app.models.service import Service
+
+    db = Session()
+    ws, owner = create_workspace(db, slug, "Capacity Spa")
+    staff = [make_user(ws, f"staff{i}") for i in range(staff_count)]
+    db.add_all(staff)
+    db.flush()
+    rows = [Service(name=f"Service {i}", duration_minutes=60, workspace_id=ws.id, availability=WEEK,
+                    staff_ids=[staff[j].id for j in pool] if pool is not None else None)
+            for i, pool in enumerate(services)]
+    db.add_all(rows)
+    db.commit()
+    headers = auth_headers(owner)
+    ids = ([s.id for s in rows], [u.id for u in staff])
+    db.close()
+    return headers, ids
+
+
+def _quiet_emails(monkeypatch):
+    import app.api.bookings as bookings_api
+
+    async def noop(*args, **kwargs):
+        return None
+    for name in ("send_booking_confirmation", "send_form_magic_link", "send_welcome_email",
+                 "send_booking_cancellation"):
+        monkeypatch.setattr(bookings_api.email_service, name, noop)
+
+
+def _book(service_id, start, email):
+    return client.post("/api/bookings", json={
+        "service_id": service_id, "start_datetime": start.isoformat(), "name": "Guest", "email": email,
+    })
+
+
+def _slots(service_id, day):
+    res = client.get(f"/api/public/services/{service_id}/availability?date={day}&timezone=UTC")
+    assert res.status_code == 200, res.text
+    return res.json()
+
+
+def test_timeline_counts_overlaps():
+    from app.services.capacity import Timeline
+
+    t0 = datetime(2026, 5, 4, 9, tzinfo=timezone.utc)
+    h = timedelta(hours=1)
+    timeline = Timeline([(t0, t0 + 3 * h), (t0 + h, t0 + 2 * h), (t0 + 4 * h, t0 + 5 * h)])
+    assert timeline.overlapping(t0 + h, t0 + 2 * h) == 2
+    assert timeline.overlapping(t0 + 3 * h, t0 + 4 * h) == 0  # Touching ends don't overlap
+    assert timeline.overlapping(t0 - h, t0 + 6 * h) == 3
+    assert timeline.is_free(t0 + 5 * h, t0 + 6 * h)
+
+
+def test_staffed_service_takes_one_booking_per_free_staff(monkeypatch):
+    from app.models.booking import Booking
+
+    _quiet_emails(monkeypatch)
+    slug = unique_slug("cap")
+    _, ([massage], staff_ids) = _setup(slug, 2, [[0, 1]])
+    day = date.today() + timedelta(days=4)
+    start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc).replace(hour=10)
+
+    first = _book(massage, start, f"a@{slug}.com")
+    assert first.status_code == 200, first.text
+    assert "10:00" in _slots(massage, day)  # One therapist still free
+
+    second = _book(massage, start, f"b@{slug}.com")
+    assert second.status_code == 200, second.text
+    assert "10:00" not in _slots(massage, day)
+    assert _book(massage, start, f"c@{slug}.com").status_code == 400
+
+    db = Session()
+    assigned = {b.staff_id for b in db.query(Booking).filter(Booking.id.in_([first.json()["id"], second.json()["id"]]))}
+    assert assigned == set(staff_ids)
+    db.close()
+
+
+def test_staff_are_shared_across_services(monkeypatch):
+    _quiet_emails(monkeypatch)
+    slug = unique_slug("cap-shared")
+    _, ([massage, facial], _) = _setup(slug, 1, [[0], [0]])
+    day = date.today() + timedelta(days=5)
+    start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc).replace(hour=9)
+
+    assert "09:00" in _slots(facial, day)
+    assert _book(massage, start, f"a@{slug}.com").status_code == 200
+    # The only therapist is busy, so the facial at 09:00 is gone too
+    assert "09:00" not in _slots(facial, day)
+    assert _book(facial, start, f"b@{slug}.com").status_code == 400
+
+
+def test_reschedule_and_restore_check_capacity_not_workspace(monkeypatch):
+    _quiet_emails(monkeypatch)
+    slug = unique_slug("cap-ws")
+    headers, ([yoga, sauna], _) = _setup(slug, 0, [None, None])
+    day = date.today() + timedelta(days=6)
+    nine = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc).replace(hour=9)
+
+    assert _book(sauna, nine, f"a@{slug}.com").status_code == 200
+    res = _book(yoga, nine + timedelta(hours=2), f"b@{slug}.com")
+    yoga_booking = res.json()["id"]
+
+    # A different, unstaffed service at the same time doesn't block the move
+    res = client.post(f"/api/bookings/{yoga_booking}/reschedule", headers=headers,
+                      json={"start_datetime": nine.isoformat()})
+    assert res.status_code == 200, res.text
+
+    assert client.post(f"/api/bookings/{yoga_booking}/cancel", headers=headers).status_code == 200
+    assert _book(yoga, nine, f"c@{slug}.com").status_code == 200
+    # Now its own service is taken at 09:00
+    assert client.post(f"/api/bookings/{yoga_booking}/restore", headers=headers).status_code == 409
+
+
+if __name__ == "__main__":
+    test_timeline_counts_overlaps()
+    print("\n--- ALL CAPACITY TESTS PASSED ---")
@@ -0,0 +1,141 @@
+import sys
+import os
+import time
+from dataclasses import FrozenInstanceError
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./catalog_cache_test.db"
+os.environ["JWT_SECRET"] = "catalog_cache_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from helpers import auth_headers, create_workspace, unique_slug
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+WEEK = {day: ["09:00-17:00"] for day in ("mon", "tue", "wed", "thu", "fri", "sat", "sun")}
+
+
+def _setup(slug):
+    from app.models.service import Service
+
+    db = Session()
+    ws, owner = create_workspace(db, slug, "Catalog Spa")
+    service = Service(name="Massage", duration_minutes=60, workspace_id=ws.id, availability=WEEK)
+    db.add(service)
+    db.commit()
+    headers = auth_headers(owner)
+    ids = (ws.id, service.id)
+    db.close()
+    return headers, ids
+
+
+def _count_queries(fn):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return result, statements
+
+
+def test_public_reads_hit_cache_and_writes_invalidate():
+    from app.services.catalog import catalog_cache
+
+    slug = unique_slug("catalog")
+    headers, (ws_id, service_id) = _setup(slug)
+    catalog_cache.clear()
+
+    res = client.get(f"/api/public/workspace/{slug}")
+    assert res.status_code == 200, res.text
+    assert [s["name"] for s in res.json()["services"]] == ["Massage"]
+
+    res, statements = _count_queries(lambda: client.get(f"/api/bookings/services/{slug}"))
+    assert res.status_code == 200 and res.json()[0]["availability"] == WEEK
+    assert not any("services" in s or "workspaces" in s for s in statements)
+    stats = catalog_cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+    # Editing a service shows up on the next read
+    res = client.patch(f"/api/services/{service_id}", headers=headers, json={"name": "Deep Massage"})
+    assert res.status_code == 200, res.text
+    assert catalog_cache.get(ws_id) is None
+    assert client.get(f"/api/bookings/services/{slug}").json()[0]["name"] == "Deep Massage"
+
+    # A renamed workspace answers under its new slug only
+    from app.models.workspace import Workspace
+    db = Session()
+    db.get(Workspace, ws_id).slug = f"{slug}-new"
+    db.commit()
+    db.close()
+    assert client.get(f"/api/public/workspace/{slug}").status_code == 404
+    assert client.get(f"/api/public/workspace/{slug}-new").json()["id"] == ws_id
+
+
+def test_private_fields_and_rollbacks_keep_snapshot():
+    from app.models.workspace import Workspace
+    from app.models.service import Service
+    from app.services import catalog
+
+    slug = unique_slug("catalog-keep")
+    _, (ws_id, service_id) = _setup(slug)
+    db = Session()
+    snapshot = catalog.get_workspace_by_slug(db, slug)
+    assert catalog.get_service(db, service_id) == snapshot.service(service_id)
+
+    db.get(Workspace, ws_id).google_refresh_token = "refreshed"  # Not part of the snapshot
+    db.commit()
+    assert catalog.catalog_cache.get(ws_id) is snapshot
+
+    db.get(Service, service_id).name = "Never saved"
+    db.flush()
+    db.rollback()
+    assert catalog.catalog_cache.get(ws_id) is snapshot
+    db.close()
+
+
+def test_stale_load_is_not_cached():
+    from app.services.catalog import CatalogCache, WorkspaceSnapshot
+
+    cache = CatalogCache(max_size=2, ttl_seconds=60)
+    snapshot = WorkspaceSnapshot(id=1, slug="a", name="A", address=None, timezone=None,
+                                 contact_email=None, is_active=True, services=())
+    started = time.monotonic()
+    cache.invalidate([1])  # A write committed while the snapshot was being read
+    assert cache.put(snapshot, started) is False and cache.get(1) is None
+    assert cache.put(snapshot, time.monotonic()) is True and cache.get_by_slug("a") is snapshot
+    try:
+        snapshot.name = "B"
+        assert False, "snapshots must be immutable"
+    except FrozenInstanceError:
+        pass
+
+
+def test_warm_loads_active_workspaces():
+    from app.services import catalog
+
+    slug = unique_slug("catalog-warm")
+    _, (ws_id, service_id) = _setup(slug)
+    catalog.catalog_cache.clear()
+    assert catalog.warm() >= 1
+    snapshot = catalog.catalog_cache.get_by_service(service_id)
+    assert snapshot is not None and snapshot.id == ws_id and snapshot.slug == slug
+
+
+if __name__ == "__main__":
+    test_public_reads_hit_cache_and_writes_invalidate()
+    test_private_fields_and_rollbacks_keep_snapshot()
+    test_stale_load_is_not_cached()
+    test_warm_loads_active_workspaces()
+    print("\n--- ALL CATALOG CACHE TESTS PASSED ---")
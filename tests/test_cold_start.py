@@ -0,0 +1,39 @@
+import sys
+import os
+import subprocess
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./cold_start_test.db"
+os.environ["JWT_SECRET"] = "cold_start_secret"
+
+BACKEND = os.path.join(os.getcwd(), 'backend')
+
+
+def test_google_stack_not_imported_at_startup():
+    code = (
+        "import sys, app.main\n"
+        "loaded = sorted(m for m in sys.modules if m.split('.')[0] in ('googleapiclient', 'google_auth_oauthlib')"
+        " or m.startswith('google.oauth2') or m.startswith('google.auth'))\n"
+        "print(','.join(loaded))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND, capture_output=True, text=True,
+                            env={**os.environ, "DATABASE_URL": "sqlite:///./cold_start_test.db"})
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert result.stdout.strip() == ""
+
+
+def test_profile_parses_importtime():
+    from scripts.profile_startup import by_package, profile_imports
+
+    timings = profile_imports("json")
+    assert any(t.module == "json" and t.depth == 0 for t in timings)
+    assert by_package(timings)["json"] >= 0
+
+
+if __name__ == "__main__":
+    test_google_stack_not_imported_at_startup()
+    test_profile_parses_importtime()
+    print("\n--- ALL COLD START TESTS PASSED ---")
@@ -0,0 +1,106 @@
+import sys
+import os
+import io
+import json
+import time
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./import_test.db"
+os.environ["JWT_SECRET"] = "import_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from helpers import auth_headers, create_workspace, unique_slug
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+
+def _owner_headers(slug):
+    from app.models.contact import Contact
+
+    db = Session()
+    ws, owner = create_workspace(db, slug, "Import Spa")
+    db.add(Contact(workspace_id=ws.id, email="existing@client.com", full_name="Already Here"))
+    db.commit()
+    headers = auth_headers(owner)
+    workspace_id = ws.id
+    db.close()
+    return headers, workspace_id
+
+
+def test_bulk_import_csv_dedupes_and_batches_welcome(monkeypatch):
+    import app.api.leads as leads_api
+    queued = []
+    monkeypatch.setattr(leads_api, "send_welcome_emails_bulk", lambda ids, url: queued.append(ids))
+
+    headers, workspace_id = _owner_headers(unique_slug("import"))
+    lines = ["Email,First Name,Last Name,Phone", "existing@client.com,Old,Client,1"]
+    lines += [f"client{i}@example.com,Client,{i},555{i}" for i in range(20000)]
+    lines += ["client1@example.com,Dup,Row,0", "not-an-email,Bad,Row,0"]
+    payload = ("\n".join(lines) + "\n").encode()
+
+    started = time.perf_counter()
+    res = client.post("/api/leads/import", headers=headers,
+                      files={"file": ("clients.csv", io.BytesIO(payload), "text/csv")})
+    elapsed = time.perf_counter() - started
+    assert res.status_code == 200, res.text
+    assert res.json() == {"imported": 20000, "skipped_existing": 1, "skipped_invalid": 1, "duplicates_in_file": 1}
+    assert elapsed < 30
+
+    # Welcome emails queued once for the whole batch
+    assert len(queued) == 1 and len(queued[0]) == 20000
+
+    from app.models.contact import Contact
+    db = Session()
+    c = db.query(Contact).filter(Contact.workspace_id == workspace_id, Contact.email == "client7@example.com").one()
+    assert c.full_name == "Client 7" and c.source == "import" and c.status == "new"
+    db.close()
+
+
+def test_bulk_import_ndjson():
+    headers, _ = _owner_headers(unique_slug("import-nd"))
+    payload = "\n".join(json.dumps({"email": f"nd{i}@example.com", "name": f"ND {i}"}) for i in range(50))
+    res = client.post("/api/leads/import?send_welcome=false", headers=headers,
+                      files={"file": ("clients.ndjson", io.BytesIO(payload.encode()), "application/x-ndjson")})
+    assert res.status_code == 200
+    assert res.json()["imported"] == 50
+
+    # Re-importing the same file is a no-op
+    res = client.post("/api/leads/import?send_welcome=false", headers=headers,
+                      files={"file": ("clients.ndjson", io.BytesIO(payload.encode()), "application/x-ndjson")})
+    assert res.json()["imported"] == 0
+    assert res.json()["skipped_existing"] == 50
+
+
+def test_imported_contacts_emit_created_events(monkeypatch):
+    from app.services.events import event_bus
+
+    published = []
+    monkeypatch.setattr(event_bus, "publish", published.append)
+    headers, workspace_id = _owner_headers(unique_slug("import-events"))
+    payload = "email,name\nexisting@client.com,Old\nnew1@example.com,New One\nnew2@example.com,New Two\n"
+    res = client.post("/api/leads/import?send_welcome=false", headers=headers,
+                      files={"file": ("clients.csv", io.BytesIO(payload.encode()), "text/csv")})
+    assert res.json()["imported"] == 2
+
+    # The fixture's existing contact came through the ORM; the imported ones come from the bulk INSERT
+    created = [evt["data"] for evt in published
+               if evt["workspace_id"] == workspace_id and evt["type"] == "contact.created" and evt["data"]["source"] == "import"]
+    assert sorted(data["email"] for data in created) == ["new1@example.com", "new2@example.com"]
+    assert all(data["contact_id"] and data["status"] == "new" for data in created)
+
+
+if __name__ == "__main__":
+    test_bulk_import_ndjson()
+    import pytest
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_imported_contacts_emit_created_events(monkeypatch)
+    print("\n--- ALL IMPORT TESTS PASSED ---")
@@ -0,0 +1,91 @@
+import sys
+import os
+import asyncio
+import time
+from datetime import datetime
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./cron_metrics_test.db"
+os.environ["JWT_SECRET"] = "cron_metrics_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from app.core.config import settings
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+CRON_HEADERS = {"X-Cron-Secret": settings.CRON_SECRET}
+
+
+def test_job_metrics_are_persisted():
+    from sqlalchemy import text
+    from app.models.cron import CronRun
+    from app.services import job_metrics
+    from app.services.job_runner import run_job
+
+    name = f"metrics-{datetime.now().timestamp()}"
+
+    async def job(db):
+        ids = db.execute(text("SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3")).all()
+        job_metrics.scanned(len(ids))
+        for _ in range(2):
+            with job_metrics.gmail_call():
+                time.sleep(0.05)
+        return {"sent": 2}
+
+    outcome = asyncio.run(run_job(name, job))
+    assert outcome["rows_scanned"] == 3 and outcome["emails_sent"] == 2
+    assert outcome["gmail_ms"] >= 100
+    assert outcome["duration_ms"] >= outcome["gmail_ms"]
+
+    db = Session()
+    run = db.query(CronRun).filter(CronRun.job == name).one()
+    assert (run.rows_scanned, run.emails_sent) == (3, 2)
+    assert run.db_ms is not None and run.gmail_ms >= 100
+    db.close()
+
+    # Outside a job nothing is collected
+    with job_metrics.gmail_call():
+        pass
+
+
+def test_runs_and_stats_endpoints():
+    for _ in range(3):
+        assert client.post("/api/cron/run", headers=CRON_HEADERS).status_code == 200
+
+    res = client.get("/api/cron/runs?job=owner_summaries&limit=2", headers=CRON_HEADERS)
+    assert res.status_code == 200
+    runs = res.json()
+    assert len(runs) == 2
+    assert all(r["job"] == "owner_summaries" and r["rows_scanned"] is not None for r in runs)
+
+    res = client.get("/api/cron/runs/stats", headers=CRON_HEADERS)
+    assert res.status_code == 200
+    stats = res.json()["owner_summaries"]
+    assert stats["runs"] >= 3
+    assert stats["duration_ms"]["p50"] <= stats["duration_ms"]["p95"] <= stats["duration_ms"]["max"]
+
+    assert client.get("/api/cron/runs").status_code == 403
+
+
+def test_percentile_nearest_rank():
+    from app.api.cron import _percentile
+
+    assert _percentile([], 95) is None
+    assert _percentile([10], 50) == 10
+    assert _percentile(list(range(1, 101)), 95) == 95
+    assert _percentile([1, 2, 3, 4], 50) == 2
+
+
+if __name__ == "__main__":
+    test_job_metrics_are_persisted()
+    test_runs_and_stats_endpoints()
+    test_percentile_nearest_rank()
+    print("\n--- ALL CRON METRICS TESTS PASSED ---")
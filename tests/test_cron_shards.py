@@ -0,0 +1,108 @@
+import sys
+import os
+import asyncio
+from datetime import datetime
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./cron_shards_test.db"
+os.environ["JWT_SECRET"] = "cron_shards_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from app.core.config import settings
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+
+def _low_stock_workspaces(count):
+    from app.models.workspace import Workspace
+    from app.models.inventory import InventoryItem
+
+    db = Session()
+    stamp = f"{datetime.now().timestamp():.0f}"
+    items = {}
+    for i in range(count):
+        ws = Workspace(name=f"Shard Spa {i}", slug=f"shard-{stamp}-{i}", is_active=True)
+        db.add(ws)
+        db.flush()
+        item = InventoryItem(name="Towels", quantity=1, threshold=5, workspace_id=ws.id)
+        db.add(item)
+        db.flush()
+        items[item.id] = ws.id
+    db.commit()
+    db.close()
+    return items
+
+
+def test_shard_partitions_workspaces():
+    from app.services.job_runner import Shard
+
+    shards = [Shard(i, 3) for i in range(3)]
+    for workspace_id in range(1, 50):
+        assert sum(s.owns(workspace_id) for s in shards) == 1
+    assert str(shards[1]) == "1/3"
+
+
+def test_failing_tenant_only_affects_its_shard(monkeypatch):
+    from app.models.cron import CronRun
+    from app.services import cron_jobs
+    from app.services.job_runner import run_jobs, Shard
+
+    items = _low_stock_workspaces(4)
+    bad_item = next(iter(items))
+    bad_shard = Shard(items[bad_item] % 2, 2)
+    alerted = []
+
+    async def fake_alert(item_id):
+        if item_id == bad_item:
+            raise RuntimeError("gmail outage")
+        alerted.append(item_id)
+    monkeypatch.setattr(cron_jobs.email_service, "send_inventory_alert", fake_alert)
+
+    outcomes = asyncio.run(run_jobs({"inventory_alerts": cron_jobs.inventory_alerts}, shards=2))
+    assert set(outcomes) == {"inventory_alerts:0/2", "inventory_alerts:1/2"}
+    assert outcomes[f"inventory_alerts:{bad_shard}"]["status"] == "failed"
+    good = Shard(1 - bad_shard.index, 2)
+    assert outcomes[f"inventory_alerts:{good}"]["status"] == "success"
+
+    # Every tenant in the healthy shard got its alert
+    assert {i for i, ws in items.items() if good.owns(ws)} <= set(alerted)
+
+    db = Session()
+    shards_run = {r.shard for r in db.query(CronRun).filter(CronRun.job == "inventory_alerts")}
+    assert {"0/2", "1/2"} <= shards_run
+    db.close()
+
+
+def test_endpoint_runs_requested_shard_only(monkeypatch):
+    monkeypatch.setattr(settings, "CRON_SHARDS", 4)
+    headers = {"X-Cron-Secret": settings.CRON_SECRET}
+    res = client.post("/api/cron/run?shards=4&shard=2", headers=headers)
+    assert res.status_code == 200, res.text
+    assert set(res.json()["jobs"]) == {f"{name}:2/4" for name in
+                                       ("booking_reminders", "form_reminders", "inventory_alerts",
+                                        "thank_you_emails", "owner_summaries", "follow_ups", "series_occurrences",
+                                        "webhook_deliveries", "auto_complete", "stats_rollup")}
+
+    res = client.post("/api/cron/run?shards=4&shard=4", headers=headers)
+    assert res.status_code == 400
+
+    # A shard count other than CRON_SHARDS would take different leases and overlap a normal run
+    res = client.post("/api/cron/run?shards=2&shard=1", headers=headers)
+    assert res.status_code == 400
+
+
+if __name__ == "__main__":
+    test_shard_partitions_workspaces()
+    import pytest
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_endpoint_runs_requested_shard_only(monkeypatch)
+    print("\n--- ALL CRON SHARD TESTS PASSED ---")
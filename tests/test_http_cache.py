@@ -0,0 +1,160 @@
+import sys
+import os
+from datetime import datetime, date, timedelta, timezone
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./http_cache_test.db"
+os.environ["JWT_SECRET"] = "http_cache_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from helpers import auth_headers, create_workspace, unique_slug
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+WEEK = {day: ["09:00-17:00"] for day in ("mon", "tue", "wed", "thu", "fri", "sat", "sun")}
+
+
+def _setup(slug):
+    from app.models.service import Service
+    from app.models.form import Form
+
+    db = Session()
+    ws, owner = create_workspace(db, slug, "Etag Spa")
+    service = Service(name="Massage", duration_minutes=60, workspace_id=ws.id, availability=WEEK)
+    form = Form(name="Contact us", type="contact", workspace_id=ws.id,
+                fields=[{"name": "email", "label": "Email", "type": "email", "required": True}])
+    db.add_all([service, form])
+    db.commit()
+    headers = auth_headers(owner)
+    ids = (ws.id, service.id, form.id)
+    db.close()
+    return headers, ids
+
+
+def _quiet_emails(monkeypatch):
+    import app.api.bookings as bookings_api
+
+    async def noop(*args, **kwargs):
+        return None
+    for name in ("send_booking_confirmation", "send_form_magic_link", "send_welcome_email",
+                 "send_booking_cancellation"):
+        monkeypatch.setattr(bookings_api.email_service, name, noop)
+
+
+def _revalidate(url, tag):
+    return client.get(url, headers={"If-None-Match": tag})
+
+
+def test_not_modified_matching():
+    from app.services.http_cache import not_modified
+
+    class FakeRequest:
+        def __init__(self, header):
+            self.headers = {"if-none-match": header} if header else {}
+
+    assert not_modified(FakeRequest('"a", W/"b"'), '"b"')
+    assert not_modified(FakeRequest("*"), '"c"')
+    assert not not_modified(FakeRequest('"a"'), '"b"') and not not_modified(FakeRequest(None), '"a"')
+
+
+def test_catalog_routes_revalidate_from_cache():
+    from app.models.workspace import Workspace
+
+    slug = unique_slug("etag")
+    headers, (ws_id, service_id, _) = _setup(slug)
+
+    for url in (f"/api/public/workspace/{slug}", f"/api/bookings/services/{slug}"):
+        res = client.get(url)
+        assert res.status_code == 200 and "stale-while-revalidate" in res.headers["cache-control"]
+        tag = res.headers["etag"]
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            res = _revalidate(url, tag)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        assert res.status_code == 304 and res.headers["etag"] == tag and not res.content
+        assert statements == []  # Answered from the catalog snapshot
+
+    # A service edit and a public workspace field change move the validator; a token refresh doesn't
+    tag = client.get(f"/api/public/workspace/{slug}").headers["etag"]
+    db = Session()
+    db.get(Workspace, ws_id).google_refresh_token = "refreshed"
+    db.commit()
+    assert _revalidate(f"/api/public/workspace/{slug}", tag).status_code == 304
+
+    res = client.patch(f"/api/services/{service_id}", headers=headers, json={"name": "Deep Massage"})
+    assert res.status_code == 200, res.text
+    res = _revalidate(f"/api/public/workspace/{slug}", tag)
+    assert res.status_code == 200 and res.json()["services"][0]["name"] == "Deep Massage"
+    tag = res.headers["etag"]
+
+    db.get(Workspace, ws_id).address = "1 New Street"
+    db.commit()
+    db.close()
+    assert _revalidate(f"/api/public/workspace/{slug}", tag).status_code == 200
+
+
+def test_form_revalidates_on_counter():
+    from app.models.workspace import Workspace
+
+    slug = unique_slug("etag-form")
+    headers, (ws_id, _, form_id) = _setup(slug)
+    url = f"/api/public/forms/{form_id}"
+    res = client.get(url)
+    assert res.status_code == 200 and res.json()["workspace_slug"] == slug
+    tag = res.headers["etag"]
+    assert _revalidate(url, tag).status_code == 304
+
+    res = client.patch(f"/api/forms/{form_id}", headers=headers, json={"name": "Get in touch"})
+    assert res.status_code == 200, res.text
+    res = _revalidate(url, tag)
+    assert res.status_code == 200 and res.json()["name"] == "Get in touch"
+    tag = res.headers["etag"]
+
+    # The page shows the workspace's name and slug too
+    db = Session()
+    db.get(Workspace, ws_id).name = "Renamed Spa"
+    db.commit()
+    db.close()
+    res = _revalidate(url, tag)
+    assert res.status_code == 200 and res.json()["workspace_name"] == "Renamed Spa"
+
+
+def test_availability_revalidates_on_slots(monkeypatch):
+    _quiet_emails(monkeypatch)
+    slug = unique_slug("etag-slots")
+    _, (_, service_id, _) = _setup(slug)
+    day = date.today() + timedelta(days=3)
+    url = f"/api/public/services/{service_id}/availability?date={day}&timezone=UTC"
+    res = client.get(url)
+    assert res.status_code == 200 and "10:00" in res.json()
+    tag = res.headers["etag"]
+    assert _revalidate(url, tag).status_code == 304
+
+    start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc).replace(hour=10)
+    res = client.post("/api/bookings", json={
+        "service_id": service_id, "start_datetime": start.isoformat(), "name": "Guest", "email": f"g@{slug}.com",
+    })
+    assert res.status_code == 200, res.text
+    res = _revalidate(url, tag)
+    assert res.status_code == 200 and "10:00" not in res.json()
+
+
+if __name__ == "__main__":
+    test_not_modified_matching()
+    test_catalog_routes_revalidate_from_cache()
+    test_form_revalidates_on_counter()
+    print("\n--- ALL HTTP CACHE TESTS PASSED ---")
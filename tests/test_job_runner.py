@@ -0,0 +1,179 @@
+import sys
+import os
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./job_runner_test.db"
+os.environ["JWT_SECRET"] = "job_runner_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from app.core.config import settings
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+
+def test_lease_is_exclusive_until_expired():
+    from app.services.job_runner import acquire_lease, release_lease
+
+    name = f"lease-{datetime.now().timestamp()}"
+    now = datetime.now(timezone.utc)
+    db = Session()
+    assert acquire_lease(db, name, "worker-a", 60, now=now)
+    assert not acquire_lease(db, name, "worker-b", 60, now=now)
+
+    # Expired leases can be taken over; the old holder can no longer release it
+    later = now + timedelta(seconds=61)
+    assert acquire_lease(db, name, "worker-b", 60, now=later)
+    release_lease(db, name, "worker-a")
+    assert not acquire_lease(db, name, "worker-c", 60, now=later)
+
+    release_lease(db, name, "worker-b")
+    assert acquire_lease(db, name, "worker-c", 60, now=later)
+    db.close()
+
+
+def test_same_job_never_runs_twice_concurrently():
+    from app.models.cron import CronRun
+    from app.services.job_runner import run_jobs, run_job
+
+    name = f"job-{datetime.now().timestamp()}"
+    calls = []
+
+    async def slow_job(db):
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return {"done": 1}
+
+    async def both():
+        return await asyncio.gather(run_job(name, slow_job), run_job(name, slow_job))
+
+    first, second = asyncio.run(both())
+    assert sorted([first["status"], second["status"]]) == ["skipped", "success"]
+    assert len(calls) == 1
+
+    # Different jobs run side by side
+    other = name + "-other"
+    outcomes = asyncio.run(run_jobs({name: slow_job, other: slow_job}))
+    assert [o["status"] for o in outcomes.values()] == ["success", "success"]
+
+    db = Session()
+    runs = db.query(CronRun).filter(CronRun.job == name).all()
+    assert len(runs) == 2
+    assert all(r.status == "success" and r.duration_ms >= 200 and r.result == {"done": 1} for r in runs)
+    db.close()
+
+
+def test_stages_run_one_after_another():
+    from app.services.job_runner import run_stages
+
+    name = f"stage-{datetime.now().timestamp()}"
+    log = []
+
+    def job(label, delay):
+        async def fn(db):
+            log.append(f"{label} start")
+            await asyncio.sleep(delay)
+            log.append(f"{label} end")
+            return {}
+        return fn
+
+    outcomes = asyncio.run(run_stages([{f"{name}-a": job("a", 0.1)},
+                                       {f"{name}-b": job("b", 0), f"{name}-c": job("c", 0)}]))
+    assert set(outcomes) == {f"{name}-a", f"{name}-b", f"{name}-c"}
+    assert log[:2] == ["a start", "a end"] and sorted(log[2:]) == ["b end", "b start", "c end", "c start"]
+
+
+def test_failed_job_is_recorded_and_lease_released():
+    from app.models.cron import CronRun
+    from app.services.job_runner import run_job
+
+    name = f"boom-{datetime.now().timestamp()}"
+
+    async def boom(db):
+        raise RuntimeError("smtp down")
+
+    assert asyncio.run(run_job(name, boom))["status"] == "failed"
+    assert asyncio.run(run_job(name, boom))["status"] == "failed"  # lease was released
+
+    db = Session()
+    assert [r.error for r in db.query(CronRun).filter(CronRun.job == name)] == ["smtp down", "smtp down"]
+    db.close()
+
+
+def test_overlapping_runs_send_thank_yous_and_owner_alerts_once(monkeypatch):
+    from app.models.workspace import Workspace
+    from app.models.booking import Booking
+    from app.models.conversation import Conversation
+    from app.services import cron_jobs
+
+    db = Session()
+    ws = Workspace(name="Claim Spa", slug=f"claims-{datetime.now().timestamp()}", is_active=True)
+    db.add(ws)
+    db.flush()
+    ended = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    booking = Booking(workspace_id=ws.id, status="completed", start_time=ended - timedelta(hours=1), end_time=ended)
+    db.add_all([booking, Conversation(workspace_id=ws.id, subject="Hi", is_paused=False, last_message_is_internal=False)])
+    db.commit()
+    ws_id, booking_id = ws.id, booking.id
+    db.close()
+
+    sent = []
+
+    async def fake_thank_you(booking_id):
+        await asyncio.sleep(0.05)
+        sent.append(("thank_you", booking_id))
+
+    async def fake_owner_alert(workspace_id, unanswered, low_stock):
+        await asyncio.sleep(0.05)
+        sent.append(("owner_alert", workspace_id))
+
+    monkeypatch.setattr(cron_jobs.email_service, "send_visit_completion", fake_thank_you)
+    monkeypatch.setattr(cron_jobs.email_service, "send_daily_owner_alert", fake_owner_alert)
+
+    async def twice(job):
+        sessions = [Session(), Session()]
+        try:
+            await asyncio.gather(*(job(db) for db in sessions))
+        finally:
+            for db in sessions:
+                db.close()
+
+    for job in (cron_jobs.thank_you_emails, cron_jobs.owner_summaries, cron_jobs.thank_you_emails):
+        asyncio.run(twice(job))
+    assert [s for s in sent if s in (("thank_you", booking_id), ("owner_alert", ws_id))] == [
+        ("thank_you", booking_id), ("owner_alert", ws_id)]
+
+
+def test_cron_endpoint_reports_jobs():
+    res = client.post("/api/cron/run", headers={"X-Cron-Secret": settings.CRON_SECRET})
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert "booking_reminders" in body and "follow_ups_sent" in body
+    assert set(body["jobs"]) == {"booking_reminders", "form_reminders", "inventory_alerts",
+                                 "thank_you_emails", "owner_summaries", "follow_ups",
+                                 "series_occurrences", "webhook_deliveries", "auto_complete", "stats_rollup"}
+
+    res = client.get("/api/cron/jobs", headers={"X-Cron-Secret": settings.CRON_SECRET})
+    assert res.status_code == 200
+    assert all(job["last_run"] is not None for job in res.json())
+
+
+if __name__ == "__main__":
+    test_lease_is_exclusive_until_expired()
+    test_same_job_never_runs_twice_concurrently()
+    test_stages_run_one_after_another()
+    test_failed_job_is_recorded_and_lease_released()
+    import pytest
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_overlapping_runs_send_thank_yous_and_owner_alerts_once(monkeypatch)
+    print("\n--- ALL JOB RUNNER TESTS PASSED ---")
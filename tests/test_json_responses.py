@@ -0,0 +1,76 @@
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./json_responses_test.db"
+os.environ["JWT_SECRET"] = "json_responses_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from helpers import auth_headers, create_workspace, unique_slug
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+
+def _setup(slug, bookings):
+    from app.models.service import Service
+    from app.models.contact import Contact
+    from app.models.booking import Booking
+
+    db = Session()
+    ws, owner = create_workspace(db, slug, "Json Spa")
+    service = Service(name="Massage", duration_minutes=60, workspace_id=ws.id, location="Room 2")
+    contact = Contact(workspace_id=ws.id, email=f"ada@{slug}.com", full_name="Ada")
+    db.add_all([service, contact])
+    db.flush()
+    start = datetime(2026, 3, 2, 9, tzinfo=timezone.utc)
+    db.add_all([Booking(workspace_id=ws.id, service_id=service.id, contact_id=contact.id, status="confirmed",
+                        start_time=start + timedelta(hours=i), end_time=start + timedelta(hours=i + 1))
+                for i in range(bookings)])
+    db.commit()
+    headers = auth_headers(owner)
+    db.close()
+    return headers
+
+
+def test_dumps_matches_pydantic_formats():
+    from app.core.responses import dumps
+    from app.schemas.booking import BookingOut
+
+    when = datetime(2026, 3, 2, 9, 30, tzinfo=timezone.utc)
+    booking = {"id": 1, "service_id": 2, "contact_id": 3, "start_time": when, "end_time": when,
+               "status": "confirmed", "created_at": None, "service": None, "contact": None}
+    assert dumps(booking) == BookingOut(**booking).model_dump_json().encode()
+    assert dumps({1: datetime(2026, 3, 2, 9)}) == b'{"1":"2026-03-02T09:00:00"}'
+
+
+def test_booking_list_shape_and_compression():
+    slug = unique_slug("json")
+    headers = _setup(slug, bookings=40)
+
+    res = client.get("/api/bookings", headers={**headers, "Accept-Encoding": "gzip"})
+    assert res.status_code == 200 and res.headers["content-encoding"] == "gzip"
+    bookings = res.json()
+    assert len(bookings) == 40 and bookings[0]["start_time"] > bookings[-1]["start_time"]
+    assert bookings[0]["service"] == {"id": bookings[0]["service_id"], "name": "Massage",
+                                      "duration_minutes": 60, "location": "Room 2"}
+    assert bookings[0]["contact"]["full_name"] == "Ada"
+
+    # Below GZIP_MINIMUM_SIZE bodies go out as-is
+    res = client.get(f"/api/bookings/{bookings[0]['id']}/history", headers={**headers, "Accept-Encoding": "gzip"})
+    assert res.status_code == 200 and res.json() == [] and "content-encoding" not in res.headers
+
+
+if __name__ == "__main__":
+    test_dumps_matches_pydantic_formats()
+    test_booking_list_shape_and_compression()
+    print("\n--- ALL JSON RESPONSE TESTS PASSED ---")
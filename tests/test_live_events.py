@@ -0,0 +1,173 @@
+import sys
+import os
+import asyncio
+from datetime import datetime, date, timedelta, timezone
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./live_events_test.db"
+os.environ["JWT_SECRET"] = "live_events_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from helpers import access_token, create_workspace, unique_slug
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+WEEK = {day: ["09:00-17:00"] for day in ("mon", "tue", "wed", "thu", "fri", "sat", "sun")}
+
+
+def _setup(slug):
+    from app.models.service import Service
+
+    db = Session()
+    ws, owner = create_workspace(db, slug, "Live Spa")
+    service = Service(name="Massage", duration_minutes=60, workspace_id=ws.id, availability=WEEK)
+    db.add(service)
+    db.commit()
+    token = access_token(owner)
+    ids = (ws.id, service.id)
+    db.close()
+    return token, ids
+
+
+def _quiet_emails(monkeypatch):
+    import app.api.bookings as bookings_api
+
+    async def noop(*args, **kwargs):
+        return None
+    for name in ("send_booking_confirmation", "send_form_magic_link", "send_welcome_email",
+                 "send_booking_cancellation", "send_inventory_alert"):
+        monkeypatch.setattr(bookings_api.email_service, name, noop)
+
+
+async def _drain(queue, count):
+    return [(await asyncio.wait_for(queue.get(), timeout=2))["type"] for _ in range(count)]
+
+
+def test_committed_changes_reach_subscribers(monkeypatch):
+    from app.models.conversation import Conversation, Message
+    from app.models.communication_log import CommunicationLog
+    from app.models.inventory import InventoryItem
+    from app.services.events import event_bus
+
+    _quiet_emails(monkeypatch)
+    slug = unique_slug("live")
+    token, (ws_id, service_id) = _setup(slug)
+    start = datetime.combine(date.today() + timedelta(days=2), datetime.min.time(), tzinfo=timezone.utc).replace(hour=10)
+
+    def rolled_back_message():
+        db = Session()
+        conv = Conversation(workspace_id=ws_id, subject="Hi")
+        db.add(conv)
+        db.flush()
+        db.add(Message(conversation_id=conv.id, sender_email="x@y.com", content="never sent"))
+        db.flush()
+        db.rollback()
+        db.close()
+
+    def workspace_activity():
+        db = Session()
+        conv = Conversation(workspace_id=ws_id, subject="Hi")
+        item = InventoryItem(name="Oil", quantity=6, threshold=5, workspace_id=ws_id)
+        log = CommunicationLog(workspace_id=ws_id, type="reminder", recipient_email="x@y.com", status="pending")
+        db.add_all([conv, item, log])
+        db.commit()
+        db.add(Message(conversation_id=conv.id, sender_email="x@y.com", content="Hello"))
+        item.quantity -= 1  # Crosses the threshold
+        log.status = "failed"
+        db.commit()
+        item.quantity -= 1  # Already low: no second alert
+        db.commit()
+        db.close()
+
+    async def scenario():
+        queue = event_bus.subscribe(ws_id)
+        other = event_bus.subscribe(ws_id + 1000)
+        try:
+            await asyncio.to_thread(rolled_back_message)
+            res = await asyncio.to_thread(client.post, "/api/bookings", json={
+                "service_id": service_id, "start_datetime": start.isoformat(), "name": "Guest", "email": f"g@{slug}.com",
+            })
+            assert res.status_code == 200, res.text
+            booking_id = res.json()["id"]
+            # The public booking creates the guest's contact in the same transaction
+            created = {evt["type"]: evt for evt in [await asyncio.wait_for(queue.get(), timeout=2) for _ in range(2)]}
+            assert sorted(created) == ["booking.created", "contact.created"]
+            assert created["booking.created"]["data"]["booking_id"] == booking_id
+
+            res = await asyncio.to_thread(client.post, f"/api/bookings/{booking_id}/cancel",
+                                          headers={"Authorization": f"Bearer {token}"})
+            assert res.status_code == 200, res.text
+            assert await _drain(queue, 1) == ["booking.cancelled"]
+
+            await asyncio.to_thread(workspace_activity)
+            assert sorted(await _drain(queue, 3)) == ["email.failed", "inventory.low", "message.created"]
+            await asyncio.sleep(0.05)
+            assert queue.empty() and other.empty()
+        finally:
+            event_bus.unsubscribe(ws_id, queue)
+            event_bus.unsubscribe(ws_id + 1000, other)
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_gets_resync():
+    from app.core.config import settings
+    from app.services.events import event_bus, make_event
+
+    async def scenario():
+        queue = event_bus.subscribe(424242)
+        try:
+            for i in range(settings.LIVE_EVENTS_QUEUE_SIZE + 2):
+                event_bus.publish(make_event(424242, "booking.created", {"booking_id": i}))
+            await asyncio.sleep(0.05)
+            assert await _drain(queue, 2) == ["resync", "booking.created"]
+            assert queue.empty()
+        finally:
+            event_bus.unsubscribe(424242, queue)
+        assert event_bus.subscriber_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_stream_endpoint(monkeypatch):
+    from app.api.events import stream_events
+    from app.services.events import event_bus, make_event
+
+    monkeypatch.setattr("app.core.config.settings.LIVE_EVENTS_HEARTBEAT_SECONDS", 0.05)
+
+    assert client.get("/api/events/stream").status_code == 401
+    assert client.get("/api/events/stream?token=garbage").status_code == 401
+
+    class FakeRequest:
+        def __init__(self):
+            self.polls = 0
+
+        async def is_disconnected(self):
+            self.polls += 1
+            return self.polls > 2
+
+    async def scenario():
+        queue = event_bus.subscribe(7)
+        event_bus.publish(make_event(7, "message.created", {"message_id": 1}))
+        await asyncio.sleep(0.01)
+        chunks = [chunk async for chunk in stream_events(FakeRequest(), queue, 7)]
+        assert chunks[0].startswith("event: ready")
+        assert chunks[1].startswith("event: message.created\ndata: {") and chunks[1].endswith("\n\n")
+        assert chunks[2] == ": keep-alive\n\n"
+        assert event_bus.subscriber_count() == 0  # Unsubscribed on disconnect
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_slow_subscriber_gets_resync()
+    print("\n--- ALL LIVE EVENTS TESTS PASSED ---")
@@ -0,0 +1,84 @@
+import sys
+import os
+import gzip
+import json
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./retention_test.db"
+os.environ["JWT_SECRET"] = "retention_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from app.core.config import settings
+
+# Fresh start
+Base.metadata.drop_all(bind=engine)
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+
+def test_retention_moves_and_archives_logs():
+    from app.models.workspace import Workspace
+    from app.models.audit_log import AuditLog, AuditLogArchive
+    from app.models.communication_log import CommunicationLog, CommunicationLogArchive
+    from app.services.retention import run_log_retention
+
+    settings.LOG_ARCHIVE_DIR = tempfile.mkdtemp()
+    db = Session()
+    now = datetime.now(timezone.utc)
+
+    ws = Workspace(name="Retention Spa", slug="retention-spa", is_active=True)
+    db.add(ws)
+    db.commit()
+
+    # Hot, cold (archive table) and expired (gzip) rows
+    db.add_all([
+        AuditLog(workspace_id=ws.id, action="booking.created", created_at=now - timedelta(days=1)),
+        AuditLog(workspace_id=ws.id, action="booking.cancelled", created_at=now - timedelta(days=120)),
+        AuditLog(workspace_id=ws.id, action="booking.restored", created_at=now - timedelta(days=400)),
+        CommunicationLog(workspace_id=ws.id, type="reminder", recipient_email="a@b.com", status="failed",
+                         created_at=now - timedelta(days=200)),
+    ])
+    db.commit()
+
+    results = run_log_retention(db, now=now)
+    assert results["moved_to_archive"] == 3
+    assert results["exported"] == 1
+
+    assert [a.action for a in db.query(AuditLog).filter(AuditLog.workspace_id == ws.id)] == ["booking.created"]
+    assert [a.action for a in db.query(AuditLogArchive).filter(AuditLogArchive.workspace_id == ws.id)] == ["booking.cancelled"]
+    assert db.query(CommunicationLog).filter(CommunicationLog.workspace_id == ws.id).count() == 0
+    assert db.query(CommunicationLogArchive).filter(CommunicationLogArchive.workspace_id == ws.id).count() == 1
+
+    # Expired row landed in a gzip NDJSON file for its month
+    month = (now - timedelta(days=400)).strftime("%Y-%m")
+    path = os.path.join(settings.LOG_ARCHIVE_DIR, "audit_logs", f"{month}.ndjson.gz")
+    with gzip.open(path, "rt") as fh:
+        records = [json.loads(line) for line in fh]
+    assert [r["action"] for r in records] == ["booking.restored"]
+
+    # Idempotent
+    assert run_log_retention(db, now=now) == {"moved_to_archive": 0, "exported": 0}
+    db.close()
+
+
+def test_retention_endpoint_requires_secret():
+    res = client.post("/api/cron/retention")
+    assert res.status_code == 403
+    res = client.post("/api/cron/retention", headers={"X-Cron-Secret": settings.CRON_SECRET})
+    assert res.status_code == 200
+
+
+if __name__ == "__main__":
+    test_retention_moves_and_archives_logs()
+    test_retention_endpoint_requires_secret()
+    print("\n--- ALL RETENTION TESTS PASSED ---")
@@ -0,0 +1,219 @@
+import sys
+import os
+import base64
+import email
+from datetime import datetime
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./mail_threads_test.db"
+os.environ["JWT_SECRET"] = "mail_threads_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from helpers import auth_headers, create_workspace, unique_slug
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+
+class FakeGmail:
+    """Just enough of the Gmail API client for inbox sync and reply: users().threads()/messages()."""
+
+    def __init__(self, threads):
+        self.threads_by_id = threads
+        self.sent = []
+
+    def users(self):
+        return self
+
+    def threads(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def list(self, **kwargs):
+        return _Call({"threads": [{"id": thread_id} for thread_id in self.threads_by_id]})
+
+    def get(self, id, **kwargs):
+        return _Call({"id": id, "messages": self.threads_by_id[id]})
+
+    def send(self, body, **kwargs):
+        self.sent.append(body)
+        return _Call({"id": "sent", "threadId": body.get("threadId")})
+
+
+class _Call:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        return self.result
+
+
+def _gmail_message(gmail_id, sender, text, at, message_id, in_reply_to=None, subject="Booking"):
+    headers = [("From", sender), ("To", "desk@spa.com"), ("Subject", subject), ("Message-Id", message_id)]
+    if in_reply_to:
+        headers += [("In-Reply-To", in_reply_to), ("References", in_reply_to)]
+    return {
+        "id": gmail_id, "internalDate": str(int(at * 1000)),
+        "payload": {"headers": [{"name": n, "value": v} for n, v in headers],
+                    "body": {"data": base64.urlsafe_b64encode(text.encode()).decode()}},
+    }
+
+
+def _setup(slug):
+    from app.models.contact import Contact
+
+    db = Session()
+    ws, user = create_workspace(db, slug, "Thread Spa")
+    contact = Contact(workspace_id=ws.id, email=f"ada@{slug}.com", full_name="Ada")
+    db.add(contact)
+    db.commit()
+    headers = auth_headers(user)
+    ids = {"ws": ws.id, "contact": contact.id, "email": contact.email}
+    db.close()
+    return headers, ids
+
+
+def _conversations(ws_id):
+    from app.models.conversation import Conversation
+
+    db = Session()
+    rows = {c.gmail_thread_id: (c.id, [m.content for m in sorted(c.messages, key=lambda m: m.id)])
+            for c in db.query(Conversation).filter(Conversation.workspace_id == ws_id)}
+    db.close()
+    return rows
+
+
+def test_parallel_threads_become_separate_conversations(monkeypatch):
+    import app.api.inbox as inbox_api
+
+    stamp = datetime.now().timestamp()
+    headers, ids = _setup(unique_slug("threads-split"))
+    ada = ids["email"]
+    gmail = FakeGmail({
+        "t-massage": [_gmail_message("g1", ada, "Can I book a massage?", stamp, "<m1@mail>")],
+        "t-invoice": [_gmail_message("g2", ada, "Where is my invoice?", stamp + 1, "<i1@mail>", subject="Invoice")],
+    })
+    monkeypatch.setattr(inbox_api, "get_gmail_client", lambda *args: gmail)
+
+    res = client.post("/api/inbox/sync", headers=headers)
+    assert res.status_code == 200 and res.json()["synced_messages"] == 2
+    first = _conversations(ids["ws"])
+    assert first["t-massage"][1] == ["Can I book a massage?"] and first["t-invoice"][1] == ["Where is my invoice?"]
+    assert first["t-massage"][0] != first["t-invoice"][0]
+
+    # Re-syncing only adds what's new; the same text twice in a thread is still two messages
+    gmail.threads_by_id["t-massage"] += [
+        _gmail_message("g3", "desk@spa.com", "Thanks!", stamp + 2, "<m2@spa>", in_reply_to="<m1@mail>"),
+        _gmail_message("g4", ada, "Thanks!", stamp + 3, "<m3@mail>", in_reply_to="<m2@spa>"),
+    ]
+    assert client.post("/api/inbox/sync", headers=headers).json()["synced_messages"] == 2
+    assert _conversations(ids["ws"])["t-massage"][1] == ["Can I book a massage?", "Thanks!", "Thanks!"]
+
+
+def test_replies_from_a_new_thread_and_outbound_replies(monkeypatch):
+    import app.api.inbox as inbox_api
+    from app.models.conversation import Conversation, Message
+
+    stamp = datetime.now().timestamp()
+    headers, ids = _setup(unique_slug("threads-reply"))
+    # A form enquiry we answered by email: it has our Message-ID but no Gmail thread yet
+    db = Session()
+    conv = Conversation(workspace_id=ids["ws"], contact_id=ids["contact"], subject="Enquiry",
+                        last_message_at=datetime.now())
+    db.add(conv)
+    db.flush()
+    db.add(Message(conversation_id=conv.id, sender_email="desk@spa.com", content="We have Friday free",
+                   is_internal=True, message_id_header="<reply1@spa>"))
+    db.commit()
+    conv_id = conv.id
+    db.close()
+
+    gmail = FakeGmail({"t-answer": [
+        _gmail_message("g1", ids["email"], "Friday works", stamp, "<a1@mail>", in_reply_to="<reply1@spa>"),
+    ]})
+    monkeypatch.setattr(inbox_api, "get_gmail_client", lambda *args: gmail)
+    assert client.post("/api/inbox/sync", headers=headers).json()["synced_messages"] == 1
+    assert _conversations(ids["ws"]) == {"t-answer": (conv_id, ["We have Friday free", "Friday works"])}
+
+    res = client.post("/api/inbox/reply", headers=headers, json={"thread_id": "t-answer", "body": "Booked!"})
+    assert res.status_code == 200, res.text
+    (sent,) = gmail.sent
+    mime = email.message_from_bytes(base64.urlsafe_b64decode(sent["raw"]))
+    assert sent["threadId"] == "t-answer" and mime["In-Reply-To"] == "<a1@mail>"
+    assert mime["References"] == "<reply1@spa> <a1@mail>"
+
+    db = Session()
+    assert db.get(Conversation, conv_id).is_paused
+    db.close()
+
+
+def test_conversations_from_before_threading_claim_their_thread(monkeypatch):
+    import app.api.inbox as inbox_api
+    from app.models.contact import Contact
+    from app.models.conversation import Conversation, Message
+
+    stamp = datetime.now().timestamp()
+    headers, ids = _setup(unique_slug("threads-legacy"))
+    ada = ids["email"]
+    bob = ada.replace("ada@", "bob@")
+    # Synced before the upgrade: no gmail_thread_id, no Message-IDs on the messages
+    db = Session()
+    bob_contact = Contact(workspace_id=ids["ws"], email=bob, full_name="Bob")
+    db.add(bob_contact)
+    db.flush()
+    legacy = {}
+    for email, contact_id, text in ((ada, ids["contact"], "Can I book a massage?"),
+                                    (bob, bob_contact.id, "Do you do facials?")):
+        conv = Conversation(workspace_id=ids["ws"], contact_id=contact_id, subject="Booking",
+                            last_message_at=datetime.now())
+        db.add(conv)
+        db.flush()
+        db.add(Message(conversation_id=conv.id, sender_email=email, content=text, is_internal=False))
+        legacy[email] = conv.id
+    db.commit()
+    db.close()
+
+    gmail = FakeGmail({"t-old": [
+        _gmail_message("g1", ada, "Can I book a massage?", stamp, "<o1@mail>"),
+        _gmail_message("g2", ada, "Is Friday free?", stamp + 1, "<o2@mail>", in_reply_to="<o1@mail>"),
+    ]})
+    monkeypatch.setattr(inbox_api, "get_gmail_client", lambda *args: gmail)
+    assert client.post("/api/inbox/sync", headers=headers).json()["synced_messages"] == 1
+    assert client.post("/api/inbox/sync", headers=headers).json()["synced_messages"] == 0
+    assert _conversations(ids["ws"]) == {
+        "t-old": (legacy[ada], ["Can I book a massage?", "Is Friday free?"]),
+        None: (legacy[bob], ["Do you do facials?"]),
+    }
+    db = Session()
+    assert {m.message_id_header for m in db.get(Conversation, legacy[ada]).messages} == {"<o1@mail>", "<o2@mail>"}
+    db.close()
+
+    # Replying on a thread we never synced still pauses the contact's conversation, which takes the thread
+    gmail.threads_by_id["t-bob"] = [_gmail_message("g3", bob, "Do you do facials?", stamp + 2, "<b1@mail>")]
+    res = client.post("/api/inbox/reply", headers=headers, json={"thread_id": "t-bob", "body": "We do!"})
+    assert res.status_code == 200, res.text
+    db = Session()
+    conv = db.get(Conversation, legacy[bob])
+    assert conv.is_paused and conv.gmail_thread_id == "t-bob"
+    db.close()
+
+
+if __name__ == "__main__":
+    import pytest
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_parallel_threads_become_separate_conversations(monkeypatch)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_replies_from_a_new_thread_and_outbound_replies(monkeypatch)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_conversations_from_before_threading_claim_their_thread(monkeypatch)
+    print("\n--- ALL MAIL THREAD TESTS PASSED ---")
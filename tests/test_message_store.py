@@ -0,0 +1,117 @@
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./message_store_test.db"
+os.environ["JWT_SECRET"] = "message_store_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from helpers import auth_headers, create_workspace, unique_slug
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+LONG_BODY = "Hello, here is my intake history. " * 200 + "Also: I'm allergic to lavender."
+
+
+def _setup(slug):
+    """A workspace with one conversation holding a short message and a long one."""
+    from app.models.user import UserRole
+    from app.models.contact import Contact
+    from app.models.conversation import Conversation, Message
+
+    db = Session()
+    ws, user = create_workspace(db, slug, "Store Spa", role=UserRole.STAFF)
+    contact = Contact(workspace_id=ws.id, email=f"ada@{slug}.com", full_name="Ada")
+    db.add(contact)
+    db.flush()
+    conv = Conversation(workspace_id=ws.id, contact_id=contact.id, subject="Intake")
+    db.add(conv)
+    db.flush()
+    short = Message(conversation_id=conv.id, sender_email=contact.email, content="See you  Tuesday\n")
+    long = Message(conversation_id=conv.id, sender_email=contact.email, content=LONG_BODY)
+    db.add_all([short, long])
+    db.commit()
+    headers = auth_headers(user)
+    ids = {"conversation": conv.id, "short": short.id, "long": long.id}
+    db.close()
+    return headers, ids
+
+
+def _statements(fn):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(" ".join(statement.split()))
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return result, statements
+
+
+def test_bodies_are_split_and_compressed():
+    from app.models.conversation import Message, MessageBody, PREVIEW_CHARS, message_hash
+
+    _, ids = _setup(unique_slug("store-split"))
+    db = Session()
+    short, long = db.get(Message, ids["short"]), db.get(Message, ids["long"])
+    assert short.preview == "See you Tuesday" and short.body_size == 17
+    assert len(long.preview) == PREVIEW_CHARS and long.content_hash == message_hash(LONG_BODY)
+
+    bodies = {b.message_id: b for b in db.query(MessageBody).filter(MessageBody.message_id.in_(list(ids.values())))}
+    assert bodies[ids["short"]].encoding == "plain"
+    assert bodies[ids["long"]].encoding == "zlib" and len(bodies[ids["long"]].data) < long.body_size / 10
+    assert long.content == LONG_BODY
+
+    # Rewriting a body keeps the metadata in step
+    short.content = "Make it Wednesday"
+    db.commit()
+    assert db.get(Message, ids["short"]).preview == "Make it Wednesday"
+    db.close()
+
+
+def test_opening_a_conversation_loads_bodies_in_one_query():
+    headers, ids = _setup(unique_slug("store-open"))
+    res, statements = _statements(lambda: client.get(f"/api/conversations/{ids['conversation']}", headers=headers))
+    assert res.status_code == 200
+    assert sorted(m["content"] for m in res.json()) == [LONG_BODY, "See you  Tuesday\n"]
+    assert len([s for s in statements if "FROM message_bodies" in s]) == 1
+
+    # The inbox list never reads a body
+    res, statements = _statements(lambda: client.get("/api/conversations/", headers=headers))
+    assert res.status_code == 200 and not [s for s in statements if "message_bodies" in s]
+
+
+def test_search_indexes_the_whole_body():
+    from app.models.conversation import Message
+
+    headers, ids = _setup(unique_slug("store-search"))
+    # "lavender" is far past the preview
+    res = client.get("/api/search", params={"q": "lavender", "type": "messages"}, headers=headers)
+    (hit,) = res.json()["messages"]
+    assert hit["id"] == ids["long"] and "<b>lavender</b>" in hit["snippet"]
+
+    db = Session()
+    db.delete(db.get(Message, ids["long"]))
+    db.commit()
+    assert db.execute(text("SELECT count(*) FROM messages_fts WHERE rowid = :id"), {"id": ids["long"]}).scalar() == 0
+    assert db.execute(text("SELECT count(*) FROM message_bodies WHERE message_id = :id"), {"id": ids["long"]}).scalar() == 0
+    db.close()
+    res = client.get("/api/search", params={"q": "lavender", "type": "messages"}, headers=headers)
+    assert res.json()["messages"] == []
+
+
+if __name__ == "__main__":
+    test_bodies_are_split_and_compressed()
+    test_opening_a_conversation_loads_bodies_in_one_query()
+    test_search_indexes_the_whole_body()
+    print("\n--- ALL MESSAGE STORE TESTS PASSED ---")
@@ -0,0 +1,140 @@
+import sys
+import os
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./scheduler_test.db"
+os.environ["JWT_SECRET"] = "scheduler_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from helpers import auth_headers, create_workspace, unique_slug
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+
+def _setup(slug):
+    from app.models.service import Service
+
+    db = Session()
+    ws, owner = create_workspace(db, slug, "Reminder Spa")
+    service = Service(name="Massage", duration_minutes=60, workspace_id=ws.id)
+    db.add(service)
+    db.commit()
+    headers = auth_headers(owner)
+    ids = (ws.id, service.id)
+    db.close()
+    return headers, ids
+
+
+def test_heap_schedule_cancel_reschedule():
+    from app.services.scheduler import ReminderScheduler
+
+    s = ReminderScheduler()
+    t0 = datetime(2026, 5, 1, 9, 0, tzinfo=timezone.utc)
+    s.schedule(("booking_reminder", 1), t0 + timedelta(hours=3))
+    s.schedule(("booking_reminder", 2), t0 + timedelta(hours=1))
+    s.schedule(("form_reminder", 7), t0 + timedelta(hours=2))
+    assert s.next_due() == t0 + timedelta(hours=1)
+
+    # Reschedule moves #2 behind #1; cancel drops #7
+    s.schedule(("booking_reminder", 2), t0 + timedelta(hours=5))
+    s.cancel(("form_reminder", 7))
+    assert len(s) == 2
+    assert s.pop_due(t0 + timedelta(hours=4)) == [("booking_reminder", 1)]
+    assert s.pop_due(t0 + timedelta(hours=4)) == []
+    assert s.pop_due(t0 + timedelta(hours=6)) == [("booking_reminder", 2)]
+    assert s.next_due() is None
+
+
+def test_booking_events_feed_scheduler(monkeypatch):
+    from app.services.scheduler import reminder_scheduler
+    import app.api.bookings as bookings_api
+
+    async def noop(*args, **kwargs):
+        return None
+    for name in ("send_booking_confirmation", "send_form_magic_link", "send_welcome_email", "send_booking_cancellation"):
+        monkeypatch.setattr(bookings_api.email_service, name, noop)
+
+    slug = unique_slug("sched")
+    headers, (_, service_id) = _setup(slug)
+    start = (datetime.now(timezone.utc) + timedelta(days=3)).replace(minute=0, second=0, microsecond=0)
+    res = client.post("/api/bookings", json={
+        "service_id": service_id, "start_datetime": start.isoformat(),
+        "name": "Sam", "email": f"sam@{slug}.com",
+    })
+    assert res.status_code == 200, res.text
+    booking_id = res.json()["id"]
+
+    key = ("booking_reminder", booking_id)
+    assert reminder_scheduler._entries[key][0] == start - timedelta(hours=24)
+
+    new_start = start + timedelta(days=1)
+    res = client.post(f"/api/bookings/{booking_id}/reschedule", headers=headers,
+                      json={"start_datetime": new_start.isoformat()})
+    assert res.status_code == 200, res.text
+    assert reminder_scheduler._entries[key][0] == new_start - timedelta(hours=24)
+
+    res = client.post(f"/api/bookings/{booking_id}/cancel", headers=headers)
+    assert res.status_code == 200
+    assert key not in reminder_scheduler._entries
+
+
+def test_due_jobs_fire_once_and_rebuild(monkeypatch):
+    from app.models.booking import Booking, BookingStatus
+    from app.models.contact import Contact
+    from app.models.audit_log import AuditLog
+    from app.services import scheduler
+
+    sent = []
+
+    async def fake_reminder(booking_id):
+        sent.append(booking_id)
+    monkeypatch.setattr(scheduler.email_service, "send_booking_reminder", fake_reminder)
+
+    slug = unique_slug("sched-fire")
+    _, (workspace_id, service_id) = _setup(slug)
+    now = datetime.now(timezone.utc)
+    db = Session()
+    contact = Contact(workspace_id=workspace_id, email=f"kim@{slug}.com", full_name="Kim")
+    db.add(contact)
+    db.flush()
+    booking = Booking(workspace_id=workspace_id, service_id=service_id, contact_id=contact.id,
+                      start_time=now + timedelta(hours=10), end_time=now + timedelta(hours=11),
+                      status=BookingStatus.CONFIRMED.value, reminder_sent=False)
+    db.add(booking)
+    db.commit()
+    booking_id = booking.id
+
+    # Startup rebuild picks the booking up from the range query
+    s = scheduler.ReminderScheduler()
+    s.rebuild(db, now=now)
+    assert ("booking_reminder", booking_id) in s._entries
+
+    # Already due (starts within 24h): fires once, then the claim makes it a no-op
+    assert asyncio.run(s.run_due(now)) >= 1
+    assert booking_id in sent
+    db.expire_all()
+    s.booking_changed(db.query(Booking).get(booking_id))
+    assert ("booking_reminder", booking_id) not in s._entries
+    assert asyncio.run(scheduler.send_booking_reminder_job(db, booking_id, now)) is False
+    assert sent.count(booking_id) == 1
+
+    assert db.query(Booking).get(booking_id).reminder_sent is True
+    assert db.query(AuditLog).filter(AuditLog.booking_id == booking_id,
+                                     AuditLog.action == "booking.reminder_sent").count() == 1
+    db.close()
+
+
+if __name__ == "__main__":
+    test_heap_schedule_cancel_reschedule()
+    print("\n--- ALL SCHEDULER TESTS PASSED ---")
@@ -0,0 +1,80 @@
+import sys
+import os
+import time
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./search_test.db"
+os.environ["JWT_SECRET"] = "search_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from helpers import auth_headers, create_workspace, unique_slug
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+
+def _workspace(db, slug):
+    from app.models.user import UserRole
+
+    ws, user = create_workspace(db, slug, slug, role=UserRole.STAFF)
+    return ws, auth_headers(user)
+
+
+def test_search_contacts_and_messages():
+    from app.models.contact import Contact
+    from app.models.conversation import Conversation, Message
+
+    db = Session()
+    ws, headers = _workspace(db, unique_slug("search-a"))
+    other, _ = _workspace(db, unique_slug("search-b"))
+
+    db.add_all([Contact(workspace_id=ws.id, email=f"lead{i}@example.com", full_name=f"Lead Number{i}") for i in range(2000)])
+    jane = Contact(workspace_id=ws.id, email="jane.smithson@example.com", full_name="Jane Smithson", phone="555 0101")
+    leak = Contact(workspace_id=other.id, email="jane.smith@other.com", full_name="Jane Smith")
+    db.add_all([jane, leak])
+    db.flush()
+    conv = Conversation(workspace_id=ws.id, contact_id=jane.id, subject="Hi")
+    db.add(conv)
+    db.flush()
+    db.add(Message(conversation_id=conv.id, sender_email=jane.email, content="Can I move my aromatherapy session?"))
+    db.commit()
+
+    # Prefix match on partial words, workspace scoped
+    started = time.perf_counter()
+    res = client.get("/api/search", params={"q": "jan smi"}, headers=headers)
+    elapsed = time.perf_counter() - started
+    assert res.status_code == 200
+    data = res.json()
+    assert [c["email"] for c in data["contacts"]] == ["jane.smithson@example.com"]
+    assert elapsed < 0.5
+
+    res = client.get("/api/search", params={"q": "aroma", "type": "messages"}, headers=headers)
+    messages = res.json()["messages"]
+    assert len(messages) == 1 and messages[0]["conversation_id"] == conv.id
+    assert "<b>aromatherapy</b>" in messages[0]["snippet"]
+
+    # Index follows updates (trigger maintained)
+    jane.full_name = "Janet Doe"
+    db.commit()
+    res = client.get("/api/search", params={"q": "smithson", "type": "contacts"}, headers=headers)
+    assert res.json()["contacts"][0]["full_name"] == "Janet Doe"
+    res = client.get("/api/search", params={"q": "Janet", "type": "contacts"}, headers=headers)
+    assert len(res.json()["contacts"]) == 1
+
+    # Pagination
+    res = client.get("/api/search", params={"q": "lead", "type": "contacts", "limit": 50, "offset": 1950}, headers=headers)
+    assert len(res.json()["contacts"]) == 50
+    db.close()
+
+
+if __name__ == "__main__":
+    test_search_contacts_and_messages()
+    print("\n--- ALL SEARCH TESTS PASSED ---")
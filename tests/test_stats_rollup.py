@@ -0,0 +1,152 @@
+import sys
+import os
+from datetime import date, datetime, timedelta, timezone
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Set ENV for Testing
+os.environ["DATABASE_URL"] = "sqlite:///./stats_rollup_test.db"
+os.environ["JWT_SECRET"] = "stats_rollup_secret"
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import engine
+from helpers import auth_headers, create_workspace, make_user, unique_slug
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+Session = sessionmaker(bind=engine)
+
+MONDAY = date(2025, 3, 3)
+
+
+def _at(day, hour=10):
+    return datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc)
+
+
+def _setup(slug):
+    """Monday: 2 bookings (Sam, Kim), 1 sent + 1 failed email, a completed form, a lead. Wednesday: 1 booking."""
+    from app.models.service import Service
+    from app.models.contact import Contact
+    from app.models.booking import Booking
+    from app.models.form import Form, FormSubmission
+    from app.models.communication_log import CommunicationLog
+
+    db = Session()
+    ws, owner = create_workspace(db, slug, "Stats Spa")
+    sam = make_user(ws, "sam")
+    service = Service(name="Massage", duration_minutes=60, workspace_id=ws.id)
+    contact = Contact(workspace_id=ws.id, email=f"ada@{slug}.com", full_name="Ada", created_at=_at(MONDAY))
+    form = Form(name="Intake", type="intake", workspace_id=ws.id)
+    db.add_all([sam, service, contact, form])
+    db.flush()
+
+    def booking(day, staff_id=None, status="confirmed"):
+        return Booking(workspace_id=ws.id, service_id=service.id, contact_id=contact.id, staff_id=staff_id,
+                       status=status, start_time=_at(day), end_time=_at(day, 11))
+
+    bookings = [booking(MONDAY, sam.id), booking(MONDAY, status="completed"), booking(MONDAY + timedelta(days=2), sam.id)]
+    db.add_all(bookings)
+    db.flush()
+    db.add_all([
+        CommunicationLog(workspace_id=ws.id, type="reminder", recipient_email=contact.email, status="success",
+                         created_at=_at(MONDAY)),
+        CommunicationLog(workspace_id=ws.id, type="reminder", recipient_email=contact.email, status="failed",
+                         created_at=_at(MONDAY)),
+        FormSubmission(form_id=form.id, booking_id=bookings[0].id, status="completed",
+                       sent_at=_at(MONDAY, 8), completed_at=_at(MONDAY, 9)),
+    ])
+    db.commit()
+    headers = auth_headers(owner)
+    ids = {"ws": ws.id, "sam": sam.id, "service": service.id, "bookings": [b.id for b in bookings]}
+    db.close()
+    return headers, ids
+
+
+def _dirty(db, ws_id):
+    from app.models.workspace_stats import WorkspaceStatsDirtyDay
+    return {(m.day, m.source) for m in db.query(WorkspaceStatsDirtyDay).filter(WorkspaceStatsDirtyDay.workspace_id == ws_id)}
+
+
+def test_rollup_recomputes_dirty_days_only():
+    from app.models.booking import Booking
+    from app.models.workspace_stats import WorkspaceDailyStats
+    from app.services import stats_rollup
+
+    headers, ids = _setup(unique_slug("stats-roll"))
+    wednesday = MONDAY + timedelta(days=2)
+    db = Session()
+    assert _dirty(db, ids["ws"]) == {(MONDAY, "bookings"), (MONDAY, "emails"), (MONDAY, "forms"),
+                                     (MONDAY, "leads"), (wednesday, "bookings")}
+    assert stats_rollup.run(db) >= 5
+    assert _dirty(db, ids["ws"]) == set()
+
+    monday = db.get(WorkspaceDailyStats, (ids["ws"], MONDAY))
+    assert monday.bookings_total == 2
+    assert monday.bookings_by_status == {"confirmed": 1, "completed": 1}
+    assert monday.bookings_by_staff == {str(ids["sam"]): 1, "none": 1}
+    assert monday.bookings_by_service == {str(ids["service"]): 2}
+    assert (monday.emails_sent, monday.emails_failed, monday.forms_completed, monday.new_leads) == (1, 1, 1, 1)
+
+    # Moving a booking dirties the day it left and the day it landed on; unrelated edits dirty nothing
+    moved = db.get(Booking, ids["bookings"][0])
+    moved.start_time, moved.end_time = _at(wednesday), _at(wednesday, 11)
+    db.get(Booking, ids["bookings"][2]).reminder_sent = True
+    db.commit()
+    assert _dirty(db, ids["ws"]) == {(MONDAY, "bookings"), (wednesday, "bookings")}
+    stats_rollup.run(db)
+    db.expire_all()
+    assert db.get(WorkspaceDailyStats, (ids["ws"], MONDAY)).bookings_total == 1
+    assert db.get(WorkspaceDailyStats, (ids["ws"], wednesday)).bookings_by_staff == {str(ids["sam"]): 2}
+    # Only the bookings source was recomputed; the other counters are untouched
+    assert db.get(WorkspaceDailyStats, (ids["ws"], MONDAY)).emails_failed == 1
+    db.close()
+
+
+def test_bulk_updates_mark_days():
+    from app.services import stats_rollup
+
+    headers, ids = _setup(unique_slug("stats-bulk"))
+    db = Session()
+    stats_rollup.run(db)
+    db.close()
+    res = client.post("/api/bookings/bulk", headers=headers,
+                      json={"action": "set_status", "status": "no_show", "booking_ids": ids["bookings"][2:]})
+    assert res.status_code == 200, res.text
+    db = Session()
+    assert _dirty(db, ids["ws"]) == {(MONDAY + timedelta(days=2), "bookings")}
+    db.close()
+
+
+def test_trends_read_the_rollup():
+    from app.services import stats_rollup
+
+    headers, ids = _setup(unique_slug("stats-trends"))
+    db = Session()
+    stats_rollup.run(db)
+    db.close()
+
+    params = {"start": str(MONDAY - timedelta(days=40)), "end": str(MONDAY + timedelta(days=30))}
+    res = client.get("/api/dashboard/trends", headers=headers, params={**params, "period": "week"})
+    assert res.status_code == 200, res.text
+    (week,) = res.json()["points"]
+    assert week["period_start"] == str(MONDAY) and week["bookings_total"] == 3
+    assert week["bookings_by_status"] == {"confirmed": 2, "completed": 1}
+
+    res = client.get("/api/dashboard/trends", headers=headers, params={**params, "period": "month"})
+    body = res.json()
+    assert body["start"] == "2025-01-01"  # Widened to the whole first month
+    assert [(p["period_start"], p["new_leads"], p["emails_sent"]) for p in body["points"]] == [("2025-03-01", 1, 1)]
+
+    res = client.get("/api/dashboard/trends", headers=headers, params={"start": "2020-01-01", "end": "2025-01-01"})
+    assert res.status_code == 400
+
+
+if __name__ == "__main__":
+    test_rollup_recomputes_dirty_days_only()
+    test_bulk_updates_mark_days()
+    test_trends_read_the_rollup()
+    print("\n--- ALL STATS ROLLUP TESTS PASSED ---")